@@ -0,0 +1,71 @@
+"""
+Per-chunk voiceover cache.
+
+The narration is synthesized in chunks that follow the script's chapter
+sections, and every chunk is cached by its text, voice and model. After a
+chapter edit only the chunks whose text changed are sent to ElevenLabs; the
+rest are reused byte-for-byte, with their word timings shifted into place.
+
+Layout:
+    <root>/<key>.mp3    chunk audio
+    <root>/<key>.json   {"words": [[start, end], ...], "duration_seconds": float, "source": str}
+
+Usage:
+    from audio_chunks import AudioChunkCache
+    cache = AudioChunkCache(config.audio_chunks_dir)
+    key = cache.key(text, voice_id, model_id, timestamps)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from timing_index import WordTiming
+
+
+class AudioChunkCache:
+    """Synthesized chunks addressed by (text, voice, model, timestamps)."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, voice_id: str, model_id: str, timestamps: bool) -> str:
+        payload = json.dumps([text, voice_id, model_id, timestamps], separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> tuple[bytes, list[WordTiming], float, str] | None:
+        """Return (audio, words relative to the chunk start, duration, source)."""
+        audio_path = self.root / f"{key}.mp3"
+        meta_path = self.root / f"{key}.json"
+        if not (audio_path.exists() and meta_path.exists()):
+            self.misses += 1
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        words = [(start, end) for start, end in meta["words"]]
+        return audio_path.read_bytes(), words, meta["duration_seconds"], meta["source"]
+
+    def put(self, key: str, audio: bytes, words: list[WordTiming], duration: float, source: str) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "words": [[round(start, 3), round(end, 3)] for start, end in words],
+            "duration_seconds": duration,
+            "source": source,
+        }
+        # Audio first, metadata last: a chunk only counts as cached once both exist
+        for suffix, data in ((".mp3", audio), (".json", json.dumps(meta).encode("utf-8"))):
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=f".{key}.")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, self.root / f"{key}{suffix}")
@@ -0,0 +1,668 @@
+"""
+Record/replay cassettes for deterministic offline benchmarking.
+
+In ``record`` mode the Gemini, ElevenLabs, Sora and download clients are
+wrapped so every request/response pair is captured with its latency. In
+``replay`` mode the same interactions are served offline, sleeping for the
+original latency multiplied by ``PIPELINE_REPLAY_SPEED`` (0 = instant).
+Async clients share the same cassette format, so a run recorded by the
+click steps replays under ``agenerate_*`` and vice versa.
+
+Cassette layout (format version in the file name and in the JSON):
+    cassettes/<name>.v1.json           interactions, in recorded order
+    cassettes/<name>.v1.journal.jsonl  interactions recorded since the last save, one per line
+    cassettes/<name>.blobs/<sha>.bin   binary payloads (audio, video)
+
+Recording appends each interaction to the journal (every Sora poll is one
+interaction), and the journal is folded into the JSON file when the
+recording process exits. Loading reads both, so an interrupted recording
+still replays.
+
+Interactions are matched by a hash of (service, operation, request). Repeated
+requests (e.g. polling the same Sora job) replay in recorded order; a request
+that was never recorded falls back to the next unused interaction for the
+same service and operation, so prompt tweaks still replay realistic payloads.
+
+Usage:
+    from cassettes import active_cassette
+    cassette = active_cassette()   # None unless PIPELINE_CASSETTE_MODE is set
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any
+
+from logging_utils import get_logger
+from simulation_adapters import (
+    FakeAudioWithTimestamps,
+    FakeCachedContent,
+    FakeCharacterAlignment,
+    FakeGeminiAdapter,
+    FakeGeminiResponse,
+    FakeGeminiStream,
+    FakeOpenAIOutput,
+    FakeOpenAIResponse,
+    FakeUsageMetadata,
+)
+
+log = get_logger(__name__)
+
+CASSETTE_VERSION = 1
+CASSETTE_MODES = ("off", "record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when no recorded interaction can serve a request."""
+
+
+def request_key(service: str, operation: str, request: dict) -> str:
+    payload = json.dumps([service, operation, request], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """A versioned file of recorded interactions plus a binary blob directory."""
+
+    def __init__(self, path: Path, speed: float = 1.0):
+        self.path = path
+        self.blob_dir = path.parent / f"{path.name.split('.v')[0]}.blobs"
+        self.journal = path.with_name(f"{path.stem}.journal.jsonl")
+        self.speed = speed
+        self.interactions: list[dict] = []
+        self._lock = threading.Lock()
+        self._by_key: dict[str, deque] = defaultdict(deque)
+        self._by_operation: dict[tuple[str, str], deque] = defaultdict(deque)
+        self._used: set[int] = set()
+
+    @classmethod
+    def for_name(cls, cassettes_dir: Path, name: str, speed: float = 1.0) -> "Cassette":
+        return cls(cassettes_dir / f"{name}.v{CASSETTE_VERSION}.json", speed)
+
+    def _read(self) -> list[dict]:
+        """Interactions on disk: the saved file, then the journal."""
+        interactions = []
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version in {self.path}: {data.get('version')}")
+            interactions = data.get("interactions", [])
+        if self.journal.exists():
+            with self.journal.open(encoding="utf-8") as fh:
+                # A torn last line (killed mid-append) is dropped
+                for line in fh:
+                    try:
+                        interactions.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+        return interactions
+
+    def load(self) -> "Cassette":
+        self.interactions = self._read()
+        for position, interaction in enumerate(self.interactions):
+            self._by_key[interaction["key"]].append(position)
+            self._by_operation[(interaction["service"], interaction["operation"])].append(position)
+        return self
+
+    def save(self) -> None:
+        """Fold the journal into the JSON file."""
+        with self._lock:
+            if not self.journal.exists():
+                return
+            data = {"version": CASSETTE_VERSION, "interactions": self._read()}
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, indent=1)
+            os.replace(tmp, self.path)
+            self.journal.unlink()
+
+    # Binary payloads are stored out of line so cassettes stay diffable
+    def put_blob(self, data: bytes) -> str:
+        sha = hashlib.sha256(data).hexdigest()
+        blob = self.blob_dir / f"{sha}.bin"
+        if not blob.exists():
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            blob.write_bytes(data)
+        return sha
+
+    def get_blob(self, sha: str) -> bytes:
+        return (self.blob_dir / f"{sha}.bin").read_bytes()
+
+    def record(self, service: str, operation: str, request: dict, response: dict, latency: float) -> None:
+        interaction = {
+            "service": service,
+            "operation": operation,
+            "key": request_key(service, operation, request),
+            "request": request,
+            "response": response,
+            "latency_seconds": round(latency, 4),
+        }
+        line = json.dumps(interaction, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.interactions.append(interaction)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.journal.open("a", encoding="utf-8") as fh:
+                fh.write(line)
+
+    def replay(self, service: str, operation: str, request: dict) -> dict:
+        """Return the recorded response for a request, sleeping for its scaled latency."""
+        interaction = self._take(service, operation, request)
+        if self.speed > 0:
+            time.sleep(interaction["latency_seconds"] * self.speed)
+        return interaction["response"]
+
+    async def areplay(self, service: str, operation: str, request: dict) -> dict:
+        """``replay`` for async clients: waits without blocking the event loop."""
+        interaction = self._take(service, operation, request)
+        if self.speed > 0:
+            await asyncio.sleep(interaction["latency_seconds"] * self.speed)
+        return interaction["response"]
+
+    def _take(self, service: str, operation: str, request: dict) -> dict:
+        key = request_key(service, operation, request)
+        with self._lock:
+            position = self._next_unused(self._by_key[key])
+            if position is None:
+                position = self._next_unused(self._by_operation[(service, operation)])
+                if position is None:
+                    raise CassetteMiss(f"No recorded {service}.{operation} interaction in {self.path}")
+                log.info("Cassette fallback match", extra={"service": service, "operation": operation})
+            self._used.add(position)
+            return self.interactions[position]
+
+    def _next_unused(self, positions: deque) -> int | None:
+        for position in positions:
+            if position not in self._used:
+                return position
+        # Exhausted: keep serving the last recorded answer (e.g. final poll status)
+        return positions[-1] if positions else None
+
+
+class _Timer:
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.monotonic() - self.started
+        return False
+
+
+# --- Gemini ------------------------------------------------------------------
+
+def _usage_dict(response: Any) -> dict | None:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_token_count": getattr(usage, "prompt_token_count", 0) or 0,
+        "cached_content_token_count": getattr(usage, "cached_content_token_count", 0) or 0,
+        "candidates_token_count": getattr(usage, "candidates_token_count", 0) or 0,
+    }
+
+
+def _model_id(model_name: str) -> str:
+    # Cached-content models report "models/<id>"; record the bare id either way
+    return model_name.removeprefix("models/")
+
+
+class RecordingGeminiModel:
+    def __init__(self, inner: Any, model_name: str, cassette: Cassette, cached: bool = False):
+        self.inner = inner
+        self.model_name = _model_id(model_name)
+        self.cassette = cassette
+        self.cached = cached
+
+    def generate_content(self, prompt: str, generation_config: Any = None):
+        with _Timer() as timer:
+            response = self.inner.generate_content(prompt, generation_config=generation_config)
+        self._record(prompt, response, timer.elapsed)
+        return response
+
+    async def generate_content_async(self, prompt: str, generation_config: Any = None, stream: bool = False):
+        if stream:
+            return self._recorded_stream(prompt, generation_config)
+        with _Timer() as timer:
+            response = await self.inner.generate_content_async(prompt, generation_config=generation_config)
+        self._record(prompt, response, timer.elapsed)
+        return response
+
+    async def _recorded_stream(self, prompt: str, generation_config: Any):
+        # Streamed replies are recorded whole, once the stream is exhausted
+        with _Timer() as timer:
+            response = await self.inner.generate_content_async(prompt, generation_config=generation_config, stream=True)
+            parts = []
+            async for chunk in response:
+                parts.append(chunk.text)
+                yield chunk
+        self._record(prompt, FakeGeminiResponse("".join(parts), getattr(response, "usage_metadata", None)), timer.elapsed)
+
+    def _record(self, prompt: str, response: Any, elapsed: float) -> None:
+        request = {"model": self.model_name, "prompt": prompt}
+        if self.cached:
+            request["cached_content"] = True
+        self.cassette.record(
+            "gemini", "generate_content", request,
+            {"text": response.text, "usage": _usage_dict(response)},
+            elapsed,
+        )
+
+
+class _RecordingModelFactory:
+    """Stands in for genai.GenerativeModel (incl. from_cached_content)."""
+
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    def __call__(self, model_name: str, **kwargs):
+        return RecordingGeminiModel(self.inner(model_name, **kwargs), model_name, self.cassette)
+
+    def from_cached_content(self, cached_content: Any, **kwargs):
+        model = self.inner.from_cached_content(cached_content, **kwargs)
+        return RecordingGeminiModel(model, model.model_name, self.cassette, cached=True)
+
+
+class RecordingGeminiAdapter:
+    """Wraps a google.generativeai-shaped module and records every call.
+
+    Context-cache management (``caching.CachedContent``) passes through
+    unrecorded; replays recreate handles against the fake cache.
+    """
+
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+        self.GenerationConfig = inner.GenerationConfig
+        self.GenerativeModel = _RecordingModelFactory(inner.GenerativeModel, cassette)
+        self.caching = inner.caching
+
+    def configure(self, api_key: str):
+        return self.inner.configure(api_key=api_key)
+
+
+class ReplayGeminiModel:
+    def __init__(self, model_name: str, cassette: Cassette, cached: bool = False):
+        self.model_name = _model_id(model_name)
+        self.cassette = cassette
+        self.cached = cached
+
+    def generate_content(self, prompt: str, generation_config: Any = None) -> FakeGeminiResponse:
+        return self._response(self.cassette.replay("gemini", "generate_content", self._request(prompt)))
+
+    async def generate_content_async(self, prompt: str, generation_config: Any = None, stream: bool = False):
+        response = self._response(await self.cassette.areplay("gemini", "generate_content", self._request(prompt)))
+        return FakeGeminiStream(response) if stream else response
+
+    def _request(self, prompt: str) -> dict:
+        request = {"model": self.model_name, "prompt": prompt}
+        if self.cached:
+            request["cached_content"] = True
+        return request
+
+    @staticmethod
+    def _response(response: dict) -> FakeGeminiResponse:
+        usage = response.get("usage")
+        return FakeGeminiResponse(response["text"], FakeUsageMetadata(**usage) if usage else None)
+
+
+class _ReplayModelFactory:
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def __call__(self, model_name: str, **kwargs) -> ReplayGeminiModel:
+        return ReplayGeminiModel(model_name, self.cassette)
+
+    def from_cached_content(self, cached_content: Any, **kwargs) -> ReplayGeminiModel:
+        if isinstance(cached_content, str):
+            cached_content = FakeCachedContent.get(cached_content)
+        return ReplayGeminiModel(cached_content.model, self.cassette, cached=True)
+
+
+class ReplayGeminiAdapter(FakeGeminiAdapter):
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.GenerativeModel = _ReplayModelFactory(cassette)
+
+
+# --- ElevenLabs --------------------------------------------------------------
+
+class _RecordingTextToSpeech:
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    def convert(self, voice_id: str, text: str, model_id: str) -> list[bytes]:
+        with _Timer() as timer:
+            audio = b"".join(self.inner.convert(voice_id=voice_id, text=text, model_id=model_id))
+        self._record_audio(voice_id, text, model_id, audio, timer.elapsed)
+        return [audio]
+
+    def convert_with_timestamps(self, voice_id: str, text: str, model_id: str):
+        with _Timer() as timer:
+            response = self.inner.convert_with_timestamps(voice_id=voice_id, text=text, model_id=model_id)
+        self._record_timestamps(voice_id, text, model_id, response, timer.elapsed)
+        return response
+
+    def _record_audio(self, voice_id: str, text: str, model_id: str, audio: bytes, elapsed: float) -> None:
+        self.cassette.record(
+            "elevenlabs", "convert",
+            {"voice_id": voice_id, "model_id": model_id, "text": text},
+            {"audio_blob": self.cassette.put_blob(audio)},
+            elapsed,
+        )
+
+    def _record_timestamps(self, voice_id: str, text: str, model_id: str, response: Any, elapsed: float) -> None:
+        alignment = response.alignment
+        self.cassette.record(
+            "elevenlabs", "convert_with_timestamps",
+            {"voice_id": voice_id, "model_id": model_id, "text": text},
+            {
+                "audio_blob": self.cassette.put_blob(base64.b64decode(response.audio_base_64)),
+                "alignment": {
+                    "characters": list(alignment.characters),
+                    "starts": list(alignment.character_start_times_seconds),
+                    "ends": list(alignment.character_end_times_seconds),
+                } if alignment else None,
+            },
+            elapsed,
+        )
+
+
+class _AsyncRecordingTextToSpeech(_RecordingTextToSpeech):
+    async def convert(self, voice_id: str, text: str, model_id: str):
+        with _Timer() as timer:
+            stream = self.inner.convert(voice_id=voice_id, text=text, model_id=model_id)
+            audio = b"".join([chunk async for chunk in stream])
+        self._record_audio(voice_id, text, model_id, audio, timer.elapsed)
+        yield audio
+
+    async def convert_with_timestamps(self, voice_id: str, text: str, model_id: str):
+        with _Timer() as timer:
+            response = await self.inner.convert_with_timestamps(voice_id=voice_id, text=text, model_id=model_id)
+        self._record_timestamps(voice_id, text, model_id, response, timer.elapsed)
+        return response
+
+
+class RecordingElevenLabsClient:
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.text_to_speech = _RecordingTextToSpeech(inner.text_to_speech, cassette)
+
+
+class AsyncRecordingElevenLabsClient:
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.text_to_speech = _AsyncRecordingTextToSpeech(inner.text_to_speech, cassette)
+
+
+def _speech_request(voice_id: str, text: str, model_id: str) -> dict:
+    return {"voice_id": voice_id, "model_id": model_id, "text": text}
+
+
+class _ReplayTextToSpeech:
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def convert(self, voice_id: str, text: str, model_id: str) -> list[bytes]:
+        response = self.cassette.replay("elevenlabs", "convert", _speech_request(voice_id, text, model_id))
+        return [self.cassette.get_blob(response["audio_blob"])]
+
+    def convert_with_timestamps(self, voice_id: str, text: str, model_id: str) -> FakeAudioWithTimestamps:
+        response = self.cassette.replay(
+            "elevenlabs", "convert_with_timestamps", _speech_request(voice_id, text, model_id)
+        )
+        return self._timestamps(response)
+
+    def _timestamps(self, response: dict) -> FakeAudioWithTimestamps:
+        audio = base64.b64encode(self.cassette.get_blob(response["audio_blob"])).decode("ascii")
+        alignment = response.get("alignment")
+        if alignment is None:
+            return FakeAudioWithTimestamps(audio, None)
+        return FakeAudioWithTimestamps(
+            audio, FakeCharacterAlignment(alignment["characters"], alignment["starts"], alignment["ends"])
+        )
+
+
+class _AsyncReplayTextToSpeech(_ReplayTextToSpeech):
+    async def convert(self, voice_id: str, text: str, model_id: str):
+        response = await self.cassette.areplay("elevenlabs", "convert", _speech_request(voice_id, text, model_id))
+        yield self.cassette.get_blob(response["audio_blob"])
+
+    async def convert_with_timestamps(self, voice_id: str, text: str, model_id: str) -> FakeAudioWithTimestamps:
+        response = await self.cassette.areplay(
+            "elevenlabs", "convert_with_timestamps", _speech_request(voice_id, text, model_id)
+        )
+        return self._timestamps(response)
+
+
+class ReplayElevenLabsClient:
+    def __init__(self, cassette: Cassette):
+        self.text_to_speech = _ReplayTextToSpeech(cassette)
+
+
+class AsyncReplayElevenLabsClient:
+    def __init__(self, cassette: Cassette):
+        self.text_to_speech = _AsyncReplayTextToSpeech(cassette)
+
+
+# --- Sora (OpenAI responses) -------------------------------------------------
+
+def _response_dict(response: Any) -> dict:
+    return {
+        "id": response.id,
+        "status": response.status,
+        "output": [getattr(item, "url", None) for item in (response.output or [])],
+    }
+
+
+def _response_object(data: dict) -> FakeOpenAIResponse:
+    return FakeOpenAIResponse(
+        id=data["id"], status=data["status"], output=[FakeOpenAIOutput(url=url) for url in data["output"]]
+    )
+
+
+def _job_request(model: str, input: str, n: int, size: str, duration: int) -> dict:
+    return {"model": model, "input": input, "n": n, "size": size, "duration": duration}
+
+
+class _RecordingResponses:
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    def create(self, model: str, input: str, n: int, size: str, duration: int):
+        with _Timer() as timer:
+            response = self.inner.create(model=model, input=input, n=n, size=size, duration=duration)
+        self.cassette.record(
+            "sora", "create", _job_request(model, input, n, size, duration), _response_dict(response), timer.elapsed,
+        )
+        return response
+
+    def retrieve(self, id: str):
+        with _Timer() as timer:
+            response = self.inner.retrieve(id)
+        self.cassette.record("sora", "retrieve", {"id": id}, _response_dict(response), timer.elapsed)
+        return response
+
+
+class _AsyncRecordingResponses(_RecordingResponses):
+    async def create(self, model: str, input: str, n: int, size: str, duration: int):
+        with _Timer() as timer:
+            response = await self.inner.create(model=model, input=input, n=n, size=size, duration=duration)
+        self.cassette.record(
+            "sora", "create", _job_request(model, input, n, size, duration), _response_dict(response), timer.elapsed,
+        )
+        return response
+
+    async def retrieve(self, id: str):
+        with _Timer() as timer:
+            response = await self.inner.retrieve(id)
+        self.cassette.record("sora", "retrieve", {"id": id}, _response_dict(response), timer.elapsed)
+        return response
+
+
+class RecordingOpenAIClient:
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.responses = _RecordingResponses(inner.responses, cassette)
+
+
+class AsyncRecordingOpenAIClient:
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.responses = _AsyncRecordingResponses(inner.responses, cassette)
+
+
+class _ReplayResponses:
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def create(self, model: str, input: str, n: int, size: str, duration: int) -> FakeOpenAIResponse:
+        return _response_object(self.cassette.replay("sora", "create", _job_request(model, input, n, size, duration)))
+
+    def retrieve(self, id: str) -> FakeOpenAIResponse:
+        return _response_object(self.cassette.replay("sora", "retrieve", {"id": id}))
+
+
+class _AsyncReplayResponses(_ReplayResponses):
+    async def create(self, model: str, input: str, n: int, size: str, duration: int) -> FakeOpenAIResponse:
+        return _response_object(
+            await self.cassette.areplay("sora", "create", _job_request(model, input, n, size, duration))
+        )
+
+    async def retrieve(self, id: str) -> FakeOpenAIResponse:
+        return _response_object(await self.cassette.areplay("sora", "retrieve", {"id": id}))
+
+
+class ReplayOpenAIClient:
+    def __init__(self, cassette: Cassette):
+        self.responses = _ReplayResponses(cassette)
+
+
+class AsyncReplayOpenAIClient:
+    def __init__(self, cassette: Cassette):
+        self.responses = _AsyncReplayResponses(cassette)
+
+
+# --- Downloads (httpx) -------------------------------------------------------
+
+class _Downloaded:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+def recording_http_client(inner_factory: Any, cassette: Cassette):
+    """Return an httpx.Client-shaped class that records GET responses."""
+
+    class _RecordingHttpClient:
+        def __enter__(self):
+            self.inner = inner_factory().__enter__()
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            return self.inner.__exit__(exc_type, exc_val, exc_tb)
+
+        def get(self, url, **kwargs):
+            with _Timer() as timer:
+                response = self.inner.get(url, **kwargs)
+                response.raise_for_status()
+            cassette.record(
+                "http", "get", {"url": url},
+                {"content_blob": cassette.put_blob(response.content)},
+                timer.elapsed,
+            )
+            return response
+
+    return _RecordingHttpClient
+
+
+def async_recording_http_client(inner_factory: Any, cassette: Cassette):
+    """Return an httpx.AsyncClient-shaped class that records GET responses."""
+
+    class _AsyncRecordingHttpClient:
+        async def __aenter__(self):
+            self.inner = await inner_factory().__aenter__()
+            return self
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            return await self.inner.__aexit__(exc_type, exc_val, exc_tb)
+
+        async def get(self, url, **kwargs):
+            with _Timer() as timer:
+                response = await self.inner.get(url, **kwargs)
+                response.raise_for_status()
+            cassette.record(
+                "http", "get", {"url": url},
+                {"content_blob": cassette.put_blob(response.content)},
+                timer.elapsed,
+            )
+            return response
+
+    return _AsyncRecordingHttpClient
+
+
+def replay_http_client(cassette: Cassette):
+    """Return an httpx.Client-shaped class that serves recorded GET responses."""
+
+    class _ReplayHttpClient:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            return None
+
+        def get(self, url, **kwargs):
+            response = cassette.replay("http", "get", {"url": url})
+            return _Downloaded(cassette.get_blob(response["content_blob"]))
+
+    return _ReplayHttpClient
+
+
+def async_replay_http_client(cassette: Cassette):
+    """Return an httpx.AsyncClient-shaped class that serves recorded GET responses."""
+
+    class _AsyncReplayHttpClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            return None
+
+        async def get(self, url, **kwargs):
+            response = await cassette.areplay("http", "get", {"url": url})
+            return _Downloaded(cassette.get_blob(response["content_blob"]))
+
+    return _AsyncReplayHttpClient
+
+
+# --- Active cassette ---------------------------------------------------------
+
+_active: dict[tuple, Cassette] = {}
+
+
+def active_cassette(config: Any = None) -> Cassette | None:
+    """Return the cassette selected by config, loading it once per process."""
+    if config is None:
+        from config import get_config
+        config = get_config()
+    if config.cassette_mode not in ("record", "replay"):
+        return None
+
+    cache_key = (str(config.cassettes_dir), config.cassette_name, config.replay_speed)
+    if cache_key not in _active:
+        cassette = Cassette.for_name(config.cassettes_dir, config.cassette_name, config.replay_speed)
+        _active[cache_key] = cassette.load()
+        if config.cassette_mode == "record":
+            atexit.register(cassette.save)
+    return _active[cache_key]
+
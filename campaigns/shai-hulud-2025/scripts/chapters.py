@@ -0,0 +1,215 @@
+"""
+Chapter-level change tracking between the outline, script and downstream media.
+
+``generate_script`` records a hash of every outline chapter next to the
+script (``script-longform.chapters.json``), along with a hash of the prompt,
+voice-style note and Gemini settings it was written with. On the next run
+only chapters whose hash changed are regenerated and spliced back into the
+script, one bracketed section ([INTRO ...], [CHAPTER ...], [OUTRO ...]) per
+chapter; a changed prompt or setting regenerates it all.
+
+The B-roll cues inside changed sections are traced to the shotlist scenes
+they produced, and both are written to ``data/processed/stale.json`` so the
+audio and shotlist steps only redo what the edit touched.
+
+Usage:
+    from chapters import diff_outline, split_sections, join_sections
+    diff = diff_outline(load_chapter_state(state_path), outline, minutes, len(sections))
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Sequence
+
+from timing_index import BROLL_PATTERN, match_scenes_to_cues
+from video_formats import longform_scenes
+
+STATE_VERSION = 1
+
+SECTION_HEADER = re.compile(r"^\[(?:INTRO|OUTRO|CHAPTER)\b[^\]\n]*\][ \t]*$", re.MULTILINE)
+
+
+@dataclass
+class ChapterDiff:
+    """Which outline chapters need their script section regenerated."""
+
+    changed: list[int] = field(default_factory=list)
+    full: bool = False
+    reason: str = ""
+
+
+def chapter_state_path(script_path: Path) -> Path:
+    """Return the chapter state path stored alongside a script."""
+    return script_path.with_suffix(".chapters.json")
+
+
+def _digest(value) -> str:
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def chapter_id(chapter: dict, position: int) -> str:
+    return str(chapter.get("id") or f"chapter_{position + 1}")
+
+
+def chapter_hash(chapter: dict) -> str:
+    return _digest(chapter)
+
+
+def outline_context_hash(outline: dict) -> str:
+    """Hash everything outside the chapter list (title, global stats, ...)."""
+    return _digest({key: value for key, value in outline.items() if key != "chapters"})
+
+
+def generation_hash(prompt_template: str, voice_style: str, model: str, temperature: float, top_p: float) -> str:
+    """Hash of everything besides the outline that shapes the script's text."""
+    return _digest([prompt_template, voice_style, model, temperature, top_p])
+
+
+def build_chapter_state(outline: dict, target_minutes: int, generation: str = "") -> dict:
+    return {
+        "version": STATE_VERSION,
+        "context": outline_context_hash(outline),
+        "generation": generation,
+        "target_minutes": target_minutes,
+        "chapters": [
+            {"id": chapter_id(chapter, i), "hash": chapter_hash(chapter)}
+            for i, chapter in enumerate(outline.get("chapters", []))
+        ],
+    }
+
+
+def load_chapter_state(path: Path) -> dict | None:
+    """Load chapter state, returning None if absent or from another version."""
+    if not path.exists():
+        return None
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def diff_outline(
+    state: dict | None, outline: dict, target_minutes: int, section_count: int, generation: str = "",
+) -> ChapterDiff:
+    """Compare the outline against the state recorded with the current script.
+
+    Anything that breaks the one-section-per-chapter alignment (new, removed
+    or reordered chapters, edited global fields, a changed target length, a
+    script whose sections no longer line up), or a different ``generation_hash``,
+    requires a full regeneration.
+    """
+    chapters = outline.get("chapters", [])
+    if state is None:
+        return ChapterDiff(full=True, reason="no previous chapter state")
+    if state.get("context") != outline_context_hash(outline):
+        return ChapterDiff(full=True, reason="outline metadata changed")
+    if state.get("generation", "") != generation:
+        return ChapterDiff(full=True, reason="script prompt, voice style or model settings changed")
+    if state.get("target_minutes") != target_minutes:
+        return ChapterDiff(full=True, reason="target length changed")
+
+    previous = state.get("chapters", [])
+    if [entry["id"] for entry in previous] != [chapter_id(c, i) for i, c in enumerate(chapters)]:
+        return ChapterDiff(full=True, reason="chapters added, removed or reordered")
+    if section_count != len(chapters):
+        return ChapterDiff(full=True, reason="script sections do not line up with outline chapters")
+
+    changed = [
+        i for i, (chapter, entry) in enumerate(zip(chapters, previous))
+        if chapter_hash(chapter) != entry["hash"]
+    ]
+    return ChapterDiff(changed=changed)
+
+
+def split_sections(script_text: str) -> tuple[str, list[str]]:
+    """Split a script into (preamble, sections), each section starting at its header."""
+    starts = [match.start() for match in SECTION_HEADER.finditer(script_text)]
+    if not starts:
+        return script_text, []
+    bounds = starts + [len(script_text)]
+    sections = [script_text[bounds[i]:bounds[i + 1]] for i in range(len(starts))]
+    return script_text[:starts[0]], sections
+
+
+def join_sections(preamble: str, sections: Sequence[str]) -> str:
+    if not sections:
+        return preamble
+    return preamble + "\n\n".join(section.strip("\n") for section in sections) + "\n"
+
+
+def splice_section(previous: str, regenerated: str) -> str:
+    """Take the first section of a regenerated reply, keeping the old header if it has none."""
+    _, sections = split_sections(regenerated)
+    if sections:
+        return sections[0]
+    header = SECTION_HEADER.match(previous)
+    body = regenerated.strip()
+    return f"{header.group(0)}\n\n{body}" if header else body
+
+
+def stale_scenes(script_text: str, changed_sections: Sequence[int], shotlist: dict | None) -> tuple[list[int], list[str]]:
+    """Return (B-roll cue indices, shotlist scene ids) inside changed sections.
+
+    ``script_text`` must be the script the shotlist was generated from, so
+    scenes pair with its cues the same way the timing sync pairs them; only
+    long-form scenes follow the script, so shorts-only scenes are skipped.
+    """
+    preamble, sections = split_sections(script_text)
+    spans = []
+    position = len(preamble)
+    for section in sections:
+        spans.append((position, position + len(section)))
+        position += len(section)
+
+    wanted = set(changed_sections)
+    cues = list(BROLL_PATTERN.finditer(script_text))
+    stale_cues = [
+        index for index, cue in enumerate(cues)
+        if any(start <= cue.start() < end for n, (start, end) in enumerate(spans) if n in wanted)
+    ]
+
+    scenes = longform_scenes((shotlist or {}).get("scenes", []))
+    if not scenes or not stale_cues:
+        return stale_cues, []
+    matches = match_scenes_to_cues(scenes, [{"label": cue.group(1).strip()} for cue in cues])
+    stale_ids = [
+        str(scene.get("id", f"scene_{n + 1:03d}"))
+        for n, (scene, match) in enumerate(zip(scenes, matches))
+        if match in stale_cues
+    ]
+    return stale_cues, stale_ids
+
+
+def load_stale(path: Path) -> dict:
+    if path.exists():
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            pass
+    return {"version": STATE_VERSION, "chapters": [], "scenes": []}
+
+
+def mark_stale(path: Path, chapters: Sequence[str] = (), scenes: Sequence[str] = ()) -> dict:
+    """Add chapter ids and scene ids to stale.json (union with anything not yet redone)."""
+    stale = load_stale(path)
+    for key, values in (("chapters", chapters), ("scenes", scenes)):
+        stale[key] = list(dict.fromkeys([*stale.get(key, []), *values]))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(stale, indent=2), encoding="utf-8")
+    return stale
+
+
+def clear_stale(path: Path, key: str, values: Sequence[str] | None = None) -> None:
+    """Drop redone entries (all of them when values is None) from stale.json."""
+    if not path.exists():
+        return
+    stale = load_stale(path)
+    stale[key] = [] if values is None else [v for v in stale.get(key, []) if v not in set(values)]
+    path.write_text(json.dumps(stale, indent=2), encoding="utf-8")
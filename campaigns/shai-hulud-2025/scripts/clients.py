@@ -0,0 +1,237 @@
+"""
+Provider client construction for pipeline steps.
+
+Each factory returns the real client, the simulation fake (``simulate=True``),
+or, when a cassette is active (``PIPELINE_CASSETTE_MODE``), a recording proxy
+around either of them or an offline replay client. The ``async_*`` factories
+do the same with the providers' async clients; Gemini needs no separate
+factory because its models expose ``generate_content_async``.
+
+Inside ``warm_clients()`` the sync provider factories hand back the client
+they built earlier in this process, so long-lived callers (``watch``) pay
+for imports, auth and connection pools once rather than on every step run.
+
+Usage:
+    from clients import gemini_client
+    gemini = gemini_client(config.gemini_api_key, simulate)
+    model_instance = gemini.GenerativeModel(model)
+
+    with warm_clients():
+        ...  # repeated step runs share their clients
+"""
+
+from __future__ import annotations
+
+import functools
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from cassettes import (
+    AsyncRecordingElevenLabsClient,
+    AsyncRecordingOpenAIClient,
+    AsyncReplayElevenLabsClient,
+    AsyncReplayOpenAIClient,
+    Cassette,
+    RecordingElevenLabsClient,
+    RecordingGeminiAdapter,
+    RecordingOpenAIClient,
+    ReplayElevenLabsClient,
+    ReplayGeminiAdapter,
+    ReplayOpenAIClient,
+    active_cassette,
+    async_recording_http_client,
+    async_replay_http_client,
+    recording_http_client,
+    replay_http_client,
+)
+from config import get_config
+from context_cache import ContextCache
+from simulation_adapters import (
+    FakeAsyncElevenLabsClient,
+    FakeAsyncOpenAIClient,
+    FakeElevenLabsClient,
+    FakeGeminiAdapter,
+    FakeMediaTools,
+    FakeOpenAIClient,
+    get_fake_async_httpx_client,
+    get_fake_httpx_client,
+)
+
+_memory_context_cache: ContextCache | None = None
+# Clients kept across step runs while ``warm_clients`` is active
+_warm_registry: dict[tuple, Any] | None = None
+
+
+@contextmanager
+def warm_clients() -> Iterator[dict[tuple, Any]]:
+    """Reuse sync provider clients across step runs in this process (nested calls share one registry)."""
+    global _warm_registry
+    previous = _warm_registry
+    if previous is None:
+        _warm_registry = {}
+    try:
+        yield _warm_registry
+    finally:
+        _warm_registry = previous
+
+
+def _warm(factory: Callable[[str, bool], Any]) -> Callable[[str, bool], Any]:
+    """Serve a factory's clients from the warm registry when one is active."""
+
+    @functools.wraps(factory)
+    def wrapper(api_key: str, simulate: bool = False) -> Any:
+        # Cassette clients hold per-run state, so they are always built fresh
+        if _warm_registry is None or _cassette()[0] is not None:
+            return factory(api_key, simulate)
+        key = (factory.__name__, api_key, simulate, get_config().simulate_latency_scale)
+        if key not in _warm_registry:
+            _warm_registry[key] = factory(api_key, simulate)
+        return _warm_registry[key]
+
+    return wrapper
+
+
+@_warm
+def gemini_client(api_key: str, simulate: bool = False) -> Any:
+    """Return a configured google.generativeai-shaped module."""
+    cassette, replaying = _cassette()
+    if replaying:
+        return ReplayGeminiAdapter(cassette)
+
+    if simulate:
+        client = FakeGeminiAdapter(latency_scale=get_config().simulate_latency_scale)
+        client.configure(api_key="fake")
+    else:
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        client = genai
+
+    return RecordingGeminiAdapter(client, cassette) if cassette else client
+
+
+@_warm
+def elevenlabs_client(api_key: str, simulate: bool = False) -> Any:
+    """Return an ElevenLabs client exposing ``text_to_speech``."""
+    cassette, replaying = _cassette()
+    if replaying:
+        return ReplayElevenLabsClient(cassette)
+
+    if simulate:
+        client = FakeElevenLabsClient(api_key="fake")
+    else:
+        from elevenlabs import ElevenLabs
+        client = ElevenLabs(api_key=api_key)
+
+    return RecordingElevenLabsClient(client, cassette) if cassette else client
+
+
+@_warm
+def openai_client(api_key: str, simulate: bool = False) -> Any:
+    """Return an OpenAI client exposing ``responses`` (Sora jobs)."""
+    cassette, replaying = _cassette()
+    if replaying:
+        return ReplayOpenAIClient(cassette)
+
+    if simulate:
+        client = FakeOpenAIClient(api_key="fake")
+    else:
+        from openai import OpenAI
+        client = OpenAI(api_key=api_key)
+
+    return RecordingOpenAIClient(client, cassette) if cassette else client
+
+
+def http_client(simulate: bool = False) -> Any:
+    """Return an httpx.Client-shaped class for downloads."""
+    cassette, replaying = _cassette()
+    if replaying:
+        return replay_http_client(cassette)
+
+    if simulate:
+        factory = get_fake_httpx_client()
+    else:
+        import httpx
+        factory = httpx.Client
+
+    return recording_http_client(factory, cassette) if cassette else factory
+
+
+def async_elevenlabs_client(api_key: str, simulate: bool = False) -> Any:
+    """Return an AsyncElevenLabs-shaped client (awaitable ``text_to_speech``)."""
+    cassette, replaying = _cassette()
+    if replaying:
+        return AsyncReplayElevenLabsClient(cassette)
+
+    if simulate:
+        client = FakeAsyncElevenLabsClient(api_key="fake")
+    else:
+        from elevenlabs import AsyncElevenLabs
+        client = AsyncElevenLabs(api_key=api_key)
+
+    return AsyncRecordingElevenLabsClient(client, cassette) if cassette else client
+
+
+def async_openai_client(api_key: str, simulate: bool = False) -> Any:
+    """Return an AsyncOpenAI-shaped client exposing awaitable ``responses``."""
+    cassette, replaying = _cassette()
+    if replaying:
+        return AsyncReplayOpenAIClient(cassette)
+
+    if simulate:
+        client = FakeAsyncOpenAIClient(api_key="fake")
+    else:
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(api_key=api_key)
+
+    return AsyncRecordingOpenAIClient(client, cassette) if cassette else client
+
+
+def async_http_client(simulate: bool = False) -> Any:
+    """Return an httpx.AsyncClient-shaped class for downloads."""
+    cassette, replaying = _cassette()
+    if replaying:
+        return async_replay_http_client(cassette)
+
+    if simulate:
+        factory = get_fake_async_httpx_client()
+    else:
+        import httpx
+        factory = httpx.AsyncClient
+
+    return async_recording_http_client(factory, cassette) if cassette else factory
+
+
+def media_tools(simulate: bool = False) -> Any:
+    """Return the local ffmpeg/ffprobe runner for clip previews (no provider, no cassette)."""
+    if simulate:
+        return FakeMediaTools()
+    from clip_previews import FFmpegTools
+    return FFmpegTools()
+
+
+def gemini_context_cache(simulate: bool = False) -> ContextCache | None:
+    """Return the cached-context registry for Gemini steps (None when disabled).
+
+    Simulated and replayed runs keep handles in memory so fake cache names
+    never reach the shared registry.
+    """
+    global _memory_context_cache
+    config = get_config()
+    if not config.gemini_context_cache:
+        return None
+    if simulate or cassette_replaying():
+        if _memory_context_cache is None:
+            _memory_context_cache = ContextCache(None, config.gemini_cache_ttl, config.gemini_cache_min_tokens)
+        return _memory_context_cache
+    return ContextCache(config.context_cache_json, config.gemini_cache_ttl, config.gemini_cache_min_tokens)
+
+
+def cassette_replaying() -> bool:
+    """True when providers are served from a cassette (no API keys needed)."""
+    return _cassette()[1]
+
+
+def _cassette() -> tuple[Cassette | None, bool]:
+    config = get_config()
+    cassette = active_cassette(config)
+    return cassette, cassette is not None and config.cassette_mode == "replay"
@@ -0,0 +1,295 @@
+"""
+Clip metadata, low-res proxies and contact sheets from local ffmpeg/ffprobe.
+
+Each downloaded clip gets an ffprobe summary (duration, codecs, size, frame
+rate), a small H.264 proxy and a contact sheet of evenly spaced frames, so
+the studio can preview a campaign's b-roll without streaming 1080p files.
+Results are cached by clip content hash in a store shared across campaigns;
+a clip is only processed once however many campaigns link it.
+
+Layout:
+    <cache>/<sha[:2]>/<sha256>/probe.json   ffprobe summary
+    <cache>/<sha[:2]>/<sha256>/proxy.mp4    PROXY_HEIGHT-line H.264 proxy
+    <cache>/<sha[:2]>/<sha256>/sheet.jpg    SHEET_COLUMNS x SHEET_ROWS contact sheet
+    <campaign>/video/previews/index.json    clip name -> sha, metadata, preview files
+    <campaign>/video/previews/<clip>.proxy.mp4, <clip>.sheet.jpg   linked from the cache
+
+Usage:
+    from clip_previews import PreviewCache, build_previews
+    index = build_previews(clips, PreviewCache(config.media_cache_dir), tools, config.previews_dir, workers=4)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fractions import Fraction
+from pathlib import Path
+from typing import Callable, Iterable
+
+from clip_store import file_sha256, link_or_copy
+from logging_utils import get_logger
+
+log = get_logger(__name__)
+
+INDEX_NAME = "index.json"
+PROXY_HEIGHT = 360
+SHEET_COLUMNS = 4
+SHEET_ROWS = 3
+SHEET_TILE_WIDTH = 320
+
+
+class MediaToolError(RuntimeError):
+    """An ffmpeg/ffprobe job failed (or the tool is not installed)."""
+
+
+class FFmpegTools:
+    """Runs the local ffmpeg/ffprobe binaries, one process per job."""
+
+    def __init__(self, ffmpeg: str = "ffmpeg", ffprobe: str = "ffprobe"):
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+
+    @staticmethod
+    def _run(cmd: list[str]) -> str:
+        try:
+            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        except FileNotFoundError as exc:
+            raise MediaToolError(f"{cmd[0]} not found on PATH") from exc
+        except subprocess.CalledProcessError as exc:
+            detail = (exc.stderr or "").strip().splitlines()[-1:] or [f"exit {exc.returncode}"]
+            raise MediaToolError(f"{Path(cmd[0]).name} failed: {detail[0]}") from exc
+        return result.stdout
+
+    def probe(self, clip: Path) -> dict:
+        """Raw ``ffprobe -show_format -show_streams`` output."""
+        output = self._run([
+            self.ffprobe, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", str(clip),
+        ])
+        return json.loads(output)
+
+    def proxy(self, clip: Path, dest: Path) -> None:
+        self._run([
+            self.ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-i", str(clip),
+            "-vf", f"scale=-2:{PROXY_HEIGHT}", "-c:v", "libx264", "-preset", "veryfast", "-crf", "28",
+            "-an", "-movflags", "+faststart", str(dest),
+        ])
+
+    def contact_sheet(self, clip: Path, dest: Path, duration: float) -> None:
+        frames = SHEET_COLUMNS * SHEET_ROWS
+        rate = frames / duration if duration > 0 else 1
+        self._run([
+            self.ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-i", str(clip),
+            "-vf", f"fps={rate:.4f},scale={SHEET_TILE_WIDTH}:-2,tile={SHEET_COLUMNS}x{SHEET_ROWS}",
+            "-frames:v", "1", "-q:v", "4", str(dest),
+        ])
+
+    def copy_segment(self, clip: Path, dest: Path, duration: float) -> None:
+        """First ``duration`` seconds of a clip's video, stream-copied."""
+        self._run([
+            self.ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-i", str(clip),
+            "-t", f"{duration:.3f}", "-map", "0:v:0", "-c", "copy", str(dest),
+        ])
+
+    def encode_segment(self, clip: Path | None, dest: Path, duration: float, spec) -> None:
+        """Re-encode a clip to ``spec`` (fit, pad, hold the last frame), or a black slate without one."""
+        size = f"{spec.width}x{spec.height}"
+        if clip is None:
+            source = ["-f", "lavfi", "-i", f"color=c=black:s={size}:r={spec.fps}"]
+            filters = "null"
+        else:
+            source = ["-i", str(clip)]
+            filters = (
+                f"scale={spec.width}:{spec.height}:force_original_aspect_ratio=decrease,"
+                f"pad={spec.width}:{spec.height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={spec.fps},"
+                f"tpad=stop_mode=clone:stop_duration={duration:.3f}"
+            )
+        # Profile and track timescale must match the copied segments for the concat demuxer
+        stream = ["-profile:v", spec.encoder_profile] if spec.encoder_profile else []
+        if spec.timescale:
+            stream += ["-video_track_timescale", str(spec.timescale)]
+        self._run([
+            self.ffmpeg, "-hide_banner", "-loglevel", "error", "-y", *source,
+            "-t", f"{duration:.3f}", "-vf", filters, "-an", "-c:v", spec.encoder, "-preset", "veryfast",
+            "-crf", "20", "-pix_fmt", spec.pix_fmt, *stream, "-r", str(spec.fps), str(dest),
+        ])
+
+    def split_clip(self, clip: Path, dest: Path, start: float, duration: float) -> None:
+        """A ``duration``-second piece of a clip from ``start``, re-encoded so the cut lands on the exact frame."""
+        self._run([
+            self.ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-ss", f"{start:.3f}", "-i", str(clip),
+            "-t", f"{duration:.3f}", "-map", "0:v:0", "-map", "0:a:0?", "-c:v", "libx264", "-preset", "veryfast",
+            "-crf", "18", "-pix_fmt", "yuv420p", "-c:a", "aac", "-movflags", "+faststart", str(dest),
+        ])
+
+    def concat(self, segment_list: Path, audio: Path, dest: Path) -> None:
+        """Join segments with the concat demuxer and mux the narration, all stream-copied."""
+        self._run([
+            self.ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-f", "concat", "-safe", "0",
+            "-i", str(segment_list), "-i", str(audio), "-map", "0:v:0", "-map", "1:a:0", "-c", "copy",
+            "-movflags", "+faststart", "-shortest", str(dest),
+        ])
+
+
+def summarize_probe(raw: dict) -> dict:
+    """Duration, codecs, dimensions, frame rate, time base and profile from ffprobe's JSON."""
+    streams = raw.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+    duration = raw.get("format", {}).get("duration") or video.get("duration") or 0
+    fps = None
+    if video.get("avg_frame_rate") not in (None, "0/0"):
+        fps = round(float(Fraction(video["avg_frame_rate"])), 3)
+    return {
+        "duration_seconds": round(float(duration), 3),
+        "video_codec": video.get("codec_name"),
+        "audio_codec": audio.get("codec_name"),
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "fps": fps,
+        "pix_fmt": video.get("pix_fmt"),
+        "time_base": video.get("time_base"),
+        "profile": video.get("profile"),
+    }
+
+
+def _write_json(path: Path, data: dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def write_atomically(dest: Path, job: Callable[[Path], None]) -> Path:
+    """Run a job writing to a temp file beside dest, then move it into place."""
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.stem}.", suffix=dest.suffix)
+    os.close(fd)
+    try:
+        job(Path(tmp))
+        os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return dest
+
+
+class PreviewCache:
+    """Probe results and preview files keyed by clip content hash."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def entry_dir(self, sha: str) -> Path:
+        return self.root / sha[:2] / sha
+
+    def probe(self, clip: Path, sha: str, tools) -> tuple[dict, bool]:
+        """A clip's ffprobe summary, running ffprobe only on a cache miss."""
+        entry = self.entry_dir(sha)
+        entry.mkdir(parents=True, exist_ok=True)
+        probe_path = entry / "probe.json"
+        if probe_path.exists():
+            meta = json.loads(probe_path.read_text(encoding="utf-8"))
+            # Summaries cached before time base and profile were recorded are probed again
+            if "time_base" in meta and "profile" in meta:
+                return meta, False
+        meta = summarize_probe(tools.probe(clip))
+        _write_json(probe_path, meta)
+        return meta, True
+
+    def process(self, clip: Path, sha: str, tools) -> tuple[dict, bool]:
+        """Metadata and preview files for a clip, running only the missing jobs.
+
+        Returns the entry and whether any ffmpeg/ffprobe job ran.
+        """
+        meta, ran = self.probe(clip, sha, tools)
+        entry = self.entry_dir(sha)
+        proxy_path, sheet_path = entry / "proxy.mp4", entry / "sheet.jpg"
+        if not proxy_path.exists():
+            write_atomically(proxy_path, lambda tmp: tools.proxy(clip, tmp))
+            ran = True
+        if not sheet_path.exists():
+            write_atomically(sheet_path, lambda tmp: tools.contact_sheet(clip, tmp, meta["duration_seconds"]))
+            ran = True
+        return {**meta, "proxy": proxy_path, "sheet": sheet_path}, ran
+
+
+def load_index(previews_dir: Path) -> dict:
+    path = previews_dir / INDEX_NAME
+    if not path.exists():
+        return {"clips": {}}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {"clips": {}}
+
+
+def indexed_sha(clip: Path, previous: dict | None) -> str:
+    """Content hash, reusing the indexed one while size and mtime are unchanged."""
+    stat = clip.stat()
+    if previous and previous.get("bytes") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        return previous["sha256"]
+    return file_sha256(clip)
+
+
+def build_previews(
+    clips: Iterable[Path],
+    cache: PreviewCache,
+    tools,
+    previews_dir: Path,
+    workers: int = 4,
+    on_done: Callable[[Path, dict | None, bool], None] | None = None,
+) -> dict:
+    """Process clips on a bounded pool and write the campaign's preview index.
+
+    ``on_done(clip, record, ran)`` is called as each clip finishes; ``record``
+    is None when its jobs failed (the failure is logged and the clip dropped
+    from the index, so the next run retries it).
+    """
+    clips = sorted(clips)
+    previews_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_index(previews_dir).get("clips", {})
+
+    def work(clip: Path) -> tuple[dict, bool]:
+        sha = indexed_sha(clip, previous.get(clip.name))
+        meta, ran = cache.process(clip, sha, tools)
+        proxy, sheet = previews_dir / f"{clip.stem}.proxy.mp4", previews_dir / f"{clip.stem}.sheet.jpg"
+        link_or_copy(meta.pop("proxy"), proxy)
+        link_or_copy(meta.pop("sheet"), sheet)
+        stat = clip.stat()
+        record = {
+            "sha256": sha, "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns, **meta,
+            "proxy": proxy.name, "sheet": sheet.name,
+        }
+        return record, ran
+
+    index: dict[str, dict] = {}
+    # Each job is an ffmpeg/ffprobe subprocess, so threads bound the number of processes
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(work, clip): clip for clip in clips}
+        for future in as_completed(futures):
+            clip = futures[future]
+            try:
+                record, ran = future.result()
+            except (MediaToolError, OSError, ValueError) as exc:
+                log.warning("Preview failed", extra={"clip": clip.name, "error": str(exc)})
+                record, ran = None, False
+            else:
+                index[clip.name] = record
+            if on_done:
+                on_done(clip, record, ran)
+
+    # Drop previews of clips that are gone
+    live = {name for record in index.values() for name in (record["proxy"], record["sheet"])}
+    for stale in previews_dir.glob("*.proxy.mp4"):
+        if stale.name not in live:
+            stale.unlink()
+    for stale in previews_dir.glob("*.sheet.jpg"):
+        if stale.name not in live:
+            stale.unlink()
+
+    result = {"clips": dict(sorted(index.items()))}
+    _write_json(previews_dir / INDEX_NAME, result)
+    return result
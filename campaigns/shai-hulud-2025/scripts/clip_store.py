@@ -0,0 +1,229 @@
+"""
+Content-addressed clip store shared across campaigns.
+
+Rendered Sora clips are stored once under their content hash and indexed by
+a render key (normalized prompt, model, resolution, duration, and the aspect
+ratio for formats other than 16:9). Campaigns link clips out of the store
+instead of re-rendering near-identical b-roll.
+
+Layout:
+    <root>/objects/<sha[:2]>/<sha256>.mp4   clip bytes, addressed by content
+    <root>/refs/<key[:2]>/<key>.json        render key -> object hash + size
+    <root>/stats.json                       cumulative hit/miss counters
+
+Objects are read-only and campaign clips are hardlinks to them, so a clip
+path is only ever replaced (``atomic_write_bytes``, ``link_or_copy``), never
+written through; an in-place write would change every campaign's copy.
+
+Usage:
+    from clip_store import ClipStore
+    store = ClipStore(config.clip_store_dir)
+    key = store.key(prompt, model, resolution, duration, aspect_ratio)
+    if not store.link(key, output_path):
+        ...render...
+        store.put(key, output_path)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
+
+from logging_utils import get_logger
+from video_formats import DEFAULT_ASPECT_RATIO
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked read-modify-write
+    fcntl = None
+
+log = get_logger(__name__)
+
+
+@dataclass
+class ClipStoreStats:
+    """Hit/miss counters for one run (or cumulative totals)."""
+
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+    bytes_stored: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a Sora prompt so cosmetic differences share a key."""
+    normalized = re.sub(r"\s+", " ", prompt.lower()).strip()
+    return normalized.rstrip(" .")
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file in chunks without loading it into memory."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write beside path and move into place; a hardlinked path gets a new inode instead of new bytes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Serialize read-modify-write of the shared stats across steps and campaigns."""
+    if fcntl is None:
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f".{path.name}.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def link_or_copy(source: Path, dest: Path) -> None:
+    """Hardlink source to dest (a copy across filesystems), swapping dest in atomically."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.link")
+    tmp.unlink(missing_ok=True)
+    try:
+        try:
+            os.link(source, tmp)
+        except OSError:
+            shutil.copy2(source, tmp)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class ClipStore:
+    """Shared store of rendered clips keyed by render parameters."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.stats = ClipStoreStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(prompt: str, model: str, resolution: str, duration: int, aspect_ratio: str | None = None) -> str:
+        """Render key for a clip request.
+
+        16:9 (or unspecified) keeps the original key layout, so clips stored
+        before per-format renders still hit.
+        """
+        parts = [normalize_prompt(prompt), model, resolution, int(duration)]
+        if aspect_ratio and aspect_ratio != DEFAULT_ASPECT_RATIO:
+            parts.append(aspect_ratio)
+        payload = json.dumps(parts, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _ref_path(self, key: str) -> Path:
+        return self.root / "refs" / key[:2] / f"{key}.json"
+
+    def _object_path(self, sha: str) -> Path:
+        return self.root / "objects" / sha[:2] / f"{sha}.mp4"
+
+    def lookup(self, key: str) -> Path | None:
+        """Return the stored object for a render key, if present."""
+        ref_path = self._ref_path(key)
+        if not ref_path.exists():
+            return None
+        try:
+            ref = json.loads(ref_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+        obj = self._object_path(ref.get("sha256", ""))
+        return obj if obj.exists() else None
+
+    def link(self, key: str, dest: Path) -> bool:
+        """Materialize a stored clip at dest. Records a hit or a miss."""
+        obj = self.lookup(key)
+        if obj is None:
+            with self._lock:
+                self.stats.misses += 1
+            return False
+
+        link_or_copy(obj, dest)
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.bytes_saved += obj.stat().st_size
+        log.info("Clip store hit", extra={"key": key[:12], "path": str(dest)})
+        return True
+
+    def evict(self, key: str) -> None:
+        """Drop a render key and its object (e.g. a corrupt clip) so the next put stores afresh."""
+        obj = self.lookup(key)
+        self._ref_path(key).unlink(missing_ok=True)
+        if obj is not None:
+            obj.unlink(missing_ok=True)
+        log.info("Clip store evicted", extra={"key": key[:12]})
+
+    def put(self, key: str, source: Path) -> Path:
+        """Add a rendered clip to the store and relink source to the object."""
+        sha = file_sha256(source)
+        obj = self._object_path(sha)
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=obj.parent, prefix=".incoming.")
+            os.close(fd)
+            shutil.copy2(source, tmp)
+            os.chmod(tmp, 0o444)  # in-place writes through a linked clip fail loudly
+            os.replace(tmp, obj)
+            with self._lock:
+                self.stats.bytes_stored += obj.stat().st_size
+
+        size = obj.stat().st_size
+        _atomic_write_text(self._ref_path(key), json.dumps({"sha256": sha, "size": size}))
+        link_or_copy(obj, source)
+        return obj
+
+    def record_run(self) -> ClipStoreStats:
+        """Fold this run's counters into the persisted totals and return them."""
+        stats_path = self.root / "stats.json"
+        with self._lock, _locked(stats_path):
+            totals = ClipStoreStats()
+            if stats_path.exists():
+                try:
+                    totals = ClipStoreStats(**json.loads(stats_path.read_text(encoding="utf-8")))
+                except (json.JSONDecodeError, TypeError):
+                    pass
+
+            totals.hits += self.stats.hits
+            totals.misses += self.stats.misses
+            totals.bytes_saved += self.stats.bytes_saved
+            totals.bytes_stored += self.stats.bytes_stored
+            _atomic_write_text(stats_path, json.dumps(asdict(totals), indent=2))
+        return totals
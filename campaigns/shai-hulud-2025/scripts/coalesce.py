@@ -0,0 +1,141 @@
+"""
+Merge runs of short, similar adjacent scenes into one Sora render.
+
+Every render job pays its own queueing delay and polling, so five 5-second
+scenes of the same server room cost five queues. Adjacent scenes in the same
+format whose prompts overlap enough are rendered as one multi-shot clip, up to
+the model's duration cap. The group records where each scene starts; after
+the render the clip is cut back into per-scene clips locally with ffmpeg.
+
+A scene can opt out with ``"coalesce": false`` in the shotlist. Scenes with a
+different priority tier are never merged, so priority hints keep their meaning.
+
+Usage:
+    from coalesce import coalesce_scenes, split_render
+    jobs = coalesce_scenes(variants)
+    clips = split_render(group_clip, group, tools, lambda scene: output_dir / f"{scene['id']}.mp4")
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Callable
+
+from clip_previews import MediaToolError, write_atomically
+
+# Sora's per-render duration cap (generate_sora_clip clamps to the same value)
+MAX_RENDER_SECONDS = 20
+# Token overlap (Jaccard) two prompts need to share one render
+MIN_SIMILARITY = 0.3
+# Only short scenes are worth merging; longer ones already amortize the queue
+MAX_SCENE_SECONDS = 8
+# Where group renders and their cut points are kept, inside each format's clip directory
+COALESCED_DIR = ".coalesced"
+
+# Filler that would make every prompt look alike
+STOPWORDS = {
+    "a", "an", "and", "as", "at", "by", "for", "from", "in", "into", "of", "on", "or", "the", "to", "with",
+    "no", "text", "shot", "cinematic", "lighting", "style", "8k", "4k",
+}
+
+
+def _tokens(prompt: str) -> set[str]:
+    return {token for token in re.findall(r"[a-z0-9]+", prompt.lower()) if token not in STOPWORDS and len(token) > 1}
+
+
+def prompt_similarity(a: str, b: str) -> float:
+    """Jaccard overlap of the prompts' content words."""
+    left, right = _tokens(a), _tokens(b)
+    return len(left & right) / len(left | right) if left and right else 0.0
+
+
+def render_seconds(scene: dict) -> int:
+    return min(int(scene.get("duration_seconds", 10)), MAX_RENDER_SECONDS)
+
+
+def _mergeable(scene: dict) -> bool:
+    return bool(scene.get("sora_prompt")) and scene.get("coalesce", True) and render_seconds(scene) <= MAX_SCENE_SECONDS
+
+
+def _compatible(group: list[dict], scene: dict, max_seconds: int, min_similarity: float) -> bool:
+    last = group[-1]
+    return (
+        _mergeable(last)
+        and _mergeable(scene)
+        and scene.get("aspect_ratio") == last.get("aspect_ratio")
+        and int(scene.get("priority", 0)) == int(last.get("priority", 0))
+        and sum(render_seconds(s) for s in group) + render_seconds(scene) <= max_seconds
+        and prompt_similarity(last["sora_prompt"], scene["sora_prompt"]) >= min_similarity
+    )
+
+
+def group_job(scenes: list[dict]) -> dict:
+    """One render job covering several scenes, with each scene's cut point."""
+    cuts = []
+    start = 0
+    for scene in scenes:
+        seconds = render_seconds(scene)
+        cuts.append({"id": scene.get("id", "unknown"), "start_seconds": start, "duration_seconds": seconds})
+        start += seconds
+    shots = " ".join(
+        f"Shot {n} ({cut['start_seconds']}-{cut['start_seconds'] + cut['duration_seconds']}s): "
+        f"{scene['sora_prompt'].rstrip(' .')}."
+        for n, (cut, scene) in enumerate(zip(cuts, scenes), start=1)
+    )
+    first = scenes[0]
+    return {
+        "id": f"{first.get('id', 'unknown')}+{len(scenes) - 1}",
+        "sora_prompt": f"One continuous sequence of {len(scenes)} shots with hard cuts between them. {shots}",
+        "duration_seconds": start,
+        "aspect_ratio": first.get("aspect_ratio"),
+        "priority": int(first.get("priority", 0)),
+        "coalesced": scenes,
+        "cuts": cuts,
+    }
+
+
+def coalesce_scenes(
+    scenes: list[dict],
+    max_seconds: int = MAX_RENDER_SECONDS,
+    min_similarity: float = MIN_SIMILARITY,
+) -> list[dict]:
+    """Greedily merge adjacent compatible scenes (per format); singles are returned unchanged."""
+    by_format: dict[str | None, list[dict]] = {}
+    for scene in scenes:
+        by_format.setdefault(scene.get("aspect_ratio"), []).append(scene)
+
+    jobs = []
+    for run in by_format.values():
+        groups = [[run[0]]]
+        for scene in run[1:]:
+            if _compatible(groups[-1], scene, max_seconds, min_similarity):
+                groups[-1].append(scene)
+            else:
+                groups.append([scene])
+        jobs.extend(group_job(group) if len(group) > 1 else group[0] for group in groups)
+    return jobs
+
+
+def split_render(group_clip: Path, group: dict, tools, dest_for: Callable[[dict], Path]) -> dict[str, Path | None]:
+    """Cut a group render back into per-scene clips at its recorded cut points.
+
+    The cut points are saved next to the render (``<group>.json``). A cut
+    that fails leaves that scene without a clip (None) so it can be re-queued.
+    """
+    write_atomically(
+        group_clip.with_suffix(".json"),
+        lambda tmp: tmp.write_text(json.dumps({"cuts": group["cuts"]}, indent=2), encoding="utf-8"),
+    )
+    clips: dict[str, Path | None] = {}
+    for scene, cut in zip(group["coalesced"], group["cuts"]):
+        dest = dest_for(scene)
+        try:
+            write_atomically(
+                dest, lambda tmp: tools.split_clip(group_clip, tmp, cut["start_seconds"], cut["duration_seconds"]),
+            )
+            clips[cut["id"]] = dest
+        except (MediaToolError, OSError):  # the caller re-queues scenes without a clip
+            clips[cut["id"]] = None
+    return clips
@@ -2,9 +2,28 @@
 Configuration management for the Shai-Hulud video pipeline.
 
 Usage:
-    from config import Config
-    config = Config()
-    
+    from config import get_config
+    config = get_config()
+
+    # Another campaign in the same process
+    other = Config.load(Path("campaigns/log4shell-retro"))
+    with use_config(other):
+        ...  # get_config() returns `other` here
+
+The campaign is the working directory when it contains ``campaign.json``
+(or ``$CAMPAIGN_ROOT``); otherwise this template campaign. Prompts fall back
+to the template's copies unless the campaign has its own.
+
+``Config.load`` layers settings, lowest precedence first:
+    1. the defaults below
+    2. ``campaign.json`` in the campaign root (keys are field names)
+    3. the campaign's ``.env``
+    4. the process environment
+
+Nothing is read at import time and configs are immutable (derive variants
+with ``dataclasses.replace``). ``fingerprint`` hashes every setting and
+input file that affects generated output, for use in cache keys.
+
 Environment variables required:
     - GEMINI_API_KEY: Google AI Studio API key
     - OPENAI_API_KEY: OpenAI API key (for Sora 2)
@@ -12,89 +31,321 @@ Environment variables required:
     - ELEVENLABS_VOICE_ID: Your voice profile ID
 """
 
+import contextvars
+import functools
+import hashlib
+import json
 import os
-from dataclasses import dataclass, field
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, Mapping
+
+from dotenv import dotenv_values
+
+# Pipeline code and default assets (prompts) live in the template campaign;
+# scaffolded campaigns link to them and only hold what they customize.
+TEMPLATE_ROOT = Path(__file__).resolve().parent.parent
+CAMPAIGN_FILE = "campaign.json"
+# campaign.json keys that describe the campaign rather than set a field
+CAMPAIGN_METADATA_KEYS = ("name", "template")
+
+# Paths derived from the campaign root unless set explicitly
+CAMPAIGN_PATHS = {
+    "docs_dir": "docs",
+    "data_dir": "data",
+    "data_raw_dir": "data/raw",
+    "data_processed_dir": "data/processed",
+    "prompts_dir": "prompts",
+    "audio_dir": "audio",
+    "video_dir": "video",
+    "previews_dir": "video/previews",
+    "rough_cut_dir": "video/rough-cut",
+    "shorts_dir": "shorts",
+    "paradigm_doc": "docs/shai-hulud-paradigm.md",
+    "intel_links": "data/raw/intel-links.md",
+    "intel_notes": "data/raw/notes-snippets.md",
+    "intel_index_json": "data/index/intel-index.json",
+    "outline_json": "data/processed/outline.json",
+    "script_longform": "data/processed/script-longform.md",
+    "shorts_scripts": "data/processed/shorts-scripts.md",
+    "shotlist_json": "data/processed/shotlist.json",
+    "stale_json": "data/processed/stale.json",
+    "work_queue_db": "data/work-queue.sqlite",
+    "voiceover_mp3": "audio/voiceover.mp3",
+    "audio_chunks_dir": "audio/chunks",
+    "profiles_dir": "profiles",
+    "logs_dir": "logs",
+    "cassettes_dir": "cassettes",
+}
+# Shared across campaigns (next to the campaign folders)
+SHARED_PATHS = {
+    "clip_store_dir": ".clip-store",
+    "render_history_json": ".render-history.json",
+    "context_cache_json": ".context-cache.json",
+    "intel_sketches_json": ".intel-sketches.json",
+    "media_cache_dir": ".media-cache",
+}
+# Campaign's own copy if it has one, else the template's
+PROMPT_PATHS = {
+    "prompt_outline": "prompts/01-threat-to-outline.md",
+    "prompt_script": "prompts/02-outline-to-script.md",
+    "prompt_shorts": "prompts/03-script-to-shorts.md",
+    "prompt_shotlist": "prompts/04-script-to-shotlist.md",
+    "prompt_voice_style": "prompts/05-elevenlabs-style-note.md",
+}
+PATH_FIELDS = {**CAMPAIGN_PATHS, **SHARED_PATHS, **PROMPT_PATHS}
+
+ENV_VARS = {
+    "clip_store_dir": "CLIP_STORE_DIR",
+    "render_history_json": "RENDER_HISTORY_JSON",
+    "context_cache_json": "CONTEXT_CACHE_JSON",
+    "intel_sketches_json": "INTEL_SKETCHES_JSON",
+    "media_cache_dir": "MEDIA_CACHE_DIR",
+    "media_workers": "MEDIA_WORKERS",
+    "intel_top_k": "INTEL_TOP_K",
+    "intel_max_chars": "INTEL_MAX_CHARS",
+    "intel_other_campaigns": "INTEL_OTHER_CAMPAIGNS",
+    "intel_dedup": "INTEL_DEDUP",
+    "gemini_api_key": "GEMINI_API_KEY",
+    "openai_api_key": "OPENAI_API_KEY",
+    "elevenlabs_api_key": "ELEVENLABS_API_KEY",
+    "elevenlabs_voice_id": "ELEVENLABS_VOICE_ID",
+    "gemini_model": "GEMINI_MODEL",
+    "gemini_temperature": "GEMINI_TEMPERATURE",
+    "gemini_top_p": "GEMINI_TOP_P",
+    "gemini_context_cache": "GEMINI_CONTEXT_CACHE",
+    "gemini_cache_ttl": "GEMINI_CACHE_TTL",
+    "gemini_cache_min_tokens": "GEMINI_CACHE_MIN_TOKENS",
+    "sora_model": "SORA_MODEL",
+    "sora_temperature": "SORA_TEMPERATURE",
+    "sora_top_p": "SORA_TOP_P",
+    "sora_concurrency": "SORA_CONCURRENCY",
+    "work_queue_url": "WORK_QUEUE_URL",
+    "work_queue_lease": "WORK_QUEUE_LEASE",
+    "elevenlabs_model": "ELEVENLABS_MODEL",
+    "elevenlabs_stability": "ELEVENLABS_STABILITY",
+    "elevenlabs_similarity": "ELEVENLABS_SIMILARITY",
+    "pipeline_profile": "PIPELINE_PROFILE",
+    "pipeline_run_logs": "PIPELINE_RUN_LOGS",
+    "cassette_mode": "PIPELINE_CASSETTE_MODE",
+    "cassette_name": "PIPELINE_CASSETTE",
+    "replay_speed": "PIPELINE_REPLAY_SPEED",
+    "simulate_latency_scale": "SIMULATE_LATENCY_SCALE",
+}
+
+# Settings and input files that change what the pipeline generates
+FINGERPRINT_FIELDS = (
+    "gemini_model", "gemini_temperature", "gemini_top_p",
+    "sora_model", "sora_temperature", "sora_top_p",
+    "elevenlabs_model", "elevenlabs_voice_id", "elevenlabs_stability", "elevenlabs_similarity",
+    "intel_top_k", "intel_max_chars", "intel_other_campaigns", "intel_dedup",
+    "video_aspect_ratio", "shorts_aspect_ratio", "video_resolution", "target_video_minutes",
+)
+FINGERPRINT_INPUTS = ("paradigm_doc", *PROMPT_PATHS)
+
+
+def find_campaign_root() -> Path:
+    """$CAMPAIGN_ROOT, else the working directory if it holds campaign.json, else the template."""
+    if os.getenv("CAMPAIGN_ROOT"):
+        return Path(os.environ["CAMPAIGN_ROOT"]).resolve()
+    if (Path.cwd() / CAMPAIGN_FILE).exists():
+        return Path.cwd()
+    return Path(__file__).parent.parent
+
 
-from dotenv import load_dotenv
+def load_campaign_settings(campaign_root: Path) -> dict:
+    """Per-campaign settings from campaign.json (empty if absent)."""
+    path = campaign_root / CAMPAIGN_FILE
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
 
-# Load .env from campaign root
-CAMPAIGN_ROOT = Path(__file__).parent.parent
-load_dotenv(CAMPAIGN_ROOT / ".env")
 
+def _parse_bool(value: str) -> bool:
+    return str(value).lower() in ("1", "true", "yes")
 
-@dataclass
+
+@dataclass(frozen=True)
 class Config:
     """Pipeline configuration with paths and API settings."""
-    
-    # Paths
-    campaign_root: Path = CAMPAIGN_ROOT
-    docs_dir: Path = CAMPAIGN_ROOT / "docs"
-    data_dir: Path = CAMPAIGN_ROOT / "data"
-    data_raw_dir: Path = CAMPAIGN_ROOT / "data" / "raw"
-    data_processed_dir: Path = CAMPAIGN_ROOT / "data" / "processed"
-    prompts_dir: Path = CAMPAIGN_ROOT / "prompts"
-    audio_dir: Path = CAMPAIGN_ROOT / "audio"
-    video_dir: Path = CAMPAIGN_ROOT / "video"
-    
+
+    # Paths (None = derived from campaign_root, see CAMPAIGN_PATHS / SHARED_PATHS / PROMPT_PATHS)
+    campaign_root: Path = TEMPLATE_ROOT
+    campaign_name: str = ""
+    docs_dir: Path | None = None
+    data_dir: Path | None = None
+    data_raw_dir: Path | None = None
+    data_processed_dir: Path | None = None
+    prompts_dir: Path | None = None  # overrides of the template's prompts
+    audio_dir: Path | None = None
+    video_dir: Path | None = None
+    previews_dir: Path | None = None  # proxies, contact sheets and clip metadata for the studio
+    rough_cut_dir: Path | None = None  # assembled rough cut and its cached segments
+    shorts_dir: Path | None = None  # one folder per short: script, voiceover, timing and clip list
+
+    # Shared across campaigns: clip store, render timings, cached-context handles, intel sketches, clip previews
+    clip_store_dir: Path | None = None
+    render_history_json: Path | None = None
+    context_cache_json: Path | None = None
+    intel_sketches_json: Path | None = None
+    media_cache_dir: Path | None = None
+
     # Input files
-    paradigm_doc: Path = CAMPAIGN_ROOT / "docs" / "shai-hulud-paradigm.md"
-    intel_links: Path = CAMPAIGN_ROOT / "data" / "raw" / "intel-links.md"
-    intel_notes: Path = CAMPAIGN_ROOT / "data" / "raw" / "notes-snippets.md"
-    
+    paradigm_doc: Path | None = None
+    intel_links: Path | None = None
+    intel_notes: Path | None = None
+
+    # Retrieval over docs/ and data/raw/ (BM25, refreshed incrementally)
+    intel_index_json: Path | None = None
+    intel_top_k: int = 8
+    intel_max_chars: int = 6000
+    intel_other_campaigns: bool = False
+    intel_dedup: bool = True
+
     # Output files
-    outline_json: Path = CAMPAIGN_ROOT / "data" / "processed" / "outline.json"
-    script_longform: Path = CAMPAIGN_ROOT / "data" / "processed" / "script-longform.md"
-    shorts_scripts: Path = CAMPAIGN_ROOT / "data" / "processed" / "shorts-scripts.md"
-    shotlist_json: Path = CAMPAIGN_ROOT / "data" / "processed" / "shotlist.json"
-    voiceover_mp3: Path = CAMPAIGN_ROOT / "audio" / "voiceover.mp3"
-    
+    outline_json: Path | None = None
+    script_longform: Path | None = None
+    shorts_scripts: Path | None = None
+    shotlist_json: Path | None = None
+    stale_json: Path | None = None
+    voiceover_mp3: Path | None = None
+    audio_chunks_dir: Path | None = None
+    profiles_dir: Path | None = None
+
     # Prompt files
-    prompt_outline: Path = CAMPAIGN_ROOT / "prompts" / "01-threat-to-outline.md"
-    prompt_script: Path = CAMPAIGN_ROOT / "prompts" / "02-outline-to-script.md"
-    prompt_shorts: Path = CAMPAIGN_ROOT / "prompts" / "03-script-to-shorts.md"
-    prompt_shotlist: Path = CAMPAIGN_ROOT / "prompts" / "04-script-to-shotlist.md"
-    prompt_voice_style: Path = CAMPAIGN_ROOT / "prompts" / "05-elevenlabs-style-note.md"
-    
+    prompt_outline: Path | None = None
+    prompt_script: Path | None = None
+    prompt_shorts: Path | None = None
+    prompt_shotlist: Path | None = None
+    prompt_voice_style: Path | None = None
+
     # API Keys (from environment)
-    gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-    openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
-    elevenlabs_api_key: str = os.getenv("ELEVENLABS_API_KEY", "")
-    elevenlabs_voice_id: str = os.getenv("ELEVENLABS_VOICE_ID", "")
-    
+    gemini_api_key: str = ""
+    openai_api_key: str = ""
+    elevenlabs_api_key: str = ""
+    elevenlabs_voice_id: str = ""
+
     # Model settings
-    gemini_model: str = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
-    gemini_temperature: float = float(os.getenv("GEMINI_TEMPERATURE", "0.7"))
-    gemini_top_p: float = float(os.getenv("GEMINI_TOP_P", "0.9"))
-    
-    sora_model: str = os.getenv("SORA_MODEL", "sora-2")
-    sora_temperature: float = float(os.getenv("SORA_TEMPERATURE", "0.5"))
-    sora_top_p: float = float(os.getenv("SORA_TOP_P", "0.9"))
-    
-    elevenlabs_model: str = os.getenv("ELEVENLABS_MODEL", "eleven_v3")
-    elevenlabs_stability: float = float(os.getenv("ELEVENLABS_STABILITY", "0.35"))
-    elevenlabs_similarity: float = float(os.getenv("ELEVENLABS_SIMILARITY", "0.75"))
-    
+    gemini_model: str = "gemini-2.0-flash"
+    gemini_temperature: float = 0.7
+    gemini_top_p: float = 0.9
+    # Provider-side caching of stable prompt prefixes (script, templates, threat doc)
+    gemini_context_cache: bool = True
+    gemini_cache_ttl: int = 3600
+    gemini_cache_min_tokens: int = 1024
+
+    sora_model: str = "sora-2"
+    sora_temperature: float = 0.5
+    sora_top_p: float = 0.9
+    sora_concurrency: int = 3
+    # Concurrent local ffmpeg/ffprobe jobs for clip previews
+    media_workers: int = 4
+
+    # Job queue for distributed workers (SQLite file unless WORK_QUEUE_URL names another broker)
+    work_queue_db: Path | None = None
+    work_queue_url: str = ""
+    # Seconds without a heartbeat before a worker's job is requeued
+    work_queue_lease: int = 60
+
+    elevenlabs_model: str = "eleven_v3"
+    elevenlabs_stability: float = 0.35
+    elevenlabs_similarity: float = 0.75
+
+    # Diagnostics
+    pipeline_profile: bool = False
+    # JSON-lines log file per step run in logs_dir
+    pipeline_run_logs: bool = True
+    logs_dir: Path | None = None
+
+    # Record/replay cassettes: off | record | replay
+    cassettes_dir: Path | None = None
+    cassette_mode: str = "off"
+    cassette_name: str = "default"
+    replay_speed: float = 1.0
+    # Scale for the fake adapters' modeled provider latency (0 = instant)
+    simulate_latency_scale: float = 0.0
+
     # Video settings
     video_aspect_ratio: str = "16:9"
+    # Scenes used by shorts are also rendered in this format (same as above = one format)
+    shorts_aspect_ratio: str = "9:16"
     video_resolution: str = "1080p"
     target_video_minutes: int = 12
-    
-    required_files: tuple[Path, ...] = field(default_factory=lambda: (
-        CAMPAIGN_ROOT / "docs" / "shai-hulud-paradigm.md",
-        CAMPAIGN_ROOT / "data" / "raw" / "intel-links.md",
-        CAMPAIGN_ROOT / "prompts" / "01-threat-to-outline.md",
-        CAMPAIGN_ROOT / "prompts" / "02-outline-to-script.md",
-        CAMPAIGN_ROOT / "prompts" / "03-script-to-shorts.md",
-        CAMPAIGN_ROOT / "prompts" / "04-script-to-shotlist.md",
-        CAMPAIGN_ROOT / "prompts" / "05-elevenlabs-style-note.md",
-    ))
-    
+
+    def __post_init__(self):
+        root = Path(self.campaign_root)
+        derived = {"campaign_root": root, "campaign_name": self.campaign_name or root.name}
+        for name, relative in PATH_FIELDS.items():
+            value = getattr(self, name)
+            if value is None:
+                if name in SHARED_PATHS:
+                    value = root.parent / relative
+                elif name in PROMPT_PATHS and not (root / relative).exists():
+                    value = TEMPLATE_ROOT / relative
+                else:
+                    value = root / relative
+            derived[name] = Path(value) if Path(value).is_absolute() else root / value
+        for name, value in derived.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def load(cls, campaign_root: Path | None = None, environ: Mapping[str, str] | None = None) -> "Config":
+        """Build a campaign's config from campaign.json, its .env and the environment."""
+        root = Path(campaign_root or find_campaign_root()).resolve()
+        settings = load_campaign_settings(root)
+        known = {f.name: f for f in fields(cls)}
+        unknown = set(settings) - set(known) - set(CAMPAIGN_METADATA_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown setting(s) in {root / CAMPAIGN_FILE}: {', '.join(sorted(unknown))}")
+
+        values = {key: value for key, value in settings.items() if key in known}
+        values["campaign_name"] = settings.get("name", root.name)
+
+        env_file = {key: value for key, value in dotenv_values(root / ".env").items() if value is not None}
+        overlay = {**env_file, **(os.environ if environ is None else environ)}
+        for name, variable in ENV_VARS.items():
+            if variable in overlay:
+                values[name] = overlay[variable]
+
+        for name, value in values.items():
+            values[name] = cls._coerce(known[name], value)
+        return cls(campaign_root=root, **values)
+
+    @staticmethod
+    def _coerce(spec, value):
+        if spec.name in PATH_FIELDS:
+            return Path(value)
+        if spec.type is bool:
+            return value if isinstance(value, bool) else _parse_bool(value)
+        if spec.type in (int, float, str):
+            return spec.type(value)
+        return value
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable hash of the generation settings and input file contents.
+
+        Computed on every access: a long-lived config (watch mode, the async
+        pipeline) must see prompts and the paradigm doc as they are now.
+        """
+        inputs = {}
+        for name in FINGERPRINT_INPUTS:
+            path = getattr(self, name)
+            inputs[name] = hashlib.sha256(path.read_bytes()).hexdigest() if path.exists() else None
+        payload = {
+            "settings": {name: getattr(self, name) for name in FINGERPRINT_FIELDS},
+            "inputs": inputs,
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    @property
+    def required_files(self) -> tuple[Path, ...]:
+        return (self.paradigm_doc, self.intel_links, *(getattr(self, name) for name in PROMPT_PATHS))
+
     def validate(self) -> list[str]:
         """Check for missing required configuration and files."""
         errors = []
-        
+
         if not self.gemini_api_key:
             errors.append("GEMINI_API_KEY not set")
         if not self.openai_api_key:
@@ -103,13 +354,13 @@ class Config:
             errors.append("ELEVENLABS_API_KEY not set")
         if not self.elevenlabs_voice_id:
             errors.append("ELEVENLABS_VOICE_ID not set")
-        
+
         for path in self.required_files:
             if not path.exists():
                 errors.append(f"Missing file: {path}")
-        
+
         return errors
-    
+
     def ensure_dirs(self):
         """Create output directories if they don't exist."""
         processed_dir = self.data_processed_dir
@@ -118,12 +369,35 @@ class Config:
 
         for dir_path in [processed_dir, self.audio_dir, self.video_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
-    
+
     def require_files(self, paths: Iterable[Path]) -> list[str]:
         """Return list of missing file paths for the provided iterable."""
         return [str(path) for path in paths if not path.exists()]
 
 
-def get_config() -> Config:
-    """Get configuration singleton."""
-    return Config()
+_active_config: contextvars.ContextVar[Config | None] = contextvars.ContextVar("active_config", default=None)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config(campaign_root: Path) -> Config:
+    return Config.load(campaign_root)
+
+
+def get_config(campaign_root: Path | None = None) -> Config:
+    """Get the config for a campaign (cached per root), or the one set by ``use_config``."""
+    if campaign_root is None:
+        active = _active_config.get()
+        if active is not None:
+            return active
+        campaign_root = find_campaign_root()
+    return _load_config(Path(campaign_root).resolve())
+
+
+@contextmanager
+def use_config(config: Config) -> Iterator[Config]:
+    """Make ``get_config()`` return ``config`` (in this thread/task) inside the block."""
+    token = _active_config.set(config)
+    try:
+        yield config
+    finally:
+        _active_config.reset(token)
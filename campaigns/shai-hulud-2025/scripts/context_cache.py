@@ -0,0 +1,271 @@
+"""
+Stable-prefix prompt layout and Gemini context caching.
+
+Prompts are split into stable context sections (prompt templates, the threat
+doc, the long-form script) followed by the per-request task. The stable
+prefix is uploaded once as a provider-side cached context and the handle is
+kept in a local registry shared across steps and campaigns, so later stages
+(shorts and shotlist both read the full script) only send their task text.
+
+Prefixes under ``GEMINI_CACHE_MIN_TOKENS`` skip explicit caching; the
+stable-first layout still lets the provider's implicit prefix caching hit.
+
+Registry layout (``CONTEXT_CACHE_JSON``):
+    {"<sha256(model, prefix)>": {"name": "cachedContents/...", "expires_at": 1732000000.0,
+                                 "tokens": 12345, "model": "gemini-2.0-flash"}}
+
+Usage:
+    from context_cache import ContextCache, PromptLayout, generate_with_context
+    layout = PromptLayout(context=[("FULL_SCRIPT_TEXT", script_text)], task=instructions)
+    response = generate_with_context(gemini, model, layout, generation_config, cache)
+    response = await agenerate_with_context(gemini, model, layout, generation_config, cache)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from events import get_emitter
+from logging_utils import get_logger
+
+log = get_logger(__name__)
+
+# Don't reuse a handle this close to its expiry; recreate instead
+EXPIRY_MARGIN_SECONDS = 60
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars/token), good enough for cache thresholds."""
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class PromptLayout:
+    """A prompt split into a cacheable stable prefix and a per-request task."""
+
+    context: list[tuple[str | None, str]]  # (section label or None for raw text, text)
+    task: str
+
+    @property
+    def prefix(self) -> str:
+        sections = (f"## {label}:\n\n{text.strip()}" if label else text.strip() for label, text in self.context)
+        return "".join(f"{section}\n\n---\n\n" for section in sections)
+
+    def render(self) -> str:
+        """Full prompt for providers (or paths) without context caching."""
+        return self.prefix + self.task
+
+    def prefix_key(self, model: str) -> str:
+        payload = json.dumps([model, self.prefix], separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ContextCacheStats:
+    hits: int = 0
+    misses: int = 0
+    cached_tokens: int = 0
+    fallbacks: int = 0
+
+
+class ContextCache:
+    """Local registry of provider cached-context handles.
+
+    With ``path=None`` the registry lives in memory only (simulation/replay),
+    so fake handles never leak into the shared registry.
+    """
+
+    def __init__(self, path: Path | None = None, ttl_seconds: int = 3600, min_tokens: int = 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.stats = ContextCacheStats()
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        if path and path.exists():
+            try:
+                self._entries = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                log.warning("Ignoring unreadable context cache registry", extra={"path": str(path)})
+
+    def lookup(self, key: str) -> str | None:
+        """Return a live handle name for a prefix key, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry.get("expires_at", 0) - EXPIRY_MARGIN_SECONDS > time.time():
+            return entry["name"]
+        return None
+
+    def store(self, key: str, name: str, model: str, tokens: int) -> None:
+        with self._lock:
+            self._entries[key] = {
+                "name": name,
+                "model": model,
+                "tokens": tokens,
+                "expires_at": round(time.time() + self.ttl_seconds, 3),
+            }
+            self._save()
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        now = time.time()
+        live = {k: v for k, v in self._entries.items() if v.get("expires_at", 0) > now}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(live, fh, indent=2)
+        os.replace(tmp, self.path)
+
+
+def _cached_model(gemini: Any, model: str, layout: PromptLayout, generation_config: Any,
+                  cache: ContextCache, key: str):
+    """Return a model bound to the cached prefix, creating the cache on a miss."""
+    name = cache.lookup(key)
+    tokens = estimate_tokens(layout.prefix)
+    if name is None:
+        cached = gemini.caching.CachedContent.create(
+            model=model,
+            display_name=f"pipeline-{key[:12]}",
+            contents=[layout.prefix],
+            ttl=datetime.timedelta(seconds=cache.ttl_seconds),
+        )
+        name = cached.name
+        cache.store(key, name, model, tokens)
+        cache.stats.misses += 1
+        hit = False
+    else:
+        cache.stats.hits += 1
+        hit = True
+
+    get_emitter().emit("context_cache", hit=hit, handle=name, prefix_tokens=tokens)
+    log.info("Context cache hit" if hit else "Context cache created", extra={"handle": name, "prefix_tokens": tokens})
+    return gemini.GenerativeModel.from_cached_content(name, generation_config=generation_config)
+
+
+def generate_with_context(
+    gemini: Any,
+    model: str,
+    layout: PromptLayout,
+    generation_config: Any,
+    cache: ContextCache | None = None,
+) -> Any:
+    """Generate content, sending the stable prefix as cached context when possible.
+
+    Any failure on the cached path (prefix below the provider minimum, expired
+    handle, unsupported model) falls back to sending the full prompt once.
+    """
+    if _use_cache(gemini, layout, cache):
+        key = layout.prefix_key(model)
+        try:
+            model_instance = _cached_model(gemini, model, layout, generation_config, cache, key)
+            response = model_instance.generate_content(layout.task)
+        except Exception as exc:  # noqa: BLE001
+            _fall_back(cache, key, exc)
+        else:
+            return _count_cached(cache, response)
+
+    model_instance = gemini.GenerativeModel(model)
+    return model_instance.generate_content(layout.render(), generation_config=generation_config)
+
+
+async def agenerate_with_context(
+    gemini: Any,
+    model: str,
+    layout: PromptLayout,
+    generation_config: Any,
+    cache: ContextCache | None = None,
+) -> Any:
+    """``generate_with_context`` on the model's async API.
+
+    Creating a cached context has no async API, so that one-off upload runs
+    in a worker thread; generation itself never blocks the event loop.
+    """
+    if _use_cache(gemini, layout, cache):
+        key = layout.prefix_key(model)
+        try:
+            model_instance = await asyncio.to_thread(
+                _cached_model, gemini, model, layout, generation_config, cache, key,
+            )
+            response = await model_instance.generate_content_async(layout.task)
+        except Exception as exc:  # noqa: BLE001
+            _fall_back(cache, key, exc)
+        else:
+            return _count_cached(cache, response)
+
+    model_instance = gemini.GenerativeModel(model)
+    return await model_instance.generate_content_async(layout.render(), generation_config=generation_config)
+
+
+async def astream_with_context(
+    gemini: Any,
+    model: str,
+    layout: PromptLayout,
+    generation_config: Any,
+    cache: ContextCache | None = None,
+) -> AsyncIterator[str]:
+    """``agenerate_with_context`` yielding text as the model streams it.
+
+    The full-prompt fallback only applies while nothing has been yielded;
+    a stream that breaks midway raises.
+    """
+    if _use_cache(gemini, layout, cache):
+        key = layout.prefix_key(model)
+        streamed = False
+        try:
+            model_instance = await asyncio.to_thread(
+                _cached_model, gemini, model, layout, generation_config, cache, key,
+            )
+            response = await model_instance.generate_content_async(layout.task, stream=True)
+            async for chunk in response:
+                streamed = True
+                yield chunk.text
+        except Exception as exc:  # noqa: BLE001
+            if streamed:
+                raise
+            _fall_back(cache, key, exc)
+        else:
+            _count_cached(cache, response)
+            return
+
+    model_instance = gemini.GenerativeModel(model)
+    response = await model_instance.generate_content_async(
+        layout.render(), generation_config=generation_config, stream=True,
+    )
+    async for chunk in response:
+        yield chunk.text
+
+
+def _use_cache(gemini: Any, layout: PromptLayout, cache: ContextCache | None) -> bool:
+    return (
+        cache is not None
+        and hasattr(gemini, "caching")
+        and estimate_tokens(layout.prefix) >= cache.min_tokens
+    )
+
+
+def _fall_back(cache: ContextCache, key: str, exc: Exception) -> None:
+    cache.invalidate(key)
+    cache.stats.fallbacks += 1
+    log.warning("Context cache unavailable, sending full prompt", extra={"error": str(exc)})
+
+
+def _count_cached(cache: ContextCache, response: Any) -> Any:
+    usage = getattr(response, "usage_metadata", None)
+    cache.stats.cached_tokens += getattr(usage, "cached_content_token_count", 0) or 0
+    return response
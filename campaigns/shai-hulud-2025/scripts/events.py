@@ -0,0 +1,140 @@
+"""
+Machine-readable progress events for pipeline steps.
+
+With ``--events jsonl`` a step writes one JSON object per line to stdout and
+silences its rich console, so stdout becomes a dedicated event stream that
+dashboards can parse without scraping human-oriented output. Logging still
+goes to stderr.
+
+Event shape:
+    {"ts": 1732000000.123, "step": "audio", "event": "progress", "done": 2, "total": 5}
+
+Events: step_start, step_end, api_call_start, api_call_end, context_cache,
+progress, artifact_written, error.
+
+Usage:
+    from events import get_emitter, step_events
+
+    @click.command()
+    @step_events("outline", console)
+    @click.option(...)
+    def main(...):
+        events = get_emitter()
+        with events.api_call("gemini", model=model):
+            ...
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+import click
+from rich.console import Console
+
+EVENT_MODES = ("none", "jsonl")
+
+
+class EventEmitter:
+    """Writes JSON-lines events to a stream; a no-op when no stream is set."""
+
+    def __init__(self, stream: IO[str] | None = None, step: str | None = None):
+        self.stream = stream
+        self.step = step
+        self.artifacts: list[Path] = []  # every artifact reported this run, even when muted
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.stream is not None
+
+    def emit(self, event: str, **fields: Any) -> None:
+        if self.stream is None:
+            return
+        record = {"ts": round(time.time(), 3), "step": self.step, "event": event, **fields}
+        line = json.dumps(record, default=str, separators=(",", ":"))
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    @contextmanager
+    def api_call(self, service: str, **fields: Any) -> Iterator[None]:
+        """Emit api_call_start/api_call_end around a provider request."""
+        self.emit("api_call_start", service=service, **fields)
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as exc:
+            self.emit(
+                "api_call_end", service=service, ok=False, error=str(exc),
+                duration_seconds=round(time.monotonic() - started, 3), **fields,
+            )
+            raise
+        self.emit(
+            "api_call_end", service=service, ok=True,
+            duration_seconds=round(time.monotonic() - started, 3), **fields,
+        )
+
+    def progress(self, done: int, total: int, **fields: Any) -> None:
+        self.emit("progress", done=done, total=total, **fields)
+
+    def artifact(self, path: Path) -> None:
+        """Report a written output file and its size."""
+        size = path.stat().st_size if path.exists() else 0
+        with self._lock:
+            self.artifacts.append(path)
+        self.emit("artifact_written", path=str(path), bytes=size)
+
+
+_emitter = EventEmitter()
+
+
+def get_emitter() -> EventEmitter:
+    """Return the process-wide emitter (disabled unless configured)."""
+    return _emitter
+
+
+def configure_events(mode: str, step: str, console: Console | None = None) -> EventEmitter:
+    """Enable JSON-lines events on stdout and mute rich output for headless runs."""
+    _emitter.step = step
+    if mode == "jsonl":
+        _emitter.stream = sys.stdout
+        if console is not None:
+            console.quiet = True
+    else:
+        _emitter.stream = None
+    return _emitter
+
+
+def step_events(step: str, console: Console | None = None):
+    """Click decorator adding ``--events`` and step start/end/error events to main."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, events: str, **kwargs):
+            emitter = configure_events(events, step, console)
+            emitter.emit("step_start")
+            started = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as exc:
+                message = exc.format_message() if isinstance(exc, click.ClickException) else str(exc)
+                emitter.emit("error", error=message or type(exc).__name__)
+                emitter.emit("step_end", ok=False, duration_seconds=round(time.monotonic() - started, 3))
+                raise
+            emitter.emit("step_end", ok=True, duration_seconds=round(time.monotonic() - started, 3))
+            return result
+
+        return click.option(
+            "--events",
+            type=click.Choice(EVENT_MODES), default="none",
+            help="Emit JSON-lines progress events on stdout (mutes rich output)",
+        )(wrapper)
+
+    return decorator
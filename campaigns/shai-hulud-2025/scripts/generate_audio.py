@@ -5,8 +5,14 @@ Generate ElevenLabs voiceover from script.
 Usage:
     python generate_audio.py
     python generate_audio.py --script custom-script.md --output voiceover.mp3
+
+    timing = await agenerate_audio(chunks, voice_id, api_key, output_path, model_id)
 """
 
+import asyncio
+import base64
+import copy
+import json
 import re
 from pathlib import Path
 
@@ -15,15 +21,34 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress
 
-from elevenlabs import ElevenLabs
-
+from audio_chunks import AudioChunkCache
+from chapters import clear_stale, split_sections
+from clients import async_elevenlabs_client, cassette_replaying, elevenlabs_client
 from config import get_config
+from events import get_emitter, step_events
 from logging_utils import get_logger
-from simulation_adapters import FakeElevenLabsClient
+from manifest import manifest_step
+from profiling import profile_step
+from shotlist_stream import load_shotlist, shotlist_source, write_shotlist
+from timing_index import (
+    WordTiming,
+    apply_timing_to_shotlist,
+    build_timing_index,
+    estimate_word_timings,
+    find_broll_cues,
+    timing_index_path,
+    words_from_alignment,
+)
 
 console = Console()
 log = get_logger(__name__)
 
+# ElevenLabs has a character limit per request
+MAX_CHARS = 5000
+
+# Concurrent synthesis requests for the async API
+TTS_CONCURRENCY = 2
+
 
 def clean_script_for_tts(script_text: str) -> str:
     """Remove B-roll markers and formatting for TTS."""
@@ -44,6 +69,105 @@ def clean_script_for_tts(script_text: str) -> str:
     return cleaned
 
 
+def synthesize_chunk(
+    client,
+    text: str,
+    voice_id: str,
+    model_id: str,
+    offset: float = 0.0,
+    timestamps: bool = True,
+) -> tuple[bytes, list[WordTiming], float, str]:
+    """Synthesize one chunk and return (audio, word timings, duration, source).
+
+    With ``timestamps`` the provider's character alignment is used; otherwise
+    (or if the response carries no alignment) word timings are estimated locally.
+    """
+    if timestamps:
+        response = client.text_to_speech.convert_with_timestamps(
+            voice_id=voice_id,
+            text=text,
+            model_id=model_id,
+        )
+        return _timed_chunk(text, base64.b64decode(response.audio_base_64), response.alignment, offset)
+
+    audio = b"".join(client.text_to_speech.convert(
+        voice_id=voice_id,
+        text=text,
+        model_id=model_id
+    ))
+    return _timed_chunk(text, audio, None, offset)
+
+
+async def asynthesize_chunk(
+    client,
+    text: str,
+    voice_id: str,
+    model_id: str,
+    offset: float = 0.0,
+    timestamps: bool = True,
+) -> tuple[bytes, list[WordTiming], float, str]:
+    """``synthesize_chunk`` on an AsyncElevenLabs-shaped client."""
+    if timestamps:
+        response = await client.text_to_speech.convert_with_timestamps(
+            voice_id=voice_id,
+            text=text,
+            model_id=model_id,
+        )
+        return _timed_chunk(text, base64.b64decode(response.audio_base_64), response.alignment, offset)
+
+    stream = client.text_to_speech.convert(voice_id=voice_id, text=text, model_id=model_id)
+    audio = b"".join([part async for part in stream])
+    return _timed_chunk(text, audio, None, offset)
+
+
+def _timed_chunk(text: str, audio: bytes, alignment, offset: float) -> tuple[bytes, list[WordTiming], float, str]:
+    if alignment and alignment.characters:
+        words = words_from_alignment(
+            alignment.characters,
+            alignment.character_start_times_seconds,
+            alignment.character_end_times_seconds,
+            offset,
+        )
+        return audio, words, alignment.character_end_times_seconds[-1], "elevenlabs"
+
+    words, duration = estimate_word_timings(text, offset)
+    return audio, words, duration, "estimated"
+
+
+def split_into_chunks(script_text: str, max_chars: int) -> list[str]:
+    """Split text into chunks under max_chars on paragraph boundaries."""
+    if len(script_text) <= max_chars:
+        return [script_text]
+
+    chunks = []
+    paragraphs = script_text.split('\n\n')
+    current_chunk = ""
+
+    for para in paragraphs:
+        if len(current_chunk) + len(para) < max_chars:
+            current_chunk += para + "\n\n"
+        else:
+            if current_chunk:
+                chunks.append(current_chunk.strip())
+            current_chunk = para + "\n\n"
+
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+
+    return chunks
+
+
+def chunk_script(raw_script: str, max_chars: int) -> list[str]:
+    """Clean and chunk the script section by section, so chapter edits only touch their own chunks."""
+    preamble, sections = split_sections(raw_script)
+    chunks = []
+    for part in [preamble, *sections]:
+        cleaned = clean_script_for_tts(part)
+        if cleaned:
+            chunks.extend(split_into_chunks(cleaned, max_chars))
+    return chunks
+
+
 def generate_audio(
     script_text: str,
     voice_id: str,
@@ -51,82 +175,187 @@ def generate_audio(
     output_path: Path,
     model_id: str,
     simulate: bool = False,
-) -> None:
-    """Call ElevenLabs API to generate audio."""
+    timestamps: bool = True,
+    chunks: list[str] | None = None,
+    chunk_cache: AudioChunkCache | None = None,
+) -> dict:
+    """Call ElevenLabs API to generate audio.
+
+    Chunks found in ``chunk_cache`` are reused instead of re-synthesized.
+    Returns the word timings for the full narration as
+    ``{"words": [...], "duration_seconds": float, "source": str}``.
+    """
 
+    client = elevenlabs_client(api_key, simulate)
     if simulate:
-        client = FakeElevenLabsClient(api_key="fake")
         console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
-    else:
-        client = ElevenLabs(api_key=api_key)
 
     console.print("[bold blue]Calling ElevenLabs API...[/bold blue]")
     console.print(f"  Voice ID: {voice_id}")
     console.print(f"  Script length: {len(script_text)} characters")
     
-    # ElevenLabs has a character limit per request
-    # For long scripts, might need to chunk
-    MAX_CHARS = 5000
-    
-    if len(script_text) > MAX_CHARS:
-        console.print(f"[yellow]Script exceeds {MAX_CHARS} chars, generating in chunks...[/yellow]")
-        chunks = []
-        
-        # Split on paragraph boundaries
-        paragraphs = script_text.split('\n\n')
-        current_chunk = ""
-        
-        for para in paragraphs:
-            if len(current_chunk) + len(para) < MAX_CHARS:
-                current_chunk += para + "\n\n"
+    if chunks is None:
+        chunks = split_into_chunks(script_text, MAX_CHARS)
+    if len(chunks) > 1:
+        console.print(f"[yellow]Generating in {len(chunks)} chunks (max {MAX_CHARS} chars each)...[/yellow]")
+
+    audio_segments = []
+    words: list[WordTiming] = []
+    offset = 0.0
+    sources = set()
+    events = get_emitter()
+
+    with Progress(console=console) as progress:
+        task = progress.add_task("Generating audio...", total=len(chunks))
+
+        for i, chunk in enumerate(chunks):
+            key = chunk_cache.key(chunk, voice_id, model_id, timestamps) if chunk_cache else None
+            cached = chunk_cache.get(key) if chunk_cache else None
+            if cached:
+                audio, chunk_words, duration, source = cached
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = para + "\n\n"
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-        
-        console.print(f"  Chunks: {len(chunks)}")
-        
-        # Generate audio for each chunk
-        audio_segments = []
-        with Progress() as progress:
-            task = progress.add_task("Generating audio...", total=len(chunks))
-            
-            for i, chunk in enumerate(chunks):
                 try:
-                    audio = client.text_to_speech.convert(
-                        voice_id=voice_id,
-                        text=chunk,
-                        model_id=model_id
-                    )
-                    audio_segments.append(b"".join(audio))
+                    with events.api_call("elevenlabs", model=model_id, chunk=i, chars=len(chunk)):
+                        audio, chunk_words, duration, source = synthesize_chunk(
+                            client, chunk, voice_id, model_id, 0.0, timestamps
+                        )
                 except Exception as exc:  # noqa: BLE001
                     log.exception("ElevenLabs chunk generation failed")
                     raise click.ClickException(f"ElevenLabs API failed: {exc}") from exc
-                progress.update(task, advance=1)
-        
-        # Concatenate audio
-        full_audio = b"".join(audio_segments)
-        
-    else:
-        try:
-            audio = client.text_to_speech.convert(
-                voice_id=voice_id,
-                text=script_text,
-                model_id=model_id
-            )
-            full_audio = b"".join(audio)
-        except Exception as exc:  # noqa: BLE001
-            log.exception("ElevenLabs API call failed")
-            raise click.ClickException(f"ElevenLabs API failed: {exc}") from exc
-    
+                if chunk_cache:
+                    chunk_cache.put(key, audio, chunk_words, duration, source)
+            audio_segments.append(audio)
+            words.extend((start + offset, end + offset) for start, end in chunk_words)
+            offset += duration
+            sources.add(source)
+            progress.update(task, advance=1)
+            events.progress(i + 1, len(chunks), unit="chunk", cached=cached is not None)
+
     # Save audio
-    output_path.write_bytes(full_audio)
+    output_path.write_bytes(b"".join(audio_segments))
+    events.artifact(output_path)
+
+    return {
+        "words": words,
+        "duration_seconds": offset,
+        "source": sources.pop() if len(sources) == 1 else "mixed",
+    }
+
+
+async def agenerate_audio(
+    chunks: list[str],
+    voice_id: str,
+    api_key: str,
+    output_path: Path,
+    model_id: str,
+    simulate: bool = False,
+    timestamps: bool = True,
+    chunk_cache: AudioChunkCache | None = None,
+    concurrency: int = TTS_CONCURRENCY,
+) -> dict:
+    """Async ``generate_audio`` without console output, for event-loop drivers.
+
+    Uncached chunks are synthesized up to ``concurrency`` at a time (word
+    timings are chunk-relative, so order only matters when stitching).
+    Returns the same timing dict as ``generate_audio``.
+    """
+    client = async_elevenlabs_client(api_key, simulate)
+    log.info("Calling ElevenLabs API", extra={"chunks": len(chunks), "voice_id": voice_id})
+    results = await asynthesize_chunks(
+        client, chunks, voice_id, model_id, timestamps, chunk_cache, asyncio.Semaphore(max(1, concurrency)),
+    )
+    return write_narration(results, output_path)
+
+
+async def asynthesize_chunks(
+    client,
+    chunks: list[str],
+    voice_id: str,
+    model_id: str,
+    timestamps: bool = True,
+    chunk_cache: AudioChunkCache | None = None,
+    limit: asyncio.Semaphore | None = None,
+) -> list[tuple[bytes, list[WordTiming], float, str]]:
+    """Synthesize (or reuse from ``chunk_cache``) chunks concurrently, results in chunk order.
+
+    ``limit`` bounds in-flight requests; share one semaphore between callers
+    to cap the total against the provider.
+    """
+    events = get_emitter()
+    limit = limit or asyncio.Semaphore(1)
+    done = 0
+
+    async def synthesize(i: int, chunk: str) -> tuple[bytes, list[WordTiming], float, str]:
+        nonlocal done
+        key = chunk_cache.key(chunk, voice_id, model_id, timestamps) if chunk_cache else None
+        cached = chunk_cache.get(key) if chunk_cache else None
+        if cached:
+            result = cached
+        else:
+            try:
+                async with limit:
+                    with events.api_call("elevenlabs", model=model_id, chunk=i, chars=len(chunk)):
+                        result = await asynthesize_chunk(client, chunk, voice_id, model_id, 0.0, timestamps)
+            except Exception as exc:  # noqa: BLE001
+                log.exception("ElevenLabs chunk generation failed")
+                raise click.ClickException(f"ElevenLabs API failed: {exc}") from exc
+            if chunk_cache:
+                chunk_cache.put(key, *result)
+        done += 1
+        events.progress(done, len(chunks), unit="chunk", cached=cached is not None)
+        return result
+
+    return list(await asyncio.gather(*(synthesize(i, chunk) for i, chunk in enumerate(chunks))))
+
+
+def write_narration(results: list[tuple[bytes, list[WordTiming], float, str]], output_path: Path) -> dict:
+    """Stitch synthesized chunks into ``output_path`` and return the combined timing dict."""
+    words: list[WordTiming] = []
+    offset = 0.0
+    for _, chunk_words, duration, _ in results:
+        words.extend((start + offset, end + offset) for start, end in chunk_words)
+        offset += duration
+    sources = {source for *_, source in results}
+
+    output_path.write_bytes(b"".join(audio for audio, *_ in results))
+    get_emitter().artifact(output_path)
+
+    return {
+        "words": words,
+        "duration_seconds": offset,
+        "source": sources.pop() if len(sources) == 1 else "mixed",
+    }
+
+
+def write_timing_index(raw_script: str, timing: dict, output_path: Path) -> dict:
+    """Write the timing index (word timings plus B-roll cue positions) beside the narration."""
+    cues = find_broll_cues(raw_script, clean_script_for_tts)
+    index = build_timing_index(timing["words"], timing["duration_seconds"], cues, timing["source"])
+    index_path = timing_index_path(output_path)
+    index_path.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+    get_emitter().artifact(index_path)
+    return index
+
+
+def write_shotlist_timing(shotlist_path: Path, index: dict) -> int:
+    """Write cue-derived time ranges into an existing shotlist (JSON, or JSONL by appending re-timed scenes)."""
+    try:
+        shotlist = load_shotlist(shotlist_path)
+    except ValueError as exc:
+        raise click.ClickException(f"Invalid shotlist JSON at {shotlist_path}: {exc}") from exc
+
+    saved = copy.deepcopy(shotlist)
+    updated = apply_timing_to_shotlist(shotlist, index)
+    if updated:
+        write_shotlist(shotlist_path, shotlist, saved)
+        get_emitter().artifact(shotlist_path)
+    return updated
 
 
 @click.command()
+@step_events("audio", console)
+@manifest_step("audio")
+@profile_step("audio")
 @click.option(
     "--script", "-s",
     type=click.Path(exists=True, path_type=Path),
@@ -142,6 +371,18 @@ def generate_audio(
     type=str,
     help="ElevenLabs voice ID (overrides config)"
 )
+@click.option(
+    "--timestamps/--no-timestamps", default=True,
+    help="Request character timestamps (otherwise estimate word timings locally)"
+)
+@click.option(
+    "--sync-shotlist/--no-sync-shotlist", default=True,
+    help="Fill shotlist time ranges from B-roll cue timestamps"
+)
+@click.option(
+    "--chunk-cache/--no-chunk-cache", default=True,
+    help="Reuse unchanged narration chunks from audio/chunks/"
+)
 @click.option(
     "--dry-run", is_flag=True,
     help="Show cleaned script without calling API"
@@ -150,7 +391,16 @@ def generate_audio(
     "--simulate", is_flag=True,
     help="Use fake adapters instead of real API"
 )
-def main(script: Path | None, output: Path | None, voice_id: str | None, dry_run: bool, simulate: bool):
+def main(
+    script: Path | None,
+    output: Path | None,
+    voice_id: str | None,
+    timestamps: bool,
+    sync_shotlist: bool,
+    chunk_cache: bool,
+    dry_run: bool,
+    simulate: bool,
+):
     """Generate voiceover from script using ElevenLabs."""
     
     config = get_config()
@@ -159,11 +409,12 @@ def main(script: Path | None, output: Path | None, voice_id: str | None, dry_run
     output = output or config.voiceover_mp3
     voice_id = voice_id or config.elevenlabs_voice_id
     
-    if not config.elevenlabs_api_key and not dry_run and not simulate:
+    replaying = cassette_replaying()
+    if not config.elevenlabs_api_key and not dry_run and not simulate and not replaying:
         console.print("[red]Error: ELEVENLABS_API_KEY not set[/red]")
         raise click.Abort()
 
-    if not voice_id and not dry_run and not simulate:
+    if not voice_id and not dry_run and not simulate and not replaying:
         console.print("[red]Error: No voice ID specified[/red]")
         console.print("[yellow]Set ELEVENLABS_VOICE_ID or use --voice-id[/yellow]")
         raise click.Abort()
@@ -195,18 +446,38 @@ def main(script: Path | None, output: Path | None, voice_id: str | None, dry_run
     
     # Generate audio
     config.ensure_dirs()
-    generate_audio(
+    chunks_dir = config.audio_chunks_dir / "simulated" if simulate else config.audio_chunks_dir
+    cache = AudioChunkCache(chunks_dir) if chunk_cache else None
+    timing = generate_audio(
         cleaned_script,
         voice_id,
         config.elevenlabs_api_key,
         output,
         config.elevenlabs_model,
         simulate,
+        timestamps,
+        chunks=chunk_script(raw_script, MAX_CHARS),
+        chunk_cache=cache,
     )
+    clear_stale(config.stale_json, "chapters")
     
     file_size = output.stat().st_size / (1024 * 1024)  # MB
     console.print(f"\n[green]✓ Audio saved to: {output}[/green]")
     console.print(f"  File size: {file_size:.1f} MB")
+    if cache:
+        console.print(f"  Chunks reused: {cache.hits}, synthesized: {cache.misses}")
+
+    # Timing index: word timestamps plus the spoken position of every B-roll cue
+    index = write_timing_index(raw_script, timing, output)
+    console.print(f"[green]✓ Timing index saved to: {timing_index_path(output)}[/green]")
+    console.print(
+        f"  Duration: {index['duration_seconds']:.1f}s ({index['source']}), B-roll cues: {len(index['cues'])}"
+    )
+
+    shotlist_path = shotlist_source(config.shotlist_json)
+    if sync_shotlist and shotlist_path.exists():
+        updated = write_shotlist_timing(shotlist_path, index)
+        console.print(f"  Shotlist scenes timed: {updated}")
 
 
 if __name__ == "__main__":
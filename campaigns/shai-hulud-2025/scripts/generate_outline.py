@@ -5,19 +5,25 @@ Generate video outline from threat intelligence document using Gemini.
 Usage:
     python generate_outline.py
     python generate_outline.py --threat-doc custom.md --output custom-outline.json
+
+    outline = await agenerate_outline(threat_doc, prompt_template, api_key, model, 0.7, 0.9)
 """
 
 import json
 from pathlib import Path
 
 import click
-import google.generativeai as genai
 from rich.console import Console
 from rich.panel import Panel
 
+from clients import cassette_replaying, gemini_client, gemini_context_cache
 from config import get_config
+from context_cache import PromptLayout, agenerate_with_context, generate_with_context
+from events import get_emitter, step_events
+from intel_index import retrieve_intel
 from logging_utils import get_logger
-from simulation_adapters import FakeGeminiAdapter
+from manifest import manifest_step
+from profiling import profile_step
 
 console = Console()
 log = get_logger(__name__)
@@ -28,18 +34,9 @@ def load_prompt(prompt_path: Path) -> str:
     return prompt_path.read_text(encoding="utf-8")
 
 
-def load_threat_doc(doc_path: Path, notes_path: Path | None = None) -> str:
-    """Load threat document and optional notes."""
-    threat_doc = doc_path.read_text(encoding="utf-8")
-
-    notes = ""
-    if notes_path and notes_path.exists():
-        notes_content = notes_path.read_text(encoding="utf-8")
-        # Only include if there's actual content beyond template
-        if "### Wave 1 Notes" in notes_content and len(notes_content) > 200:
-            notes = f"\n\n## Additional Intel Notes\n{notes_content}"
-
-    return threat_doc + notes
+def load_threat_doc(doc_path: Path) -> str:
+    """Load the primary threat document."""
+    return doc_path.read_text(encoding="utf-8")
 
 
 def generate_outline(
@@ -50,68 +47,100 @@ def generate_outline(
     temperature: float,
     top_p: float,
     simulate: bool = False,
+    news_notes: str = "",
 ) -> dict:
-    """Call Gemini API to generate outline JSON."""
+    """Call Gemini API to generate outline JSON.
+
+    ``news_notes`` are intel passages retrieved from the rest of the corpus.
+    """
+    gemini = gemini_client(api_key, simulate)
     if simulate:
-        adapter = FakeGeminiAdapter()
-        adapter.configure(api_key="fake")
-        model_instance = adapter.GenerativeModel(model)
-        generation_config = adapter.GenerationConfig(
-            temperature=temperature,
-            top_p=top_p,
-            response_mime_type="application/json",
-        )
         console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
-    else:
-        genai.configure(api_key=api_key)
-        model_instance = genai.GenerativeModel(model)
-        generation_config = genai.GenerationConfig(
-            temperature=temperature,
-            top_p=top_p,
-            response_mime_type="application/json",
-        )
-
-    # Construct the full prompt
-    full_prompt = f"""{prompt_template}
+    generation_config = _generation_config(gemini, temperature, top_p)
+    layout = _outline_layout(threat_doc, prompt_template, news_notes)
 
----
+    log.info("Calling Gemini API for outline")
 
-## LONGFORM_THREAT_DOC:
+    try:
+        with get_emitter().api_call("gemini", model=model, prompt_chars=len(layout.render())):
+            response = generate_with_context(
+                gemini, model, layout, generation_config, gemini_context_cache(simulate),
+            )
+    except Exception as exc:  # noqa: BLE001
+        log.exception("Gemini API call failed")
+        raise click.ClickException(f"Gemini API call failed: {exc}") from exc
 
-{threat_doc}
+    # Parse the JSON response
+    try:
+        return _parse_outline(response.text)
+    except json.JSONDecodeError as exc:
+        console.print(f"[red]Failed to parse JSON response: {exc}[/red]")
+        console.print(f"Raw response:\n{response.text[:500]}...")
+        raise click.ClickException("Gemini response was not valid JSON") from exc
 
----
 
-Now generate the video outline JSON. Output ONLY valid JSON, no markdown code blocks.
-"""
+async def agenerate_outline(
+    threat_doc: str,
+    prompt_template: str,
+    api_key: str,
+    model: str,
+    temperature: float,
+    top_p: float,
+    simulate: bool = False,
+    news_notes: str = "",
+) -> dict:
+    """Async ``generate_outline`` without console output, for event-loop drivers."""
+    gemini = gemini_client(api_key, simulate)
+    generation_config = _generation_config(gemini, temperature, top_p)
+    layout = _outline_layout(threat_doc, prompt_template, news_notes)
 
-    log.info("Calling Gemini API for outline")
+    log.info("Calling Gemini API for outline", extra={"model": model})
 
     try:
-        response = model_instance.generate_content(
-            full_prompt,
-            generation_config=generation_config,
-        )
+        with get_emitter().api_call("gemini", model=model, prompt_chars=len(layout.render())):
+            response = await agenerate_with_context(
+                gemini, model, layout, generation_config, gemini_context_cache(simulate),
+            )
     except Exception as exc:  # noqa: BLE001
         log.exception("Gemini API call failed")
         raise click.ClickException(f"Gemini API call failed: {exc}") from exc
 
-    # Parse the JSON response
     try:
-        if simulate and "```" in response.text:
-            clean_text = response.text.replace("```json", "").replace("```", "").strip()
-            outline = json.loads(clean_text)
-        else:
-            outline = json.loads(response.text)
+        return _parse_outline(response.text)
     except json.JSONDecodeError as exc:
-        console.print(f"[red]Failed to parse JSON response: {exc}[/red]")
-        console.print(f"Raw response:\n{response.text[:500]}...")
+        log.error("Outline response was not valid JSON", extra={"error": str(exc), "raw": response.text[:500]})
         raise click.ClickException("Gemini response was not valid JSON") from exc
 
-    return outline
+
+def _generation_config(gemini, temperature: float, top_p: float):
+    return gemini.GenerationConfig(
+        temperature=temperature,
+        top_p=top_p,
+        response_mime_type="application/json",
+    )
+
+
+def _outline_layout(threat_doc: str, prompt_template: str, news_notes: str) -> PromptLayout:
+    # Stable context first (template, threat doc) so it can be served from cache
+    context = [(None, prompt_template), ("LONGFORM_THREAT_DOC", threat_doc)]
+    if news_notes:
+        context.append(("OPTIONAL_NEWS_NOTES", news_notes))
+    return PromptLayout(
+        context=context,
+        task="Now generate the video outline JSON. Output ONLY valid JSON, no markdown code blocks.\n",
+    )
+
+
+def _parse_outline(text: str) -> dict:
+    if "```" in text:  # simulated or replayed fenced JSON
+        text = text.replace("```json", "").replace("```", "").strip()
+    return json.loads(text)
 
 
 @click.command()
+@step_events("outline", console)
+@manifest_step("outline")
+@profile_step("outline")
 @click.option(
     "--threat-doc", "-t",
     type=click.Path(exists=True, path_type=Path),
@@ -146,7 +175,7 @@ def main(threat_doc: Path | None, output: Path | None, dry_run: bool, simulate:
             console.print(f"[red]Missing file: {path}[/red]")
         raise click.Abort()
 
-    if not config.gemini_api_key and not dry_run and not simulate:
+    if not config.gemini_api_key and not dry_run and not simulate and not cassette_replaying():
         console.print("[red]Error: GEMINI_API_KEY not set[/red]")
         raise click.Abort()
 
@@ -160,12 +189,15 @@ def main(threat_doc: Path | None, output: Path | None, dry_run: bool, simulate:
 
     # Load inputs
     prompt_template = load_prompt(config.prompt_outline)
-    threat_content = load_threat_doc(threat_doc, config.intel_notes)
+    threat_content = load_threat_doc(threat_doc)
+    # Top-k passages from notes, intel links and other docs instead of whole files
+    news_notes = retrieve_intel(config, prompt_template, exclude=[threat_doc])
 
     if dry_run:
         console.print("\n[yellow]DRY RUN - Prompt preview:[/yellow]")
         console.print(prompt_template[:500] + "...")
         console.print(f"\n[yellow]Threat doc length: {len(threat_content)} chars[/yellow]")
+        console.print(f"[yellow]Retrieved intel: {len(news_notes)} chars[/yellow]")
         return
 
     # Generate outline
@@ -178,10 +210,12 @@ def main(threat_doc: Path | None, output: Path | None, dry_run: bool, simulate:
         config.gemini_temperature,
         config.gemini_top_p,
         simulate,
+        news_notes,
     )
 
     # Save output
     output.write_text(json.dumps(outline, indent=2), encoding="utf-8")
+    get_emitter().artifact(output)
 
     console.print(f"\n[green]✓ Outline saved to: {output}[/green]")
     console.print(f"  Chapters: {len(outline.get('chapters', []))}")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Probe downloaded clips and build low-res proxies and contact sheets.
+
+Runs local ffmpeg/ffprobe jobs on a bounded pool. Results are cached by clip
+hash (MEDIA_CACHE_DIR), so re-runs and clips shared across campaigns are
+not reprocessed. Writes video/previews/index.json for the studio media library.
+
+Usage:
+    python generate_previews.py
+    python generate_previews.py --workers 2 --video-dir ./videos
+"""
+
+import shutil
+import time
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.panel import Panel
+from rich.progress import Progress
+
+from clients import media_tools
+from clip_previews import INDEX_NAME, PreviewCache, build_previews
+from config import get_config
+from events import get_emitter, step_events
+from logging_utils import get_logger
+from manifest import manifest_step
+from profiling import profile_step
+
+console = Console()
+log = get_logger(__name__)
+
+
+@click.command()
+@step_events("previews", console)
+@manifest_step("previews")
+@profile_step("previews")
+@click.option(
+    "--video-dir", "-v",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory of downloaded clips"
+)
+@click.option(
+    "--workers", "-w",
+    type=int, default=None,
+    help="Concurrent ffmpeg/ffprobe jobs (default: MEDIA_WORKERS)"
+)
+@click.option(
+    "--dry-run", is_flag=True,
+    help="List clips without running ffmpeg"
+)
+@click.option(
+    "--simulate", is_flag=True,
+    help="Use fake media tools instead of ffmpeg"
+)
+def main(video_dir: Path | None, workers: int | None, dry_run: bool, simulate: bool):
+    """Probe clips and build proxies and contact sheets for previewing."""
+
+    config = get_config()
+    video_dir = video_dir or config.video_dir
+    previews_dir = config.previews_dir if video_dir == config.video_dir else video_dir / "previews"
+    workers = max(1, workers or config.media_workers)
+
+    if not dry_run and not simulate:
+        missing = [tool for tool in ("ffmpeg", "ffprobe") if not shutil.which(tool)]
+        if missing:
+            console.print(f"[red]Error: {', '.join(missing)} not found on PATH[/red]")
+            raise click.Abort()
+
+    clips = sorted(video_dir.glob("*.mp4")) if video_dir.exists() else []
+
+    console.print(Panel.fit(
+        f"[bold]Generate Clip Previews[/bold]\n\n"
+        f"Clips: {video_dir} ({len(clips)})\n"
+        f"Output: {previews_dir}\n"
+        f"Workers: {workers}",
+        title="Shai-Hulud Pipeline"
+    ))
+
+    if not clips:
+        console.print("[yellow]No clips to preview. Run generate_sora_clips.py first[/yellow]")
+        return
+
+    if dry_run:
+        console.print("\n[yellow]DRY RUN - Clips:[/yellow]")
+        for clip in clips:
+            console.print(f"  {clip.name} ({clip.stat().st_size / (1024 * 1024):.1f} MB)")
+        return
+
+    if simulate:
+        console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
+    # Fake previews live in their own namespace so they never satisfy real runs
+    cache = PreviewCache(config.media_cache_dir / "simulated" if simulate else config.media_cache_dir)
+    tools = media_tools(simulate)
+
+    events = get_emitter()
+    counts = {"done": 0, "processed": 0, "cached": 0}
+    failed = []
+    started = time.monotonic()
+
+    with Progress(console=console) as progress:
+        task = progress.add_task("Building previews...", total=len(clips))
+
+        def on_done(clip: Path, record: dict | None, ran: bool):
+            counts["done"] += 1
+            if record is None:
+                failed.append(clip.name)
+            else:
+                counts["processed" if ran else "cached"] += 1
+            progress.update(task, advance=1)
+            events.progress(counts["done"], len(clips), unit="clip", clip=clip.name, ok=record is not None)
+
+        index = build_previews(clips, cache, tools, previews_dir, workers, on_done)
+
+    elapsed = time.monotonic() - started
+    log.info(
+        "Previews built",
+        extra={"clips": len(clips), "processed": counts["processed"], "cached": counts["cached"],
+               "failed": len(failed), "seconds": round(elapsed, 1)},
+    )
+    events.artifact(previews_dir / INDEX_NAME)
+
+    total = sum(record["duration_seconds"] for record in index["clips"].values())
+    console.print(f"\n[green]✓ Previews for {len(index['clips'])} clips ({total:.0f}s of b-roll)[/green]")
+    console.print(f"  Processed: {counts['processed']}, from cache: {counts['cached']}, {elapsed:.1f}s")
+    console.print(f"  Index: {previews_dir / INDEX_NAME}")
+    if failed:
+        console.print(f"[red]✗ Failed: {', '.join(failed)}[/red]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Assemble a rough-cut MP4 from the shotlist timing, clips and voiceover.
+
+Each scene's clip covers the narration from its cue to the next one. Clips
+that already match the cut's format are stream-copied, the rest are
+re-encoded, and the segments are joined with the ffmpeg concat demuxer.
+Segments are cached, so changing one scene only rewrites its segment.
+
+Usage:
+    python generate_rough_cut.py
+    python generate_rough_cut.py --workers 2 --force
+"""
+
+import json
+import shutil
+import time
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.panel import Panel
+
+from clients import media_tools
+from clip_previews import MediaToolError, PreviewCache
+from config import get_config
+from events import get_emitter, step_events
+from logging_utils import get_logger
+from manifest import manifest_step
+from profiling import profile_step
+from rough_cut import CUT_NAME, assemble, plan_segments
+from shotlist_stream import iter_scenes, shotlist_source
+from timing_index import timing_index_path
+from video_formats import longform_scenes
+
+console = Console()
+log = get_logger(__name__)
+
+
+@click.command()
+@step_events("assemble", console)
+@manifest_step("assemble")
+@profile_step("assemble")
+@click.option(
+    "--shotlist", "-s",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to shotlist JSON or JSONL"
+)
+@click.option(
+    "--workers", "-w",
+    type=int, default=None,
+    help="Concurrent ffmpeg jobs (default: MEDIA_WORKERS)"
+)
+@click.option(
+    "--force", is_flag=True,
+    help="Re-cut every segment"
+)
+@click.option(
+    "--dry-run", is_flag=True,
+    help="Show the segment plan without cutting"
+)
+@click.option(
+    "--simulate", is_flag=True,
+    help="Use fake media tools instead of ffmpeg"
+)
+def main(shotlist: Path | None, workers: int | None, force: bool, dry_run: bool, simulate: bool):
+    """Assemble a rough cut from clips and voiceover."""
+
+    config = get_config()
+    shotlist_path = shotlist or shotlist_source(config.shotlist_json)
+    index_path = timing_index_path(config.voiceover_mp3)
+    workers = max(1, workers or config.media_workers)
+
+    if not simulate:
+        missing = [tool for tool in ("ffmpeg", "ffprobe") if not shutil.which(tool)]
+        if missing:
+            console.print(f"[red]Error: {', '.join(missing)} not found on PATH[/red]")
+            raise click.Abort()
+
+    missing_files = config.require_files([shotlist_path, config.voiceover_mp3, index_path])
+    if missing_files:
+        for path in missing_files:
+            console.print(f"[red]Missing file: {path}[/red]")
+        console.print("[yellow]Run generate_shotlist.py, generate_audio.py and generate_sora_clips.py first[/yellow]")
+        raise click.Abort()
+
+    try:
+        scenes = longform_scenes(iter_scenes(shotlist_path))
+        audio_seconds = float(json.loads(index_path.read_text(encoding="utf-8"))["duration_seconds"])
+    except (ValueError, KeyError) as exc:
+        raise click.ClickException(f"Invalid shotlist or timing index: {exc}") from exc
+
+    console.print(Panel.fit(
+        f"[bold]Assemble Rough Cut[/bold]\n\n"
+        f"Shotlist: {shotlist_path}\n"
+        f"Voiceover: {config.voiceover_mp3} ({audio_seconds:.1f}s)\n"
+        f"Output: {config.rough_cut_dir / CUT_NAME}",
+        title="Shai-Hulud Pipeline"
+    ))
+
+    if simulate:
+        console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
+    # Fake probes live in their own namespace so they never satisfy real runs
+    cache = PreviewCache(config.media_cache_dir / "simulated" if simulate else config.media_cache_dir)
+    tools = media_tools(simulate)
+
+    started = time.monotonic()
+    try:
+        spec, segments = plan_segments(scenes, audio_seconds, config.video_dir, tools, cache, config.previews_dir)
+    except (MediaToolError, ValueError) as exc:
+        raise click.ClickException(f"Could not probe clips: {exc}") from exc
+
+    console.print(f"\nFormat: {spec.codec} {spec.width}x{spec.height} @ {spec.fps:g} fps, {len(segments)} segments")
+    if dry_run:
+        console.print("\n[yellow]DRY RUN - Segments:[/yellow]")
+        for segment in segments:
+            console.print(
+                f"  {segment.start_frame / spec.fps:7.2f}s  {segment.duration(spec):6.2f}s  "
+                f"{segment.mode:<6}  {segment.scene_id}"
+            )
+        return
+
+    try:
+        counts = assemble(spec, segments, config.voiceover_mp3, config.rough_cut_dir, tools, workers, force)
+    except MediaToolError as exc:
+        raise click.ClickException(f"Assembly failed: {exc}") from exc
+
+    elapsed = time.monotonic() - started
+    output = config.rough_cut_dir / CUT_NAME
+    log.info(
+        "Rough cut assembled",
+        extra={"segments": len(segments), "seconds": round(elapsed, 1), **counts},
+    )
+    get_emitter().artifact(output)
+
+    console.print(f"\n[green]✓ Rough cut: {output}[/green]")
+    console.print(
+        f"  Segments copied: {counts.get('copy', 0)}, re-encoded: {counts.get('encode', 0)}, "
+        f"slates: {counts.get('slate', 0)}, reused: {counts.get('reused', 0)}"
+    )
+    if not counts["muxed"]:
+        console.print("  Timeline unchanged; kept the existing cut")
+    console.print(f"  Done in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,24 +5,135 @@ Generate long-form video script from outline using Gemini.
 Usage:
     python generate_script.py
     python generate_script.py --outline custom-outline.json --output custom-script.md
+
+    script = await agenerate_script(outline, prompt_template, voice_style, 12, api_key, model, 0.7, 0.9)
 """
 
+import asyncio
 import json
 from pathlib import Path
+from typing import AsyncIterator
 
 import click
-import google.generativeai as genai
 from rich.console import Console
 from rich.panel import Panel
 
+from chapters import (
+    ChapterDiff,
+    build_chapter_state,
+    chapter_id,
+    chapter_state_path,
+    diff_outline,
+    generation_hash,
+    join_sections,
+    load_chapter_state,
+    mark_stale,
+    splice_section,
+    split_sections,
+    stale_scenes,
+)
+from clients import cassette_replaying, gemini_client, gemini_context_cache
 from config import get_config
+from context_cache import PromptLayout, agenerate_with_context, astream_with_context, generate_with_context
+from events import get_emitter, step_events
+from intel_index import retrieve_intel
 from logging_utils import get_logger
-from simulation_adapters import FakeGeminiAdapter
+from manifest import manifest_step
+from profiling import profile_step
+from shotlist_stream import load_shotlist, shotlist_source
 
 console = Console()
 log = get_logger(__name__)
 
 
+def _script_layout(prompt_template: str, voice_style: str, task: str) -> PromptLayout:
+    # Template and voice guide never change between runs; the outline does
+    return PromptLayout(context=[(None, prompt_template), ("VOICE_GUIDE", voice_style)], task=task)
+
+
+def _outline_task_header(outline_json: dict, target_minutes: int, intel: str = "") -> str:
+    supporting = f"## SUPPORTING_INTEL:\n\n{intel}\n\n" if intel else ""
+    return f"""## OUTLINE_JSON:
+
+```json
+{json.dumps(outline_json, indent=2)}
+```
+
+## TARGET_MINUTES: {target_minutes}
+
+{supporting}---
+
+"""
+
+
+def _call_gemini(gemini, model: str, layout: PromptLayout, generation_config, simulate: bool, **fields) -> str:
+    try:
+        with get_emitter().api_call("gemini", model=model, prompt_chars=len(layout.render()), **fields):
+            response = generate_with_context(
+                gemini, model, layout, generation_config, gemini_context_cache(simulate),
+            )
+    except Exception as exc:  # noqa: BLE001
+        log.exception("Gemini API call failed")
+        raise click.ClickException(f"Gemini API call failed: {exc}") from exc
+    return response.text
+
+
+async def _acall_gemini(gemini, model: str, layout: PromptLayout, generation_config, simulate: bool, **fields) -> str:
+    try:
+        with get_emitter().api_call("gemini", model=model, prompt_chars=len(layout.render()), **fields):
+            response = await agenerate_with_context(
+                gemini, model, layout, generation_config, gemini_context_cache(simulate),
+            )
+    except Exception as exc:  # noqa: BLE001
+        log.exception("Gemini API call failed")
+        raise click.ClickException(f"Gemini API call failed: {exc}") from exc
+    return response.text
+
+
+def _full_script_layout(
+    outline_json: dict, prompt_template: str, voice_style: str, target_minutes: int, intel: str,
+) -> PromptLayout:
+    return _script_layout(prompt_template, voice_style, _outline_task_header(outline_json, target_minutes, intel) + """\
+Now generate the full spoken script. Include [B-ROLL: ...] markers for visual cues.
+Give every OUTLINE_JSON chapter exactly one bracketed section header line, in outline order.
+Output in plain text/markdown format.
+""")
+
+
+def _chapter_layout(
+    outline_json: dict,
+    sections: list[str],
+    index: int,
+    prompt_template: str,
+    voice_style: str,
+    target_minutes: int,
+    intel: str,
+) -> PromptLayout:
+    chapters = outline_json.get("chapters", [])
+    before = sections[index - 1].strip() if index > 0 else "(start of video)"
+    after = sections[index + 1].strip() if index + 1 < len(sections) else "(end of video)"
+    return _script_layout(prompt_template, voice_style, _outline_task_header(outline_json, target_minutes, intel) + f"""\
+## CURRENT_SECTION:
+
+{sections[index].strip()}
+
+## PRECEDING_SECTION:
+
+{before}
+
+## FOLLOWING_SECTION:
+
+{after}
+
+---
+
+Chapter {index + 1} of {len(chapters)} ("{chapter_id(chapters[index], index)}") changed in OUTLINE_JSON.
+Rewrite ONLY that chapter's section so it matches the updated outline, keeping continuity with the
+preceding and following sections. Start with its bracketed section header line and include
+[B-ROLL: ...] markers for visual cues. Output only that section in plain text/markdown format.
+""")
+
+
 def generate_script(
     outline_json: dict,
     prompt_template: str,
@@ -33,63 +144,177 @@ def generate_script(
     temperature: float,
     top_p: float,
     simulate: bool = False,
+    intel: str = "",
 ) -> str:
-    """Call Gemini API to generate script from outline."""
+    """Call Gemini API to generate script from outline.
+
+    ``intel`` holds retrieved passages backing the outline's talking points.
+    """
+    gemini = gemini_client(api_key, simulate)
     if simulate:
-        adapter = FakeGeminiAdapter()
-        adapter.configure(api_key="fake")
-        model_instance = adapter.GenerativeModel(model)
-        generation_config = adapter.GenerationConfig(
-            temperature=temperature,
-            top_p=top_p,
-            max_output_tokens=8000,
-        )
         console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
-    else:
-        genai.configure(api_key=api_key)
-        model_instance = genai.GenerativeModel(model)
-        generation_config = genai.GenerationConfig(
-            temperature=temperature,
-            top_p=top_p,
-            max_output_tokens=8000,
-        )
-
-    full_prompt = f"""{prompt_template}
-
----
-
-## OUTLINE_JSON:
-
-```json
-{json.dumps(outline_json, indent=2)}
-```
+    generation_config = gemini.GenerationConfig(
+        temperature=temperature,
+        top_p=top_p,
+        max_output_tokens=8000,
+    )
 
-## TARGET_MINUTES: {target_minutes}
+    layout = _full_script_layout(outline_json, prompt_template, voice_style, target_minutes, intel)
 
-## VOICE_GUIDE:
-{voice_style}
+    log.info("Calling Gemini API for script", extra={"model": model})
+    return _call_gemini(gemini, model, layout, generation_config, simulate)
 
----
 
-Now generate the full spoken script. Include [B-ROLL: ...] markers for visual cues.
-Output in plain text/markdown format.
-"""
+async def agenerate_script(
+    outline_json: dict,
+    prompt_template: str,
+    voice_style: str,
+    target_minutes: int,
+    api_key: str,
+    model: str,
+    temperature: float,
+    top_p: float,
+    simulate: bool = False,
+    intel: str = "",
+) -> str:
+    """Async ``generate_script`` without console output, for event-loop drivers."""
+    gemini = gemini_client(api_key, simulate)
+    generation_config = gemini.GenerationConfig(temperature=temperature, top_p=top_p, max_output_tokens=8000)
+    layout = _full_script_layout(outline_json, prompt_template, voice_style, target_minutes, intel)
 
     log.info("Calling Gemini API for script", extra={"model": model})
+    return await _acall_gemini(gemini, model, layout, generation_config, simulate)
 
+
+async def astream_script(
+    outline_json: dict,
+    prompt_template: str,
+    voice_style: str,
+    target_minutes: int,
+    api_key: str,
+    model: str,
+    temperature: float,
+    top_p: float,
+    simulate: bool = False,
+    intel: str = "",
+) -> AsyncIterator[str]:
+    """``agenerate_script`` as a stream of finished parts.
+
+    Yields the preamble first, then each bracketed section as soon as the
+    next section header arrives (the last one when the reply ends), so
+    downstream stages can start on early chapters while later ones are
+    still being written. The parts concatenate to the full script.
+    """
+    gemini = gemini_client(api_key, simulate)
+    generation_config = gemini.GenerationConfig(temperature=temperature, top_p=top_p, max_output_tokens=8000)
+    layout = _full_script_layout(outline_json, prompt_template, voice_style, target_minutes, intel)
+
+    log.info("Streaming script from Gemini", extra={"model": model})
+    text = ""
+    emitted = 0
     try:
-        response = model_instance.generate_content(
-            full_prompt,
-            generation_config=generation_config,
-        )
+        with get_emitter().api_call("gemini", model=model, prompt_chars=len(layout.render()), stream=True):
+            async for piece in astream_with_context(
+                gemini, model, layout, generation_config, gemini_context_cache(simulate),
+            ):
+                text += piece
+                preamble, sections = split_sections(text)
+                finished = [preamble, *sections[:-1]] if sections else []
+                for part in finished[emitted:]:
+                    yield part
+                emitted = max(emitted, len(finished))
     except Exception as exc:  # noqa: BLE001
         log.exception("Gemini API call failed")
         raise click.ClickException(f"Gemini API call failed: {exc}") from exc
 
-    return response.text
+    preamble, sections = split_sections(text)
+    for part in [preamble, *sections][emitted:]:
+        yield part
+
+
+def regenerate_chapters(
+    outline_json: dict,
+    sections: list[str],
+    changed: list[int],
+    prompt_template: str,
+    voice_style: str,
+    target_minutes: int,
+    api_key: str,
+    model: str,
+    temperature: float,
+    top_p: float,
+    simulate: bool = False,
+    intel: str = "",
+) -> list[str]:
+    """Rewrite only the script sections of changed chapters; return all sections."""
+    gemini = gemini_client(api_key, simulate)
+    if simulate:
+        console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
+    generation_config = gemini.GenerationConfig(
+        temperature=temperature,
+        top_p=top_p,
+        max_output_tokens=2000,
+    )
+
+    chapters = outline_json.get("chapters", [])
+    updated = list(sections)
+    events = get_emitter()
+    for done, index in enumerate(changed, start=1):
+        chapter = chapter_id(chapters[index], index)
+        layout = _chapter_layout(outline_json, sections, index, prompt_template, voice_style, target_minutes, intel)
+        log.info("Regenerating script chapter", extra={"model": model, "chapter": chapter})
+        text = _call_gemini(gemini, model, layout, generation_config, simulate, chapter=chapter)
+        updated[index] = splice_section(sections[index], text)
+        events.progress(done, len(changed), unit="chapter")
+
+    return updated
+
+
+async def aregenerate_chapters(
+    outline_json: dict,
+    sections: list[str],
+    changed: list[int],
+    prompt_template: str,
+    voice_style: str,
+    target_minutes: int,
+    api_key: str,
+    model: str,
+    temperature: float,
+    top_p: float,
+    simulate: bool = False,
+    intel: str = "",
+) -> list[str]:
+    """Async ``regenerate_chapters``: changed chapters are rewritten concurrently.
+
+    Each rewrite only sees the previous script's neighbouring sections, so
+    chapters don't depend on each other and can be requested at once.
+    """
+    gemini = gemini_client(api_key, simulate)
+    generation_config = gemini.GenerationConfig(temperature=temperature, top_p=top_p, max_output_tokens=2000)
+    chapters = outline_json.get("chapters", [])
+    events = get_emitter()
+    done = 0
+
+    async def rewrite(index: int) -> str:
+        nonlocal done
+        chapter = chapter_id(chapters[index], index)
+        layout = _chapter_layout(outline_json, sections, index, prompt_template, voice_style, target_minutes, intel)
+        log.info("Regenerating script chapter", extra={"model": model, "chapter": chapter})
+        text = await _acall_gemini(gemini, model, layout, generation_config, simulate, chapter=chapter)
+        done += 1
+        events.progress(done, len(changed), unit="chapter")
+        return splice_section(sections[index], text)
+
+    updated = list(sections)
+    for index, section in zip(changed, await asyncio.gather(*(rewrite(index) for index in changed))):
+        updated[index] = section
+    return updated
 
 
 @click.command()
+@step_events("script", console)
+@manifest_step("script")
+@profile_step("script")
 @click.option(
     "--outline", "-i",
     type=click.Path(exists=True, path_type=Path),
@@ -105,6 +330,10 @@ Output in plain text/markdown format.
     type=int, default=12,
     help="Target video length in minutes"
 )
+@click.option(
+    "--full", is_flag=True,
+    help="Regenerate the whole script even if only some chapters changed"
+)
 @click.option(
     "--dry-run", is_flag=True,
     help="Print prompt without calling API"
@@ -113,7 +342,7 @@ Output in plain text/markdown format.
     "--simulate", is_flag=True,
     help="Use fake adapters instead of real API"
 )
-def main(outline: Path | None, output: Path | None, minutes: int, dry_run: bool, simulate: bool):
+def main(outline: Path | None, output: Path | None, minutes: int, full: bool, dry_run: bool, simulate: bool):
     """Generate video script from outline."""
 
     config = get_config()
@@ -121,7 +350,7 @@ def main(outline: Path | None, output: Path | None, minutes: int, dry_run: bool,
     outline_path = outline or config.outline_json
     output = output or config.script_longform
 
-    if not config.gemini_api_key and not dry_run and not simulate:
+    if not config.gemini_api_key and not dry_run and not simulate and not cassette_replaying():
         console.print("[red]Error: GEMINI_API_KEY not set[/red]")
         raise click.Abort()
 
@@ -150,28 +379,97 @@ def main(outline: Path | None, output: Path | None, minutes: int, dry_run: bool,
     prompt_template = config.prompt_script.read_text(encoding="utf-8")
     voice_style = config.prompt_voice_style.read_text(encoding="utf-8")
 
+    # Diff outline chapters (and prompt/settings) against the ones the current script was written from
+    generation = generation_hash(
+        prompt_template, voice_style, config.gemini_model, config.gemini_temperature, config.gemini_top_p,
+    )
+    state_path = chapter_state_path(output)
+    previous_script = output.read_text(encoding="utf-8") if output.exists() else ""
+    preamble, sections = split_sections(previous_script)
+    if full:
+        diff = ChapterDiff(full=True, reason="--full")
+    else:
+        diff = diff_outline(load_chapter_state(state_path), outline_json, minutes, len(sections), generation)
+    chapters = outline_json.get("chapters", [])
+
     if dry_run:
         console.print("\n[yellow]DRY RUN - Outline preview:[/yellow]")
-        console.print(f"Chapters: {len(outline_json.get('chapters', []))}")
+        console.print(f"Chapters: {len(chapters)}")
+        if diff.full:
+            console.print(f"Would regenerate the full script ({diff.reason})")
+        else:
+            console.print(f"Would regenerate chapters: {[chapter_id(chapters[i], i) for i in diff.changed] or 'none'}")
         console.print(f"Model: {config.gemini_model}, temp: {config.gemini_temperature}, top_p: {config.gemini_top_p}")
         return
 
+    if not diff.full and not diff.changed:
+        console.print("\n[green]✓ Script is up to date: no outline chapters changed[/green]")
+        console.print("  Use --full to regenerate it anyway")
+        return
+
     # Generate script
     config.ensure_dirs()
-    script = generate_script(
-        outline_json,
-        prompt_template,
-        voice_style,
-        minutes,
-        config.gemini_api_key,
-        config.gemini_model,
-        config.gemini_temperature,
-        config.gemini_top_p,
-        simulate,
-    )
+    # Supporting intel for the chapters being written, not the whole corpus
+    query_chapters = chapters if diff.full else [chapters[i] for i in diff.changed]
+    intel = retrieve_intel(config, json.dumps(query_chapters))
+
+    if diff.full:
+        console.print(f"[cyan]Generating full script ({diff.reason})[/cyan]")
+        script = generate_script(
+            outline_json,
+            prompt_template,
+            voice_style,
+            minutes,
+            config.gemini_api_key,
+            config.gemini_model,
+            config.gemini_temperature,
+            config.gemini_top_p,
+            simulate,
+            intel,
+        )
+        changed = list(range(len(chapters)))
+    else:
+        changed = diff.changed
+        console.print(f"[cyan]Regenerating {len(changed)} of {len(chapters)} chapters[/cyan]")
+        updated = regenerate_chapters(
+            outline_json,
+            sections,
+            changed,
+            prompt_template,
+            voice_style,
+            minutes,
+            config.gemini_api_key,
+            config.gemini_model,
+            config.gemini_temperature,
+            config.gemini_top_p,
+            simulate,
+            intel,
+        )
+        script = join_sections(preamble, updated)
+
+    # Mark downstream work touched by the changed chapters
+    shotlist = None
+    shotlist_path = shotlist_source(config.shotlist_json)
+    if shotlist_path.exists():
+        try:
+            shotlist = load_shotlist(shotlist_path)
+        except ValueError:
+            shotlist = None
+    if diff.full:
+        stale_ids = [str(scene.get("id")) for scene in (shotlist or {}).get("scenes", [])]
+    else:
+        _, stale_ids = stale_scenes(previous_script, changed, shotlist)
+    stale_chapters = [chapter_id(chapters[i], i) for i in changed]
 
     # Save output
     output.write_text(script, encoding="utf-8")
+    get_emitter().artifact(output)
+    state = build_chapter_state(outline_json, minutes, generation)
+    state_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    mark_stale(config.stale_json, stale_chapters, stale_ids)
+
+    if len(split_sections(script)[1]) != len(chapters):
+        log.warning("Script sections do not match outline chapters; next edit will regenerate fully")
 
     # Stats
     word_count = len(script.split())
@@ -182,6 +480,7 @@ def main(outline: Path | None, output: Path | None, minutes: int, dry_run: bool,
     console.print(f"  Word count: {word_count}")
     console.print(f"  Estimated duration: {estimated_minutes:.1f} minutes")
     console.print(f"  B-roll markers: {broll_count}")
+    console.print(f"  Chapters regenerated: {len(stale_chapters)}, stale shotlist scenes: {len(stale_ids)}")
 
 
 if __name__ == "__main__":
@@ -5,22 +5,34 @@ Generate YouTube Shorts scripts from long-form script.
 Usage:
     python generate_shorts.py
     python generate_shorts.py --script custom-script.md --output shorts.md
+
+    shorts = await agenerate_shorts(script_text, prompt_template, api_key, model, 0.7, 0.9)
+    items = parse_shorts(shorts)
 """
 
+import re
 from pathlib import Path
 
 import click
-import google.generativeai as genai
 from rich.console import Console
 from rich.panel import Panel
 
+from clients import cassette_replaying, gemini_client, gemini_context_cache
 from config import get_config
+from context_cache import PromptLayout, agenerate_with_context, generate_with_context
+from events import get_emitter, step_events
 from logging_utils import get_logger
-from simulation_adapters import FakeGeminiAdapter
+from manifest import manifest_step
+from profiling import profile_step
 
 console = Console()
 log = get_logger(__name__)
 
+# "--- SHORT #1: TITLE ---" as the prompt asks, or a markdown heading like "# Short 1"
+SHORT_HEADER = re.compile(
+    r"^[ \t]*(?:-{2,}[ \t]*)?#*[ \t]*SHORT[ \t]*#?[ \t]*(\d+)\b[ \t:.\-–—]*(.*?)[ \t\-]*$", re.IGNORECASE | re.MULTILINE,
+)
+
 
 def generate_shorts(
     script_text: str,
@@ -32,45 +44,51 @@ def generate_shorts(
     simulate: bool = False,
 ) -> str:
     """Call Gemini API to generate Shorts scripts."""
+    gemini = gemini_client(api_key, simulate)
     if simulate:
-        adapter = FakeGeminiAdapter()
-        adapter.configure(api_key="fake")
-        model_instance = adapter.GenerativeModel(model)
-        generation_config = adapter.GenerationConfig(
-            temperature=temperature,
-            top_p=top_p,
-            max_output_tokens=4000,
-        )
         console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
-    else:
-        genai.configure(api_key=api_key)
-        model_instance = genai.GenerativeModel(model)
-        generation_config = genai.GenerationConfig(
-            temperature=temperature,
-            top_p=top_p,
-            max_output_tokens=4000,
-        )
-
-    full_prompt = f"""{prompt_template}
+    generation_config = gemini.GenerationConfig(
+        temperature=temperature,
+        top_p=top_p,
+        max_output_tokens=4000,
+    )
+    layout = _shorts_layout(script_text, prompt_template)
 
----
+    log.info("Calling Gemini API for shorts", extra={"model": model})
 
-## FULL_SCRIPT_TEXT:
+    try:
+        with get_emitter().api_call("gemini", model=model, prompt_chars=len(layout.render())):
+            response = generate_with_context(
+                gemini, model, layout, generation_config, gemini_context_cache(simulate),
+            )
+    except Exception as exc:  # noqa: BLE001
+        log.exception("Gemini API call failed")
+        raise click.ClickException(f"Gemini API call failed: {exc}") from exc
 
-{script_text}
+    return response.text
 
----
 
-Now generate 3-5 YouTube Shorts scripts. Each should be 45-60 seconds when read aloud.
-"""
+async def agenerate_shorts(
+    script_text: str,
+    prompt_template: str,
+    api_key: str,
+    model: str,
+    temperature: float,
+    top_p: float,
+    simulate: bool = False,
+) -> str:
+    """Async ``generate_shorts`` without console output, for event-loop drivers."""
+    gemini = gemini_client(api_key, simulate)
+    generation_config = gemini.GenerationConfig(temperature=temperature, top_p=top_p, max_output_tokens=4000)
+    layout = _shorts_layout(script_text, prompt_template)
 
     log.info("Calling Gemini API for shorts", extra={"model": model})
 
     try:
-        response = model_instance.generate_content(
-            full_prompt,
-            generation_config=generation_config,
-        )
+        with get_emitter().api_call("gemini", model=model, prompt_chars=len(layout.render())):
+            response = await agenerate_with_context(
+                gemini, model, layout, generation_config, gemini_context_cache(simulate),
+            )
     except Exception as exc:  # noqa: BLE001
         log.exception("Gemini API call failed")
         raise click.ClickException(f"Gemini API call failed: {exc}") from exc
@@ -78,7 +96,43 @@ Now generate 3-5 YouTube Shorts scripts. Each should be 45-60 seconds when read
     return response.text
 
 
+def parse_shorts(text: str) -> list[dict]:
+    """Split the shorts markdown into items ``{"id", "title", "text"}``.
+
+    Ids follow document order (``short_1``, ``short_2``, ...), matching the
+    ``used_by`` names the shotlist gives scenes.
+    """
+    headers = list(SHORT_HEADER.finditer(text))
+    shorts = []
+    for position, header in enumerate(headers, start=1):
+        end = headers[position].start() if position < len(headers) else len(text)
+        body = text[header.end():end].strip()
+        if body:
+            shorts.append({
+                "id": f"short_{position}",
+                "title": header.group(2).strip() or f"Short {header.group(1)}",
+                "text": body,
+            })
+    return shorts
+
+
+def _shorts_layout(script_text: str, prompt_template: str) -> PromptLayout:
+    # The script leads so shorts and shotlist share one cached prefix
+    return PromptLayout(
+        context=[("FULL_SCRIPT_TEXT", script_text)],
+        task=f"""{prompt_template}
+
+---
+
+Now generate 3-5 YouTube Shorts scripts from the FULL_SCRIPT_TEXT above. Each should be 45-60 seconds when read aloud.
+""",
+    )
+
+
 @click.command()
+@step_events("shorts", console)
+@manifest_step("shorts")
+@profile_step("shorts")
 @click.option(
     "--script", "-s",
     type=click.Path(exists=True, path_type=Path),
@@ -105,7 +159,7 @@ def main(script: Path | None, output: Path | None, dry_run: bool, simulate: bool
     script_path = script or config.script_longform
     output = output or config.shorts_scripts
 
-    if not config.gemini_api_key and not dry_run and not simulate:
+    if not config.gemini_api_key and not dry_run and not simulate and not cassette_replaying():
         console.print("[red]Error: GEMINI_API_KEY not set[/red]")
         raise click.Abort()
 
@@ -144,12 +198,15 @@ def main(script: Path | None, output: Path | None, dry_run: bool, simulate: bool
     )
 
     output.write_text(shorts, encoding="utf-8")
+    get_emitter().artifact(output)
 
-    # Count shorts
-    short_count = shorts.count("SHORT #") or shorts.count("--- SHORT")
-
+    items = parse_shorts(shorts)
     console.print(f"\n[green]✓ Shorts scripts saved to: {output}[/green]")
-    console.print(f"  Shorts generated: ~{max(short_count, 3)}")
+    console.print(f"  Shorts generated: {len(items)}")
+    for item in items:
+        console.print(f"  - {item['id']}: {item['title']}")
+    if not items:
+        console.print("[yellow]No SHORT headers found; generate_shorts_media.py will have nothing to produce[/yellow]")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Produce every short's voiceover and b-roll clips concurrently.
+
+Each short parsed from shorts-scripts.md gets its own folder under
+``shorts/<short_id>/`` with the narration script, a voiceover, its timing
+index and ``short.json`` (the scenes laid over the voiceover, in order).
+Shorts are produced at the same time, and within a short the voiceover and
+the clips are produced at the same time, so the step takes about as long as
+the slowest short.
+
+Caches are shared with the long-form steps. Voiceover chunks go through the
+same chunk cache as ``generate_audio``. Clips come from the shotlist's
+``used_by`` scene lists and, as in ``generate_sora_clips``, are reused only
+through the clip store by render key: a clip left in ``video/9x16/`` from an
+older prompt or model is rendered again. A scene shared by several shorts is
+rendered once.
+
+Usage:
+    python generate_shorts_media.py
+    python generate_shorts_media.py --short short_2 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.panel import Panel
+
+from audio_chunks import AudioChunkCache
+from clients import async_elevenlabs_client, async_openai_client, cassette_replaying
+from clip_store import ClipStore
+from config import Config, get_config
+from events import get_emitter, step_events
+from generate_audio import (
+    MAX_CHARS,
+    TTS_CONCURRENCY,
+    asynthesize_chunks,
+    clean_script_for_tts,
+    split_into_chunks,
+    write_narration,
+)
+from generate_shorts import parse_shorts
+from generate_sora_clips import RATE_LIMIT_SECONDS, agenerate_sora_clip, link_stored_clip, scene_store_key
+from logging_utils import get_logger
+from manifest import manifest_step
+from profiling import profile_step
+from render_scheduler import RateLimiter, RenderHistory
+from shotlist_stream import iter_scenes, read_meta, shotlist_source
+from timing_index import build_timing_index, timing_index_path
+from video_formats import LONGFORM, consumers, format_dir, render_variants, shorts_scenes
+
+console = Console()
+log = get_logger(__name__)
+
+# "[0:00–0:05] Hook:" beat labels from the shorts prompt's format
+BEAT_LABEL = re.compile(r"^\s*\[\d+:\d+\s*[–-]\s*\d+:\d+\]\s*(?:[\w ]{1,30}:)?\s*", re.MULTILINE)
+
+
+def clean_short_for_tts(text: str) -> str:
+    """Narration for one short: beat labels and script markup removed."""
+    return clean_script_for_tts(BEAT_LABEL.sub("", text))
+
+
+def lay_out_scenes(scene_ids: list[str], clips: dict[str, str | None], duration: float) -> list[dict]:
+    """Spread a short's clips evenly over its voiceover, in shotlist order."""
+    ready = [scene_id for scene_id in scene_ids if clips.get(scene_id)]
+    if not ready:
+        return []
+    span = duration / len(ready)
+    return [
+        {
+            "id": scene_id,
+            "clip": clips[scene_id],
+            "start_seconds": round(position * span, 3),
+            "end_seconds": round((position + 1) * span, 3),
+        }
+        for position, scene_id in enumerate(ready)
+    ]
+
+
+class ShortsProducer:
+    """Voiceovers and clips for a set of shorts under shared TTS and Sora budgets."""
+
+    def __init__(self, config: Config, shotlist: dict, simulate: bool, concurrency: int, clip_store: bool = True):
+        self.config = config
+        self.simulate = simulate
+        self.events = get_emitter()
+
+        planned = shotlist.get("formats", {})
+        self.longform_ratio = planned.get("longform", config.video_aspect_ratio)
+        self.shorts_ratio = planned.get("shorts", config.shorts_aspect_ratio)
+        self.scenes = {str(scene.get("id")): scene for scene in shotlist.get("scenes", [])}
+        self.scene_lists = shorts_scenes(shotlist.get("scenes", []))
+
+        self.tts = async_elevenlabs_client(config.elevenlabs_api_key, simulate)
+        self.tts_limit = asyncio.Semaphore(TTS_CONCURRENCY)
+        self.chunk_cache = AudioChunkCache(config.audio_chunks_dir / "simulated" if simulate else config.audio_chunks_dir)
+
+        self.sora = async_openai_client(config.openai_api_key, simulate)
+        self.sora_limit = asyncio.Semaphore(concurrency)
+        self.pacer = RateLimiter(0.1 if simulate else RATE_LIMIT_SECONDS)
+        # Same namespaces as generate_sora_clips: fake renders never reach real history or store
+        self.history = RenderHistory() if simulate else RenderHistory.load(config.render_history_json)
+        self.store = None
+        if clip_store:
+            self.store = ClipStore(config.clip_store_dir / "simulated" if simulate else config.clip_store_dir)
+
+        self.clip_tasks: dict[str, asyncio.Task] = {}
+        self.rendered = 0
+        self.reused = 0
+
+    async def run(self, shorts: list[dict]) -> list[dict]:
+        results = await asyncio.gather(*(self.produce(short) for short in shorts))
+        self.history.save()
+        if self.store:
+            self.store.record_run()
+        return list(results)
+
+    async def produce(self, short: dict) -> dict:
+        """One short: voiceover and clips side by side, then its ``short.json``."""
+        started = time.monotonic()
+        short_dir = self.config.shorts_dir / short["id"]
+        short_dir.mkdir(parents=True, exist_ok=True)
+        scene_ids = self.scene_lists.get(short["id"], [])
+
+        timing, clips = await asyncio.gather(
+            self.narrate(short, short_dir),
+            asyncio.gather(*(self.clip(scene_id) for scene_id in scene_ids)),
+        )
+        clip_paths = {scene_id: clip and self._campaign_path(clip) for scene_id, clip in zip(scene_ids, clips)}
+        summary = {
+            "id": short["id"],
+            "title": short["title"],
+            "aspect_ratio": self.shorts_ratio,
+            "voiceover": self._campaign_path(short_dir / "voiceover.mp3"),
+            "duration_seconds": round(timing["duration_seconds"], 3),
+            "scenes": lay_out_scenes(scene_ids, clip_paths, timing["duration_seconds"]),
+            "missing_scenes": [scene_id for scene_id in scene_ids if not clip_paths[scene_id]],
+        }
+        summary_path = short_dir / "short.json"
+        summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        self.events.artifact(summary_path)
+        log.info(
+            "Short produced",
+            extra={"short": short["id"], "scenes": len(summary["scenes"]), "seconds": round(time.monotonic() - started, 2)},
+        )
+        return summary
+
+    def _campaign_path(self, path: Path) -> str:
+        """Campaign-relative path where possible, as in the manifest."""
+        try:
+            return path.relative_to(self.config.campaign_root).as_posix()
+        except ValueError:
+            return str(path)
+
+    async def narrate(self, short: dict, short_dir: Path) -> dict:
+        script_path = short_dir / "script.md"
+        script_path.write_text(f"# {short['title']}\n\n{short['text']}\n", encoding="utf-8")
+        narration = clean_short_for_tts(short["text"])
+        results = await asynthesize_chunks(
+            self.tts, split_into_chunks(narration, MAX_CHARS) if narration else [],
+            self.config.elevenlabs_voice_id, self.config.elevenlabs_model, True, self.chunk_cache, self.tts_limit,
+        )
+        voiceover = short_dir / "voiceover.mp3"
+        timing = write_narration(results, voiceover)
+        index_path = timing_index_path(voiceover)
+        index = build_timing_index(timing["words"], timing["duration_seconds"], [], timing["source"])
+        index_path.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+        self.events.artifact(index_path)
+        return timing
+
+    def clip(self, scene_id: str) -> asyncio.Task:
+        """The shorts-format clip for a scene; every short that uses it awaits the same task."""
+        if scene_id not in self.clip_tasks:
+            self.clip_tasks[scene_id] = asyncio.create_task(self._clip(scene_id))
+        return self.clip_tasks[scene_id]
+
+    async def _clip(self, scene_id: str) -> Path | None:
+        scene = self.scenes.get(scene_id)
+        if scene is None:
+            log.warning("Short uses a scene missing from the shotlist", extra={"scene": scene_id})
+            return None
+        # The scene's shorts-format job, exactly as generate_sora_clips would render it
+        variant = render_variants([{**scene, "used_by": ["short"]}], self.longform_ratio, self.shorts_ratio)[0]
+        output_dir = format_dir(self.config.video_dir, self.shorts_ratio, self.longform_ratio)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        # Reuse the stored render for this exact request, never whatever clip is on disk
+        output = output_dir / f"{scene_id}.mp4"
+        key = scene_store_key(variant, self.config.sora_model, self.config.video_resolution)
+        if self.store and self.store.lookup(key):
+            if await asyncio.to_thread(link_stored_clip, self.store, key, output, scene_id):
+                self.reused += 1
+                return output
+
+        await self.pacer.await_turn()  # rate limiting, as in generate_sora_clips
+        async with self.sora_limit:
+            clip = await agenerate_sora_clip(
+                self.sora, variant, output_dir, self.config.video_resolution, self.config.sora_model,
+                self.simulate, self.store, self.history,
+            )
+        self.rendered += 1
+        return clip
+
+
+@click.command()
+@step_events("shorts-media", console)
+@manifest_step("shorts-media")
+@profile_step("shorts-media")
+@click.option(
+    "--shorts", "-s", "shorts_path",
+    type=click.Path(exists=True, path_type=Path),
+    help="Path to Shorts scripts"
+)
+@click.option(
+    "--short", "-n", "only",
+    type=str, multiple=True,
+    help="Produce only specific short(s) by ID, e.g. short_2"
+)
+@click.option(
+    "--concurrency", "-c",
+    type=int, default=None,
+    help="Concurrent render jobs across all shorts (default: SORA_CONCURRENCY)"
+)
+@click.option(
+    "--clip-store/--no-clip-store", default=True,
+    help="Reuse identical renders from the shared clip store"
+)
+@click.option(
+    "--dry-run", is_flag=True,
+    help="Show each short's scenes without calling APIs"
+)
+@click.option(
+    "--simulate", is_flag=True,
+    help="Use fake adapters instead of real API"
+)
+def main(
+    shorts_path: Path | None,
+    only: tuple,
+    concurrency: int | None,
+    clip_store: bool,
+    dry_run: bool,
+    simulate: bool,
+):
+    """Produce voiceovers and clips for every short."""
+
+    config = get_config()
+    shorts_path = shorts_path or config.shorts_scripts
+    concurrency = max(1, concurrency or config.sora_concurrency)
+
+    if not dry_run and not simulate and not cassette_replaying():
+        missing = [
+            name for name, value in (
+                ("ELEVENLABS_API_KEY", config.elevenlabs_api_key),
+                ("ELEVENLABS_VOICE_ID", config.elevenlabs_voice_id),
+                ("OPENAI_API_KEY", config.openai_api_key),
+            ) if not value
+        ]
+        if missing:
+            console.print(f"[red]Error: {', '.join(missing)} not set[/red]")
+            raise click.Abort()
+
+    shotlist_path = shotlist_source(config.shotlist_json)
+    missing_files = config.require_files([shorts_path, shotlist_path])
+    if missing_files:
+        for path in missing_files:
+            console.print(f"[red]Missing file: {path}[/red]")
+        console.print("[yellow]Run generate_shorts.py and generate_shotlist.py first[/yellow]")
+        raise click.Abort()
+
+    # Only the scenes some short uses are kept in memory
+    try:
+        shotlist = {
+            "formats": read_meta(shotlist_path).get("formats", {}),
+            "scenes": [scene for scene in iter_scenes(shotlist_path) if set(consumers(scene)) - {LONGFORM}],
+        }
+    except ValueError as exc:
+        raise click.ClickException(f"Invalid shotlist JSON at {shotlist_path}: {exc}") from exc
+    shorts = parse_shorts(shorts_path.read_text(encoding="utf-8"))
+    if only:
+        shorts = [short for short in shorts if short["id"] in only]
+
+    console.print(Panel.fit(
+        f"[bold]Produce Shorts Media[/bold]\n\n"
+        f"Shorts: {shorts_path} ({len(shorts)})\n"
+        f"Output: {config.shorts_dir}\n"
+        f"Sora concurrency: {concurrency}, TTS concurrency: {TTS_CONCURRENCY}",
+        title="Shai-Hulud Pipeline"
+    ))
+
+    if not shorts:
+        console.print("[yellow]No shorts to produce[/yellow]")
+        return
+
+    scene_lists = shorts_scenes(shotlist.get("scenes", []))
+    if not scene_lists:
+        console.print("[yellow]The shotlist assigns no scenes to shorts; re-run generate_shotlist.py after the shorts[/yellow]")
+
+    if dry_run:
+        console.print("\n[yellow]DRY RUN - Shorts:[/yellow]")
+        for short in shorts:
+            narration = clean_short_for_tts(short["text"])
+            scene_ids = scene_lists.get(short["id"], [])
+            console.print(
+                f"  {short['id']}: {short['title']} ({len(narration.split())} words, "
+                f"scenes: {', '.join(scene_ids) or 'none'})"
+            )
+        return
+
+    if simulate:
+        console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
+    config.ensure_dirs()
+
+    started = time.monotonic()
+    producer = ShortsProducer(config, shotlist, simulate, concurrency, clip_store)
+    summaries = asyncio.run(producer.run(shorts))
+    elapsed = time.monotonic() - started
+    log.info(
+        "Shorts produced",
+        extra={"shorts": len(summaries), "rendered": producer.rendered, "reused": producer.reused,
+               "seconds": round(elapsed, 1)},
+    )
+
+    console.print(f"\n[green]✓ Produced {len(summaries)} shorts in {config.shorts_dir}[/green]")
+    for summary in summaries:
+        line = f"  - {summary['id']}: {summary['duration_seconds']:.1f}s, {len(summary['scenes'])} clip(s)"
+        if summary["missing_scenes"]:
+            line += f" [red](missing: {', '.join(summary['missing_scenes'])})[/red]"
+        console.print(line)
+    console.print(f"  Clips rendered: {producer.rendered}, reused from the clip store: {producer.reused}")
+    console.print(f"  Done in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
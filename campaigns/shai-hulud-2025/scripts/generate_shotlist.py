@@ -5,19 +5,30 @@ Generate Sora 2 shotlist from script with B-roll markers.
 Usage:
     python generate_shotlist.py
     python generate_shotlist.py --script custom-script.md --output shotlist.json
+    python generate_shotlist.py --jsonl --stale-only    # append-only shotlist.jsonl
+
+    shotlist = await agenerate_shotlist(script_text, prompt_template, "16:9", api_key, model, 0.7, 0.9)
 """
 
+import copy
 import json
 from pathlib import Path
 
 import click
-import google.generativeai as genai
 from rich.console import Console
 from rich.panel import Panel
 
+from chapters import clear_stale, load_stale
+from clients import cassette_replaying, gemini_client, gemini_context_cache
 from config import get_config
+from context_cache import PromptLayout, agenerate_with_context, generate_with_context
+from events import get_emitter, step_events
 from logging_utils import get_logger
-from simulation_adapters import FakeGeminiAdapter
+from manifest import manifest_step
+from profiling import profile_step
+from shotlist_stream import load_shotlist, shotlist_source, write_shotlist
+from timing_index import apply_timing_to_shotlist, load_timing_index, timing_index_path
+from video_formats import shorts_scenes
 
 console = Console()
 log = get_logger(__name__)
@@ -32,68 +43,181 @@ def generate_shotlist(
     temperature: float,
     top_p: float,
     simulate: bool = False,
+    stale: list[dict] | None = None,
+    shorts_text: str = "",
+    shorts_aspect_ratio: str | None = None,
 ) -> dict:
-    """Call Gemini API to generate Sora shotlist."""
+    """Call Gemini API to generate Sora shotlist.
+
+    With ``stale`` scenes, only those are rewritten against the current script
+    and the reply holds just the replacements. With ``shorts_text``, the same
+    pass plans the shorts' visuals: scenes list their consumers in ``used_by``
+    and carry ``variants`` prompts for ``shorts_aspect_ratio``.
+    """
+    gemini = gemini_client(api_key, simulate)
     if simulate:
-        adapter = FakeGeminiAdapter()
-        adapter.configure(api_key="fake")
-        model_instance = adapter.GenerativeModel(model)
-        generation_config = adapter.GenerationConfig(
-            temperature=temperature,
-            top_p=top_p,
-            response_mime_type="application/json",
-        )
         console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
-    else:
-        genai.configure(api_key=api_key)
-        model_instance = genai.GenerativeModel(model)
-        generation_config = genai.GenerationConfig(
-            temperature=temperature,
-            top_p=top_p,
-            response_mime_type="application/json",
-        )
-
-    full_prompt = f"""{prompt_template}
-
----
+    generation_config = _generation_config(gemini, temperature, top_p)
+    layout = _shotlist_layout(
+        script_text, prompt_template, aspect_ratio, stale,
+        shorts_text=shorts_text, shorts_aspect_ratio=shorts_aspect_ratio,
+    )
 
-## SCRIPT_TEXT:
+    log.info("Calling Gemini API for shotlist", extra={"model": model})
 
-{script_text}
+    try:
+        with get_emitter().api_call("gemini", model=model, prompt_chars=len(layout.render())):
+            response = generate_with_context(
+                gemini, model, layout, generation_config, gemini_context_cache(simulate),
+            )
+    except Exception as exc:  # noqa: BLE001
+        log.exception("Gemini API call failed")
+        raise click.ClickException(f"Gemini API call failed: {exc}") from exc
 
-## TARGET_ASPECT_RATIO: {aspect_ratio}
-## DESIRED_SCENES: 8-12
+    try:
+        return _parse_shotlist(response.text)
+    except json.JSONDecodeError as exc:
+        console.print(f"[red]Failed to parse JSON: {exc}[/red]")
+        raise click.ClickException("Gemini response was not valid JSON") from exc
 
----
 
-Now generate the Sora 2 shotlist JSON. Output ONLY valid JSON, no markdown.
-"""
+async def agenerate_shotlist(
+    script_text: str,
+    prompt_template: str,
+    aspect_ratio: str,
+    api_key: str,
+    model: str,
+    temperature: float,
+    top_p: float,
+    simulate: bool = False,
+    stale: list[dict] | None = None,
+    desired_scenes: str = "8-12",
+    shorts_text: str = "",
+    shorts_aspect_ratio: str | None = None,
+) -> dict:
+    """Async ``generate_shotlist`` without console output, for event-loop drivers.
+
+    ``desired_scenes`` sizes the request, e.g. a smaller range when planning
+    one chapter at a time.
+    """
+    gemini = gemini_client(api_key, simulate)
+    generation_config = _generation_config(gemini, temperature, top_p)
+    layout = _shotlist_layout(
+        script_text, prompt_template, aspect_ratio, stale, desired_scenes, shorts_text, shorts_aspect_ratio,
+    )
 
     log.info("Calling Gemini API for shotlist", extra={"model": model})
 
     try:
-        response = model_instance.generate_content(
-            full_prompt,
-            generation_config=generation_config,
-        )
+        with get_emitter().api_call("gemini", model=model, prompt_chars=len(layout.render())):
+            response = await agenerate_with_context(
+                gemini, model, layout, generation_config, gemini_context_cache(simulate),
+            )
     except Exception as exc:  # noqa: BLE001
         log.exception("Gemini API call failed")
         raise click.ClickException(f"Gemini API call failed: {exc}") from exc
 
     try:
-        if simulate and "```" in response.text:
-            clean_text = response.text.replace("```json", "").replace("```", "").strip()
-            shotlist = json.loads(clean_text)
-        else:
-            shotlist = json.loads(response.text)
+        return _parse_shotlist(response.text)
     except json.JSONDecodeError as exc:
-        console.print(f"[red]Failed to parse JSON: {exc}[/red]")
+        log.error("Shotlist response was not valid JSON", extra={"error": str(exc)})
         raise click.ClickException("Gemini response was not valid JSON") from exc
 
-    return shotlist
+
+def _generation_config(gemini, temperature: float, top_p: float):
+    return gemini.GenerationConfig(
+        temperature=temperature,
+        top_p=top_p,
+        response_mime_type="application/json",
+    )
+
+
+def _shotlist_layout(
+    script_text: str,
+    prompt_template: str,
+    aspect_ratio: str,
+    stale: list[dict] | None,
+    desired_scenes: str = "8-12",
+    shorts_text: str = "",
+    shorts_aspect_ratio: str | None = None,
+) -> PromptLayout:
+    if stale:
+        request = f"""## STALE_SCENES:
+
+```json
+{json.dumps(stale, indent=2)}
+```
+
+---
+
+The script around these scenes' B-roll cues was rewritten. Regenerate ONLY the STALE_SCENES so they
+match the current SCRIPT_TEXT, keeping each scene's id. Output ONLY valid JSON, no markdown:
+{{"scenes": [...]}} with just those scenes.
+"""
+    else:
+        request = f"""## DESIRED_SCENES: {desired_scenes}
+
+---
+
+Now generate the Sora 2 shotlist JSON. Output ONLY valid JSON, no markdown.
+"""
+
+    formats = ""
+    if shorts_text and shorts_aspect_ratio and shorts_aspect_ratio != aspect_ratio:
+        formats = f"""## SHORTS_SCRIPTS:
+
+{shorts_text.strip()}
+
+## SHORTS_ASPECT_RATIO: {shorts_aspect_ratio}
+
+Plan the SHORTS_SCRIPTS' visuals in the same shotlist. Give every scene a "used_by" list of the outputs
+that show it: "longform" and/or "short_1", "short_2", ... (numbered in SHORTS_SCRIPTS order). Reuse a
+long-form scene whenever a short covers the same beat instead of adding a near-duplicate. Every scene a
+short uses gets "variants": {{"{shorts_aspect_ratio}": {{"sora_prompt": "..."}}}} with the prompt reframed
+for {shorts_aspect_ratio}.
+
+"""
+
+    # Same script-first prefix as generate_shorts, so the cached context is shared
+    return PromptLayout(
+        context=[("FULL_SCRIPT_TEXT", script_text)],
+        task=f"""{prompt_template}
+
+---
+
+Use the FULL_SCRIPT_TEXT above as SCRIPT_TEXT.
+
+## TARGET_ASPECT_RATIO: {aspect_ratio}
+{formats}{request}""",
+    )
+
+
+def _parse_shotlist(text: str) -> dict:
+    if "```" in text:  # simulated or replayed fenced JSON
+        text = text.replace("```json", "").replace("```", "").strip()
+    return json.loads(text)
+
+
+def replace_scenes(shotlist: dict, stale: list[dict], replacements: list[dict]) -> dict:
+    """Swap regenerated scenes into the shotlist by id (by position if ids were dropped)."""
+    by_id = {str(scene.get("id")): scene for scene in replacements if scene.get("id") is not None}
+    leftovers = iter(scene for scene in replacements if str(scene.get("id")) not in {str(s.get("id")) for s in stale})
+    swapped = {}
+    for scene in stale:
+        new = by_id.get(str(scene.get("id"))) or next(leftovers, None)
+        if new is not None:
+            # Consumers are a planning decision; a rewrite keeps them unless it names its own
+            kept = {"used_by": scene["used_by"]} if "used_by" in scene else {}
+            swapped[str(scene.get("id"))] = {**kept, **new, "id": scene.get("id")}
+
+    scenes = [swapped.get(str(scene.get("id")), scene) for scene in shotlist.get("scenes", [])]
+    return {**shotlist, "scenes": scenes}
 
 
 @click.command()
+@step_events("shotlist", console)
+@manifest_step("shotlist")
+@profile_step("shotlist")
 @click.option(
     "--script", "-s",
     type=click.Path(exists=True, path_type=Path),
@@ -102,12 +226,29 @@ Now generate the Sora 2 shotlist JSON. Output ONLY valid JSON, no markdown.
 @click.option(
     "--output", "-o",
     type=click.Path(path_type=Path),
-    help="Output path for shotlist JSON"
+    help="Output path for shotlist JSON (.jsonl for one scene per line; default: the current shotlist)"
+)
+@click.option(
+    "--jsonl", is_flag=True,
+    help="Write the append-only shotlist.jsonl (--stale-only appends just the redone scenes)"
 )
 @click.option(
     "--aspect-ratio", "-a",
-    type=str, default="16:9",
-    help="Video aspect ratio"
+    type=str, default=None,
+    help="Long-form aspect ratio (default: video_aspect_ratio)"
+)
+@click.option(
+    "--shorts-aspect-ratio",
+    type=str, default=None,
+    help="Aspect ratio of the shorts' variants (default: shorts_aspect_ratio)"
+)
+@click.option(
+    "--shorts/--no-shorts", default=True,
+    help="Plan visuals for the shorts scripts in the same pass"
+)
+@click.option(
+    "--stale-only", is_flag=True,
+    help="Only regenerate scenes listed in stale.json after chapter edits"
 )
 @click.option(
     "--dry-run", is_flag=True,
@@ -117,15 +258,30 @@ Now generate the Sora 2 shotlist JSON. Output ONLY valid JSON, no markdown.
     "--simulate", is_flag=True,
     help="Use fake adapters instead of real API"
 )
-def main(script: Path | None, output: Path | None, aspect_ratio: str, dry_run: bool, simulate: bool):
+def main(
+    script: Path | None,
+    output: Path | None,
+    jsonl: bool,
+    aspect_ratio: str | None,
+    shorts_aspect_ratio: str | None,
+    shorts: bool,
+    stale_only: bool,
+    dry_run: bool,
+    simulate: bool,
+):
     """Generate Sora 2 shotlist from script."""
 
     config = get_config()
 
     script_path = script or config.script_longform
-    output = output or config.shotlist_json
-
-    if not config.gemini_api_key and not dry_run and not simulate:
+    # Without a choice, keep writing whichever shotlist the campaign currently reads
+    output = output or (config.shotlist_json.with_suffix(".jsonl") if jsonl else shotlist_source(config.shotlist_json))
+    aspect_ratio = aspect_ratio or config.video_aspect_ratio
+    shorts_aspect_ratio = shorts_aspect_ratio or config.shorts_aspect_ratio
+    # Shorts get visuals only once their scripts exist and they need another format
+    plan_shorts = shorts and shorts_aspect_ratio != aspect_ratio and config.shorts_scripts.exists()
+
+    if not config.gemini_api_key and not dry_run and not simulate and not cassette_replaying():
         console.print("[red]Error: GEMINI_API_KEY not set[/red]")
         raise click.Abort()
 
@@ -135,25 +291,59 @@ def main(script: Path | None, output: Path | None, aspect_ratio: str, dry_run: b
             console.print(f"[red]Missing file: {path}[/red]")
         raise click.Abort()
 
+    ratios = f"{aspect_ratio} (shorts: {shorts_aspect_ratio})" if plan_shorts else aspect_ratio
     console.print(Panel.fit(
         f"[bold]Generate Sora 2 Shotlist[/bold]\n\n"
         f"Script: {script_path}\n"
-        f"Aspect Ratio: {aspect_ratio}\n"
+        f"Aspect Ratio: {ratios}\n"
         f"Output: {output}",
         title="Shai-Hulud Pipeline"
     ))
 
     script_text = script_path.read_text(encoding="utf-8")
     prompt_template = config.prompt_shotlist.read_text(encoding="utf-8")
+    shorts_text = config.shorts_scripts.read_text(encoding="utf-8") if plan_shorts else ""
+
+    # Scenes whose script chapter changed since the shotlist was written
+    stale_ids: list[str] = []
+    previous: dict = {}
+    if stale_only:
+        if not output.exists():
+            raise click.ClickException(f"--stale-only needs an existing shotlist at {output}")
+        try:
+            previous = load_shotlist(output)
+        except ValueError as exc:
+            raise click.ClickException(f"Invalid shotlist JSON at {output}: {exc}") from exc
+        stale_ids = load_stale(config.stale_json).get("scenes", [])
+        if not stale_ids:
+            console.print("\n[green]✓ Shotlist is up to date: no stale scenes[/green]")
+            return
+        # Stale ids from another shotlist must not turn into a full (paid) regeneration
+        if not any(str(scene.get("id")) in stale_ids for scene in previous.get("scenes", [])):
+            log.warning("Stale scenes are not in the shotlist", extra={"scenes": stale_ids})
+            console.print(
+                f"\n[yellow]None of the stale scenes ({', '.join(stale_ids)}) are in {output.name}; "
+                f"nothing to regenerate. Run without --stale-only to replan the whole shotlist.[/yellow]"
+            )
+            if not dry_run:
+                clear_stale(config.stale_json, "scenes", stale_ids)
+            return
 
     if dry_run:
         broll_count = script_text.count("[B-ROLL")
         console.print(f"\n[yellow]DRY RUN - B-roll markers found: {broll_count}[/yellow]")
+        if stale_only:
+            console.print(f"Stale scenes: {', '.join(stale_ids)}")
+        if plan_shorts:
+            console.print(f"Shorts visuals: planned from {config.shorts_scripts.name} at {shorts_aspect_ratio}")
         console.print(f"Model: {config.gemini_model}, temp: {config.gemini_temperature}, top_p: {config.gemini_top_p}")
         return
 
     # Generate
     config.ensure_dirs()
+    # Timing is applied to kept scenes in place; a JSONL shotlist appends only what differs from disk
+    saved = copy.deepcopy(previous)
+    stale = [scene for scene in previous.get("scenes", []) if str(scene.get("id")) in stale_ids]
     shotlist = generate_shotlist(
         script_text,
         prompt_template,
@@ -163,13 +353,29 @@ def main(script: Path | None, output: Path | None, aspect_ratio: str, dry_run: b
         config.gemini_temperature,
         config.gemini_top_p,
         simulate,
+        stale or None,
+        shorts_text,
+        shorts_aspect_ratio,
     )
+    if stale_only:
+        shotlist = replace_scenes(previous, stale, shotlist.get("scenes", []))
+    clear_stale(config.stale_json, "scenes", stale_ids if stale_only else None)
+    shotlist["formats"] = {"longform": aspect_ratio, "shorts": shorts_aspect_ratio}
+
+    # Prefer exact cue timestamps over the model's guessed time ranges
+    timing = load_timing_index(timing_index_path(config.voiceover_mp3))
+    timed_scenes = apply_timing_to_shotlist(shotlist, timing) if timing else 0
 
-    output.write_text(json.dumps(shotlist, indent=2), encoding="utf-8")
+    write_shotlist(output, shotlist, saved if stale_only else None)
+    get_emitter().artifact(output)
 
     scene_count = len(shotlist.get("scenes", []))
     console.print(f"\n[green]✓ Shotlist saved to: {output}[/green]")
     console.print(f"  Scenes: {scene_count}")
+    if timed_scenes:
+        console.print(f"  Timed from voiceover cues: {timed_scenes}")
+    for short_id, scene_ids in shorts_scenes(shotlist.get("scenes", [])).items():
+        console.print(f"  {short_id}: {', '.join(scene_ids)}")
     
     for scene in shotlist.get("scenes", [])[:3]:
         console.print(f"  - {scene.get('id')}: {scene.get('duration_seconds', '?')}s")
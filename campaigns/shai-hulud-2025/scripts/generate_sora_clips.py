@@ -5,10 +5,16 @@ Generate Sora 2 video clips from shotlist.
 Usage:
     python generate_sora_clips.py
     python generate_sora_clips.py --shotlist custom-shotlist.json --output-dir ./videos
+    python generate_sora_clips.py --shotlist shotlist.jsonl --offset 640
+
+    path = await agenerate_sora_clip(async_openai_client(api_key), scene, output_dir)
 """
 
-import json
+import asyncio
+import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import click
@@ -18,13 +24,76 @@ from rich.progress import Progress
 
 from openai import OpenAI
 
+from clients import async_http_client, cassette_replaying, http_client, media_tools, openai_client
+from clip_store import ClipStore, atomic_write_bytes
+from coalesce import COALESCED_DIR, coalesce_scenes, split_render
 from config import get_config
+from events import get_emitter, step_events
 from logging_utils import get_logger
-from simulation_adapters import FakeOpenAIClient, get_fake_httpx_client
+from manifest import manifest_step
+from mp4_check import check_mp4, verify_clips
+from profiling import profile_step
+from render_scheduler import RateLimiter, RenderHistory, projected_makespan, schedule_scenes
+from shotlist_stream import iter_scenes, read_meta, shotlist_source, windows
+from video_formats import format_dir, render_size, render_variants
 
 console = Console()
 log = get_logger(__name__)
 
+# Downloads of a finished render tried before giving up on it
+DOWNLOAD_ATTEMPTS = 2
+# Extra passes over scenes whose clip is missing or corrupt after a run
+CLIP_RETRIES = 1
+# Scenes read from the shotlist and ordered longest-first at a time
+SCHEDULE_WINDOW = 64
+# Minimum spacing between render starts (simulated runs use 0.1s)
+RATE_LIMIT_SECONDS = 2.0
+
+
+def _download(video_url: str, output_path: Path, simulate: bool = False) -> None:
+    """Download a rendered clip to output_path using httpx."""
+    with http_client(simulate)() as http:
+        video_response = http.get(video_url, timeout=60)
+        video_response.raise_for_status()
+        atomic_write_bytes(output_path, video_response.content)
+
+
+def _bad_clip(output_path: Path, scene_id: str, attempt: int) -> list[str]:
+    """Container problems of a downloaded clip (empty when it is sound)."""
+    report = check_mp4(output_path)
+    if not report.ok:
+        log.warning(
+            "Downloaded clip failed container check",
+            extra={"scene": scene_id, "attempt": attempt, "problems": report.problems},
+        )
+    return report.problems
+
+
+def scene_store_key(scene: dict, model: str, resolution: str) -> str:
+    """Clip store key of a scene's render (duration clamped as for the request)."""
+    duration = min(scene.get("duration_seconds", 10), 20)
+    return ClipStore.key(scene.get("sora_prompt", ""), model, resolution, duration, scene.get("aspect_ratio"))
+
+
+def link_stored_clip(store: ClipStore, key: str, output_path: Path, scene_id: str) -> bool:
+    """Link a stored render, unless it fails the container check (then render afresh)."""
+    if not store.link(key, output_path):
+        return False
+    if check_mp4(output_path).ok:
+        return True
+    log.warning("Stored clip failed container check", extra={"scene": scene_id, "key": key[:12]})
+    output_path.unlink(missing_ok=True)
+    store.evict(key)
+    return False
+
+
+async def _adownload(video_url: str, output_path: Path, simulate: bool = False) -> None:
+    """Download a rendered clip to output_path using httpx.AsyncClient."""
+    async with async_http_client(simulate)() as http:
+        video_response = await http.get(video_url, timeout=60)
+        video_response.raise_for_status()
+        await asyncio.to_thread(atomic_write_bytes, output_path, video_response.content)
+
 
 def generate_sora_clip(
     client: OpenAI,
@@ -33,8 +102,17 @@ def generate_sora_clip(
     resolution: str = "1080p",
     model: str = "sora",
     simulate: bool = False,
+    store: ClipStore | None = None,
+    history: RenderHistory | None = None,
 ) -> Path | None:
-    """Generate a single Sora clip from a scene definition."""
+    """Generate a single Sora clip from a scene definition.
+
+    When a clip store is given, an identical earlier render (same normalized
+    prompt, model, resolution and duration) is linked instead of re-rendered.
+    Render times of real jobs are recorded into ``history`` for scheduling.
+    A scene expanded by ``render_variants`` carries its ``aspect_ratio``,
+    which sets the frame size and is part of the store key.
+    """
     
     scene_id = scene.get("id", "unknown")
     prompt = scene.get("sora_prompt", "")
@@ -43,65 +121,169 @@ def generate_sora_clip(
     if not prompt:
         console.print(f"[yellow]Skipping {scene_id}: No prompt[/yellow]")
         return None
+
+    render_duration = min(duration, 20)  # Sora max is typically 20s
+    aspect_ratio = scene.get("aspect_ratio")
+    size = render_size(resolution, aspect_ratio)
+    output_path = output_dir / f"{scene_id}.mp4"
+    store_key = scene_store_key(scene, model, resolution) if store else None
+    detail = f"{duration}s, {aspect_ratio}" if aspect_ratio else f"{duration}s"
+    if store and link_stored_clip(store, store_key, output_path, scene_id):
+        console.print(f"[cyan]Reused: {scene_id} ({detail}) from clip store[/cyan]")
+        get_emitter().artifact(output_path)
+        return output_path
     
     log.info("Generating scene", extra={"scene": scene_id, "duration": duration})
-    console.print(f"[blue]Generating: {scene_id} ({duration}s)[/blue]")
+    console.print(f"[blue]Generating: {scene_id} ({detail})[/blue]")
+    started = time.monotonic()
+    events = get_emitter()
     
     try:
-        # Create video generation request
-        # Note: Sora 2 API is accessed through OpenAI's responses.create
-        response = client.responses.create(
-            model=model,
-            input=prompt,
-            # Sora-specific parameters
-            n=1,
-            size=resolution,
-            duration=min(duration, 20)  # Sora max is typically 20s
-        )
-        
-        # Poll for completion
-        while response.status == "processing":
-            time.sleep(1 if simulate else 5)
-            response = client.responses.retrieve(response.id)
+        with events.api_call("sora", model=model, scene=scene_id, duration=render_duration):
+            # Create video generation request
+            # Note: Sora 2 API is accessed through OpenAI's responses.create
+            response = client.responses.create(
+                model=model,
+                input=prompt,
+                # Sora-specific parameters
+                n=1,
+                size=size,
+                duration=render_duration,
+            )
+
+            # Poll for completion
+            while response.status == "processing":
+                time.sleep(1 if simulate else 5)
+                response = client.responses.retrieve(response.id)
         
         if response.status == "completed":
             # Download video
             video_url = response.output[0].url
-            output_path = output_dir / f"{scene_id}.mp4"
             
-            # Download using httpx
-            try:
-                if simulate:
-                    FakeHttpxClient = get_fake_httpx_client()
-                    with FakeHttpxClient() as http:
-                        video_response = http.get(video_url)
-                        output_path.write_bytes(video_response.content)
-                else:
-                    import httpx
-                    with httpx.Client() as http:
-                        video_response = http.get(video_url, timeout=60)
-                        video_response.raise_for_status()
-                        output_path.write_bytes(video_response.content)
-            except Exception as exc:  # noqa: BLE001
-                log.exception("Download failed for %s", scene_id)
-                raise click.ClickException(f"Failed to download {scene_id}: {exc}") from exc
+            # Download using httpx; a truncated or corrupt file is fetched again
+            for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+                try:
+                    with events.api_call("download", scene=scene_id):
+                        _download(video_url, output_path, simulate)
+                except Exception as exc:  # noqa: BLE001
+                    log.exception("Download failed for %s", scene_id)
+                    raise click.ClickException(f"Failed to download {scene_id}: {exc}") from exc
+                problems = _bad_clip(output_path, scene_id, attempt)
+                if not problems:
+                    break
+            else:
+                output_path.unlink(missing_ok=True)
+                console.print(f"[red]Corrupt clip for {scene_id}: {problems[0]}[/red]")
+                events.emit("error", scene=scene_id, error=f"corrupt clip: {problems[0]}")
+                return None
+            events.artifact(output_path)
+
+            if store:
+                store.put(store_key, output_path)
+            if history:
+                history.record(render_duration, time.monotonic() - started)
             
             return output_path
         else:
             console.print(f"[red]Generation failed for {scene_id}: {response.status}[/red]")
+            events.emit("error", scene=scene_id, error=f"status {response.status}")
             return None
             
     except Exception as exc:  # noqa: BLE001
         log.exception("Error generating scene %s", scene_id)
         console.print(f"[red]Error generating {scene_id}: {exc}[/red]")
+        events.emit("error", scene=scene_id, error=str(exc))
+        return None
+
+
+async def agenerate_sora_clip(
+    client,
+    scene: dict,
+    output_dir: Path,
+    resolution: str = "1080p",
+    model: str = "sora",
+    simulate: bool = False,
+    store: ClipStore | None = None,
+    history: RenderHistory | None = None,
+) -> Path | None:
+    """Async ``generate_sora_clip`` on an AsyncOpenAI-shaped client, without console output.
+
+    Polling waits on the event loop, so one loop can keep many render jobs
+    in flight. Failures are logged and reported as error events; the scene
+    then returns None, as in the blocking version.
+    """
+    scene_id = scene.get("id", "unknown")
+    prompt = scene.get("sora_prompt", "")
+    duration = scene.get("duration_seconds", 10)
+
+    if not prompt:
+        log.warning("Skipping scene without prompt", extra={"scene": scene_id})
+        return None
+
+    render_duration = min(duration, 20)  # Sora max is typically 20s
+    aspect_ratio = scene.get("aspect_ratio")
+    size = render_size(resolution, aspect_ratio)
+    output_path = output_dir / f"{scene_id}.mp4"
+    store_key = scene_store_key(scene, model, resolution) if store else None
+    if store and link_stored_clip(store, store_key, output_path, scene_id):
+        log.info("Reused scene from clip store", extra={"scene": scene_id, "duration": duration})
+        get_emitter().artifact(output_path)
+        return output_path
+
+    log.info("Generating scene", extra={"scene": scene_id, "duration": duration})
+    started = time.monotonic()
+    events = get_emitter()
+
+    try:
+        with events.api_call("sora", model=model, scene=scene_id, duration=render_duration):
+            response = await client.responses.create(
+                model=model,
+                input=prompt,
+                n=1,
+                size=size,
+                duration=render_duration,
+            )
+            while response.status == "processing":
+                await asyncio.sleep(1 if simulate else 5)
+                response = await client.responses.retrieve(response.id)
+
+        if response.status != "completed":
+            log.error("Generation failed", extra={"scene": scene_id, "status": response.status})
+            events.emit("error", scene=scene_id, error=f"status {response.status}")
+            return None
+
+        for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+            with events.api_call("download", scene=scene_id):
+                await _adownload(response.output[0].url, output_path, simulate)
+            problems = await asyncio.to_thread(_bad_clip, output_path, scene_id, attempt)
+            if not problems:
+                break
+        else:
+            output_path.unlink(missing_ok=True)
+            events.emit("error", scene=scene_id, error=f"corrupt clip: {problems[0]}")
+            return None
+        events.artifact(output_path)
+
+        if store:
+            store.put(store_key, output_path)
+        if history:
+            history.record(render_duration, time.monotonic() - started)
+        return output_path
+
+    except Exception as exc:  # noqa: BLE001
+        log.exception("Error generating scene %s", scene_id)
+        events.emit("error", scene=scene_id, error=str(exc))
         return None
 
 
 @click.command()
+@step_events("sora", console)
+@manifest_step("sora")
+@profile_step("sora")
 @click.option(
     "--shotlist", "-s",
     type=click.Path(exists=True, path_type=Path),
-    help="Path to shotlist JSON"
+    help="Path to shotlist JSON or JSONL (default: the newer of shotlist.json and shotlist.jsonl)"
 )
 @click.option(
     "--output-dir", "-o",
@@ -113,6 +295,42 @@ def generate_sora_clip(
     type=str, multiple=True,
     help="Generate only specific scene(s) by ID"
 )
+@click.option(
+    "--offset",
+    type=int, default=0,
+    help="Skip the first N scenes (after --scene), e.g. to resume a long run"
+)
+@click.option(
+    "--window",
+    type=int, default=None,
+    help="Scenes read and ordered longest-first at a time (default: SCHEDULE_WINDOW)"
+)
+@click.option(
+    "--format", "-f", "formats",
+    type=str, multiple=True,
+    help="Render only these aspect ratio(s), e.g. 9:16 (default: every format the shotlist needs)"
+)
+@click.option(
+    "--concurrency", "-c",
+    type=int, default=None,
+    help="Concurrent render jobs across all formats (default: SORA_CONCURRENCY)"
+)
+@click.option(
+    "--clip-store/--no-clip-store", default=True,
+    help="Reuse identical renders from the shared clip store"
+)
+@click.option(
+    "--coalesce/--no-coalesce", default=True,
+    help="Render runs of short, similar adjacent scenes as one clip and cut it locally"
+)
+@click.option(
+    "--repair", is_flag=True,
+    help="Only render scenes whose clip is missing or fails the container check"
+)
+@click.option(
+    "--retries", type=int, default=CLIP_RETRIES,
+    help="Re-queue rounds for scenes left without a sound clip"
+)
 @click.option(
     "--dry-run", is_flag=True,
     help="Show prompts without calling API"
@@ -121,15 +339,30 @@ def generate_sora_clip(
     "--simulate", is_flag=True,
     help="Use fake adapters instead of real API"
 )
-def main(shotlist: Path | None, output_dir: Path | None, scene: tuple, dry_run: bool, simulate: bool):
+def main(
+    shotlist: Path | None,
+    output_dir: Path | None,
+    scene: tuple,
+    offset: int,
+    window: int | None,
+    formats: tuple,
+    concurrency: int | None,
+    clip_store: bool,
+    coalesce: bool,
+    repair: bool,
+    retries: int,
+    dry_run: bool,
+    simulate: bool,
+):
     """Generate Sora 2 video clips from shotlist."""
     
     config = get_config()
     
-    shotlist_path = shotlist or config.shotlist_json
+    shotlist_path = shotlist or shotlist_source(config.shotlist_json)
     output_dir = output_dir or config.video_dir
+    concurrency = max(1, concurrency or config.sora_concurrency)
     
-    if not config.openai_api_key and not dry_run and not simulate:
+    if not config.openai_api_key and not dry_run and not simulate and not cassette_replaying():
         console.print("[red]Error: OPENAI_API_KEY not set[/red]")
         raise click.Abort()
     
@@ -140,82 +373,271 @@ def main(shotlist: Path | None, output_dir: Path | None, scene: tuple, dry_run:
         console.print("[yellow]Run generate_shotlist.py first[/yellow]")
         raise click.Abort()
     
+    # Scenes are streamed from the shotlist; only the formats are read up front
+    try:
+        planned = read_meta(shotlist_path).get("formats", {})
+    except ValueError as exc:
+        raise click.ClickException(f"Invalid shotlist JSON at {shotlist_path}: {exc}") from exc
+    longform_ratio = planned.get("longform", config.video_aspect_ratio)
+    shorts_ratio = planned.get("shorts", config.shorts_aspect_ratio)
+    window = max(1, window or SCHEDULE_WINDOW)
+
     console.print(Panel.fit(
         f"[bold]Generate Sora 2 Video Clips[/bold]\n\n"
         f"Shotlist: {shotlist_path}\n"
         f"Output: {output_dir}\n"
+        f"Formats: {longform_ratio} long-form, {shorts_ratio} shorts\n"
         f"Resolution: {config.video_resolution}\n"
         f"Model: {config.sora_model}",
         title="Shai-Hulud Pipeline"
     ))
-    
-    # Load shotlist
+
+    def clip_path(variant: dict) -> Path:
+        return format_dir(output_dir, variant["aspect_ratio"], longform_ratio) / f"{variant.get('id', 'unknown')}.mp4"
+
+    def variant_windows(report: bool = False):
+        """(scenes read, render jobs) per window: one job per scene and format its consumers need."""
+        for scenes in windows(iter_scenes(shotlist_path, scene, offset), window):
+            variants = render_variants(scenes, longform_ratio, shorts_ratio)
+            if formats:
+                variants = [v for v in variants if v["aspect_ratio"] in formats]
+            if repair:
+                checks = verify_clips([clip_path(v) for v in variants], concurrency * 4)
+                broken = {path: check for path, check in checks.items() if not check.ok}
+                if report:
+                    for path, check in broken.items():
+                        console.print(f"[yellow]{path.relative_to(output_dir)}: {check.problems[0]}[/yellow]")
+                variants = [v for v in variants if clip_path(v) in broken]
+            yield len(scenes), variants
+
+    # Counting pass: memory stays at one window however long the shotlist is
+    scene_total = job_total = 0
     try:
-        shotlist_data = json.loads(shotlist_path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
-        raise click.ClickException(f"Invalid shotlist JSON at {shotlist_path}: {exc}") from exc
-    scenes = shotlist_data.get("scenes", [])
-    
-    # Filter scenes if specific ones requested
-    if scene:
-        scenes = [s for s in scenes if s.get("id") in scene]
-    
-    if not scenes:
+        for read, variants in variant_windows(report=True):
+            scene_total += read
+            job_total += len(variants)
+            for ratio in {v["aspect_ratio"] for v in variants}:
+                render_size(config.video_resolution, ratio)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+
+    if not job_total:
         console.print("[yellow]No scenes to generate[/yellow]")
         return
     
-    console.print(f"\nScenes to generate: {len(scenes)}")
-    
+    console.print(f"\nScenes to generate: {scene_total} ({job_total} render jobs)")
+
+    # Fake renders live in their own namespace so they never satisfy real runs
+    store = None
+    if clip_store:
+        store = ClipStore(config.clip_store_dir / "simulated" if simulate else config.clip_store_dir)
+    if coalesce and not simulate and not dry_run and shutil.which("ffmpeg") is None:
+        console.print("[yellow]ffmpeg not found; rendering every scene on its own[/yellow]")
+        coalesce = False
+
+    # Longest expected render first, within shotlist priority tiers, across all formats of a window.
+    # Simulated timings are kept in memory so they never skew real estimates.
+    history = RenderHistory() if simulate else RenderHistory.load(config.render_history_json)
+    expected: list[float] = []
+
+    def plan_window(variants: list[dict]):
+        """Coalesce short similar neighbours (scenes already stored stay single and are linked), then order."""
+        jobs = variants
+        if coalesce:
+            def stored(variant: dict) -> bool:
+                key = scene_store_key(variant, config.sora_model, config.video_resolution)
+                return bool(store and store.lookup(key))
+
+            jobs = coalesce_scenes([v for v in variants if not stored(v)]) + [v for v in variants if stored(v)]
+        plan = schedule_scenes(jobs, history)
+        expected.extend(job.expected_seconds for job in plan)
+        return plan
+
+    def report_coalescing() -> None:
+        if len(expected) < job_total:
+            console.print(
+                f"Coalesced adjacent scenes: {job_total} scenes in {len(expected)} Sora jobs "
+                f"({job_total - len(expected)} fewer)"
+            )
+
     if dry_run:
-        console.print("\n[yellow]DRY RUN - Scene prompts:[/yellow]")
-        for s in scenes:
-            console.print(f"\n[bold]{s.get('id')}[/bold] ({s.get('duration_seconds', '?')}s)")
-            console.print(f"  {s.get('sora_prompt', 'No prompt')[:100]}...")
+        console.print("\n[yellow]DRY RUN - Scene prompts (submission order):[/yellow]")
+        for _, variants in variant_windows():
+            for job in plan_window(variants):
+                s = job.scene
+                console.print(
+                    f"\n[bold]{job.scene_id}[/bold] {s['aspect_ratio']} ({s.get('duration_seconds', '?')}s, "
+                    f"priority {job.priority}, ~{job.expected_seconds:.0f}s render)"
+                )
+                for cut in s.get("cuts", []):
+                    console.print(f"  {cut['id']}: {cut['start_seconds']}s +{cut['duration_seconds']}s")
+                console.print(f"  {s.get('sora_prompt', 'No prompt')[:100]}...")
+        report_coalescing()
+        projected = projected_makespan(expected, concurrency)
+        console.print(f"\nConcurrency: {concurrency}, projected makespan: {projected:.0f}s")
         return
     
     # Initialize OpenAI client
+    client = openai_client(config.openai_api_key, simulate)
     if simulate:
-        client = FakeOpenAIClient(api_key="fake")
         console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
-    else:
-        client = OpenAI(api_key=config.openai_api_key)
     config.ensure_dirs()
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate clips
-    generated = []
-    failed = []
-    
-    with Progress() as progress:
-        task = progress.add_task("Generating clips...", total=len(scenes))
-        
-        for scene_data in scenes:
-            result = generate_sora_clip(
-                client,
-                scene_data,
-                output_dir,
-                config.video_resolution,
-                config.sora_model,
-                simulate,
+    tools = media_tools(simulate)
+
+    # Only paths and failed scenes are kept across windows
+    generated: list[Path] = []
+    failed: list[dict] = []
+    lock = threading.Lock()
+    run_started = time.monotonic()
+
+    events = get_emitter()
+
+    # Rate limiting spaces out render starts; a finished job frees its slot at once
+    pacer = RateLimiter(0.1 if simulate else RATE_LIMIT_SECONDS)
+
+    with Progress(console=console) as progress:
+        task = progress.add_task("Generating clips...", total=job_total)
+
+        def render_group(group: dict) -> list[tuple[dict, Path | None]]:
+            """One render for a coalesced run, cut back into a stored clip per scene."""
+            renders_dir = clip_path(group).parent / COALESCED_DIR
+            renders_dir.mkdir(parents=True, exist_ok=True)
+            group_clip = generate_sora_clip(
+                client, group, renders_dir, config.video_resolution, config.sora_model, simulate, store, history,
             )
-            
-            if result:
-                generated.append(result)
+            pieces = split_render(group_clip, group, tools, clip_path) if group_clip else {}
+            clips = []
+            for part in group["coalesced"]:
+                piece = pieces.get(part["id"])
+                if piece and not check_mp4(piece).ok:
+                    piece.unlink(missing_ok=True)
+                    piece = None
+                if piece:
+                    if store:
+                        store.put(scene_store_key(part, config.sora_model, config.video_resolution), piece)
+                    events.artifact(piece)
+                clips.append((part, piece))
+            return clips
+
+        def render(job) -> None:
+            if "coalesced" in job.scene:
+                clips = render_group(job.scene)
             else:
-                failed.append(scene_data.get("id"))
-            
-            progress.update(task, advance=1)
-            
-            # Rate limiting
-            time.sleep(0.1 if simulate else 2)
-    
+                target = clip_path(job.scene)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                result = generate_sora_clip(
+                    client,
+                    job.scene,
+                    target.parent,
+                    config.video_resolution,
+                    config.sora_model,
+                    simulate,
+                    store,
+                    history,
+                )
+                clips = [(job.scene, result)]
+            with lock:
+                for variant, path in clips:
+                    if path:
+                        generated.append(path)
+                    else:
+                        failed.append(variant)
+            progress.update(task, advance=len(clips))
+            events.progress(
+                int(progress.tasks[0].completed), int(progress.tasks[0].total), unit="scene", scene=job.scene_id,
+                format=job.scene["aspect_ratio"], ok=all(path for _, path in clips),
+            )
+
+        # Windows are planned as the stream is read; a slot freed by any window takes the next job,
+        # so there is no idle tail between windows. The resume offset only moves past whole windows.
+        slots = threading.Semaphore(concurrency)
+        outstanding: dict[int, int] = {}
+        window_ends: dict[int, int] = {}
+        finished_windows = 0
+
+        def settle(number: int) -> None:
+            nonlocal finished_windows
+            with lock:
+                outstanding[number] -= 1
+                while outstanding.get(finished_windows) == 0:
+                    log.info("Shotlist window finished", extra={"resume_offset": window_ends.pop(finished_windows)})
+                    del outstanding[finished_windows]
+                    finished_windows += 1
+
+        def run(job, number: int) -> None:
+            try:
+                render(job)
+            finally:
+                slots.release()
+                settle(number)
+
+        read_total = offset
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = []
+            for number, (read, variants) in enumerate(variant_windows()):
+                plan = plan_window(variants)
+                read_total += read
+                with lock:
+                    outstanding[number] = len(plan) + 1
+                    window_ends[number] = read_total
+                for job in plan:
+                    pacer.wait()  # before taking a slot, so a paced start never idles one
+                    slots.acquire()
+                    futures.append(executor.submit(run, job, number))
+                settle(number)
+                # Surface errors early and let finished futures go
+                for future in [future for future in futures if future.done()]:
+                    future.result()
+                    futures.remove(future)
+            for future in futures:
+                future.result()
+        report_coalescing()
+
+        for attempt in range(retries):
+            pending = [v for v in failed if v.get("sora_prompt")]
+            if not pending:
+                break
+            console.print(f"[yellow]Re-queuing {len(pending)} scene(s) without a sound clip[/yellow]")
+            failed = [v for v in failed if not v.get("sora_prompt")]
+            progress.update(task, total=progress.tasks[0].total + len(pending))
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = []
+                for job in schedule_scenes(pending, history):
+                    pacer.wait()
+                    futures.append(executor.submit(render, job))
+                for future in futures:
+                    future.result()
+
+    actual = time.monotonic() - run_started
+    projected = projected_makespan(expected, concurrency)
+    history.save()
+    log.info(
+        "Render makespan",
+        extra={"projected_seconds": round(projected, 1), "actual_seconds": round(actual, 1),
+               "concurrency": concurrency, "scenes": scene_total, "jobs": len(expected)},
+    )
+    console.print(f"\nMakespan: projected {projected:.0f}s, actual {actual:.0f}s")
+
     console.print(f"\n[green]✓ Generated {len(generated)} clips[/green]")
     if failed:
-        console.print(f"[red]✗ Failed: {', '.join(failed)}[/red]")
+        labels = [f"{v.get('id', 'unknown')} ({v['aspect_ratio']})" for v in failed]
+        console.print(f"[red]✗ Failed: {', '.join(labels)}[/red]")
     
     for path in generated:
         console.print(f"  - {path}")
 
+    if store:
+        totals = store.record_run()
+        run = store.stats
+        console.print(
+            f"\nClip store: {run.hits}/{run.lookups} hits ({run.hit_rate:.0%}), "
+            f"{run.bytes_saved / (1024 * 1024):.1f} MB saved this run"
+        )
+        console.print(
+            f"  All runs: {totals.hit_rate:.0%} hit rate, "
+            f"{totals.bytes_saved / (1024 * 1024):.1f} MB saved"
+        )
+
 
 if __name__ == "__main__":
     main()
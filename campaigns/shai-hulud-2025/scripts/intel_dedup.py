@@ -0,0 +1,255 @@
+"""
+Near-duplicate intel detection with MinHash/LSH paragraph sketches.
+
+Campaigns scaffolded from this one start with copies of the same paradigm
+doc and notes that later drift apart. Every paragraph of docs/ and data/raw/
+is reduced to a MinHash signature over word shingles, and signatures are
+bucketed by LSH bands so near-duplicates are found without comparing every
+pair.
+
+Sketches are cached in ``campaigns/.intel-sketches.json``, shared by all
+campaigns. Signatures are keyed by paragraph content hash, so an edited file
+only re-sketches the paragraphs that changed, and unchanged files (same
+size/mtime) are not re-read at all.
+
+Usage:
+    from intel_dedup import SketchIndex, near_duplicates
+    index = SketchIndex(path).refresh(files, base_dir)
+    pairs = near_duplicates(index, threshold=0.8)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from intel_index import Passage, tokenize
+from logging_utils import get_logger
+
+log = get_logger(__name__)
+
+SKETCH_VERSION = 1
+
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 4
+DEFAULT_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(0x5EED)  # fixed seed: signatures must be comparable across runs
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+
+def split_paragraphs(text: str) -> list[str]:
+    """Blank-line separated blocks, without markdown headings."""
+    paragraphs = []
+    for block in re.split(r"\n\s*\n", text):
+        lines = [line for line in block.strip().splitlines() if not line.lstrip().startswith("#")]
+        paragraph = "\n".join(lines).strip()
+        if paragraph:
+            paragraphs.append(paragraph)
+    return paragraphs
+
+
+def shingles(text: str) -> set[str]:
+    tokens = tokenize(text)
+    return {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def paragraph_key(text: str) -> str:
+    return hashlib.sha256(" ".join(tokenize(text)).encode("utf-8")).hexdigest()[:32]
+
+
+def minhash(shingle_set: set[str]) -> tuple[int, ...]:
+    """MinHash signature (NUM_PERM 32-bit values) of a shingle set."""
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+              for s in shingle_set]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(first: tuple[int, ...], second: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERM
+
+
+def band_keys(signature: tuple[int, ...]) -> list[tuple[int, tuple[int, ...]]]:
+    return [(band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]) for band in range(LSH_BANDS)]
+
+
+def _pack(signature: tuple[int, ...]) -> str:
+    return struct.pack(f"<{NUM_PERM}I", *signature).hex()
+
+
+def _unpack(packed: str) -> tuple[int, ...]:
+    return struct.unpack(f"<{NUM_PERM}I", bytes.fromhex(packed))
+
+
+@dataclass
+class DuplicatePair:
+    first: str
+    second: str
+    similarity: float
+    preview: str
+
+
+class SketchIndex:
+    """Paragraph signatures per intel file, cached as JSON and refreshed incrementally."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.files: dict[str, dict] = {}
+        self.signatures: dict[str, str] = {}
+        self.changed_files: list[str] = []
+        self.sketched = 0
+        self._dirty = False
+        if path and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                data = {}
+            if data.get("version") == SKETCH_VERSION and data.get("num_perm") == NUM_PERM:
+                self.files = data.get("files", {})
+                self.signatures = data.get("signatures", {})
+
+    def signature(self, text: str) -> tuple[int, ...] | None:
+        """Signature of one paragraph (None if too short to compare), cached by content."""
+        key = paragraph_key(text)
+        packed = self.signatures.get(key)
+        if packed is None:
+            shingle_set = shingles(text)
+            if len(shingle_set) < MIN_SHINGLES:
+                return None
+            packed = self.signatures[key] = _pack(minhash(shingle_set))
+            self.sketched += 1
+            self._dirty = True
+        return _unpack(packed)
+
+    def refresh(self, paths: Iterable[Path], base_dir: Path, prune: bool = True) -> "SketchIndex":
+        """Re-sketch changed files; with ``prune`` also drop files no longer present."""
+        self.changed_files = []
+        seen = set()
+        for path in paths:
+            name = path.resolve().relative_to(base_dir.resolve()).as_posix()
+            seen.add(name)
+            stat = path.stat()
+            entry = self.files.get(name)
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                continue
+            paragraphs = []
+            for text in split_paragraphs(path.read_text(encoding="utf-8", errors="replace")):
+                if self.signature(text) is not None:
+                    paragraphs.append({"key": paragraph_key(text), "preview": text[:120]})
+            self.files[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "paragraphs": paragraphs}
+            self.changed_files.append(name)
+            self._dirty = True
+
+        if prune:
+            for name in [name for name in self.files if name not in seen]:
+                del self.files[name]
+                self.changed_files.append(name)
+                self._dirty = True
+            referenced = {p["key"] for entry in self.files.values() for p in entry["paragraphs"]}
+            if len(referenced) != len(self.signatures):
+                self.signatures = {k: v for k, v in self.signatures.items() if k in referenced}
+                self._dirty = True
+        if self.changed_files:
+            log.info("Sketch index updated", extra={"changed_files": len(self.changed_files), "sketched": self.sketched})
+        return self
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": SKETCH_VERSION, "num_perm": NUM_PERM, "files": self.files, "signatures": self.signatures}
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def near_duplicates(index: SketchIndex, threshold: float = DEFAULT_THRESHOLD) -> list[DuplicatePair]:
+    """Near-duplicate paragraph pairs across different files, most similar first."""
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+    paragraphs = []
+    for name, entry in sorted(index.files.items()):
+        for paragraph in entry["paragraphs"]:
+            signature = _unpack(index.signatures[paragraph["key"]])
+            for band in band_keys(signature):
+                buckets[band].append(len(paragraphs))
+            paragraphs.append((name, paragraph, signature))
+
+    candidates = set()
+    for members in buckets.values():
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                if paragraphs[first][0] != paragraphs[second][0]:
+                    candidates.add((first, second))
+
+    pairs = []
+    for first, second in candidates:
+        score = similarity(paragraphs[first][2], paragraphs[second][2])
+        if score >= threshold:
+            pairs.append(DuplicatePair(
+                first=paragraphs[first][0],
+                second=paragraphs[second][0],
+                similarity=score,
+                preview=paragraphs[first][1]["preview"],
+            ))
+    pairs.sort(key=lambda p: (-p.similarity, p.first, p.second, p.preview))
+    return pairs
+
+
+class RedundancyFilter:
+    """``IntelIndex.search(keep=...)`` hook that drops passages already covered.
+
+    A passage is redundant when every comparable paragraph in it nearly
+    duplicates a paragraph seeded from the prompt (e.g. the threat doc) or
+    one from a passage kept earlier.
+    """
+
+    def __init__(self, sketches: SketchIndex, threshold: float = DEFAULT_THRESHOLD):
+        self.sketches = sketches
+        self.threshold = threshold
+        self.dropped = 0
+        self._buckets: dict[tuple, list[tuple[int, ...]]] = defaultdict(list)
+
+    def seed(self, text: str) -> None:
+        for paragraph in split_paragraphs(text):
+            signature = self.sketches.signature(paragraph)
+            if signature is not None:
+                self._add(signature)
+
+    def _add(self, signature: tuple[int, ...]) -> None:
+        for band in band_keys(signature):
+            self._buckets[band].append(signature)
+
+    def _covered(self, signature: tuple[int, ...]) -> bool:
+        return any(
+            similarity(signature, other) >= self.threshold
+            for band in band_keys(signature) for other in self._buckets.get(band, ())
+        )
+
+    def __call__(self, passage: Passage) -> bool:
+        signatures = [s for s in map(self.sketches.signature, split_paragraphs(passage.text)) if s is not None]
+        if signatures and all(self._covered(s) for s in signatures):
+            self.dropped += 1
+            return False
+        for signature in signatures:
+            self._add(signature)
+        return True
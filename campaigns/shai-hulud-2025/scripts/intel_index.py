@@ -0,0 +1,301 @@
+"""
+Incremental BM25 index over campaign intel for focused prompts.
+
+Markdown/text files under ``docs/`` and ``data/raw/`` (optionally of every
+campaign) are split into heading-scoped passages. Steps retrieve the top-k
+passages for their task instead of pasting whole files, so prompt size stays
+bounded as the corpus grows.
+
+The index is cached at ``data/index/intel-index.json``. Each refresh only
+re-reads files whose size/mtime changed and only re-tokenizes files whose
+content hash changed; document frequencies are updated in place.
+
+Usage:
+    from intel_index import retrieve_intel
+    notes = retrieve_intel(config, "bun preinstall runner", exclude=[config.paradigm_doc])
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from logging_utils import get_logger
+
+log = get_logger(__name__)
+
+INDEX_VERSION = 1
+INTEL_SUFFIXES = (".md", ".txt")
+
+# Passages are heading-scoped and capped so one long section can't crowd out the rest
+MAX_PASSAGE_CHARS = 1200
+MIN_PASSAGE_TERMS = 5
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+HEADING_PATTERN = re.compile(r"^#{1,6}\s+(.*)$")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the this to was were "
+    "will with which who what when where how not no but if then than so such can".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+@dataclass
+class Passage:
+    source: str
+    heading: str
+    text: str
+    score: float = 0.0
+
+    @property
+    def label(self) -> str:
+        return f"{self.source} § {self.heading}" if self.heading else self.source
+
+
+def split_passages(text: str) -> list[tuple[str, str]]:
+    """Split markdown into (heading, passage) pairs on headings and paragraph breaks."""
+    passages: list[tuple[str, str]] = []
+    heading = ""
+    buffer: list[str] = []
+
+    def flush():
+        body = "\n\n".join(buffer).strip()
+        buffer.clear()
+        if body:
+            passages.append((heading, body))
+
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        first_line = block.splitlines()[0]
+        match = HEADING_PATTERN.match(first_line)
+        if match:
+            flush()
+            heading = match.group(1).strip()
+            block = block[len(first_line):].strip()
+            if not block:
+                continue
+        if buffer and sum(len(b) for b in buffer) + len(block) > MAX_PASSAGE_CHARS:
+            flush()
+        buffer.append(block)
+    flush()
+    return passages
+
+
+def intel_sources(campaign_root: Path, include_other_campaigns: bool = False) -> list[Path]:
+    """Intel files for a campaign (docs/, data/raw/), plus sibling campaigns' if requested."""
+    roots = [campaign_root]
+    if include_other_campaigns:
+        roots += sorted(
+            path for path in campaign_root.parent.iterdir()
+            if path.is_dir() and path != campaign_root and not path.name.startswith(".")
+        )
+    files = []
+    for root in roots:
+        for folder in (root / "docs", root / "data" / "raw"):
+            if folder.is_dir():
+                files += sorted(p for p in folder.rglob("*") if p.is_file() and p.suffix in INTEL_SUFFIXES)
+    return files
+
+
+class IntelIndex:
+    """BM25 index persisted as JSON and refreshed file by file."""
+
+    def __init__(self, path: Path | None, base_dir: Path | None = None):
+        self.path = path
+        self.base_dir = base_dir
+        self.files: dict[str, dict] = {}
+        self.df: Counter = Counter()
+        self.changed_files: list[str] = []
+        if path and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                data = {}
+            if data.get("version") == INDEX_VERSION:
+                self.files = data.get("files", {})
+                self.df = Counter(data.get("df", {}))
+
+    def source_name(self, path: Path) -> str:
+        if self.base_dir:
+            try:
+                return path.resolve().relative_to(self.base_dir.resolve()).as_posix()
+            except ValueError:
+                pass
+        return path.as_posix()
+
+    def refresh(self, paths: Iterable[Path]) -> "IntelIndex":
+        """Re-index changed files, drop deleted ones, and save if anything changed."""
+        self.changed_files = []
+        dirty = False
+        seen = set()
+        for path in paths:
+            name = self.source_name(path)
+            seen.add(name)
+            stat = path.stat()
+            entry = self.files.get(name)
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                continue
+
+            text = path.read_text(encoding="utf-8", errors="replace")
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            dirty = True
+            if entry and entry["sha256"] == digest:
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                continue
+
+            if entry:
+                self._forget(entry)
+            self.files[name] = self._index_file(text, digest, stat)
+            self.changed_files.append(name)
+
+        for name in [name for name in self.files if name not in seen]:
+            self._forget(self.files.pop(name))
+            self.changed_files.append(name)
+
+        if self.changed_files:
+            log.info("Intel index updated", extra={"changed_files": len(self.changed_files)})
+        if dirty or self.changed_files:
+            self._save()
+        return self
+
+    def _index_file(self, text: str, digest: str, stat: os.stat_result) -> dict:
+        passages = []
+        for heading, body in split_passages(text):
+            terms = tokenize(f"{heading}\n{body}")
+            if len(terms) < MIN_PASSAGE_TERMS:
+                continue
+            tf = Counter(terms)
+            self.df.update(tf.keys())
+            passages.append({"heading": heading, "text": body, "tf": dict(tf), "length": len(terms)})
+        return {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "passages": passages}
+
+    def _forget(self, entry: dict) -> None:
+        for passage in entry["passages"]:
+            self.df.subtract(passage["tf"].keys())
+        self.df = +self.df  # drop zero counts
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": INDEX_VERSION, "df": dict(self.df), "files": self.files}
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    @property
+    def passage_count(self) -> int:
+        return sum(len(entry["passages"]) for entry in self.files.values())
+
+    def search(
+        self,
+        query: str,
+        k: int = 8,
+        exclude: Iterable[str] = (),
+        keep: Callable[[Passage], bool] | None = None,
+    ) -> list[Passage]:
+        """Return the top-k passages for a query by BM25 score.
+
+        ``exclude`` drops whole sources (e.g. a doc already in the prompt);
+        ``keep`` can veto individual passages (e.g. near-duplicates).
+        """
+        terms = set(tokenize(query))
+        total = self.passage_count
+        if not terms or not total:
+            return []
+        average_length = sum(
+            passage["length"] for entry in self.files.values() for passage in entry["passages"]
+        ) / total
+        idf = {
+            term: math.log(1 + (total - self.df[term] + 0.5) / (self.df[term] + 0.5))
+            for term in terms if self.df.get(term)
+        }
+
+        excluded = set(exclude)
+        scored = []
+        for source, entry in self.files.items():
+            if source in excluded:
+                continue
+            for passage in entry["passages"]:
+                tf = passage["tf"]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * passage["length"] / average_length)
+                score = sum(
+                    weight * tf[term] * (BM25_K1 + 1) / (tf[term] + norm)
+                    for term, weight in idf.items() if term in tf
+                )
+                if score > 0:
+                    scored.append(Passage(source, passage["heading"], passage["text"], round(score, 4)))
+
+        scored.sort(key=lambda p: (-p.score, p.source, p.heading))
+        results = []
+        for passage in scored:
+            if keep is None or keep(passage):
+                results.append(passage)
+            if len(results) == k:
+                break
+        return results
+
+
+def format_passages(passages: Iterable[Passage], max_chars: int) -> str:
+    """Render retrieved passages for a prompt, stopping at the character budget."""
+    blocks = []
+    used = 0
+    for passage in passages:
+        block = f"[{passage.label}]\n{passage.text.strip()}"
+        if blocks and used + len(block) > max_chars:
+            break
+        blocks.append(block[:max_chars])
+        used += len(block)
+    return "\n\n".join(blocks)
+
+
+def open_intel_index(config: Any) -> IntelIndex:
+    """Load the campaign's intel index and bring it up to date with the corpus."""
+    sources = intel_sources(config.campaign_root, config.intel_other_campaigns)
+    return IntelIndex(config.intel_index_json, base_dir=config.campaign_root.parent).refresh(sources)
+
+
+def retrieve_intel(config: Any, query: str, exclude: Iterable[Path] = ()) -> str:
+    """Top-k intel passages for a prompt, formatted within INTEL_MAX_CHARS.
+
+    With ``INTEL_DEDUP`` on, passages that nearly duplicate an excluded doc
+    (already in the prompt) or an earlier passage are skipped.
+    """
+    from intel_dedup import RedundancyFilter, SketchIndex  # imports this module
+
+    exclude = list(exclude)
+    index = open_intel_index(config)
+    excluded = [index.source_name(path) for path in exclude]
+
+    keep = None
+    if config.intel_dedup:
+        sketches = SketchIndex(config.intel_sketches_json)
+        keep = RedundancyFilter(sketches)
+        for path in exclude:
+            keep.seed(path.read_text(encoding="utf-8"))
+
+    passages = index.search(query, k=config.intel_top_k, exclude=excluded, keep=keep)
+    if keep is not None:
+        sketches.save()
+    log.info(
+        "Retrieved intel passages",
+        extra={"passages": len(passages), "indexed": index.passage_count, "redundant": keep.dropped if keep else 0},
+    )
+    return format_passages(passages, config.intel_max_chars)
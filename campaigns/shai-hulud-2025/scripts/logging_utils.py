@@ -1,16 +1,48 @@
 """
 Shared logging setup for pipeline scripts.
 
+Loggers hand records to an in-memory queue; a background listener thread
+does the formatting and I/O, so concurrent scene/chunk workers never block
+on stderr or disk. Fields passed as ``extra={...}`` are kept: appended as
+``key=value`` in text output and as top-level keys in JSON output.
+
+``LOG_FORMAT=json`` switches stderr to one JSON object per line, and
+``run_log_file`` adds a JSON-lines file for a single step run. The listener
+runs for the life of the process; flushing waits for a marker to pass
+through the queue rather than restarting it.
+
 Usage:
     from logging_utils import get_logger
     log = get_logger(__name__)
+    log.info("Scene rendered", extra={"scene": "scene_001", "duration": 8})
 """
 
 from __future__ import annotations
 
+import atexit
+import copy
+import json
 import logging
 import os
-from typing import Optional
+import queue
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Iterator, Optional
+
+# Attributes every LogRecord has; anything else came from ``extra``
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "run_id",
+}
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener: QueueListener | None = None
+# The step run a record was logged in; set by ``run_log_file``
+_run_id: ContextVar[str | None] = ContextVar("log_run_id", default=None)
 
 
 def _log_level_from_env(default: str = "INFO") -> int:
@@ -19,16 +51,153 @@ def _log_level_from_env(default: str = "INFO") -> int:
     return getattr(logging, level_name, logging.INFO)
 
 
+def record_extras(record: logging.LogRecord) -> dict:
+    """Fields a caller attached with ``extra={...}``."""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class TextFormatter(logging.Formatter):
+    """The classic one-line format with extra fields appended as key=value."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s | %(levelname)s | %(name)s | %(message)s", datefmt="%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = record_extras(record)
+        if not extras:
+            return line
+        head, sep, tail = line.partition("\n")  # keep tracebacks below the fields
+        fields = " ".join(f"{key}={value}" for key, value in extras.items())
+        return f"{head} | {fields}{sep}{tail}"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, message, extras, exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **record_extras(record),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _EnqueueHandler(QueueHandler):
+    """Queue records with their message resolved but otherwise unformatted.
+
+    The stock ``prepare`` formats the whole record on the caller's thread;
+    here only ``%``-args and tracebacks (which may hold live objects) are
+    resolved, and formatting is left to the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.run_id = _run_id.get()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _FlushMarker:
+    """Queued behind pending records; the listener sets ``done`` when it reaches it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class _Listener(QueueListener):
+    def handle(self, record) -> None:
+        if isinstance(record, _FlushMarker):
+            record.done.set()
+            return
+        super().handle(record)
+
+
+class _RunFilter(logging.Filter):
+    """Pass records logged in one run, plus records logged outside any run.
+
+    Worker threads don't inherit the caller's context, so their records carry
+    no run id and go to every open run file, as they did before runs were told
+    apart; records from another run's context are dropped.
+    """
+
+    def __init__(self, run_id: str):
+        super().__init__()
+        self.run_id = run_id
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return getattr(record, "run_id", None) in (None, self.run_id)
+
+
+def _stderr_handler() -> logging.Handler:
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if os.getenv("LOG_FORMAT", "").lower() == "json" else TextFormatter())
+    return handler
+
+
 def configure_logging(level: Optional[int] = None) -> None:
-    """Configure root logger once with a simple, consistent format."""
-    if logging.getLogger().handlers:
+    """Route the root logger through the queue once.
+
+    If something else (a test runner, an embedding app) already configured
+    root handlers, their console output is left alone; the queue is still
+    installed so per-run log files work.
+    """
+    global _listener
+    if _listener is not None:
         return
 
-    logging.basicConfig(
-        level=level or _log_level_from_env(),
-        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        datefmt="%H:%M:%S",
-    )
+    root = logging.getLogger()
+    handlers = [] if root.handlers else [_stderr_handler()]
+    if not root.handlers:
+        root.setLevel(level or _log_level_from_env())
+
+    _listener = _Listener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    root.addHandler(_EnqueueHandler(_queue))
+
+
+def flush_logging() -> None:
+    """Block until every record queued before the call has been written."""
+    if _listener is None or _listener._thread is None or threading.current_thread() is _listener._thread:
+        return
+    marker = _FlushMarker()
+    _queue.put(marker)
+    marker.done.wait()
+
+
+@contextmanager
+def run_log_file(path: Path) -> Iterator[Path]:
+    """Also write every record logged inside the block to ``path`` as JSON lines."""
+    configure_logging()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    run_id = uuid.uuid4().hex
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+    handler.addFilter(_RunFilter(run_id))
+    # The listener reads its handler tuple once per record; swapping it is safe while it runs
+    _listener.handlers = (*_listener.handlers, handler)
+    token = _run_id.set(run_id)
+    try:
+        yield path
+    finally:
+        _run_id.reset(token)
+        flush_logging()
+        _listener.handlers = tuple(h for h in _listener.handlers if h is not handler)
+        handler.close()
+        if path.stat().st_size == 0:
+            path.unlink()
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -0,0 +1,243 @@
+"""
+Per-campaign pipeline manifest.
+
+Every step records its status, timings and the artifacts it wrote (path,
+size, sha256, mtime) in ``<campaign>/manifest.json``. Status tooling and the
+studio server read this one small file instead of crawling and stat-ing
+the campaign's output directories.
+
+Layout:
+    {"version": 1, "campaign": "shai-hulud-2025", "updated_at": "2025-11-26T12:00:00+00:00",
+     "steps": {"outline": {"status": "complete", "started_at": "...", "finished_at": "...",
+                           "duration_seconds": 4.2, "artifacts": 1, "error": null,
+                           "config": "<Config.fingerprint>", "log": "logs/outline-20251126-120000.jsonl"}},
+     "artifacts": {"data/processed/outline.json": {"step": "outline", "bytes": 2048,
+                                                   "sha256": "...", "mtime": "..."}}}
+
+Usage:
+    @click.command()
+    @step_events("outline", console)
+    @manifest_step("outline")
+    @profile_step("outline")
+    def main(...): ...
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import click
+
+from clip_store import file_sha256
+from config import get_config
+from events import get_emitter
+from logging_utils import get_logger, run_log_file
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked read-modify-write
+    fcntl = None
+
+log = get_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Same order and status labels as the studio server
+PIPELINE_STEPS = ("outline", "script", "shorts", "shotlist", "audio", "sora")
+
+
+def manifest_path(campaign_root: Path) -> Path:
+    return campaign_root / MANIFEST_NAME
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def load_manifest(campaign_root: Path) -> dict | None:
+    """Return a campaign's manifest, or None if it has none (or an unreadable one)."""
+    path = manifest_path(campaign_root)
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Serialize read-modify-write of the manifest across concurrent steps."""
+    if fcntl is None:
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f".{path.name}.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _relative(path: Path, campaign_root: Path) -> str:
+    try:
+        return path.resolve().relative_to(campaign_root.resolve()).as_posix()
+    except ValueError:  # --output outside the campaign
+        return path.resolve().as_posix()
+
+
+def _artifact_record(path: Path, step: str) -> dict:
+    stat = path.stat()
+    return {
+        "step": step,
+        "bytes": stat.st_size,
+        "sha256": file_sha256(path),
+        "mtime": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def record_step(
+    campaign_root: Path,
+    step: str,
+    ok: bool,
+    started_at: float,
+    duration_seconds: float,
+    artifacts: Iterable[Path] = (),
+    error: str | None = None,
+    config_fingerprint: str | None = None,
+    log_path: Path | None = None,
+) -> dict:
+    """Merge one step run into the manifest and rewrite it atomically.
+
+    ``config_fingerprint`` identifies the settings and inputs the step ran
+    with, so a later config change shows which outputs are out of date.
+    """
+    path = manifest_path(campaign_root)
+    with _locked(path):
+        manifest = load_manifest(campaign_root) or {
+            "version": MANIFEST_VERSION,
+            "campaign": campaign_root.name,
+            "steps": {},
+            "artifacts": {},
+        }
+        entries = manifest["artifacts"]
+        for artifact in dict.fromkeys(artifacts):
+            if artifact.exists():
+                name = _relative(artifact, campaign_root)
+                # A later step touching an output (audio re-times shotlist.json) doesn't take it over
+                owner = entries.get(name, {}).get("step", step)
+                entries[name] = _artifact_record(artifact, owner)
+        # Drop outputs that were deleted since (e.g. by `make clean`)
+        for name in [name for name in entries if not (campaign_root / name).exists()]:
+            del entries[name]
+
+        manifest["steps"][step] = {
+            "status": "complete" if ok else "failed",
+            "started_at": datetime.fromtimestamp(started_at, timezone.utc).isoformat(timespec="seconds"),
+            "finished_at": _now(),
+            "duration_seconds": round(duration_seconds, 3),
+            "error": error,
+            "config": config_fingerprint,
+            "log": _relative(log_path, campaign_root) if log_path else None,
+        }
+        for name, record in manifest["steps"].items():
+            record["artifacts"] = sum(1 for entry in entries.values() if entry["step"] == name)
+        manifest["updated_at"] = _now()
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2)
+        os.replace(tmp, path)
+    return manifest
+
+
+def summarize(manifest: dict | None) -> dict:
+    """Status label, progress and per-step state, as the studio server reports them."""
+    steps = (manifest or {}).get("steps", {})
+    done = {
+        step: steps.get(step, {}).get("status") == "complete" and steps[step].get("artifacts", 0) > 0
+        for step in PIPELINE_STEPS
+    }
+    if done["audio"] or done["sora"]:
+        status = "Media Generated"
+    elif done["script"] or done["shorts"] or done["shotlist"]:
+        status = "Scripted"
+    elif done["outline"]:
+        status = "Outlined"
+    else:
+        status = "Draft"
+    return {
+        "status": status,
+        "progress": round(100 * sum(done.values()) / len(PIPELINE_STEPS)),
+        "steps": {step: steps.get(step, {}).get("status", "pending") for step in PIPELINE_STEPS},
+        "last_updated": (manifest or {}).get("updated_at", ""),
+    }
+
+
+def manifest_step(step: str):
+    """Decorator recording a step run (and the artifacts it reported) in the manifest.
+
+    Runs that write nothing (dry runs, up-to-date skips) leave the manifest
+    untouched; failures are always recorded.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            config = get_config()
+            emitter = get_emitter()
+            emitter.artifacts.clear()
+            started_at, started = time.time(), time.monotonic()
+            log_path = None
+            if config.pipeline_run_logs:
+                log_path = config.logs_dir / f"{step}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl"
+            with run_log_file(log_path) if log_path else nullcontext():
+                try:
+                    result = func(*args, **kwargs)
+                except click.exceptions.Exit:
+                    raise
+                except BaseException as exc:
+                    message = exc.format_message() if isinstance(exc, click.ClickException) else str(exc)
+                    log.error("Step failed", extra={"step": step, "error": message or type(exc).__name__})
+                    failed = (message or type(exc).__name__, exc)
+                else:
+                    failed = None
+            log_path = log_path if log_path and log_path.exists() else None
+            if failed:
+                _record(step, False, started_at, started, emitter.artifacts, failed[0], log_path)
+                raise failed[1]
+            if emitter.artifacts:
+                _record(step, True, started_at, started, emitter.artifacts, log_path=log_path)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _record(
+    step: str,
+    ok: bool,
+    started_at: float,
+    started: float,
+    artifacts: list[Path],
+    error: str | None = None,
+    log_path: Path | None = None,
+):
+    try:
+        config = get_config()
+        record_step(
+            config.campaign_root, step, ok, started_at, time.monotonic() - started, artifacts, error,
+            config_fingerprint=config.fingerprint, log_path=log_path,
+        )
+    except OSError as exc:
+        log.warning("Could not update campaign manifest", extra={"error": str(exc)})
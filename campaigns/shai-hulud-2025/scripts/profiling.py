@@ -0,0 +1,167 @@
+"""
+Built-in profiling for pipeline steps.
+
+``--profile`` (or ``PIPELINE_PROFILE=1``) runs a step's main under cProfile
+and writes two artifacts to ``<campaign>/profiles/``:
+
+    <step>-<timestamp>.prof   raw pstats dump (snakeviz, pstats, etc.)
+    <step>-<timestamp>.txt    flat summary of the top wall-clock consumers
+
+The summary separates blocking network I/O (socket/ssl/select) and sleeps
+(polling, rate limiting) from CPU time, so a slow step shows whether it was
+waiting on a provider or doing local work. Worker threads (e.g. concurrent
+Sora renders) are profiled too.
+
+Usage:
+    @click.command()
+    @step_events("outline", console)
+    @profile_step("outline")
+    @click.option(...)
+    def main(...): ...
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import io
+import pstats
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import click
+
+from config import get_config
+from logging_utils import get_logger
+
+log = get_logger(__name__)
+
+# Builtins that block on the network (exclusive time only, so no double counting)
+NETWORK_WAIT = re.compile(r"_socket\.|_ssl\.|select\.|selectors|getaddrinfo")
+SLEEP_WAIT = re.compile(r"time\.sleep")
+
+TOP_N = 25
+
+
+@dataclass
+class ProfileSummary:
+    """Wall/CPU split for one profiled step."""
+
+    step: str
+    wall_seconds: float
+    cpu_seconds: float
+    startup_cpu_seconds: float
+    network_wait_seconds: float
+    sleep_seconds: float
+
+
+def classify_waits(stats: pstats.Stats) -> tuple[float, float]:
+    """Sum exclusive time spent in network builtins and in sleeps."""
+    network = sleep = 0.0
+    for (filename, _line, name), (_cc, _nc, tottime, _ct, _callers) in stats.stats.items():
+        if filename != "~":
+            continue
+        if SLEEP_WAIT.search(name):
+            sleep += tottime
+        elif NETWORK_WAIT.search(name):
+            network += tottime
+    return network, sleep
+
+
+def _thread_hook(profiles: list[cProfile.Profile]):
+    """threading.setprofile hook that starts a profiler in each new thread."""
+
+    def hook(frame, event, arg):
+        profile = cProfile.Profile()
+        profiles.append(profile)
+        profile.enable()
+
+    return hook
+
+
+def render_summary(summary: ProfileSummary, stats: pstats.Stats) -> str:
+    """Format the flat text summary written next to the .prof file."""
+    lines = [
+        f"Profile: {summary.step}",
+        "",
+        f"Wall clock:            {summary.wall_seconds:8.3f}s",
+        f"CPU (process):         {summary.cpu_seconds:8.3f}s  (all threads)",
+        f"Network wait:          {summary.network_wait_seconds:8.3f}s  (summed across threads)",
+        f"Sleep/poll wait:       {summary.sleep_seconds:8.3f}s  (summed across threads)",
+        f"Startup CPU (imports): {summary.startup_cpu_seconds:8.3f}s  (before main)",
+        "",
+    ]
+    for sort_key, title in (("cumulative", "Top cumulative wall-clock"), ("tottime", "Top exclusive wall-clock")):
+        buffer = io.StringIO()
+        stats.stream = buffer
+        stats.sort_stats(sort_key).print_stats(TOP_N)
+        body = buffer.getvalue()
+        # Drop pstats' preamble; keep the table from the header row down
+        table = body[body.find("   ncalls"):] if "   ncalls" in body else body
+        lines += [f"== {title} ==", table.rstrip(), ""]
+    return "\n".join(lines) + "\n"
+
+
+def run_profiled(step: str, profiles_dir: Path, func, /, *args, **kwargs):
+    """Run func under cProfile and write the .prof and .txt artifacts."""
+    startup_cpu = time.process_time()
+    thread_profiles: list[cProfile.Profile] = []
+    # From 3.12 cProfile uses sys.monitoring, which already covers all threads
+    per_thread = sys.version_info < (3, 12)
+
+    profile = cProfile.Profile()
+    wall_start = time.perf_counter()
+    if per_thread:
+        threading.setprofile(_thread_hook(thread_profiles))
+    profile.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.disable()
+        if per_thread:
+            threading.setprofile(None)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - startup_cpu
+
+        stats = pstats.Stats(profile)
+        for thread_profile in thread_profiles:
+            stats.add(thread_profile)
+        network, sleep = classify_waits(stats)
+
+        summary = ProfileSummary(step, wall, cpu, startup_cpu, network, sleep)
+        profiles_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{step}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        prof_path = profiles_dir / f"{stem}.prof"
+        summary_path = profiles_dir / f"{stem}.txt"
+        stats.dump_stats(prof_path)
+        summary_path.write_text(render_summary(summary, stats), encoding="utf-8")
+
+        log.info(
+            "Profile written",
+            extra={"step": step, "path": str(summary_path), "wall_seconds": round(wall, 3),
+                   "network_wait_seconds": round(network, 3), "sleep_seconds": round(sleep, 3)},
+        )
+
+
+def profile_step(step: str):
+    """Click decorator adding ``--profile`` (default: PIPELINE_PROFILE) to main."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, profile: bool | None, **kwargs):
+            config = get_config()
+            if not (config.pipeline_profile if profile is None else profile):
+                return func(*args, **kwargs)
+            return run_profiled(step, config.profiles_dir, func, *args, **kwargs)
+
+        return click.option(
+            "--profile/--no-profile", default=None,
+            help="Profile this step into profiles/ (default: PIPELINE_PROFILE)",
+        )(wrapper)
+
+    return decorator
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Fan a campaign's work out to queue workers, track it, and stitch the results.
+
+The coordinator turns the campaign's current state into idempotent jobs:
+one per requested LLM step, one per narration chunk of the script, and one
+per scene render and format in the shotlist. It then waits while workers
+(``queue_worker.py``, here or on other hosts) work through them, reports
+progress, and requeues the jobs of workers that stopped heartbeating. When
+the narration chunks are all in the chunk cache it writes the voiceover and
+its timing index, as ``generate_audio`` would.
+
+Finished jobs are not run again unless their output has gone missing, so
+re-running the coordinator after a crash only fills the gaps. LLM steps run one
+wave at a time in pipeline order (outline, script, shorts, then shotlist, which
+reads the shorts scripts) before the media jobs, which need their output. A
+wave's jobs are keyed on its inputs as they stand when the wave starts.
+
+Usage:
+    python queue_coordinator.py --simulate --workers 4
+    python queue_coordinator.py --llm shorts --llm shotlist --no-tts --no-sora
+    python queue_worker.py          # on each extra host
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.panel import Panel
+from rich.progress import Progress
+
+from audio_chunks import AudioChunkCache
+from chapters import clear_stale
+from clients import cassette_replaying
+from config import Config, get_config
+from events import get_emitter, step_events
+from generate_audio import MAX_CHARS, chunk_script, write_narration, write_shotlist_timing, write_timing_index
+from logging_utils import get_logger
+from manifest import record_step
+from mp4_check import check_mp4
+from profiling import profile_step
+from queue_worker import LLM_STEPS
+from render_scheduler import RenderHistory, schedule_scenes
+from shotlist_stream import iter_scenes, read_meta, shotlist_source
+from video_formats import format_dir, render_variants
+from work_queue import open_broker
+
+console = Console()
+log = get_logger(__name__)
+
+# LLM steps that can run side by side, in pipeline order (shotlist reads the shorts scripts)
+LLM_WAVES = (("outline",), ("script",), ("shorts",), ("shotlist",))
+# Seconds between progress polls (and dead-worker sweeps)
+POLL_SECONDS = 1.0
+
+
+def input_digest(config: Config, fields: tuple[str, ...], settings: tuple[str, ...] = ()) -> str:
+    """Hash of a step's input files and settings, so a changed prompt, input or model makes a new job."""
+    digest = hashlib.sha256()
+    for name in fields:
+        path = getattr(config, name)
+        digest.update(name.encode("utf-8"))
+        digest.update(path.read_bytes() if path.exists() else b"")
+    values = {name: getattr(config, name) for name in settings}
+    digest.update(json.dumps(values, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def llm_jobs(config: Config, steps: tuple[str, ...], simulate: bool) -> list[tuple[str, dict, bool]]:
+    """(kind, payload, output present) for LLM steps."""
+    outputs = {
+        "outline": config.outline_json, "script": config.script_longform,
+        "shorts": config.shorts_scripts, "shotlist": config.shotlist_json,
+    }
+    return [
+        ("llm", {"step": step, "inputs": input_digest(config, *LLM_STEPS[step][1:]), "simulate": simulate},
+         outputs[step].exists())
+        for step in steps
+    ]
+
+
+def tts_jobs(config: Config, cache: AudioChunkCache, simulate: bool) -> list[tuple[str, dict, bool]]:
+    """One job per narration chunk of the script, in the same chunks ``generate_audio`` uses."""
+    raw_script = config.script_longform.read_text(encoding="utf-8")
+    voice_id, model_id = config.elevenlabs_voice_id, config.elevenlabs_model
+    return [
+        ("tts", {"text": chunk, "voice_id": voice_id, "model_id": model_id, "timestamps": True, "simulate": simulate},
+         (cache.root / f"{cache.key(chunk, voice_id, model_id, True)}.json").exists())
+        for chunk in chunk_script(raw_script, MAX_CHARS)
+    ]
+
+
+def sora_jobs(config: Config, simulate: bool, clip_store: bool) -> list[tuple[str, dict, bool]]:
+    """One job per scene and format, longest expected render first (as ``generate_sora_clips`` submits them)."""
+    shotlist_path = shotlist_source(config.shotlist_json)
+    try:
+        planned = read_meta(shotlist_path).get("formats", {})
+        longform_ratio = planned.get("longform", config.video_aspect_ratio)
+        shorts_ratio = planned.get("shorts", config.shorts_aspect_ratio)
+        variants = render_variants(iter_scenes(shotlist_path), longform_ratio, shorts_ratio)
+    except ValueError as exc:
+        raise click.ClickException(f"Invalid shotlist JSON at {shotlist_path}: {exc}") from exc
+    history = RenderHistory() if simulate else RenderHistory.load(config.render_history_json)
+
+    jobs = []
+    for scheduled in schedule_scenes(variants, history):
+        scene = scheduled.scene
+        output = format_dir(config.video_dir, scene["aspect_ratio"], longform_ratio) / f"{scheduled.scene_id}.mp4"
+        payload = {
+            "scene": scene, "output": output.relative_to(config.campaign_root).as_posix(),
+            "model": config.sora_model, "resolution": config.video_resolution,
+            "clip_store": clip_store, "simulate": simulate,
+        }
+        jobs.append(("sora", payload, output.exists() and check_mp4(output).ok))
+    return jobs
+
+
+def start_workers(config: Config, broker_url: str, count: int) -> list[subprocess.Popen]:
+    """Local worker processes on this host, against the same queue and campaign."""
+    worker = Path(__file__).with_name("queue_worker.py")
+    env = {**os.environ, "CAMPAIGN_ROOT": str(config.campaign_root)}
+    return [
+        subprocess.Popen(
+            [sys.executable, str(worker), "--broker", broker_url, "--worker-id", f"local-{n}"],
+            cwd=config.campaign_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        for n in range(1, count + 1)
+    ]
+
+
+def wait_for(broker, jobs: list[str], label: str, workers: list[subprocess.Popen], timeout: float | None) -> dict:
+    """Poll until every job is done or failed, requeueing jobs of dead workers along the way."""
+    events = get_emitter()
+    started = time.monotonic()
+    with Progress(console=console) as progress:
+        task = progress.add_task(label, total=len(jobs))
+        while True:
+            requeued = broker.requeue_expired()
+            if requeued:
+                console.print(
+                    f"[yellow]Requeued {len(requeued)} job(s) from workers that stopped heartbeating[/yellow]")
+            counts = broker.counts(jobs)
+            finished = counts["done"] + counts["failed"]
+            live = broker.live_workers()
+            progress.update(task, completed=finished, description=f"{label} ({len(live)} workers)")
+            events.progress(
+                finished, len(jobs), unit="job", workers=len(live), queued=counts["queued"],
+                running=counts["running"], failed=counts["failed"],
+            )
+            if finished == len(jobs):
+                return counts
+            if workers and all(proc.poll() is not None for proc in workers) and not live:
+                raise click.ClickException("All local workers exited with jobs still queued")
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise click.ClickException(f"Timed out after {timeout:.0f}s: {counts['queued']} queued, "
+                                           f"{counts['running']} running")
+            time.sleep(POLL_SECONDS)
+
+
+def run_wave(broker, planned: list[tuple[str, dict, bool]], label: str, workers, timeout) -> list[str]:
+    """Enqueue jobs (requeueing those whose output went missing), wait, and return the failures."""
+    jobs = [broker.enqueue(kind, payload, rerun=not present) for kind, payload, present in planned]
+    counts = wait_for(broker, jobs, label, workers, timeout)
+    console.print(f"  {label}: {counts['done']} done, {counts['failed']} failed")
+    return [f"{job.kind} {job.id[:8]}: {job.error}" for job in map(broker.get, jobs) if job.state == "failed"]
+
+
+def assemble_narration(config: Config, cache: AudioChunkCache) -> list[Path]:
+    """Write the voiceover, timing index and shotlist timing from cached chunks."""
+    raw_script = config.script_longform.read_text(encoding="utf-8")
+    voice_id, model_id = config.elevenlabs_voice_id, config.elevenlabs_model
+    results = [cache.get(cache.key(chunk, voice_id, model_id, True)) for chunk in chunk_script(raw_script, MAX_CHARS)]
+    if any(result is None for result in results):
+        raise click.ClickException("Narration chunks missing from the chunk cache")
+    timing = write_narration(results, config.voiceover_mp3)
+    index = write_timing_index(raw_script, timing, config.voiceover_mp3)
+    clear_stale(config.stale_json, "chapters")
+    shotlist_path = shotlist_source(config.shotlist_json)
+    if shotlist_path.exists():
+        write_shotlist_timing(shotlist_path, index)
+    console.print(f"[green]✓ Voiceover: {config.voiceover_mp3} ({index['duration_seconds']:.1f}s)[/green]")
+    return [config.voiceover_mp3]
+
+
+@click.command()
+@step_events("queue", console)
+@profile_step("queue")
+@click.option(
+    "--broker", "-b", "broker_url",
+    type=str, default=None,
+    help="Queue URL or SQLite path (default: WORK_QUEUE_URL, else data/work-queue.sqlite)"
+)
+@click.option(
+    "--llm", "llm_steps",
+    type=click.Choice(list(LLM_STEPS)), multiple=True,
+    help="LLM step(s) to run on workers before the media jobs"
+)
+@click.option(
+    "--tts/--no-tts", default=True,
+    help="Queue narration chunks from the script and write the voiceover"
+)
+@click.option(
+    "--sora/--no-sora", default=True,
+    help="Queue scene renders from the shotlist"
+)
+@click.option(
+    "--workers", "-w",
+    type=int, default=0,
+    help="Local worker processes to start (others can join from any host)"
+)
+@click.option(
+    "--clip-store/--no-clip-store", default=True,
+    help="Let workers reuse identical renders from the shared clip store"
+)
+@click.option(
+    "--timeout",
+    type=float, default=None,
+    help="Give up waiting after this many seconds"
+)
+@click.option(
+    "--dry-run", is_flag=True,
+    help="List the jobs that would be queued"
+)
+@click.option(
+    "--simulate", is_flag=True,
+    help="Queue jobs for the fake adapters"
+)
+def main(
+    broker_url: str | None,
+    llm_steps: tuple,
+    tts: bool,
+    sora: bool,
+    workers: int,
+    clip_store: bool,
+    timeout: float | None,
+    dry_run: bool,
+    simulate: bool,
+):
+    """Queue LLM, TTS and Sora jobs for workers and wait for them."""
+
+    config = get_config()
+    broker_url = broker_url or config.work_queue_url or str(config.work_queue_db)
+
+    # Local workers inherit this environment; remote workers bring their own keys
+    if workers and not dry_run and not simulate and not cassette_replaying():
+        needed = [("GEMINI_API_KEY", config.gemini_api_key)] if llm_steps else []
+        if tts:
+            needed += [("ELEVENLABS_API_KEY", config.elevenlabs_api_key),
+                       ("ELEVENLABS_VOICE_ID", config.elevenlabs_voice_id)]
+        if sora:
+            needed += [("OPENAI_API_KEY", config.openai_api_key)]
+        missing = [name for name, value in needed if not value]
+        if missing:
+            console.print(f"[red]Error: {', '.join(missing)} not set[/red]")
+            raise click.Abort()
+
+    console.print(Panel.fit(
+        f"[bold]Work Queue Coordinator[/bold]\n\n"
+        f"Queue: {broker_url}\n"
+        f"LLM steps: {', '.join(llm_steps) or 'none'}\n"
+        f"Media: {', '.join(kind for kind, wanted in (('tts', tts), ('sora', sora)) if wanted) or 'none'}\n"
+        f"Local workers: {workers}",
+        title="Shai-Hulud Pipeline"
+    ))
+
+    waves = [tuple(step for step in wave if step in llm_steps) for wave in LLM_WAVES]
+    waves = [wave for wave in waves if wave]
+    chunks_dir = config.audio_chunks_dir / "simulated" if simulate else config.audio_chunks_dir
+    cache = AudioChunkCache(chunks_dir)
+
+    if dry_run:
+        console.print("\n[yellow]DRY RUN - Jobs in queue order:[/yellow]")
+        for wave in waves:
+            console.print(f"  llm: {', '.join(wave)}")
+        if tts and config.script_longform.exists():
+            planned = tts_jobs(config, cache, simulate)
+            missing = sum(not present for *_, present in planned)
+            console.print(f"  tts: {len(planned)} chunk(s), {missing} to synthesize")
+        if sora and shotlist_source(config.shotlist_json).exists():
+            planned = sora_jobs(config, simulate, clip_store)
+            missing = sum(not present for *_, present in planned)
+            console.print(f"  sora: {len(planned)} render(s), {missing} missing")
+        return
+
+    try:
+        broker = open_broker(broker_url, config.work_queue_lease)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+    if simulate:
+        console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
+    config.ensure_dirs()
+
+    local = start_workers(config, broker_url, workers)
+    failures: list[str] = []
+    try:
+        for wave in waves:
+            # Digest the inputs only now, after the previous wave has written them
+            failures += run_wave(broker, llm_jobs(config, wave, simulate), f"LLM: {', '.join(wave)}", local, timeout)
+            if failures:
+                raise click.ClickException(f"LLM step failed: {failures[0]}")
+
+        media: list[tuple[str, dict, bool]] = []
+        if tts:
+            if config.script_longform.exists():
+                media += tts_jobs(config, cache, simulate)
+            else:
+                console.print(f"[yellow]No script at {config.script_longform}; skipping narration[/yellow]")
+        if sora:
+            if shotlist_source(config.shotlist_json).exists():
+                media += sora_jobs(config, simulate, clip_store)
+            else:
+                console.print(f"[yellow]No shotlist at {config.shotlist_json}; skipping renders[/yellow]")
+        if media:
+            started_at, started = time.time(), time.monotonic()
+            failures += run_wave(broker, media, "Media jobs", local, timeout)
+            if any(kind == "tts" for kind, *_ in media) and not any(f.startswith("tts") for f in failures):
+                artifacts = assemble_narration(config, cache)
+                record_step(config.campaign_root, "audio", True, started_at, time.monotonic() - started, artifacts,
+                            config_fingerprint=config.fingerprint)
+            clips = [config.campaign_root / payload["output"] for kind, payload, _ in media if kind == "sora"]
+            if clips and not any(f.startswith("sora") for f in failures):
+                record_step(config.campaign_root, "sora", True, started_at, time.monotonic() - started,
+                            [clip for clip in clips if clip.exists()], config_fingerprint=config.fingerprint)
+    finally:
+        for proc in local:
+            proc.terminate()
+        for proc in local:
+            proc.wait(timeout=30)
+
+    if failures:
+        for failure in failures:
+            console.print(f"[red]✗ {failure}[/red]")
+        raise click.ClickException(f"{len(failures)} job(s) failed")
+    console.print("\n[green]✓ All queued work finished[/green]")
+
+
+if __name__ == "__main__":
+    main()
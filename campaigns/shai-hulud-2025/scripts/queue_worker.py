@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Pull jobs from the campaign work queue and run them.
+
+Start any number of workers, on this host or on others that share the
+campaign folder (and the queue file, or a broker from WORK_QUEUE_URL). Each
+worker claims one job at a time, heartbeats while it runs, and writes the
+result where the step scripts would:
+
+    sora  one scene render into video/ (through the clip store)
+    tts   one narration chunk into the chunk cache (audio/chunks/)
+    llm   one Gemini step (outline, script, shorts, shotlist) into data/processed/
+
+Whether a job runs against the fake adapters is part of the job itself, so
+simulated and real jobs never share results.
+
+Usage:
+    python queue_worker.py
+    python queue_worker.py --kind sora --kind tts --idle-exit 30
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Callable
+
+import click
+from rich.console import Console
+
+from audio_chunks import AudioChunkCache
+from clients import elevenlabs_client, openai_client
+from clip_store import ClipStore
+from config import Config, get_config, use_config
+from generate_audio import synthesize_chunk
+from generate_outline import main as outline_step
+from generate_script import main as script_step
+from generate_shorts import main as shorts_step
+from generate_shotlist import main as shotlist_step
+from generate_sora_clips import generate_sora_clip
+from logging_utils import get_logger
+from work_queue import JOB_KINDS, Job, open_broker
+
+console = Console()
+log = get_logger(__name__)
+
+# Settings every LLM step's output depends on
+GEMINI_SETTINGS = ("gemini_model", "gemini_temperature", "gemini_top_p")
+# LLM steps a queue job can run, with the input files (prompts included) and settings that decide their output
+LLM_STEPS = {
+    "outline": (
+        outline_step, ("paradigm_doc", "intel_links", "intel_notes", "prompt_outline"),
+        (*GEMINI_SETTINGS, "intel_top_k", "intel_max_chars", "intel_other_campaigns", "intel_dedup"),
+    ),
+    "script": (
+        script_step, ("outline_json", "prompt_script", "prompt_voice_style"),
+        (*GEMINI_SETTINGS, "target_video_minutes"),
+    ),
+    "shorts": (shorts_step, ("script_longform", "prompt_shorts"), GEMINI_SETTINGS),
+    "shotlist": (
+        shotlist_step, ("script_longform", "shorts_scripts", "prompt_shotlist"),
+        (*GEMINI_SETTINGS, "video_aspect_ratio", "shorts_aspect_ratio"),
+    ),
+}
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_sora_job(config: Config, payload: dict) -> dict:
+    """Render one scene (or link it from the clip store) to its output path."""
+    simulate = payload.get("simulate", False)
+    output = config.campaign_root / payload["output"]
+    output.parent.mkdir(parents=True, exist_ok=True)
+    store = None
+    if payload.get("clip_store", True):
+        store = ClipStore(config.clip_store_dir / "simulated" if simulate else config.clip_store_dir)
+    path = generate_sora_clip(
+        openai_client(config.openai_api_key, simulate),
+        payload["scene"],
+        output.parent,
+        payload["resolution"],
+        payload["model"],
+        simulate,
+        store,
+    )
+    if path is None:
+        raise RuntimeError(f"No clip rendered for {payload['scene'].get('id', 'unknown')}")
+    return {"path": payload["output"]}
+
+
+def run_tts_job(config: Config, payload: dict) -> dict:
+    """Synthesize one narration chunk into the chunk cache (cached chunks are left alone)."""
+    simulate = payload.get("simulate", False)
+    cache = AudioChunkCache(config.audio_chunks_dir / "simulated" if simulate else config.audio_chunks_dir)
+    text, voice_id, model_id = payload["text"], payload["voice_id"], payload["model_id"]
+    timestamps = payload["timestamps"]
+    key = cache.key(text, voice_id, model_id, timestamps)
+    if cache.get(key) is None:
+        client = elevenlabs_client(config.elevenlabs_api_key, simulate)
+        cache.put(key, *synthesize_chunk(client, text, voice_id, model_id, 0.0, timestamps))
+    return {"chunk": key}
+
+
+def run_llm_job(config: Config, payload: dict) -> dict:
+    """Run one Gemini step script in this process."""
+    command = LLM_STEPS[payload["step"]][0]
+    args = ["--simulate"] if payload.get("simulate") else []
+    command.main(args=args, standalone_mode=False)
+    return {"step": payload["step"]}
+
+
+HANDLERS: dict[str, Callable[[Config, dict], dict]] = {
+    "sora": run_sora_job,
+    "tts": run_tts_job,
+    "llm": run_llm_job,
+}
+
+
+class Lease:
+    """Heartbeat a claimed job from a background thread while it runs."""
+
+    def __init__(self, broker, job: Job, worker: str, interval: float):
+        self.broker = broker
+        self.job = job
+        self.worker = worker
+        self.interval = interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.interval):
+            if not self.broker.heartbeat(self.job.id, self.worker):
+                self.lost = True
+                log.warning("Lease lost; job was requeued", extra={"job": self.job.id, "worker": self.worker})
+                return
+
+    def __enter__(self) -> "Lease":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def work(
+    broker,
+    config: Config,
+    worker: str,
+    kinds: tuple[str, ...] = JOB_KINDS,
+    max_jobs: int | None = None,
+    idle_exit: float | None = None,
+    poll: float = 1.0,
+) -> int:
+    """Claim and run jobs until ``max_jobs`` are done or the queue stays empty ``idle_exit`` seconds."""
+    broker.register_worker(worker, socket.gethostname(), os.getpid())
+    finished = 0
+    idle_since = time.monotonic()
+    while max_jobs is None or finished < max_jobs:
+        broker.register_worker(worker, socket.gethostname(), os.getpid())
+        job = broker.claim(worker, kinds)
+        if job is None:
+            if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                break
+            time.sleep(poll)
+            continue
+
+        log.info("Running job", extra={"job": job.id, "kind": job.kind, "attempt": job.attempts})
+        with Lease(broker, job, worker, max(0.1, broker.lease_seconds / 3)):
+            try:
+                with use_config(config):
+                    result = HANDLERS[job.kind](config, job.payload)
+            except (KeyboardInterrupt, SystemExit):
+                broker.fail(job.id, worker, "worker stopped")
+                raise
+            except Exception as exc:  # noqa: BLE001 - any job failure goes back to the queue
+                message = exc.format_message() if isinstance(exc, click.ClickException) else str(exc)
+                log.exception("Job failed", extra={"job": job.id, "kind": job.kind})
+                state = broker.fail(job.id, worker, message or type(exc).__name__)
+                console.print(f"[red]✗ {job.kind} job {job.id[:8]} failed ({state}): {message}[/red]")
+                idle_since = time.monotonic()
+                continue
+        broker.complete(job.id, worker, result)
+        console.print(f"[green]✓ {job.kind} job {job.id[:8]} done[/green]")
+        finished += 1
+        idle_since = time.monotonic()
+    return finished
+
+
+@click.command()
+@click.option(
+    "--broker", "-b", "broker_url",
+    type=str, default=None,
+    help="Queue URL or SQLite path (default: WORK_QUEUE_URL, else data/work-queue.sqlite)"
+)
+@click.option(
+    "--kind", "-k", "kinds",
+    type=click.Choice(JOB_KINDS), multiple=True,
+    help="Only run these job kinds (default: all)"
+)
+@click.option(
+    "--worker-id",
+    type=str, default=None,
+    help="Name reported to the coordinator (default: host:pid)"
+)
+@click.option(
+    "--max-jobs",
+    type=int, default=None,
+    help="Exit after this many finished jobs"
+)
+@click.option(
+    "--idle-exit",
+    type=float, default=None,
+    help="Exit once the queue has been empty this many seconds (default: keep polling)"
+)
+def main(
+    broker_url: str | None,
+    kinds: tuple,
+    worker_id: str | None,
+    max_jobs: int | None,
+    idle_exit: float | None,
+):
+    """Run jobs from the campaign work queue."""
+    config = get_config()
+    try:
+        broker = open_broker(broker_url or config.work_queue_url or config.work_queue_db, config.work_queue_lease)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+    worker = worker_id or worker_name()
+    console.print(f"[bold]Worker {worker}[/bold] on {broker_url or config.work_queue_url or config.work_queue_db}")
+    # A stopped worker hands its current job back instead of waiting out the lease
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        finished = work(broker, config, worker, kinds or JOB_KINDS, max_jobs, idle_exit)
+    finally:
+        broker.remove_worker(worker)
+    console.print(f"[green]Worker {worker} finished {finished} job(s)[/green]")
+
+
+if __name__ == "__main__":
+    main()
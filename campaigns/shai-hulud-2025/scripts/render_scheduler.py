@@ -0,0 +1,187 @@
+"""
+Longest-job-first scheduling for Sora scene renders.
+
+With a fixed number of concurrent render slots, submitting the longest jobs
+first (LPT) keeps one long scene from being the last thing running. Expected
+render time comes from historical per-duration timings, falling back to a
+simple linear model until history exists. Scenes may carry an integer
+``priority`` hint in the shotlist; higher priorities are always submitted
+first, and LPT ordering applies within each priority tier.
+
+The history file is shared by every campaign and step that renders; saves
+merge this run's samples into what is on disk, under a lock.
+
+Usage:
+    from render_scheduler import RenderHistory, schedule_scenes, projected_makespan
+    history = RenderHistory.load(config.render_history_json)
+    plan = schedule_scenes(scenes, history)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked read-modify-write
+    fcntl = None
+
+# Fallback model until real timings are recorded: queue/setup + per-second cost
+DEFAULT_BASE_SECONDS = 60.0
+DEFAULT_SECONDS_PER_CLIP_SECOND = 12.0
+
+
+@dataclass
+class ScheduledScene:
+    """A scene paired with its expected render time."""
+
+    scene: dict
+    duration: int
+    priority: int
+    expected_seconds: float
+
+    @property
+    def scene_id(self) -> str:
+        return self.scene.get("id", "unknown")
+
+
+def _fold(entry: dict, count: int, mean_seconds: float) -> None:
+    """Merge ``count`` samples with the given mean into a per-duration entry."""
+    total = entry["count"] + count
+    if total:
+        entry["mean_seconds"] += (mean_seconds - entry["mean_seconds"]) * count / total
+    entry["count"] = total
+
+
+def _read_timings(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Serialize read-merge-write of the shared history across processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_name(f".{path.name}.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class RenderHistory:
+    """Running mean of observed render times per clip duration."""
+
+    def __init__(self, path: Path | None = None, timings: dict | None = None):
+        self.path = path
+        self.timings: dict[str, dict] = timings or {}
+        # Samples recorded since load/save, merged into the file on save
+        self._unsaved: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "RenderHistory":
+        return cls(path, _read_timings(path))
+
+    def record(self, duration: int, seconds: float) -> None:
+        """Fold one observed render time into the per-duration mean."""
+        with self._lock:
+            for timings in (self.timings, self._unsaved):
+                _fold(timings.setdefault(str(int(duration)), {"count": 0, "mean_seconds": 0.0}), 1, seconds)
+
+    def estimate(self, duration: int) -> float:
+        """Expected render time for a clip of the given duration."""
+        entry = self.timings.get(str(int(duration)))
+        if entry and entry["count"]:
+            return entry["mean_seconds"]
+
+        # Scale from observed durations: mean seconds per clip-second
+        observed = [(int(d), e["mean_seconds"]) for d, e in self.timings.items() if e.get("count")]
+        if observed:
+            rate = sum(seconds for _, seconds in observed) / sum(d for d, _ in observed)
+            return rate * duration
+
+        return DEFAULT_BASE_SECONDS + DEFAULT_SECONDS_PER_CLIP_SECOND * duration
+
+    def save(self) -> None:
+        """Merge this run's samples into the file, keeping samples other runs saved meanwhile."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, _locked(self.path):
+            timings = _read_timings(self.path)
+            for duration, sample in self._unsaved.items():
+                _fold(timings.setdefault(duration, {"count": 0, "mean_seconds": 0.0}), **sample)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(timings, fh, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+            self.timings, self._unsaved = timings, {}
+
+
+class RateLimiter:
+    """Space job starts ``interval`` seconds apart across threads and tasks, without holding a render slot."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def _delay(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+            return start - now
+
+    def wait(self) -> None:
+        time.sleep(self._delay())
+
+    async def await_turn(self) -> None:
+        await asyncio.sleep(self._delay())
+
+
+def schedule_scenes(
+    scenes: Iterable[dict],
+    history: RenderHistory,
+    max_duration: int = 20,
+) -> list[ScheduledScene]:
+    """Order scenes by priority tier, then longest expected render first."""
+    plan = []
+    for scene in scenes:
+        duration = min(int(scene.get("duration_seconds", 10)), max_duration)
+        plan.append(ScheduledScene(
+            scene=scene,
+            duration=duration,
+            priority=int(scene.get("priority", 0)),
+            expected_seconds=history.estimate(duration),
+        ))
+
+    # sorted() is stable, so equal jobs keep shotlist order
+    return sorted(plan, key=lambda job: (-job.priority, -job.expected_seconds))
+
+
+def projected_makespan(expected: Sequence[float], workers: int) -> float:
+    """Wall-clock for list scheduling of jobs, in order, onto N workers."""
+    if not expected:
+        return 0.0
+    slots = [0.0] * max(1, min(workers, len(expected)))
+    for seconds in expected:
+        start = heapq.heappop(slots)
+        heapq.heappush(slots, start + seconds)
+    return max(slots)
@@ -0,0 +1,260 @@
+"""
+Rough-cut assembly: shotlist timing + voiceover -> one reviewable MP4.
+
+The narration timeline is cut into one segment per scene, running from the
+scene's cue to the next scene's cue (black slate before the first cue and
+for scenes without a clip). Segments are joined with the ffmpeg concat
+demuxer and the voiceover is muxed in, all stream-copied.
+
+Each segment is cut on its own:
+    - copy    the clip already matches the cut's format (codec, size, frame
+              rate, pixel format, time base, profile) and is long enough;
+              its first N seconds are stream-copied
+    - encode  format differs or the clip is too short; re-encoded to the cut's
+              format, holding the last frame
+    - slate   no clip; black frames
+
+Segments are stored under a key of (clip hash, frame count, format, mode),
+so changing one scene rewrites only that segment and an unchanged timeline
+is not re-muxed at all.
+
+Layout:
+    <campaign>/video/rough-cut/segments/<key>.mp4   cut segments
+    <campaign>/video/rough-cut/segments.txt          concat demuxer list
+    <campaign>/video/rough-cut/cut.json              timeline and key of the last cut
+    <campaign>/video/rough-cut/rough-cut.mp4         the rough cut
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from fractions import Fraction
+from pathlib import Path
+
+from clip_previews import PreviewCache, indexed_sha, load_index, write_atomically
+from clip_store import file_sha256
+from logging_utils import get_logger
+
+log = get_logger(__name__)
+
+CUT_VERSION = 2
+CUT_NAME = "rough-cut.mp4"
+
+# ffmpeg encoders for the codecs a cut can be re-encoded to
+ENCODERS = {"h264": "libx264", "hevc": "libx265"}
+# ffprobe profile names -> the encoders' -profile:v values
+ENCODER_PROFILES = {
+    "Constrained Baseline": "baseline", "Baseline": "baseline", "Main": "main", "High": "high",
+    "High 10": "high10", "High 4:2:2": "high422", "High 4:4:4 Predictive": "high444", "Main 10": "main10",
+}
+
+
+@dataclass(frozen=True)
+class CutSpec:
+    """Video format every segment is cut to, so the concat demuxer can copy them."""
+
+    codec: str = "h264"
+    width: int = 1920
+    height: int = 1080
+    fps: float = 30.0
+    pix_fmt: str = "yuv420p"
+    # Copied segments keep their clip's track timescale and profile, so encoded ones must match them
+    time_base: str | None = "1/15360"
+    profile: str | None = "High"
+
+    @property
+    def encoder(self) -> str:
+        return ENCODERS[self.codec]
+
+    @property
+    def encoder_profile(self) -> str | None:
+        return ENCODER_PROFILES.get(self.profile)
+
+    @property
+    def timescale(self) -> int | None:
+        """The mp4 track timescale for ``time_base`` (1/15360 -> 15360)."""
+        if not self.time_base:
+            return None
+        time_base = Fraction(self.time_base)
+        return time_base.denominator if time_base.numerator == 1 else None
+
+    def matches(self, meta: dict) -> bool:
+        return (
+            meta.get("video_codec") == self.codec
+            and (meta.get("width"), meta.get("height")) == (self.width, self.height)
+            and abs((meta.get("fps") or 0) - self.fps) < 0.01
+            and meta.get("pix_fmt", self.pix_fmt) in (None, self.pix_fmt)
+            and meta.get("time_base") == self.time_base
+            and meta.get("profile") == self.profile
+        )
+
+
+@dataclass
+class Segment:
+    """One span of the narration timeline."""
+
+    scene_id: str
+    start_frame: int
+    frames: int
+    clip: Path | None = None
+    clip_sha: str | None = None
+    mode: str = "slate"
+    key: str = ""
+
+    def duration(self, spec: CutSpec) -> float:
+        return self.frames / spec.fps
+
+
+def choose_spec(metas: list[dict]) -> CutSpec:
+    """The most common encodable clip format, so most segments are copied."""
+    formats = Counter(
+        (m["video_codec"], m["width"], m["height"], m["fps"], m.get("pix_fmt") or "yuv420p",
+         m.get("time_base"), m.get("profile"))
+        for m in metas
+        if m.get("video_codec") in ENCODERS and m.get("width") and m.get("height") and m.get("fps")
+    )
+    if not formats:
+        return CutSpec()
+    return CutSpec(*formats.most_common(1)[0][0])
+
+
+def scene_spans(scenes: list[dict], audio_seconds: float) -> list[tuple[str, float, float]]:
+    """(scene id, start, end) covering the narration, in timeline order.
+
+    Scenes timed from the voiceover (``start_seconds``) run to the next timed
+    scene; untimed shotlists are laid end to end by ``duration_seconds``.
+    A gap before the first scene is returned as a ``"slate"`` span.
+    """
+    timed = sorted((s for s in scenes if s.get("start_seconds") is not None), key=lambda s: s["start_seconds"])
+    if timed:
+        starts = [(s.get("id", "unknown"), float(s["start_seconds"])) for s in timed]
+    else:
+        starts, cursor = [], 0.0
+        for scene in scenes:
+            starts.append((scene.get("id", "unknown"), cursor))
+            cursor += float(scene.get("duration_seconds", 10))
+        audio_seconds = max(audio_seconds, cursor)
+
+    spans = []
+    if not starts or starts[0][1] > 0:
+        spans.append(("slate", 0.0, starts[0][1] if starts else audio_seconds))
+    for position, (scene_id, start) in enumerate(starts):
+        end = starts[position + 1][1] if position + 1 < len(starts) else max(audio_seconds, start)
+        spans.append((scene_id, start, end))
+    return spans
+
+
+def plan_segments(
+    scenes: list[dict],
+    audio_seconds: float,
+    video_dir: Path,
+    tools,
+    cache: PreviewCache,
+    previews_dir: Path,
+) -> tuple[CutSpec, list[Segment]]:
+    """Choose the cut format and each segment's clip, mode and cache key.
+
+    Clip metadata comes from the preview index when it is current, else from
+    ffprobe (cached by clip hash next to the previews).
+    """
+    indexed = load_index(previews_dir).get("clips", {})
+    metas: dict[str, dict] = {}
+    for scene_id, _, _ in scene_spans(scenes, audio_seconds):
+        clip = video_dir / f"{scene_id}.mp4"
+        if scene_id == "slate" or not clip.exists():
+            continue
+        sha = indexed_sha(clip, indexed.get(clip.name))
+        meta, _ = cache.probe(clip, sha, tools)
+        metas[scene_id] = {**meta, "sha256": sha}
+
+    spec = choose_spec(list(metas.values()))
+    segments = []
+    for scene_id, start, end in scene_spans(scenes, audio_seconds):
+        start_frame = round(start * spec.fps)
+        frames = round(end * spec.fps) - start_frame
+        if frames <= 0:
+            continue
+        segment = Segment(scene_id, start_frame, frames)
+        meta = metas.get(scene_id)
+        if meta:
+            segment.clip, segment.clip_sha = video_dir / f"{scene_id}.mp4", meta["sha256"]
+            long_enough = meta.get("duration_seconds", 0) + 0.5 / spec.fps >= segment.duration(spec)
+            segment.mode = "copy" if spec.matches(meta) and long_enough else "encode"
+        payload = json.dumps([CUT_VERSION, segment.clip_sha, frames, asdict(spec), segment.mode])
+        segment.key = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+        segments.append(segment)
+    return spec, segments
+
+
+def assemble(
+    spec: CutSpec,
+    segments: list[Segment],
+    audio: Path,
+    cut_dir: Path,
+    tools,
+    workers: int = 4,
+    force: bool = False,
+) -> dict:
+    """Cut missing segments on a bounded pool, then concat them with the narration.
+
+    Returns counts of segments reused and written per mode, and whether the
+    final mux ran. Raises MediaToolError if any segment or the mux fails.
+    """
+    segments_dir = cut_dir / "segments"
+    segments_dir.mkdir(parents=True, exist_ok=True)
+    output, state_path = cut_dir / CUT_NAME, cut_dir / "cut.json"
+
+    def cut(segment: Segment) -> str:
+        dest = segments_dir / f"{segment.key}.mp4"
+        if dest.exists() and not force:
+            return "reused"
+        duration = segment.duration(spec)
+        if segment.mode == "copy":
+            write_atomically(dest, lambda tmp: tools.copy_segment(segment.clip, tmp, duration))
+        else:
+            write_atomically(dest, lambda tmp: tools.encode_segment(segment.clip, tmp, duration, spec))
+        log.info("Segment cut", extra={"scene": segment.scene_id, "mode": segment.mode, "seconds": round(duration, 3)})
+        return segment.mode
+
+    # Each job is an ffmpeg subprocess, so threads bound the number of processes
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(cut, segments))
+    counts = dict(Counter(results))
+
+    live = {f"{segment.key}.mp4" for segment in segments}
+    for stale in segments_dir.glob("*.mp4"):
+        if stale.name not in live:
+            stale.unlink()
+
+    audio_sha = file_sha256(audio)
+    cut_key = hashlib.sha256(json.dumps([[s.key for s in segments], audio_sha]).encode("utf-8")).hexdigest()
+    previous = {}
+    if state_path.exists():
+        try:
+            previous = json.loads(state_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            previous = {}
+
+    counts["muxed"] = force or previous.get("key") != cut_key or not output.exists()
+    if counts["muxed"]:
+        segment_list = cut_dir / "segments.txt"
+        segment_list.write_text(
+            "".join(f"file 'segments/{segment.key}.mp4'\n" for segment in segments), encoding="utf-8",
+        )
+        write_atomically(output, lambda tmp: tools.concat(segment_list, audio, tmp))
+        state = {
+            "version": CUT_VERSION,
+            "key": cut_key,
+            "spec": asdict(spec),
+            "segments": [
+                {"scene": s.scene_id, "start_seconds": round(s.start_frame / spec.fps, 3),
+                 "duration_seconds": round(s.duration(spec), 3), "mode": s.mode, "key": s.key}
+                for s in segments
+            ],
+        }
+        state_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    return counts
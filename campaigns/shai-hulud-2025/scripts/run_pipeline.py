@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Run the whole pipeline in one event loop with overlapping stages.
+
+The long-form script is streamed from Gemini. As soon as a chapter's
+section is complete it goes to narration (ElevenLabs) and to shotlist
+planning for that chapter, and each planned scene is submitted to Sora
+straight away, all while later chapters are still being written. Shorts
+start once the script is complete. End-to-end time approaches the slowest
+stage instead of the sum of all stages.
+
+The outputs are the same files the step scripts write (outline, script,
+shorts, shotlist, voiceover + timing index, clips), and each stage is
+recorded in the campaign manifest, so single steps can be re-run afterwards.
+Narration chunks land in the same chunk cache ``generate_audio`` uses.
+
+Streaming trade-offs:
+    - scenes are planned one chapter at a time, with ids ``<chapter>_scene_NNN``
+    - clips render at the planned durations; voiceover cue timings are written
+      into shotlist.json once narration finishes
+    - longest-first submission applies within each chapter's scenes
+
+Usage:
+    python run_pipeline.py --simulate
+    python run_pipeline.py --minutes 12 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.panel import Panel
+
+from chapters import build_chapter_state, chapter_id, chapter_state_path, clear_stale, generation_hash
+from clients import async_elevenlabs_client, async_openai_client, cassette_replaying
+from clip_store import ClipStore
+from audio_chunks import AudioChunkCache
+from config import Config, get_config
+from events import get_emitter, step_events
+from generate_audio import (
+    MAX_CHARS,
+    TTS_CONCURRENCY,
+    asynthesize_chunks,
+    clean_script_for_tts,
+    split_into_chunks,
+    write_narration,
+)
+from generate_outline import agenerate_outline
+from generate_script import astream_script
+from generate_shorts import agenerate_shorts
+from generate_shotlist import agenerate_shotlist
+from generate_sora_clips import CLIP_RETRIES, RATE_LIMIT_SECONDS, agenerate_sora_clip
+from intel_index import retrieve_intel
+from logging_utils import get_logger
+from manifest import manifest_step, record_step
+from profiling import profile_step
+from render_scheduler import RateLimiter, RenderHistory, schedule_scenes
+from timing_index import apply_timing_to_shotlist, build_timing_index, find_broll_cues, timing_index_path
+
+console = Console()
+log = get_logger(__name__)
+
+# The step scripts ask for 8-12 scenes per video; split that across chapters
+TARGET_SCENES = 10
+
+
+def scene_range(chapter_count: int) -> str:
+    """DESIRED_SCENES for one chapter's shotlist request."""
+    per_chapter = max(1, round(TARGET_SCENES / max(1, chapter_count)))
+    return f"{max(1, per_chapter - 1)}-{per_chapter + 1}"
+
+
+def chapter_scenes(chapter: str, shotlist: dict) -> list[dict]:
+    """A chapter's planned scenes with ids unique across the whole shotlist."""
+    return [
+        {**scene, "id": f"{chapter}_scene_{n:03d}", "chapter": chapter}
+        for n, scene in enumerate(shotlist.get("scenes", []), start=1)
+    ]
+
+
+class StreamingPipeline:
+    """One campaign run with every stage fed as soon as its input is ready."""
+
+    def __init__(self, config: Config, simulate: bool, minutes: int, aspect_ratio: str, concurrency: int,
+                 clip_store: bool = True):
+        self.config = config
+        self.simulate = simulate
+        self.minutes = minutes
+        self.aspect_ratio = aspect_ratio
+        self.events = get_emitter()
+
+        self.tts = async_elevenlabs_client(config.elevenlabs_api_key, simulate)
+        self.tts_limit = asyncio.Semaphore(TTS_CONCURRENCY)
+        self.chunk_cache = AudioChunkCache(config.audio_chunks_dir / "simulated" if simulate else config.audio_chunks_dir)
+
+        self.sora = async_openai_client(config.openai_api_key, simulate)
+        self.sora_limit = asyncio.Semaphore(concurrency)
+        self.pacer = RateLimiter(0.1 if simulate else RATE_LIMIT_SECONDS)
+        # Same namespaces as generate_sora_clips: fake renders never reach real history or store
+        self.history = RenderHistory() if simulate else RenderHistory.load(config.render_history_json)
+        self.store = None
+        if clip_store:
+            self.store = ClipStore(config.clip_store_dir / "simulated" if simulate else config.clip_store_dir)
+
+        self.renders: list[asyncio.Task] = []
+        self.rendered = 0
+        self.started = time.monotonic()
+        self.stage_started: dict[str, tuple[float, float]] = {}
+        self.stage_seconds: dict[str, tuple[float, float]] = {}  # (first start, finish) from run start
+
+    async def run(self) -> dict:
+        config = self.config
+        outline = await self.outline()
+        chapters = outline.get("chapters", [])
+        per_chapter = scene_range(len(chapters))
+
+        # Script parts: the preamble, then one section per chapter as each completes
+        self._start("script")
+        intel = retrieve_intel(config, json.dumps(chapters))
+        parts: list[str] = []
+        narration: list[asyncio.Task] = []
+        planning: list[asyncio.Task] = []
+        async for part in astream_script(
+            outline, config.prompt_script.read_text(encoding="utf-8"),
+            config.prompt_voice_style.read_text(encoding="utf-8"), self.minutes,
+            config.gemini_api_key, config.gemini_model, config.gemini_temperature, config.gemini_top_p,
+            self.simulate, intel,
+        ):
+            position = len(parts)
+            parts.append(part)
+            log.info("Script part finished", extra={"part": position, "chars": len(part)})
+            self._start("audio")
+            narration.append(asyncio.create_task(self.narrate(part)))
+            if position > 0:
+                self._start("shotlist")
+                chapter = chapter_id(chapters[position - 1] if position <= len(chapters) else {}, position - 1)
+                planning.append(asyncio.create_task(self.plan(chapter, part, per_chapter)))
+        script = "".join(parts)
+        self.write_script(script, outline)
+
+        shorts = asyncio.create_task(self.shorts(script))
+        index = self.write_audio(await asyncio.gather(*narration), script)
+        self.write_shotlist([scene for scenes in await asyncio.gather(*planning) for scene in scenes], index)
+        await shorts
+        clips = await asyncio.gather(*self.renders)
+        self.finish_sora(clips)
+        return self.stage_seconds
+
+    def _start(self, stage: str) -> None:
+        self.stage_started.setdefault(stage, (time.time(), time.monotonic()))
+
+    def _finish(self, stage: str, artifacts: list[Path]) -> None:
+        """Record a finished stage in the manifest and the run timeline."""
+        started_at, started = self.stage_started[stage]
+        finished = time.monotonic()
+        self.stage_seconds[stage] = (started - self.started, finished - self.started)
+        for path in artifacts:
+            self.events.artifact(path)
+        try:
+            record_step(
+                self.config.campaign_root, stage, True, started_at, finished - started, artifacts,
+                config_fingerprint=self.config.fingerprint,
+            )
+        except OSError as exc:
+            log.warning("Could not update campaign manifest", extra={"error": str(exc)})
+        log.info("Stage finished", extra={"stage": stage, "seconds": round(finished - self.started, 2)})
+
+    async def outline(self) -> dict:
+        config = self.config
+        self._start("outline")
+        prompt_template = config.prompt_outline.read_text(encoding="utf-8")
+        news_notes = retrieve_intel(config, prompt_template, exclude=[config.paradigm_doc])
+        outline = await agenerate_outline(
+            config.paradigm_doc.read_text(encoding="utf-8"), prompt_template, config.gemini_api_key,
+            config.gemini_model, config.gemini_temperature, config.gemini_top_p, self.simulate, news_notes,
+        )
+        config.outline_json.write_text(json.dumps(outline, indent=2), encoding="utf-8")
+        self._finish("outline", [config.outline_json])
+        return outline
+
+    async def narrate(self, part: str) -> list[tuple]:
+        """Synthesize one script part, chunked exactly like ``generate_audio.chunk_script``."""
+        cleaned = clean_script_for_tts(part)
+        if not cleaned:
+            return []
+        return await asynthesize_chunks(
+            self.tts, split_into_chunks(cleaned, MAX_CHARS), self.config.elevenlabs_voice_id,
+            self.config.elevenlabs_model, True, self.chunk_cache, self.tts_limit,
+        )
+
+    async def plan(self, chapter: str, section: str, desired_scenes: str) -> list[dict]:
+        """Plan one chapter's scenes and submit them to Sora right away."""
+        config = self.config
+        shotlist = await agenerate_shotlist(
+            section, config.prompt_shotlist.read_text(encoding="utf-8"), self.aspect_ratio,
+            config.gemini_api_key, config.gemini_model, config.gemini_temperature, config.gemini_top_p,
+            self.simulate, desired_scenes=desired_scenes,
+        )
+        scenes = chapter_scenes(chapter, shotlist)
+        for job in schedule_scenes(scenes, self.history):
+            self.renders.append(asyncio.create_task(self.render(job.scene)))
+        log.info("Chapter planned", extra={"chapter": chapter, "scenes": len(scenes)})
+        return scenes
+
+    async def render(self, scene: dict) -> Path | None:
+        config = self.config
+        clip = None
+        # A failed or corrupt clip goes back in the queue, as in generate_sora_clips
+        for _ in range(CLIP_RETRIES + 1):
+            await self.pacer.await_turn()  # rate limiting, as in generate_sora_clips
+            async with self.sora_limit:
+                self._start("sora")
+                clip = await agenerate_sora_clip(
+                    self.sora, scene, config.video_dir, config.video_resolution, config.sora_model,
+                    self.simulate, self.store, self.history,
+                )
+            if clip or not scene.get("sora_prompt"):
+                break
+            log.warning("Re-queuing scene", extra={"scene": scene.get("id")})
+        self.rendered += 1
+        self.events.progress(self.rendered, len(self.renders), unit="scene", scene=scene.get("id"), ok=bool(clip))
+        return clip
+
+    async def shorts(self, script: str) -> None:
+        config = self.config
+        self._start("shorts")
+        shorts = await agenerate_shorts(
+            script, config.prompt_shorts.read_text(encoding="utf-8"), config.gemini_api_key,
+            config.gemini_model, config.gemini_temperature, config.gemini_top_p, self.simulate,
+        )
+        config.shorts_scripts.write_text(shorts, encoding="utf-8")
+        self._finish("shorts", [config.shorts_scripts])
+
+    def write_script(self, script: str, outline: dict) -> None:
+        config = self.config
+        config.script_longform.write_text(script, encoding="utf-8")
+        state_path = chapter_state_path(config.script_longform)
+        generation = generation_hash(
+            config.prompt_script.read_text(encoding="utf-8"), config.prompt_voice_style.read_text(encoding="utf-8"),
+            config.gemini_model, config.gemini_temperature, config.gemini_top_p,
+        )
+        state = build_chapter_state(outline, self.minutes, generation)
+        state_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        # Everything downstream is regenerated in this run
+        clear_stale(config.stale_json, "chapters")
+        clear_stale(config.stale_json, "scenes")
+        self._finish("script", [config.script_longform])
+
+    def write_audio(self, narration: list[list[tuple]], script: str) -> dict:
+        config = self.config
+        timing = write_narration([chunk for part in narration for chunk in part], config.voiceover_mp3)
+        cues = find_broll_cues(script, clean_script_for_tts)
+        index = build_timing_index(timing["words"], timing["duration_seconds"], cues, timing["source"])
+        index_path = timing_index_path(config.voiceover_mp3)
+        index_path.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+        self._finish("audio", [config.voiceover_mp3, index_path])
+        return index
+
+    def write_shotlist(self, scenes: list[dict], index: dict) -> None:
+        config = self.config
+        # Same formats record as generate_shotlist, so renders plan against the same ratios
+        shotlist = {"formats": {"longform": self.aspect_ratio, "shorts": config.shorts_aspect_ratio}, "scenes": scenes}
+        apply_timing_to_shotlist(shotlist, index)
+        config.shotlist_json.write_text(json.dumps(shotlist, indent=2), encoding="utf-8")
+        self._finish("shotlist", [config.shotlist_json])
+
+    def finish_sora(self, clips: list[Path | None]) -> None:
+        self.history.save()
+        if self.store:
+            self.store.record_run()
+        self._start("sora")  # no scenes planned: an empty stage
+        self._finish("sora", [clip for clip in clips if clip])
+
+
+@click.command()
+@step_events("pipeline", console)
+@manifest_step("pipeline")
+@profile_step("pipeline")
+@click.option(
+    "--minutes", "-m",
+    type=int, default=12,
+    help="Target video length in minutes"
+)
+@click.option(
+    "--aspect-ratio", "-a",
+    type=str, default=None,
+    help="Long-form aspect ratio (default: video_aspect_ratio)"
+)
+@click.option(
+    "--concurrency", "-c",
+    type=int, default=None,
+    help="Concurrent render jobs (default: SORA_CONCURRENCY)"
+)
+@click.option(
+    "--clip-store/--no-clip-store", default=True,
+    help="Reuse identical renders from the shared clip store"
+)
+@click.option(
+    "--dry-run", is_flag=True,
+    help="Show the stage plan without calling APIs"
+)
+@click.option(
+    "--simulate", is_flag=True,
+    help="Use fake adapters instead of real API"
+)
+def main(
+    minutes: int,
+    aspect_ratio: str | None,
+    concurrency: int | None,
+    clip_store: bool,
+    dry_run: bool,
+    simulate: bool,
+):
+    """Run outline → script → audio/shotlist/sora/shorts with overlapping stages."""
+
+    config = get_config()
+    concurrency = max(1, concurrency or config.sora_concurrency)
+    aspect_ratio = aspect_ratio or config.video_aspect_ratio
+
+    if not dry_run and not simulate and not cassette_replaying():
+        missing = [
+            name for name, value in (
+                ("GEMINI_API_KEY", config.gemini_api_key),
+                ("ELEVENLABS_API_KEY", config.elevenlabs_api_key),
+                ("ELEVENLABS_VOICE_ID", config.elevenlabs_voice_id),
+                ("OPENAI_API_KEY", config.openai_api_key),
+            ) if not value
+        ]
+        if missing:
+            console.print(f"[red]Error: {', '.join(missing)} not set[/red]")
+            raise click.Abort()
+
+    missing_files = config.require_files([
+        config.paradigm_doc, config.prompt_outline, config.prompt_script, config.prompt_voice_style,
+        config.prompt_shorts, config.prompt_shotlist,
+    ])
+    if missing_files:
+        for path in missing_files:
+            console.print(f"[red]Missing file: {path}[/red]")
+        raise click.Abort()
+
+    console.print(Panel.fit(
+        f"[bold]Streaming Pipeline[/bold]\n\n"
+        f"Threat Doc: {config.paradigm_doc}\n"
+        f"Target: {minutes} minutes, {aspect_ratio}\n"
+        f"Sora concurrency: {concurrency}, TTS concurrency: {TTS_CONCURRENCY}",
+        title="Shai-Hulud Pipeline"
+    ))
+
+    if dry_run:
+        console.print("\n[yellow]DRY RUN - Stage plan:[/yellow]")
+        console.print("  1. outline")
+        console.print("  2. script, streamed; each finished chapter starts:")
+        console.print("       audio chunks for that chapter")
+        console.print("       shotlist for that chapter → Sora renders for its scenes")
+        console.print("  3. shorts once the script is complete")
+        return
+
+    if simulate:
+        console.print("[bold yellow]Running in SIMULATION mode[/bold yellow]")
+    config.ensure_dirs()
+    config.video_dir.mkdir(parents=True, exist_ok=True)
+
+    pipeline = StreamingPipeline(config, simulate, minutes, aspect_ratio, concurrency, clip_store)
+    timeline = asyncio.run(pipeline.run())
+
+    total = max(finish for _, finish in timeline.values())
+    serial = sum(finish - start for start, finish in timeline.values())
+    log.info("Pipeline makespan", extra={"seconds": round(total, 1), "stage_seconds_sum": round(serial, 1)})
+
+    console.print("\n[green]✓ Pipeline complete[/green]")
+    for stage, (start, finish) in sorted(timeline.items(), key=lambda item: item[1]):
+        console.print(f"  {stage:<9} {start:6.1f}s → {finish:6.1f}s")
+    console.print(f"  End to end: {total:.1f}s (stages back to back: {serial:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
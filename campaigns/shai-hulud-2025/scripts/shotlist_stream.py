@@ -0,0 +1,225 @@
+"""
+Read shotlists scene by scene, without holding the whole file in memory.
+
+Two formats are read:
+
+    shotlist.json   the usual ``{"scenes": [...], "formats": {...}}`` document,
+                    parsed incrementally; only one scene is decoded at a time
+    shotlist.jsonl  append-only, one JSON object per line. Objects with an
+                    ``id`` are scenes, any other object is shotlist metadata
+                    (``{"formats": {...}}``). A scene appended again with the
+                    same id replaces the earlier line, in its original position.
+
+``generate_shotlist --jsonl`` writes the JSONL form. Once it exists and is at
+least as new as ``shotlist.json``, ``shotlist_source`` picks it, so every step
+reading the shotlist follows the campaign to the newer file. Rewrites of a
+JSONL shotlist (``--stale-only``, the voiceover timing sync) append only the
+scenes that changed.
+
+Usage:
+    from shotlist_stream import append_scenes, iter_scenes, read_meta, shotlist_source, windows
+    path = shotlist_source(config.shotlist_json)
+    formats = read_meta(path).get("formats", {})
+    for window in windows(iter_scenes(path, scene_ids={"scene_004"}, offset=200), 64):
+        ...
+    append_scenes(Path("shotlist.jsonl"), new_scenes, meta={"formats": formats})
+"""
+
+from __future__ import annotations
+
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Characters read from disk at a time
+CHUNK_SIZE = 1 << 16
+
+_DECODER = json.JSONDecoder()
+
+
+class _JSONStream:
+    """Just enough of a pull parser to walk one object's keys and one array's items."""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        chunk = self.handle.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, left unconsumed ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in shotlist, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more only as far as it needs."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A value ending exactly at the buffer edge may continue (e.g. a number)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def _json_entries(path: Path) -> Iterator[tuple[str, Any]]:
+    with path.open(encoding="utf-8") as handle:
+        stream = _JSONStream(handle)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "scenes" and stream.peek() == "[":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield "scenes", stream.value()
+                        if stream.peek() != ",":
+                            stream.expect("]")
+                            break
+                        stream.pos += 1
+            else:
+                yield key, stream.value()
+            if stream.peek() != ",":
+                stream.expect("}")
+                return
+            stream.pos += 1
+
+
+def _lines(handle) -> Iterator[tuple[int, bytes]]:
+    """(byte offset, line) pairs of a binary file."""
+    offset = handle.tell()
+    for line in iter(handle.readline, b""):
+        yield offset, line
+        offset += len(line)
+
+
+def _jsonl_entries(path: Path) -> Iterator[tuple[str, Any]]:
+    # First pass keeps where each scene id first and last appears, not the scenes
+    first: dict[str, int] = {}
+    newest: dict[str, int] = {}
+    with path.open("rb") as handle:
+        for offset, line in _lines(handle):
+            if line.strip():
+                record = json.loads(line)
+                if "id" in record:
+                    first.setdefault(record["id"], offset)
+                    newest[record["id"]] = offset
+    # Second pass: each scene at its first position, with its newest content
+    with path.open("rb") as handle, path.open("rb") as lookup:
+        for offset, line in _lines(handle):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "id" not in record:
+                yield from record.items()
+                continue
+            if first[record["id"]] != offset:
+                continue
+            if newest[record["id"]] != offset:
+                lookup.seek(newest[record["id"]])
+                record = json.loads(lookup.readline())
+            yield "scenes", record
+
+
+def shotlist_entries(path: Path) -> Iterator[tuple[str, Any]]:
+    """Top-level (key, value) pairs in file order, with one ("scenes", scene) pair per scene."""
+    return _jsonl_entries(path) if path.suffix == ".jsonl" else _json_entries(path)
+
+
+def read_meta(path: Path) -> dict:
+    """Everything in the shotlist except its scenes (formats, stale ids, ...)."""
+    return {key: value for key, value in shotlist_entries(path) if key != "scenes"}
+
+
+def iter_scenes(path: Path, scene_ids: Iterable[str] = (), offset: int = 0) -> Iterator[dict]:
+    """Scenes in shotlist order, optionally only ``scene_ids``, skipping the first ``offset`` of them."""
+    wanted = set(scene_ids)
+    scenes = (value for key, value in shotlist_entries(path) if key == "scenes")
+    if wanted:
+        scenes = (scene for scene in scenes if scene.get("id") in wanted)
+    return islice(scenes, offset, None)
+
+
+def windows(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Consecutive lists of up to ``size`` items."""
+    iterator = iter(items)
+    while window := list(islice(iterator, size)):
+        yield window
+
+
+def append_scenes(path: Path, scenes: Iterable[dict], meta: dict | None = None) -> None:
+    """Append scenes (and an optional metadata line) to a JSONL shotlist."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as handle:
+        if meta:
+            handle.write(json.dumps(meta, separators=(",", ":")) + "\n")
+        for scene in scenes:
+            handle.write(json.dumps(scene, separators=(",", ":")) + "\n")
+
+
+def shotlist_source(json_path: Path) -> Path:
+    """The campaign's current shotlist: the JSONL beside ``json_path`` unless the JSON is newer."""
+    jsonl = json_path.with_suffix(".jsonl")
+    if not jsonl.exists():
+        return json_path
+    if json_path.exists() and json_path.stat().st_mtime_ns > jsonl.stat().st_mtime_ns:
+        return json_path
+    return jsonl
+
+
+def load_shotlist(path: Path) -> dict:
+    """A whole shotlist as one document, from either format."""
+    return {**read_meta(path), "scenes": list(iter_scenes(path))}
+
+
+def write_shotlist(path: Path, shotlist: dict, previous: dict | None = None) -> None:
+    """Save a shotlist in its file's format.
+
+    A JSONL shotlist that ``previous`` was read from gets only the scenes (and
+    metadata) that differ from it appended; anything else is written whole.
+    """
+    meta = {key: value for key, value in shotlist.items() if key != "scenes"}
+    scenes = shotlist.get("scenes", [])
+    if path.suffix != ".jsonl":
+        path.write_text(json.dumps(shotlist, indent=2), encoding="utf-8")
+        return
+    if previous is None or not path.exists():
+        path.unlink(missing_ok=True)
+        append_scenes(path, scenes, meta=meta)
+        return
+    before = {scene.get("id"): scene for scene in previous.get("scenes", [])}
+    changed_meta = {key: value for key, value in meta.items() if previous.get(key) != value}
+    append_scenes(path, [scene for scene in scenes if before.get(scene.get("id")) != scene], meta=changed_meta)
@@ -1,48 +1,188 @@
 """Simulation adapters for offline testing.
 
 These fake clients mimic the external services used by the pipeline so we can
-exercise the workflow without network calls or API keys.
+exercise the workflow without network calls or API keys. The ``FakeAsync*``
+variants mirror the providers' async clients (AsyncElevenLabs, AsyncOpenAI,
+httpx.AsyncClient) for the ``agenerate_*`` functions.
 """
 
+import asyncio
+import base64
+import datetime
+import hashlib
+import struct
+import time
+from types import SimpleNamespace
 from typing import Any, List
 
 
+class FakeUsageMetadata:
+    def __init__(self, prompt_token_count: int, cached_content_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.cached_content_token_count = cached_content_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
 class FakeGeminiResponse:
-    def __init__(self, text: str):
+    def __init__(self, text: str, usage_metadata: FakeUsageMetadata | None = None, latency_seconds: float = 0.0):
         self.text = text
+        self.usage_metadata = usage_metadata
+        self.latency_seconds = latency_seconds
+
+
+class FakeGeminiStream:
+    """Async iterable of response chunks, like ``generate_content_async(stream=True)``.
+
+    The first chunk arrives after the modeled time-to-first-token; the rest
+    trickle in line by line at ``SECONDS_PER_OUTPUT_TOKEN``.
+    """
+
+    SECONDS_PER_OUTPUT_TOKEN = 0.01
+
+    def __init__(self, response: FakeGeminiResponse, latency_scale: float = 0.0):
+        self.text = response.text
+        self.usage_metadata = response.usage_metadata
+        self.latency_seconds = response.latency_seconds
+        self.latency_scale = latency_scale
+
+    async def __aiter__(self):
+        delay = self.latency_seconds
+        for line in self.text.splitlines(keepends=True):
+            if self.latency_scale > 0:
+                await asyncio.sleep(delay * self.latency_scale)
+            delay = fake_token_count(line) * self.SECONDS_PER_OUTPUT_TOKEN
+            yield FakeGeminiResponse(line)
+
+
+def fake_token_count(text: str) -> int:
+    """Rough token estimate (~4 chars/token) used by the fake adapters."""
+    return max(1, len(text) // 4)
 
 
 class FakeGeminiModel:
-    def __init__(self, model_name: str):
+    # Modeled time-to-first-token: cached prefix tokens prefill ~10x faster
+    BASE_LATENCY = 0.25
+    SECONDS_PER_INPUT_TOKEN = 2e-4
+    SECONDS_PER_CACHED_TOKEN = 2e-5
+
+    def __init__(self, model_name: str, cached_prefix: str = "", latency_scale: float = 0.0, generation_config: Any = None):
         self.model_name = model_name
+        self.cached_prefix = cached_prefix
+        self.latency_scale = latency_scale
+        self.generation_config = generation_config
 
     def generate_content(self, prompt: str, generation_config: Any = None) -> FakeGeminiResponse:
+        latency = self._latency(prompt)
+        if self.latency_scale > 0:
+            time.sleep(latency * self.latency_scale)
+        return self._response(prompt, latency)
+
+    async def generate_content_async(self, prompt: str, generation_config: Any = None, stream: bool = False):
+        latency = self._latency(prompt)
+        if stream:
+            return FakeGeminiStream(self._response(prompt, latency), self.latency_scale)
+        if self.latency_scale > 0:
+            await asyncio.sleep(latency * self.latency_scale)
+        return self._response(prompt, latency)
+
+    def _cached_tokens(self) -> int:
+        return fake_token_count(self.cached_prefix) if self.cached_prefix else 0
+
+    def _latency(self, prompt: str) -> float:
+        return (
+            self.BASE_LATENCY
+            + fake_token_count(prompt) * self.SECONDS_PER_INPUT_TOKEN
+            + self._cached_tokens() * self.SECONDS_PER_CACHED_TOKEN
+        )
+
+    def _response(self, prompt: str, latency: float) -> FakeGeminiResponse:
+        cached_tokens = self._cached_tokens()
+        text = self._respond(self.cached_prefix + prompt)
+        usage = FakeUsageMetadata(cached_tokens + fake_token_count(prompt), cached_tokens, fake_token_count(text))
+        return FakeGeminiResponse(text, usage, latency)
+
+    @staticmethod
+    def _respond(prompt: str) -> str:
         if "OUTLINE_JSON" in prompt:
-            return FakeGeminiResponse(
-                "# FAKE SCRIPT\n\n[SCENE START]\n\nNarrator: This is a simulated script generated by the fake adapter.\n\n"
+            return (
+                "# FAKE SCRIPT\n\n[CHAPTER 1 – The Simulation]\n\n[SCENE START]\n\nNarrator: This is a simulated script generated by the fake adapter.\n\n"
                 "[B-ROLL: Cybernetic visual]\n\nNarrator: It works without an internet connection.\n"
             )
         if "threat-to-outline" in prompt or "Paradigm" in prompt:
-            return FakeGeminiResponse(
+            return (
                 "```json\n{\n  \"title\": \"Simulated Campaign\",\n  \"chapters\": [\n    {\n      \"id\": \"chapter_1\",\n      \"title\": \"Chapter 1: The Simulation\",\n      \"scenes\": [\n        {\n          \"id\": \"scene_1\",\n          \"description\": \"A computer screen showing code.\"\n        }\n      ]\n    }\n  ]\n}\n```"
             )
-        if "script-to-shorts" in prompt:
-            return FakeGeminiResponse(
-                "# Short 1\n\nNarrator: This is a simulated short.\n\n# Short 2\n\nNarrator: Another simulated short."
+        if "script-to-shorts" in prompt or "YouTube Shorts scripts" in prompt:
+            return "# Short 1\n\nNarrator: This is a simulated short.\n\n# Short 2\n\nNarrator: Another simulated short."
+        if "SHORTS_SCRIPTS" in prompt:
+            return (
+                "```json\n{\n  \"scenes\": [\n    {\n      \"id\": \"scene_001\",\n      \"description\": \"Opening shot\",\n"
+                "      \"sora_prompt\": \"Cinematic shot of a computer terminal, 16:9, 8k\",\n      \"duration_seconds\": 5,\n"
+                "      \"used_by\": [\"longform\", \"short_1\", \"short_2\"],\n"
+                "      \"variants\": {\"9:16\": {\"sora_prompt\": \"Vertical close-up of a computer terminal, 9:16, 8k\"}}\n"
+                "    }\n  ]\n}\n```"
             )
         if "script-to-shotlist" in prompt or "TARGET_ASPECT_RATIO" in prompt:
-            return FakeGeminiResponse(
+            return (
                 "```json\n{\n  \"scenes\": [\n    {\n      \"id\": \"scene_001\",\n      \"description\": \"Opening shot\",\n      \"sora_prompt\": \"Cinematic shot of a computer terminal, 8k\",\n      \"duration_seconds\": 5\n    }\n  ]\n}\n```"
             )
-        return FakeGeminiResponse("This is generic simulated content from Gemini.")
+        return "This is generic simulated content from Gemini."
+
+
+class FakeCachedContent:
+    """Mimics google.generativeai.caching.CachedContent (process-local store)."""
+
+    _store: dict[str, "FakeCachedContent"] = {}
+
+    def __init__(self, name: str, model: str, text: str, expire_time: datetime.datetime):
+        self.name = name
+        self.model = model
+        self.text = text
+        self.expire_time = expire_time
+        self.usage_metadata = FakeUsageMetadata(fake_token_count(text), 0, 0)
+
+    @classmethod
+    def create(cls, model: str, *, display_name: str | None = None, system_instruction: Any = None,
+               contents: Any = None, ttl: datetime.timedelta | None = None, **kwargs) -> "FakeCachedContent":
+        text = (system_instruction or "") + "".join(contents or [])
+        name = f"cachedContents/sim-{hashlib.sha256((model + text).encode('utf-8')).hexdigest()[:16]}"
+        expires = datetime.datetime.now(datetime.timezone.utc) + (ttl or datetime.timedelta(hours=1))
+        cls._store[name] = cls(name, model, text, expires)
+        return cls._store[name]
+
+    @classmethod
+    def get(cls, name: str) -> "FakeCachedContent":
+        cached = cls._store.get(name)
+        if cached is None or cached.expire_time <= datetime.datetime.now(datetime.timezone.utc):
+            raise LookupError(f"CachedContent not found (or expired): {name}")
+        return cached
+
+
+class _FakeModelFactory:
+    """Callable standing in for genai.GenerativeModel, incl. from_cached_content."""
+
+    def __init__(self, latency_scale: float = 0.0):
+        self.latency_scale = latency_scale
+
+    def __call__(self, model_name: str, generation_config: Any = None) -> FakeGeminiModel:
+        return FakeGeminiModel(model_name, latency_scale=self.latency_scale, generation_config=generation_config)
+
+    def from_cached_content(self, cached_content: Any, generation_config: Any = None) -> FakeGeminiModel:
+        if isinstance(cached_content, str):
+            cached_content = FakeCachedContent.get(cached_content)
+        return FakeGeminiModel(
+            cached_content.model, cached_content.text, self.latency_scale, generation_config,
+        )
 
 
 class FakeGeminiAdapter:
     """Mimics the google.generativeai module shape used by scripts."""
 
-    def __init__(self):
+    def __init__(self, latency_scale: float = 0.0):
         self.GenerationConfig = self._FakeGenerationConfig
-        self.GenerativeModel = FakeGeminiModel
+        self.GenerativeModel = _FakeModelFactory(latency_scale)
+        self.caching = SimpleNamespace(CachedContent=FakeCachedContent)
 
     def configure(self, api_key: str):
         return None
@@ -55,9 +195,26 @@ class FakeGeminiAdapter:
             self.max_output_tokens = max_output_tokens
 
 
+class FakeCharacterAlignment:
+    def __init__(self, characters: List[str], starts: List[float], ends: List[float]):
+        self.characters = characters
+        self.character_start_times_seconds = starts
+        self.character_end_times_seconds = ends
+
+
+class FakeAudioWithTimestamps:
+    def __init__(self, audio_base_64: str, alignment: FakeCharacterAlignment):
+        self.audio_base_64 = audio_base_64
+        self.alignment = alignment
+        self.normalized_alignment = alignment
+
+
 class FakeElevenLabsClient:
     """Lightweight stand-in for ElevenLabs client."""
 
+    # Synthetic speaking rate: ~15 chars/sec is roughly 150 wpm
+    SECONDS_PER_CHAR = 1 / 15
+
     def __init__(self, api_key: str | None = None):
         self.text_to_speech = self.TextToSpeech()
 
@@ -65,6 +222,31 @@ class FakeElevenLabsClient:
         def convert(self, voice_id: str, text: str, model_id: str) -> List[bytes]:
             return [b"FAKE_AUDIO_DATA_" * 10]
 
+        def convert_with_timestamps(self, voice_id: str, text: str, model_id: str) -> FakeAudioWithTimestamps:
+            step = FakeElevenLabsClient.SECONDS_PER_CHAR
+            characters = list(text)
+            starts = [round(i * step, 3) for i in range(len(characters))]
+            ends = [round((i + 1) * step, 3) for i in range(len(characters))]
+            audio = base64.b64encode(b"FAKE_AUDIO_DATA_" * 10).decode("ascii")
+            return FakeAudioWithTimestamps(audio, FakeCharacterAlignment(characters, starts, ends))
+
+
+class FakeAsyncElevenLabsClient:
+    """Stand-in for elevenlabs.AsyncElevenLabs (convert streams, timestamps are awaited)."""
+
+    def __init__(self, api_key: str | None = None):
+        self.text_to_speech = self.TextToSpeech()
+
+    class TextToSpeech:
+        _sync = FakeElevenLabsClient.TextToSpeech()
+
+        async def convert(self, voice_id: str, text: str, model_id: str):
+            for chunk in self._sync.convert(voice_id=voice_id, text=text, model_id=model_id):
+                yield chunk
+
+        async def convert_with_timestamps(self, voice_id: str, text: str, model_id: str) -> FakeAudioWithTimestamps:
+            return self._sync.convert_with_timestamps(voice_id=voice_id, text=text, model_id=model_id)
+
 
 class FakeOpenAIResponse:
     def __init__(self, id: str, status: str, output: List[Any]):
@@ -92,9 +274,50 @@ class FakeOpenAIClient:
             return FakeOpenAIResponse(id=id, status="completed", output=[FakeOpenAIOutput(url="http://fake-url/video.mp4")])
 
 
+class FakeAsyncOpenAIClient:
+    """Stand-in for openai.AsyncOpenAI responses client."""
+
+    def __init__(self, api_key: str | None = None):
+        self.responses = self.Responses()
+
+    class Responses:
+        _sync = FakeOpenAIClient.Responses()
+
+        async def create(self, model: str, input: str, n: int, size: str, duration: int) -> FakeOpenAIResponse:
+            return self._sync.create(model=model, input=input, n=n, size=size, duration=duration)
+
+        async def retrieve(self, id: str) -> FakeOpenAIResponse:
+            return self._sync.retrieve(id)
+
+
+def _mp4_box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", 8 + len(payload)) + kind + payload
+
+
+def fake_mp4_bytes(duration_seconds: float = 5.0) -> bytes:
+    """A tiny structurally valid MP4 (ftyp, moov with mvhd/stco, mdat) with no real frames."""
+    timescale = 1000
+    ftyp = _mp4_box(b"ftyp", b"isom" + struct.pack(">I", 512) + b"isomiso2avc1mp41")
+    mvhd = _mp4_box(b"mvhd", bytes(4) + struct.pack(">IIII", 0, 0, timescale, round(duration_seconds * timescale))
+                    + bytes(80))
+    mdat = _mp4_box(b"mdat", b"FAKE_VIDEO_DATA" * 4)
+
+    def moov(chunk_offset: int) -> bytes:
+        stco = _mp4_box(b"stco", bytes(4) + struct.pack(">II", 1, chunk_offset))
+        trak = _mp4_box(b"trak", _mp4_box(b"mdia", _mp4_box(b"minf", _mp4_box(b"stbl", stco))))
+        return _mp4_box(b"moov", mvhd + trak)
+
+    # moov before mdat (faststart); its size doesn't depend on the offset value
+    offset = len(ftyp) + len(moov(0)) + 8
+    return ftyp + moov(offset) + mdat
+
+
 def get_fake_httpx_client():
     class _FakeResponse:
-        content = b"FAKE_VIDEO_DATA"
+        content = fake_mp4_bytes()
+
+        def raise_for_status(self):
+            return None
 
     class _FakeHttpxClient:
         def __enter__(self):
@@ -103,7 +326,64 @@ def get_fake_httpx_client():
         def __exit__(self, exc_type, exc_val, exc_tb):
             return None
 
-        def get(self, url):
+        def get(self, url, **kwargs):
             return _FakeResponse()
 
     return _FakeHttpxClient
+
+
+def get_fake_async_httpx_client():
+    class _FakeAsyncHttpxClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            return None
+
+        async def get(self, url, **kwargs):
+            with get_fake_httpx_client()() as http:
+                return http.get(url, **kwargs)
+
+    return _FakeAsyncHttpxClient
+
+
+class FakeMediaTools:
+    """Stands in for ffmpeg/ffprobe: canned probe output and placeholder previews and segments."""
+
+    def __init__(self):
+        self.jobs: List[tuple] = []
+
+    def probe(self, clip) -> dict:
+        self.jobs.append(("probe", clip.name))
+        return {
+            "format": {"duration": "5.000000"},
+            "streams": [
+                {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080,
+                 "avg_frame_rate": "30/1", "pix_fmt": "yuv420p", "time_base": "1/15360", "profile": "High"},
+                {"codec_type": "audio", "codec_name": "aac"},
+            ],
+        }
+
+    def proxy(self, clip, dest) -> None:
+        self.jobs.append(("proxy", clip.name))
+        dest.write_bytes(b"FAKE_PROXY_DATA")
+
+    def contact_sheet(self, clip, dest, duration: float) -> None:
+        self.jobs.append(("sheet", clip.name))
+        dest.write_bytes(b"FAKE_SHEET_DATA")
+
+    def copy_segment(self, clip, dest, duration: float) -> None:
+        self.jobs.append(("copy", clip.name))
+        dest.write_bytes(b"FAKE_SEGMENT_DATA")
+
+    def encode_segment(self, clip, dest, duration: float, spec) -> None:
+        self.jobs.append(("encode", clip.name if clip else None))
+        dest.write_bytes(b"FAKE_SEGMENT_DATA")
+
+    def split_clip(self, clip, dest, start: float, duration: float) -> None:
+        self.jobs.append(("split", clip.name, start))
+        dest.write_bytes(fake_mp4_bytes(duration))
+
+    def concat(self, segment_list, audio, dest) -> None:
+        self.jobs.append(("concat", segment_list.name))
+        dest.write_bytes(b"FAKE_CUT_DATA" + segment_list.read_bytes())
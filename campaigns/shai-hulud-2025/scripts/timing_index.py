@@ -0,0 +1,215 @@
+"""
+Word-level timing index for the long-form voiceover.
+
+The index lives next to the audio file (``voiceover.timing.json``) and maps
+every [B-ROLL: ...] cue in the script to the moment it is spoken, so shotlist
+scenes get exact ``time_range``/``duration_seconds`` values instead of guesses.
+
+Usage:
+    from timing_index import build_timing_index, apply_timing_to_shotlist
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+from pathlib import Path
+from typing import Callable, Sequence
+
+from video_formats import longform_scenes
+
+INDEX_VERSION = 1
+
+# ~150 wpm narration, same rate used for script duration estimates
+ESTIMATED_WORDS_PER_SECOND = 150 / 60
+
+BROLL_PATTERN = re.compile(r"\[B-ROLL:\s*([^\]]+)\]")
+
+WordTiming = tuple[float, float]
+
+
+def timing_index_path(audio_path: Path) -> Path:
+    """Return the timing index path stored alongside an audio file."""
+    return audio_path.with_suffix(".timing.json")
+
+
+def words_from_alignment(
+    characters: Sequence[str],
+    starts: Sequence[float],
+    ends: Sequence[float],
+    offset: float = 0.0,
+) -> list[WordTiming]:
+    """Group character-level alignment into whitespace-delimited word timings."""
+    words: list[WordTiming] = []
+    word_start: float | None = None
+    word_end = 0.0
+
+    for char, start, end in zip(characters, starts, ends):
+        if char.isspace():
+            if word_start is not None:
+                words.append((word_start + offset, word_end + offset))
+                word_start = None
+            continue
+        if word_start is None:
+            word_start = start
+        word_end = end
+
+    if word_start is not None:
+        words.append((word_start + offset, word_end + offset))
+
+    return words
+
+
+def estimate_word_timings(
+    text: str,
+    offset: float = 0.0,
+    words_per_second: float = ESTIMATED_WORDS_PER_SECOND,
+) -> tuple[list[WordTiming], float]:
+    """Derive word timings locally when the provider returns no alignment.
+
+    Each word gets a slot proportional to its length so long technical terms
+    take longer than filler words. Returns ``(words, duration_seconds)``.
+    """
+    tokens = text.split()
+    if not tokens:
+        return [], 0.0
+
+    duration = len(tokens) / words_per_second
+    total_weight = sum(len(token) + 1 for token in tokens)
+
+    words: list[WordTiming] = []
+    cursor = 0.0
+    for token in tokens:
+        span = duration * (len(token) + 1) / total_weight
+        words.append((offset + cursor, offset + cursor + span))
+        cursor += span
+
+    return words, duration
+
+
+def find_broll_cues(script_text: str, clean: Callable[[str], str]) -> list[dict]:
+    """Locate [B-ROLL] cues and the number of spoken words preceding each.
+
+    ``clean`` must be the same function used to prepare the TTS text, so word
+    positions line up with the synthesized narration.
+    """
+    cues = []
+    for index, match in enumerate(BROLL_PATTERN.finditer(script_text)):
+        spoken_before = clean(script_text[:match.start()])
+        cues.append({
+            "index": index,
+            "label": match.group(1).strip(),
+            "word_index": len(spoken_before.split()),
+        })
+    return cues
+
+
+def build_timing_index(
+    words: Sequence[WordTiming],
+    duration_seconds: float,
+    cues: Sequence[dict],
+    source: str,
+) -> dict:
+    """Assemble the compact, JSON-serializable timing index."""
+    resolved_cues = []
+    for cue in cues:
+        word_index = cue["word_index"]
+        start = words[word_index][0] if word_index < len(words) else duration_seconds
+        resolved_cues.append({**cue, "start_seconds": round(start, 3)})
+
+    return {
+        "version": INDEX_VERSION,
+        "source": source,
+        "duration_seconds": round(duration_seconds, 3),
+        "words": [[round(start, 3), round(end, 3)] for start, end in words],
+        "cues": resolved_cues,
+    }
+
+
+def load_timing_index(path: Path) -> dict | None:
+    """Load a timing index, returning None if absent or from another version."""
+    if not path.exists():
+        return None
+    try:
+        index = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    return index
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds as M:SS, matching the shotlist prompt's time_range style."""
+    whole = int(seconds)
+    return f"{whole // 60}:{whole % 60:02d}"
+
+
+def _tokens(text: str) -> set[str]:
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def match_scenes_to_cues(scenes: Sequence[dict], cues: Sequence[dict]) -> list[int | None]:
+    """Pair each scene with a cue index, preserving script order.
+
+    When counts agree the pairing is positional. Otherwise each scene picks the
+    most similar remaining cue (by word overlap with its prompt and notes),
+    never going backwards in the script.
+    """
+    if len(scenes) == len(cues):
+        return list(range(len(cues)))
+
+    matches: list[int | None] = []
+    next_cue = 0
+    for position, scene in enumerate(scenes):
+        scenes_left = len(scenes) - position - 1
+        last_candidate = max(next_cue + 1, len(cues) - scenes_left)
+        candidates = range(next_cue, min(last_candidate, len(cues)))
+        if not candidates:
+            matches.append(None)
+            continue
+
+        scene_tokens = _tokens(" ".join(
+            str(scene.get(key, "")) for key in ("sora_prompt", "description", "notes_for_editor")
+        ))
+        best = max(
+            candidates,
+            key=lambda i: (len(scene_tokens & _tokens(cues[i]["label"])), -i),
+        )
+        matches.append(best)
+        next_cue = best + 1
+
+    return matches
+
+
+def apply_timing_to_shotlist(shotlist: dict, index: dict) -> int:
+    """Fill ``time_range``/``duration_seconds`` from cue timestamps in place.
+
+    A scene runs from its cue to the next matched cue (or the end of the
+    narration). Shorts-only scenes have no cue and are left alone. Returns
+    the number of scenes updated.
+    """
+    scenes = longform_scenes(shotlist.get("scenes", []))
+    cues = index.get("cues", [])
+    if not scenes or not cues:
+        return 0
+
+    matches = match_scenes_to_cues(scenes, cues)
+    starts = [cues[m]["start_seconds"] if m is not None else None for m in matches]
+    audio_end = index.get("duration_seconds", 0.0)
+
+    updated = 0
+    for position, (scene, start) in enumerate(zip(scenes, starts)):
+        if start is None:
+            continue
+        end = next((s for s in starts[position + 1:] if s is not None), audio_end)
+        end = max(end, start)
+
+        scene["time_range"] = f"{format_timestamp(start)}-{format_timestamp(end)}"
+        scene["start_seconds"] = round(start, 3)
+        scene["end_seconds"] = round(end, 3)
+        scene["duration_seconds"] = max(1, math.ceil(end - start))
+        updated += 1
+
+    return updated
@@ -0,0 +1,116 @@
+"""
+Per-format render variants for scenes shared by the long-form video and shorts.
+
+One shotlist plans both outputs. Each scene lists its consumers in
+``used_by`` ("longform" and/or short ids such as "short_2"; long-form only
+when absent) and may carry per-format prompt overrides in ``variants``:
+
+    {"id": "scene_003", "sora_prompt": "... 16:9 ...", "duration_seconds": 8,
+     "used_by": ["longform", "short_1", "short_3"],
+     "variants": {"9:16": {"sora_prompt": "... vertical framing, 9:16 ..."}}}
+
+A scene becomes one render job per aspect ratio its consumers need, so a
+scene used by the long-form video and three shorts renders twice (16:9 and
+9:16), not four times. Long-form clips stay in ``video/``; other formats go
+to a subdirectory named after the ratio (``video/9x16/``).
+
+Usage:
+    from video_formats import render_variants, format_dir
+    jobs = render_variants(scenes, "16:9", "9:16")
+    output_dir = format_dir(config.video_dir, job["aspect_ratio"], "16:9")
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+LONGFORM = "longform"
+# The API's default framing; requests in it keep their original size and store key
+DEFAULT_ASPECT_RATIO = "16:9"
+# Short side of the frame for each resolution label
+SHORT_SIDES = {"480p": 480, "720p": 720, "1080p": 1080}
+
+_RATIO = re.compile(r"\b(\d+):(\d+)\b")
+# Ratios a prompt names as framing: a common aspect ratio (not a time such as
+# "9:16 PM" or part of "4:30"), or any W:H next to the word "aspect"
+_PROMPT_RATIO = re.compile(
+    r"(?<![\d:])(?:16:9|9:16|4:3|3:4|1:1|4:5|21:9)(?![\d:])(?!\s*[AaPp]\.?[Mm]\b)"
+    r"|(?<=aspect )\d+:\d+(?![\d:])|(?<=aspect ratio )\d+:\d+(?![\d:])|(?<![\d:])\d+:\d+(?= aspect)"
+)
+
+
+def consumers(scene: dict) -> list[str]:
+    """Outputs that use a scene: "longform" and/or short ids."""
+    return list(scene.get("used_by") or [LONGFORM])
+
+
+def scene_formats(scene: dict, longform_ratio: str, shorts_ratio: str) -> list[str]:
+    """Aspect ratios a scene must be rendered in, long-form first."""
+    needed = []
+    for consumer in consumers(scene):
+        ratio = longform_ratio if consumer == LONGFORM else shorts_ratio
+        if ratio not in needed:
+            needed.append(ratio)
+    return needed
+
+
+def longform_scenes(scenes: list[dict]) -> list[dict]:
+    """Scenes that belong on the long-form timeline."""
+    return [scene for scene in scenes if LONGFORM in consumers(scene)]
+
+
+def shorts_scenes(scenes: list[dict]) -> dict[str, list[str]]:
+    """Scene ids used by each short, in shotlist order."""
+    shorts: dict[str, list[str]] = {}
+    for scene in scenes:
+        for consumer in consumers(scene):
+            if consumer != LONGFORM:
+                shorts.setdefault(consumer, []).append(str(scene.get("id", "unknown")))
+    return shorts
+
+
+def retarget_prompt(prompt: str, aspect_ratio: str) -> str:
+    """Fallback variant: swap the aspect ratio named in the prompt, or append one.
+
+    Other ``N:N`` text (times of day, scores) is left alone.
+    """
+    if _PROMPT_RATIO.search(prompt):
+        return _PROMPT_RATIO.sub(aspect_ratio, prompt)
+    return f"{prompt.rstrip(' .')}, {aspect_ratio}."
+
+
+def render_variants(scenes: list[dict], longform_ratio: str, shorts_ratio: str) -> list[dict]:
+    """One scene dict per (scene, aspect ratio) render job, with that format's prompt."""
+    jobs = []
+    for scene in scenes:
+        base = {key: value for key, value in scene.items() if key != "variants"}
+        for ratio in scene_formats(scene, longform_ratio, shorts_ratio):
+            override = (scene.get("variants") or {}).get(ratio) or {}
+            job = {**base, **override, "aspect_ratio": ratio}
+            if ratio != longform_ratio and "sora_prompt" not in override and base.get("sora_prompt"):
+                job["sora_prompt"] = retarget_prompt(base["sora_prompt"], ratio)
+            jobs.append(job)
+    return jobs
+
+
+def render_size(resolution: str, aspect_ratio: str | None) -> str:
+    """Sora ``size`` for a format: the resolution label for 16:9, else WxH."""
+    if not aspect_ratio or aspect_ratio == DEFAULT_ASPECT_RATIO:
+        return resolution
+    match = _RATIO.fullmatch(aspect_ratio)
+    if not match or resolution not in SHORT_SIDES:
+        raise ValueError(f"Unsupported format: {resolution} at {aspect_ratio}")
+    width, height = int(match.group(1)), int(match.group(2))
+    short = SHORT_SIDES[resolution]
+    # Even dimensions, short side at the resolution's height
+    if width <= height:
+        return f"{short}x{round(short * height / width / 2) * 2}"
+    return f"{round(short * width / height / 2) * 2}x{short}"
+
+
+def format_dir(video_dir: Path, aspect_ratio: str | None, longform_ratio: str) -> Path:
+    """Where a format's clips live: video_dir for long-form, video_dir/<W>x<H> otherwise."""
+    if not aspect_ratio or aspect_ratio == longform_ratio:
+        return video_dir
+    return video_dir / aspect_ratio.replace(":", "x")
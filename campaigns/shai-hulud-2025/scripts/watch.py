@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Re-run only the pipeline stages whose inputs changed, as files are edited.
+
+Watches the campaign's input files (paradigm doc, intel notes, prompts) and
+processed artifacts. When a burst of edits has settled, each stage that
+reads a changed file runs again, followed by the stages downstream of it,
+in pipeline order. Nothing else is redone: editing the shorts prompt re-runs
+shorts and shotlist, not the outline or script. A failed stage skips its
+dependents until the next edit.
+
+Stages run in this process with warm provider clients, so each iteration
+starts at once. Files are polled (mtime and size), which works the same on
+every platform and on network mounts.
+
+Usage:
+    python watch.py --simulate
+    python watch.py --media --debounce 2
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import click
+from rich.console import Console
+
+from clients import warm_clients
+from config import Config, get_config, use_config
+from generate_audio import main as audio_step
+from generate_outline import main as outline_step
+from generate_script import main as script_step
+from generate_shorts import main as shorts_step
+from generate_shotlist import main as shotlist_step
+from generate_sora_clips import main as sora_step
+from logging_utils import get_logger
+
+console = Console()
+log = get_logger(__name__)
+
+# Seconds between polls, and of quiet after the last change before stages run
+POLL_SECONDS = 0.5
+DEBOUNCE_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A step script with the Config path fields it reads and writes."""
+
+    name: str
+    command: click.Command
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+    media: bool = False
+
+
+# In pipeline order; a stage is downstream of every stage writing one of its inputs
+STAGES = (
+    Stage("outline", outline_step, ("paradigm_doc", "intel_links", "intel_notes", "prompt_outline"),
+          ("outline_json",)),
+    Stage("script", script_step, ("outline_json", "prompt_script", "prompt_voice_style"), ("script_longform",)),
+    Stage("shorts", shorts_step, ("script_longform", "prompt_shorts"), ("shorts_scripts",)),
+    Stage("shotlist", shotlist_step, ("script_longform", "shorts_scripts", "prompt_shotlist"), ("shotlist_json",)),
+    # Narration re-times the shotlist's cues
+    Stage("audio", audio_step, ("script_longform",), ("voiceover_mp3", "shotlist_json"), media=True),
+    Stage("sora", sora_step, ("shotlist_json",), (), media=True),
+)
+
+
+def affected_stages(changed: set[str], stages: tuple[Stage, ...] = STAGES) -> list[Stage]:
+    """Stages reading a changed field, plus everything downstream of them, in pipeline order."""
+    dirty = set(changed)
+    affected = []
+    for stage in stages:
+        if dirty.intersection(stage.inputs):
+            affected.append(stage)
+            dirty.update(stage.outputs)
+    return affected
+
+
+def watched_paths(config: Config, stages: tuple[Stage, ...]) -> dict[Path, str]:
+    """Watched file -> Config field, for every stage input."""
+    return {getattr(config, field): field for stage in stages for field in stage.inputs}
+
+
+def signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def snapshot(paths) -> dict[Path, tuple[int, int] | None]:
+    return {path: signature(path) for path in paths}
+
+
+def wait_for_changes(
+    seen: dict[Path, tuple[int, int] | None],
+    poll: float,
+    debounce: float,
+    stop: threading.Event,
+) -> dict[Path, tuple[int, int] | None]:
+    """Block until watched files differ from ``seen`` and then stay unchanged for ``debounce`` seconds.
+
+    Returns the changed files' settled signatures ({} when ``stop`` is set).
+    """
+    current = snapshot(seen)
+    quiet_since = None
+    while not stop.wait(poll):
+        latest = snapshot(seen)
+        if latest != current:
+            current, quiet_since = latest, time.monotonic()
+        elif quiet_since is None and current != seen:
+            quiet_since = time.monotonic()
+        if quiet_since is not None and time.monotonic() - quiet_since >= debounce:
+            return {path: sig for path, sig in current.items() if sig != seen[path]}
+    return {}
+
+
+def run_stages(stages: list[Stage], simulate: bool) -> tuple[list[Stage], list[Stage]]:
+    """Run stages in order, skipping the dependents of a failed one. Returns (ran, failed)."""
+    args = ["--simulate"] if simulate else []
+    ran, failed = [], []
+    broken: set[str] = set()
+    for stage in stages:
+        if broken.intersection(stage.inputs):
+            console.print(f"[yellow]Skipping {stage.name}: an input stage failed[/yellow]")
+            broken.update(stage.outputs)
+            continue
+        console.rule(f"[bold]{stage.name}[/bold]")
+        started = time.monotonic()
+        try:
+            stage.command.main(args=args, standalone_mode=False)
+        except Exception as exc:  # noqa: BLE001 - a failed stage must not stop the watcher
+            message = exc.format_message() if isinstance(exc, click.ClickException) else str(exc) or "aborted"
+            console.print(f"[red]✗ {stage.name} failed: {message}[/red]")
+            log.warning("Watched stage failed", extra={"stage": stage.name, "error": message})
+            failed.append(stage)
+            broken.update(stage.outputs)
+            continue
+        seconds = round(time.monotonic() - started, 2)
+        log.info("Watched stage finished", extra={"stage": stage.name, "seconds": seconds})
+        ran.append(stage)
+    return ran, failed
+
+
+def watch(
+    config: Config,
+    stages: tuple[Stage, ...] = STAGES,
+    simulate: bool = False,
+    poll: float = POLL_SECONDS,
+    debounce: float = DEBOUNCE_SECONDS,
+    max_runs: int | None = None,
+    stop: threading.Event | None = None,
+) -> int:
+    """Rebuild affected stages after each settled burst of edits; returns the number of rebuilds."""
+    stop = stop or threading.Event()
+    fields = watched_paths(config, stages)
+    seen = snapshot(fields)
+    runs = 0
+    with use_config(config), warm_clients():
+        while max_runs is None or runs < max_runs:
+            changed = wait_for_changes(seen, poll, debounce, stop)
+            if not changed:
+                break
+            seen.update(changed)
+            names = sorted({fields[path] for path in changed})
+            affected = affected_stages(set(names), stages)
+            console.print(f"\n[bold]Changed:[/bold] {', '.join(names)}")
+            log.info("Watched files changed", extra={"fields": names, "stages": [s.name for s in affected]})
+            if affected:
+                ran, failed = run_stages(affected, simulate)
+                # The stages' own writes are not edits; anything else changed meanwhile still is
+                written = [getattr(config, field) for stage in ran + failed for field in stage.outputs]
+                seen.update(snapshot(path for path in written if path in seen))
+                summary = ", ".join(stage.name for stage in ran) or "nothing"
+                if failed:
+                    summary += f" [red]({', '.join(stage.name for stage in failed)} failed)[/red]"
+                console.print(f"[green]✓ Rebuilt[/green] {summary}")
+            runs += 1
+            console.print("[dim]Watching for changes...[/dim]")
+    return runs
+
+
+@click.command()
+@click.option(
+    "--media/--no-media", default=False,
+    help="Also re-run narration and Sora renders (default: content stages only)"
+)
+@click.option(
+    "--debounce",
+    type=float, default=DEBOUNCE_SECONDS,
+    help="Seconds of quiet after the last edit before stages run"
+)
+@click.option(
+    "--poll",
+    type=float, default=POLL_SECONDS,
+    help="Seconds between checks for changes"
+)
+@click.option(
+    "--max-runs",
+    type=int, default=None,
+    help="Exit after this many rebuilds"
+)
+@click.option(
+    "--simulate", is_flag=True,
+    help="Use fake adapters instead of real API"
+)
+def main(media: bool, debounce: float, poll: float, max_runs: int | None, simulate: bool):
+    """Watch campaign inputs and re-run only the stages they feed."""
+    config = get_config()
+    stages = tuple(stage for stage in STAGES if media or not stage.media)
+    console.print(
+        f"[bold]Watching {config.campaign_root.name}[/bold]: {' → '.join(stage.name for stage in stages)}"
+        + (" [yellow](simulated)[/yellow]" if simulate else "")
+    )
+    for path in watched_paths(config, stages):
+        shown = path.relative_to(config.campaign_root) if path.is_relative_to(config.campaign_root) else path
+        console.print(f"  {shown}")
+    try:
+        runs = watch(config, stages, simulate, poll, debounce, max_runs)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Stopped watching[/yellow]")
+        return
+    console.print(f"[green]Finished after {runs} rebuild(s)[/green]")
+
+
+if __name__ == "__main__":
+    main()
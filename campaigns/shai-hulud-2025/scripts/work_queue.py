@@ -0,0 +1,308 @@
+"""
+Durable job queue for running renders, TTS chunks and LLM steps on many workers.
+
+Jobs are idempotent: a job's id is the hash of its kind and payload, so
+enqueueing the same scene render twice is one job, and a finished job is
+never run again. Workers claim a job, renew its lease with heartbeats while
+it runs, and write the result into the campaign's own artifact paths (clips
+into ``video/`` through the clip store, chunks into the chunk cache, LLM
+outputs into ``data/processed/``). A job whose lease runs out (worker killed,
+host lost) goes back in the queue until ``max_attempts`` is reached.
+
+The default broker is a SQLite file (``data/work-queue.sqlite``) in rollback
+journal mode. WAL would be faster, but it keeps its index in shared memory,
+which hosts sharing the file over a network filesystem do not see. A rollback
+journal relies only on file locks, so the file is safe for worker processes
+on one host, and on several hosts when the shared filesystem's locks work
+(many NFS and SMB setups don't). For those, set ``WORK_QUEUE_URL`` to a broker
+registered for its URL scheme with ``register_broker``.
+
+Table layout:
+    jobs(id, kind, payload, state, priority, attempts, worker, heartbeat_at, result, error, created_at, updated_at)
+    workers(id, host, pid, seen_at)
+
+Usage:
+    from work_queue import open_broker
+    broker = open_broker(config.work_queue_url or config.work_queue_db)
+    job_id = broker.enqueue("sora", {"scene": scene, "output": "video/scene_001.mp4"})
+    job = broker.claim("host-a:1234", kinds=["sora"])
+    broker.complete(job.id, "host-a:1234", {"path": "video/scene_001.mp4"})
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from logging_utils import get_logger
+
+log = get_logger(__name__)
+
+JOB_KINDS = ("sora", "tts", "llm")
+JOB_STATES = ("queued", "running", "done", "failed")
+# Seconds a claimed job stays leased without a heartbeat
+LEASE_SECONDS = 60
+# Claims of one job (first run plus requeues) before it is marked failed
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    heartbeat_at REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, kind, priority DESC, created_at);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    seen_at REAL NOT NULL
+);
+"""
+
+
+def job_id(kind: str, payload: dict) -> str:
+    """Idempotency key: the same work always maps to the same job."""
+    canonical = json.dumps([kind, payload], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: dict
+    state: str = "queued"
+    attempts: int = 0
+    worker: str | None = None
+    result: dict | None = None
+    error: str | None = None
+
+
+class SQLiteBroker:
+    """Job queue in one SQLite file; every call is its own short transaction."""
+
+    def __init__(self, path: Path, lease_seconds: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            # Not WAL: its shared-memory index is per host (see the module docstring)
+            db.execute("PRAGMA journal_mode=DELETE")
+            db.execute("PRAGMA busy_timeout=30000")
+            yield db
+        finally:
+            db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction taken up front, so two workers never claim the same job."""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def enqueue(self, kind: str, payload: dict, priority: int = 0, rerun: bool = False) -> str:
+        """Add a job unless it already exists and return its id.
+
+        A failed job is queued again with fresh attempts; a done job only with
+        ``rerun`` (its output went missing).
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        key = job_id(kind, payload)
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO jobs (id, kind, payload, priority, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET state = 'queued', attempts = 0, error = NULL, updated_at = ? "
+                "WHERE jobs.state = 'failed' OR (? AND jobs.state = 'done')",
+                (key, kind, json.dumps(payload, sort_keys=True), priority, now, now, now, rerun),
+            )
+        return key
+
+    def claim(self, worker: str, kinds: Iterable[str] | None = None) -> Job | None:
+        """Lease the next queued job (highest priority, then oldest) to a worker."""
+        kinds = list(kinds or JOB_KINDS)
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                f"SELECT id, kind, payload, attempts FROM jobs WHERE state = 'queued' "
+                f"AND kind IN ({','.join('?' * len(kinds))}) ORDER BY priority DESC, created_at LIMIT 1",
+                kinds,
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET state = 'running', worker = ?, attempts = attempts + 1, heartbeat_at = ?, "
+                "updated_at = ? WHERE id = ?",
+                (worker, now, now, row[0]),
+            )
+        return Job(row[0], row[1], json.loads(row[2]), "running", row[3] + 1, worker)
+
+    def heartbeat(self, job: str, worker: str) -> bool:
+        """Renew a lease; False means the job was requeued and belongs to someone else now."""
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND worker = ? AND state = 'running'",
+                (time.time(), job, worker),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job: str, worker: str, result: dict) -> bool:
+        """Record a result. A worker that lost its lease still completes the job if nobody else has."""
+        now = time.time()
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET state = 'done', worker = ?, result = ?, error = NULL, updated_at = ? "
+                "WHERE id = ? AND state != 'done'",
+                (worker, json.dumps(result), now, job),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job: str, worker: str, error: str) -> str:
+        """Requeue a failed run, or mark the job failed once it has used its attempts. Returns the new state."""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT attempts FROM jobs WHERE id = ? AND worker = ? AND state = 'running'",
+                             (job, worker)).fetchone()
+            if row is None:
+                return "lost"
+            state = "failed" if row[0] >= self.max_attempts else "queued"
+            db.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, error = ?, updated_at = ? WHERE id = ?",
+                (state, error, now, job),
+            )
+        return state
+
+    def requeue_expired(self) -> list[str]:
+        """Take back running jobs whose worker stopped heartbeating; returns their ids."""
+        now = time.time()
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT id, attempts, worker FROM jobs WHERE state = 'running' AND heartbeat_at < ?",
+                (now - self.lease_seconds,),
+            ).fetchall()
+            for job, attempts, worker in rows:
+                state = "failed" if attempts >= self.max_attempts else "queued"
+                db.execute(
+                    "UPDATE jobs SET state = ?, worker = NULL, error = ?, updated_at = ? WHERE id = ?",
+                    (state, f"lease expired on {worker}", now, job),
+                )
+        if rows:
+            log.warning("Requeued jobs from dead workers", extra={"jobs": [row[0] for row in rows]})
+        return [row[0] for row in rows]
+
+    def register_worker(self, worker: str, host: str, pid: int) -> None:
+        """Record a worker as alive (called on start and with every poll)."""
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO workers (id, host, pid, seen_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET seen_at = excluded.seen_at",
+                (worker, host, pid, time.time()),
+            )
+
+    def remove_worker(self, worker: str) -> None:
+        """Forget a worker that is shutting down."""
+        with self._transaction() as db:
+            db.execute("DELETE FROM workers WHERE id = ?", (worker,))
+
+    def live_workers(self) -> list[str]:
+        """Workers seen within one lease period."""
+        with self._connect() as db:
+            rows = db.execute("SELECT id FROM workers WHERE seen_at >= ? ORDER BY id",
+                              (time.time() - self.lease_seconds,)).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self, jobs: Iterable[str] | None = None) -> dict[str, int]:
+        """Jobs per state, over all jobs or the given ids."""
+        totals = dict.fromkeys(JOB_STATES, 0)
+        with self._connect() as db:
+            if jobs is None:
+                rows = db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+            else:
+                ids = list(jobs)
+                rows = []
+                for start in range(0, len(ids), 500):
+                    batch = ids[start:start + 500]
+                    rows += db.execute(
+                        f"SELECT state, COUNT(*) FROM jobs WHERE id IN ({','.join('?' * len(batch))}) GROUP BY state",
+                        batch,
+                    ).fetchall()
+        for state, count in rows:
+            totals[state] += count
+        return totals
+
+    def get(self, job: str) -> Job | None:
+        with self._connect() as db:
+            row = db.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job,)).fetchone()
+        return _job(row) if row else None
+
+    def jobs(self, state: str | None = None) -> list[Job]:
+        """All jobs (or those in one state), oldest first."""
+        with self._connect() as db:
+            if state is None:
+                rows = db.execute(f"SELECT {JOB_COLUMNS} FROM jobs ORDER BY created_at").fetchall()
+            else:
+                rows = db.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE state = ? ORDER BY created_at",
+                                  (state,)).fetchall()
+        return [_job(row) for row in rows]
+
+
+JOB_COLUMNS = "id, kind, payload, state, attempts, worker, result, error"
+
+
+def _job(row: tuple) -> Job:
+    job, kind, payload, state, attempts, worker, result, error = row
+    return Job(job, kind, json.loads(payload), state, attempts, worker, json.loads(result) if result else None, error)
+
+
+# URL scheme -> factory(path part of the URL, **options) returning a broker
+BROKERS: dict[str, Callable[..., Any]] = {"sqlite": SQLiteBroker}
+
+
+def register_broker(scheme: str, factory: Callable[..., Any]) -> None:
+    """Make ``<scheme>://...`` queue URLs open a custom broker.
+
+    The factory is called with the rest of the URL plus ``lease_seconds`` and
+    ``max_attempts``, and must return an object with SQLiteBroker's methods.
+    """
+    BROKERS[scheme] = factory
+
+
+def open_broker(url: str | Path, lease_seconds: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+    """Open a queue from ``sqlite:///abs/path``, ``<scheme>://...`` or a plain SQLite file path."""
+    text = str(url)
+    scheme, sep, rest = text.partition("://")
+    if not sep:
+        scheme, rest = "sqlite", text
+    factory = BROKERS.get(scheme)
+    if factory is None:
+        raise ValueError(f"No work queue broker registered for '{scheme}://' (known: {', '.join(sorted(BROKERS))})")
+    return factory(rest, lease_seconds=lease_seconds, max_attempts=max_attempts)
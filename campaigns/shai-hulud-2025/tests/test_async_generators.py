@@ -0,0 +1,89 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from cassettes import (  # noqa: E402
+    AsyncRecordingElevenLabsClient,
+    AsyncRecordingOpenAIClient,
+    AsyncReplayElevenLabsClient,
+    AsyncReplayOpenAIClient,
+    Cassette,
+    ReplayGeminiAdapter,
+)
+from generate_audio import agenerate_audio  # noqa: E402
+from generate_outline import agenerate_outline  # noqa: E402
+from generate_shorts import agenerate_shorts  # noqa: E402
+from generate_shotlist import agenerate_shotlist  # noqa: E402
+from generate_sora_clips import agenerate_sora_clip  # noqa: E402
+from simulation_adapters import (  # noqa: E402
+    FakeAsyncElevenLabsClient,
+    FakeAsyncOpenAIClient,
+    FakeGeminiAdapter,
+)
+
+
+def test_async_generators_share_one_event_loop(tmp_path):
+    async def run():
+        # Independent stages (and campaigns) can be awaited together
+        outline, shorts, shotlist = await asyncio.gather(
+            agenerate_outline("# Paradigm\n\nthreat doc", "threat-to-outline", "", "gemini-test", 0.7, 0.9, True),
+            agenerate_shorts("Narrator: script", "script-to-shorts", "", "gemini-test", 0.7, 0.9, True),
+            agenerate_shotlist("Narrator: script", "script-to-shotlist", "16:9", "", "gemini-test", 0.7, 0.9, True),
+        )
+        timing = await agenerate_audio(
+            ["First chunk.", "Second chunk."], "voice", "", tmp_path / "voiceover.mp3", "model", simulate=True,
+        )
+        clip = await agenerate_sora_clip(
+            FakeAsyncOpenAIClient(), shotlist["scenes"][0], tmp_path, "1080p", "sora-2", simulate=True,
+        )
+        return outline, shorts, shotlist, timing, clip
+
+    outline, shorts, shotlist, timing, clip = asyncio.run(run())
+
+    assert outline["title"] == "Simulated Campaign"
+    assert "# Short 1" in shorts
+    assert shotlist["scenes"][0]["id"] == "scene_001"
+    assert timing["source"] == "elevenlabs"
+    # The second chunk's words start where the first chunk's audio ends
+    assert timing["words"][2][0] >= timing["words"][1][1]
+    assert (tmp_path / "voiceover.mp3").read_bytes().count(b"FAKE_AUDIO_DATA") == 20
+    assert clip == tmp_path / "scene_001.mp4" and clip.exists()
+
+
+def test_async_clients_record_and_replay_through_one_cassette(tmp_path):
+    async def record():
+        cassette = Cassette.for_name(tmp_path, "async").load()
+        tts = AsyncRecordingElevenLabsClient(FakeAsyncElevenLabsClient(), cassette)
+        await tts.text_to_speech.convert_with_timestamps(voice_id="v", text="Hello world", model_id="m")
+        sora = AsyncRecordingOpenAIClient(FakeAsyncOpenAIClient(), cassette)
+        job = await sora.responses.create(model="sora-2", input="terminal", n=1, size="1080p", duration=5)
+        await sora.responses.retrieve(job.id)
+        return cassette.path
+
+    async def replay(path):
+        cassette = Cassette(path, speed=0).load()
+        speech = await AsyncReplayElevenLabsClient(cassette).text_to_speech.convert_with_timestamps(
+            voice_id="v", text="Hello world", model_id="m",
+        )
+        job = await AsyncReplayOpenAIClient(cassette).responses.retrieve("fake_job_id_123")
+        return speech, job
+
+    speech, job = asyncio.run(replay(asyncio.run(record())))
+    assert speech.alignment.characters == list("Hello world")
+    assert job.status == "completed"
+
+
+def test_fake_and_replayed_gemini_models_generate_async(tmp_path):
+    cassette = Cassette.for_name(tmp_path, "gemini").load()
+    cassette.record("gemini", "generate_content", {"model": "m", "prompt": "p"}, {"text": "recorded", "usage": None}, 0.5)
+    replayed = ReplayGeminiAdapter(Cassette(cassette.path, speed=0).load()).GenerativeModel("m")
+    fake = FakeGeminiAdapter().GenerativeModel("m")
+
+    async def run():
+        return await asyncio.gather(replayed.generate_content_async("p"), fake.generate_content_async("OUTLINE_JSON"))
+
+    recorded, generated = asyncio.run(run())
+    assert recorded.text == "recorded"
+    assert "FAKE SCRIPT" in generated.text
@@ -0,0 +1,98 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+# Campaign tooling lives in the repository's top-level scripts/
+sys.path.append(str(Path(__file__).parents[3] / "scripts"))
+
+import campaign_tooling  # noqa: E402
+from campaign_tooling import cli  # noqa: E402
+
+
+@pytest.fixture
+def campaigns(tmp_path, monkeypatch):
+    """A campaigns dir holding a small template campaign."""
+    template = tmp_path / "campaigns" / "template"
+    for relative, text in {
+        "scripts/step.py": "print('step')\n",
+        "scripts/helpers.py": "VALUE = 1\n",
+        "Makefile": "all:\n",
+        "prompts/script.md": "Write a script.\n",
+        "data/raw/intel-links.md": "# Links\n",
+        "docs/shai-hulud-paradigm.md": "# Paradigm\n",
+    }.items():
+        (template / relative).parent.mkdir(parents=True, exist_ok=True)
+        (template / relative).write_text(text, encoding="utf-8")
+    monkeypatch.setattr(campaign_tooling, "CAMPAIGNS_DIR", template.parent)
+    monkeypatch.setattr(campaign_tooling, "TEMPLATE_CAMPAIGN", template)
+    return template.parent
+
+
+def _run(*args):
+    result = CliRunner().invoke(cli, list(args))
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def _settings(campaign: Path) -> dict:
+    return json.loads((campaign / "campaign.json").read_text(encoding="utf-8"))
+
+
+def test_new_campaign_links_shared_code_and_writes_its_settings(campaigns):
+    _run("new", "demo")
+    demo, template = campaigns / "demo", campaigns / "template"
+
+    assert (demo / "scripts").is_symlink() and (demo / "scripts").resolve() == template / "scripts"
+    assert (demo / "Makefile").is_symlink() and (demo / "Makefile").resolve() == template / "Makefile"
+    # Intel is the campaign's own; prompts resolve to the template's until customized
+    intel = demo / "data" / "raw" / "intel-links.md"
+    assert not intel.is_symlink() and not intel.samefile(template / "data" / "raw" / "intel-links.md")
+    assert not (demo / "prompts").exists()
+    assert (demo / "docs" / "demo-paradigm.md").read_text(encoding="utf-8").startswith("# TODO: Update paradigm")
+    assert _settings(demo) == {"name": "demo", "template": "template", "paradigm_doc": "docs/demo-paradigm.md"}
+
+
+def test_new_campaign_with_copy_owns_every_file(campaigns):
+    _run("new", "demo", "--copy")
+    demo, template = campaigns / "demo", campaigns / "template"
+
+    assert not (demo / "scripts").is_symlink()
+    step = demo / "scripts" / "step.py"
+    assert step.read_text(encoding="utf-8") == "print('step')\n" and not step.samefile(template / "scripts" / "step.py")
+    assert (demo / "prompts" / "script.md").is_file()
+    assert not (demo / "docs" / "shai-hulud-paradigm.md").exists()
+    assert not (demo / "README.md").exists()
+    assert _settings(demo) == {"name": "demo", "template": "template", "paradigm_doc": "docs/demo-paradigm.md"}
+
+
+def test_customizing_a_shared_file_copies_only_that_file(campaigns):
+    _run("new", "demo")
+    demo, template = campaigns / "demo", campaigns / "template"
+    before = _settings(demo)
+
+    _run("customize", "demo", "scripts/step.py")
+
+    # The linked directory became a real one; only the requested file stopped being shared
+    assert (demo / "scripts").is_dir() and not (demo / "scripts").is_symlink()
+    step = demo / "scripts" / "step.py"
+    assert not step.is_symlink() and not step.samefile(template / "scripts" / "step.py")
+    step.write_text("print('custom')\n", encoding="utf-8")
+    assert (template / "scripts" / "step.py").read_text(encoding="utf-8") == "print('step')\n"
+    assert (demo / "scripts" / "helpers.py").samefile(template / "scripts" / "helpers.py")
+
+    # A prompt resolved from the template gets its own directory
+    _run("customize", "demo", "prompts/script.md")
+    prompt = demo / "prompts" / "script.md"
+    assert prompt.read_text(encoding="utf-8") == "Write a script.\n" and not prompt.is_symlink()
+    assert _settings(demo) == before
+
+
+def test_customize_rejects_unscaffolded_campaigns_and_unknown_files(campaigns):
+    (campaigns / "loose").mkdir()
+    assert CliRunner().invoke(cli, ["customize", "loose", "scripts/step.py"]).exit_code != 0
+    _run("new", "demo")
+    result = CliRunner().invoke(cli, ["customize", "demo", "scripts/missing.py"])
+    assert result.exit_code != 0 and "template has no file" in result.output
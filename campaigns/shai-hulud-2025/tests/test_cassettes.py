@@ -0,0 +1,88 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from cassettes import (  # noqa: E402
+    Cassette,
+    CassetteMiss,
+    RecordingElevenLabsClient,
+    RecordingGeminiAdapter,
+    RecordingOpenAIClient,
+    ReplayElevenLabsClient,
+    ReplayGeminiAdapter,
+    ReplayOpenAIClient,
+)
+from simulation_adapters import (  # noqa: E402
+    FakeElevenLabsClient,
+    FakeGeminiAdapter,
+    FakeOpenAIClient,
+)
+
+
+def _record(tmp_path: Path) -> Path:
+    cassette = Cassette.for_name(tmp_path, "bench").load()
+
+    gemini = RecordingGeminiAdapter(FakeGeminiAdapter(), cassette)
+    gemini.GenerativeModel("gemini-test").generate_content("prompt with OUTLINE_JSON")
+
+    tts = RecordingElevenLabsClient(FakeElevenLabsClient(), cassette)
+    tts.text_to_speech.convert_with_timestamps(voice_id="v", text="Hello world", model_id="m")
+
+    sora = RecordingOpenAIClient(FakeOpenAIClient(), cassette)
+    job = sora.responses.create(model="sora-2", input="terminal", n=1, size="1080p", duration=5)
+    sora.responses.retrieve(job.id)
+
+    return cassette.path
+
+
+def test_record_then_replay_offline(tmp_path):
+    path = _record(tmp_path)
+    # Recording only appends; saving folds the journal into the cassette file
+    assert not path.exists() and len(Cassette(path).load().interactions) == 4
+    Cassette(path).save()
+    assert path.name == "bench.v1.json" and path.exists()
+    assert not path.with_name("bench.v1.journal.jsonl").exists()
+
+    cassette = Cassette(path, speed=0).load()
+    assert len(cassette.interactions) == 4
+
+    text = ReplayGeminiAdapter(cassette).GenerativeModel("gemini-test").generate_content(
+        "prompt with OUTLINE_JSON"
+    ).text
+    assert "FAKE SCRIPT" in text
+
+    speech = ReplayElevenLabsClient(cassette).text_to_speech.convert_with_timestamps(
+        voice_id="v", text="Hello world", model_id="m"
+    )
+    assert speech.alignment.characters == list("Hello world")
+
+    responses = ReplayOpenAIClient(cassette).responses
+    job = responses.create(model="sora-2", input="terminal", n=1, size="1080p", duration=5)
+    assert job.status == "processing"
+    assert responses.retrieve(job.id).output[0].url == "http://fake-url/video.mp4"
+
+
+def test_unrecorded_request_falls_back_by_operation(tmp_path):
+    cassette = Cassette(_record(tmp_path), speed=0).load()
+
+    model = ReplayGeminiAdapter(cassette).GenerativeModel("gemini-test")
+    assert "FAKE SCRIPT" in model.generate_content("an edited prompt").text
+
+    with pytest.raises(CassetteMiss):
+        ReplayElevenLabsClient(cassette).text_to_speech.convert(voice_id="v", text="x", model_id="m")
+
+
+def test_replay_scales_recorded_latency(tmp_path):
+    cassette = Cassette.for_name(tmp_path, "slow")
+    cassette.record("gemini", "generate_content", {"model": "m", "prompt": "p"}, {"text": "ok"}, 0.2)
+
+    fast = Cassette(cassette.path, speed=0.25).load()
+    started = time.monotonic()
+    fast.replay("gemini", "generate_content", {"model": "m", "prompt": "p"})
+    elapsed = time.monotonic() - started
+
+    assert 0.04 <= elapsed < 0.2
@@ -0,0 +1,171 @@
+import copy
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from audio_chunks import AudioChunkCache  # noqa: E402
+from chapters import (  # noqa: E402
+    build_chapter_state,
+    diff_outline,
+    generation_hash,
+    join_sections,
+    load_stale,
+    mark_stale,
+    splice_section,
+    split_sections,
+    stale_scenes,
+)
+from config import TEMPLATE_ROOT, Config, use_config  # noqa: E402
+from generate_audio import chunk_script, generate_audio  # noqa: E402
+from generate_outline import main as outline_step  # noqa: E402
+from generate_script import main as script_step  # noqa: E402
+from generate_shotlist import main as shotlist_step  # noqa: E402
+
+OUTLINE = {
+    "global_stats": {"wave_2_repos": "25k+"},
+    "chapters": [
+        {"id": "hook", "talking_points": ["scale"]},
+        {"id": "wave_1", "talking_points": ["postinstall"]},
+        {"id": "outro", "talking_points": ["cta"]},
+    ],
+}
+
+SCRIPT = """# Shai-Hulud
+
+[INTRO – 0:00–0:45]
+Welcome. [B-ROLL: glowing npm cubes]
+
+[CHAPTER 1 – September]
+Postinstall hooks. [B-ROLL: red package on a conveyor belt]
+Node runs it. [B-ROLL: terminal scrolling secrets]
+
+[OUTRO – 11:00–12:00]
+Subscribe. [B-ROLL: logo sting]
+"""
+
+
+def test_only_edited_chapters_are_regenerated():
+    state = build_chapter_state(OUTLINE, 12)
+    edited = copy.deepcopy(OUTLINE)
+    edited["chapters"][1]["talking_points"].append("single exfil repo")
+
+    assert diff_outline(state, OUTLINE, 12, 3).changed == []
+    assert diff_outline(state, edited, 12, 3).changed == [1]
+
+    added = copy.deepcopy(OUTLINE)
+    added["chapters"].insert(2, {"id": "wave_2"})
+    assert diff_outline(state, added, 12, 3).full
+    assert diff_outline(state, OUTLINE, 10, 3).full
+    assert diff_outline(state, OUTLINE, 12, 2).full
+    assert diff_outline(None, OUTLINE, 12, 3).full
+
+    # The prompt, voice style and model settings are inputs too
+    generation = generation_hash("outline-to-script", "calm", "gemini-test", 0.7, 0.9)
+    state = build_chapter_state(OUTLINE, 12, generation)
+    assert diff_outline(state, OUTLINE, 12, 3, generation).changed == []
+    edited_prompt = generation_hash("outline-to-script, punchier", "calm", "gemini-test", 0.7, 0.9)
+    assert diff_outline(state, OUTLINE, 12, 3, edited_prompt).full
+    cooler = generation_hash("outline-to-script", "calm", "gemini-test", 0.2, 0.9)
+    assert diff_outline(state, OUTLINE, 12, 3, cooler).full
+
+
+def _campaign(tmp_path: Path) -> Config:
+    root = tmp_path / "campaigns" / "demo"
+    (root / "docs").mkdir(parents=True)
+    (root / "docs" / "shai-hulud-paradigm.md").write_text("# Paradigm\n\nA worm in npm.\n", encoding="utf-8")
+    shutil.copytree(TEMPLATE_ROOT / "prompts", root / "prompts")
+    config = Config.load(root, environ={})
+    config.ensure_dirs()
+    return config
+
+
+def test_editing_the_script_prompt_regenerates_the_script(tmp_path):
+    config = _campaign(tmp_path)
+    with use_config(config):
+        for step in (outline_step, script_step):
+            assert CliRunner().invoke(step, ["--simulate"]).exit_code == 0
+        assert "up to date" in CliRunner().invoke(script_step, ["--simulate"]).output
+
+        with config.prompt_script.open("a", encoding="utf-8") as fh:
+            fh.write("\nKeep every chapter under two minutes.\n")
+        result = CliRunner().invoke(script_step, ["--simulate"])
+        assert result.exit_code == 0, result.output
+        assert "Generating full script (script prompt" in result.output
+
+
+def test_stale_only_with_unknown_scenes_does_not_replan_everything(tmp_path):
+    config = _campaign(tmp_path)
+    with use_config(config):
+        for step in (outline_step, script_step, shotlist_step):
+            assert CliRunner().invoke(step, ["--simulate"]).exit_code == 0
+        before = config.shotlist_json.read_bytes()
+        mark_stale(config.stale_json, scenes=["chapter_9_scene_001"])
+
+        result = CliRunner().invoke(shotlist_step, ["--simulate", "--stale-only"])
+        assert result.exit_code == 0, result.output
+    assert "stale scenes (chapter_9_scene_001) are in" in result.output
+    assert config.shotlist_json.read_bytes() == before
+    assert load_stale(config.stale_json).get("scenes", []) == []
+
+
+def test_splice_replaces_one_section_and_keeps_the_rest():
+    preamble, sections = split_sections(SCRIPT)
+    assert preamble == "# Shai-Hulud\n\n"
+    assert len(sections) == 3
+    assert join_sections(preamble, sections) == SCRIPT
+
+    sections[1] = splice_section(sections[1], "Preinstall hooks now. [B-ROLL: bun runtime]")
+    updated = join_sections(preamble, sections)
+
+    assert "[CHAPTER 1 – September]\n\nPreinstall hooks now." in updated
+    assert "Welcome." in updated and "Subscribe." in updated
+    assert "Postinstall" not in updated
+
+
+def test_stale_scenes_follow_cues_in_changed_chapters():
+    shotlist = {"scenes": [{"id": f"scene_{n:03d}"} for n in range(1, 5)]}
+
+    cues, scenes = stale_scenes(SCRIPT, [1], shotlist)
+
+    assert cues == [1, 2]
+    assert scenes == ["scene_002", "scene_003"]
+
+
+def test_stale_scenes_skip_shorts_only_scenes():
+    shotlist = {"scenes": [
+        {"id": "s_short", "used_by": ["short_1"]},
+        *({"id": f"scene_{n:03d}"} for n in range(1, 5)),
+    ]}
+
+    cues, scenes = stale_scenes(SCRIPT, [1], shotlist)
+
+    assert cues == [1, 2]
+    assert scenes == ["scene_002", "scene_003"]
+
+
+def test_audio_resynthesizes_only_changed_chunks(tmp_path):
+    cache = AudioChunkCache(tmp_path / "chunks")
+    first = generate_audio(
+        "", "voice", "key", tmp_path / "a.mp3", "model", simulate=True,
+        chunks=chunk_script(SCRIPT, 5000), chunk_cache=cache,
+    )
+    assert (cache.hits, cache.misses) == (0, 4)
+
+    preamble, sections = split_sections(SCRIPT)
+    sections[1] = splice_section(sections[1], "Preinstall hooks now, and much longer narration.")
+    cache = AudioChunkCache(tmp_path / "chunks")
+    second = generate_audio(
+        "", "voice", "key", tmp_path / "b.mp3", "model", simulate=True,
+        chunks=chunk_script(join_sections(preamble, sections), 5000), chunk_cache=cache,
+    )
+
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert second["duration_seconds"] > first["duration_seconds"]
+    # Reused chunks after the edit are shifted to their new position
+    assert second["words"][-1][1] == pytest.approx(second["duration_seconds"])
@@ -0,0 +1,63 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from clip_previews import MediaToolError, PreviewCache, build_previews, summarize_probe  # noqa: E402
+from simulation_adapters import FakeMediaTools  # noqa: E402
+
+
+def _clips(video_dir: Path, *contents: bytes) -> list[Path]:
+    video_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for n, data in enumerate(contents, start=1):
+        path = video_dir / f"scene_{n:03d}.mp4"
+        path.write_bytes(data)
+        paths.append(path)
+    return paths
+
+
+def test_summarize_probe_reads_duration_codecs_and_frame_rate():
+    meta = summarize_probe(FakeMediaTools().probe(Path("scene_001.mp4")))
+    assert meta == {
+        "duration_seconds": 5.0, "video_codec": "h264", "audio_codec": "aac",
+        "width": 1920, "height": 1080, "fps": 30.0, "pix_fmt": "yuv420p", "time_base": "1/15360", "profile": "High",
+    }
+    assert summarize_probe({"streams": [{"codec_type": "video", "avg_frame_rate": "30000/1001"}]})["fps"] == 29.97
+
+
+def test_previews_are_cached_by_clip_hash_across_campaigns(tmp_path):
+    cache = PreviewCache(tmp_path / ".media-cache")
+    tools = FakeMediaTools()
+    alpha = _clips(tmp_path / "alpha" / "video", b"clip-one", b"clip-two")
+    # Same bytes under another campaign (e.g. linked from the clip store)
+    beta = _clips(tmp_path / "beta" / "video", b"clip-two")
+
+    index = build_previews(alpha, cache, tools, tmp_path / "alpha" / "video" / "previews", workers=2)
+    assert len(tools.jobs) == 6
+    record = index["clips"]["scene_002.mp4"]
+    assert record["duration_seconds"] == 5.0 and record["proxy"] == "scene_002.proxy.mp4"
+    assert (tmp_path / "alpha" / "video" / "previews" / "scene_001.sheet.jpg").read_bytes() == b"FAKE_SHEET_DATA"
+
+    ran = []
+    build_previews(beta, cache, tools, tmp_path / "beta" / "video" / "previews", on_done=lambda c, r, did: ran.append(did))
+    build_previews(alpha, cache, tools, tmp_path / "alpha" / "video" / "previews", on_done=lambda c, r, did: ran.append(did))
+    assert len(tools.jobs) == 6 and ran == [False, False, False]
+    written = json.loads((tmp_path / "beta" / "video" / "previews" / "index.json").read_text(encoding="utf-8"))
+    assert written["clips"]["scene_001.mp4"]["sha256"] == record["sha256"]
+
+
+def test_failed_clip_is_left_out_of_the_index(tmp_path):
+    class BrokenProxy(FakeMediaTools):
+        def proxy(self, clip, dest):
+            raise MediaToolError("ffmpeg failed: moov atom not found")
+
+    clips = _clips(tmp_path / "video", b"clip-one")
+    results = []
+    index = build_previews(
+        clips, PreviewCache(tmp_path / "cache"), BrokenProxy(), tmp_path / "video" / "previews",
+        on_done=lambda clip, record, ran: results.append(record),
+    )
+    assert index == {"clips": {}} and results == [None]
+    assert not list((tmp_path / "cache").rglob("proxy.mp4"))
@@ -0,0 +1,91 @@
+import stat
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from clip_store import ClipStore, normalize_prompt  # noqa: E402
+from config import Config, use_config  # noqa: E402
+from generate_sora_clips import _download  # noqa: E402
+
+
+def test_key_ignores_cosmetic_prompt_differences():
+    a = ClipStore.key("Glowing repo cubes,  16:9.", "sora-2", "1080p", 8)
+    b = ClipStore.key("glowing repo cubes, 16:9", "sora-2", "1080p", 8)
+    c = ClipStore.key("glowing repo cubes, 16:9", "sora-2", "1080p", 12)
+
+    assert normalize_prompt("  A  Terminal\nwindow. ") == "a terminal window"
+    assert a == b
+    assert a != c
+
+
+def test_put_then_link_across_campaigns(tmp_path):
+    store = ClipStore(tmp_path / "store")
+    key = store.key("terminal window", "sora-2", "1080p", 5)
+
+    first = tmp_path / "campaign-a" / "video" / "scene_1.mp4"
+    first.parent.mkdir(parents=True)
+    assert not store.link(key, first)
+    first.write_bytes(b"clip-bytes")
+    store.put(key, first)
+
+    second = tmp_path / "campaign-b" / "video" / "intro.mp4"
+    assert store.link(key, second)
+    assert second.read_bytes() == b"clip-bytes"
+
+    assert store.stats.hits == 1
+    assert store.stats.misses == 1
+    assert store.stats.hit_rate == 0.5
+    assert store.stats.bytes_saved == len(b"clip-bytes")
+
+
+def test_record_run_accumulates(tmp_path):
+    store = ClipStore(tmp_path)
+    store.stats.hits = 2
+    store.stats.bytes_saved = 100
+    store.record_run()
+
+    again = ClipStore(tmp_path)
+    again.stats.misses = 2
+    totals = again.record_run()
+
+    assert totals.hits == 2
+    assert totals.misses == 2
+    assert totals.bytes_saved == 100
+    assert totals.hit_rate == 0.5
+
+
+def test_concurrent_runs_keep_each_others_counters(tmp_path):
+    def run() -> None:
+        for _ in range(5):
+            store = ClipStore(tmp_path)
+            store.stats.hits = 1
+            store.record_run()
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert ClipStore(tmp_path).record_run().hits == 40
+
+
+def test_rendering_over_a_linked_clip_leaves_the_store_alone(tmp_path):
+    store = ClipStore(tmp_path / "store")
+    key = store.key("terminal window", "sora-2", "1080p", 5)
+    first = tmp_path / "campaign-a" / "video" / "scene_1.mp4"
+    first.parent.mkdir(parents=True)
+    first.write_bytes(b"clip-bytes")
+    obj = store.put(key, first)
+    second = tmp_path / "campaign-b" / "video" / "intro.mp4"
+    assert store.link(key, second)
+    assert not stat.S_IMODE(obj.stat().st_mode) & 0o222
+
+    # A fresh render downloaded over campaign A's linked clip replaces it
+    with use_config(Config.load(tmp_path, environ={})):
+        _download("https://videos.example/new.mp4", first, simulate=True)
+    assert first.read_bytes() != b"clip-bytes"
+    assert second.read_bytes() == b"clip-bytes" and obj.read_bytes() == b"clip-bytes"
+    assert store.link(key, first) and first.read_bytes() == b"clip-bytes"
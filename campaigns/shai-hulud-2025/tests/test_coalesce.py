@@ -0,0 +1,64 @@
+import json
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from coalesce import coalesce_scenes, prompt_similarity  # noqa: E402
+from config import Config, use_config  # noqa: E402
+from generate_sora_clips import main as generate_clips  # noqa: E402
+from mp4_check import check_mp4  # noqa: E402
+
+SERVER_ROOM = "Dark server room, rows of racks, blue status lights blinking"
+SCENES = [
+    {"id": "scene_001", "sora_prompt": f"{SERVER_ROOM}, slow dolly forward", "duration_seconds": 5},
+    {"id": "scene_002", "sora_prompt": f"{SERVER_ROOM}, one rack turns red", "duration_seconds": 6},
+    {"id": "scene_003", "sora_prompt": f"{SERVER_ROOM}, red spreads along the row", "duration_seconds": 7},
+    {"id": "scene_004", "sora_prompt": "Maintainer at a laptop reading an alert", "duration_seconds": 5},
+    {"id": "scene_005", "sora_prompt": "Maintainer at a laptop, alert closeup", "duration_seconds": 12},
+]
+
+
+def test_adjacent_similar_short_scenes_share_a_render_up_to_the_cap():
+    assert prompt_similarity(SCENES[0]["sora_prompt"], SCENES[1]["sora_prompt"]) > 0.5
+    assert prompt_similarity(SCENES[2]["sora_prompt"], SCENES[3]["sora_prompt"]) == 0.0
+
+    jobs = coalesce_scenes([dict(s, aspect_ratio="16:9") for s in SCENES])
+    # 5 + 6 + 7 fits under 20s; the 12s scene is long enough on its own
+    assert [job["id"] for job in jobs] == ["scene_001+2", "scene_004", "scene_005"]
+    group = jobs[0]
+    assert group["duration_seconds"] == 18
+    assert [s["id"] for s in group["coalesced"]] == ["scene_001", "scene_002", "scene_003"]
+    assert [(c["start_seconds"], c["duration_seconds"]) for c in group["cuts"]] == [(0, 5), (5, 6), (11, 7)]
+    assert "Shot 2 (5-11s): Dark server room" in group["sora_prompt"]
+
+    # Capped duration, format, priority and opt-outs all break a run
+    assert len(coalesce_scenes([dict(s, aspect_ratio="16:9") for s in SCENES[:3]], max_seconds=12)) == 2
+    mixed = [dict(SCENES[0], aspect_ratio="16:9"), dict(SCENES[1], aspect_ratio="9:16")]
+    assert coalesce_scenes(mixed) == mixed
+    assert len(coalesce_scenes([dict(SCENES[0], priority=1), SCENES[1]])) == 2
+    assert len(coalesce_scenes([SCENES[0], dict(SCENES[1], coalesce=False)])) == 2
+
+
+def test_group_render_is_cut_into_stored_per_scene_clips(tmp_path):
+    root = tmp_path / "campaigns" / "demo"
+    root.mkdir(parents=True)
+    config = Config.load(root, environ={})
+    config.ensure_dirs()
+    config.shotlist_json.write_text(json.dumps({"scenes": SCENES}), encoding="utf-8")
+
+    with use_config(config):
+        result = CliRunner().invoke(generate_clips, ["--simulate"])
+        assert result.exit_code == 0, result.output
+        assert "5 scenes in 3 Sora jobs (2 fewer)" in result.output and "Generated 5 clips" in result.output
+        for scene in SCENES:
+            assert check_mp4(config.video_dir / f"{scene['id']}.mp4").ok
+        cuts = json.loads((config.video_dir / ".coalesced" / "scene_001+2.json").read_text(encoding="utf-8"))["cuts"]
+        assert [c["id"] for c in cuts] == ["scene_001", "scene_002", "scene_003"]
+
+        # Each piece went into the store under its own key: a rerun links every scene singly
+        result = CliRunner().invoke(generate_clips, ["--simulate"])
+        assert result.exit_code == 0, result.output
+        assert "Coalesced" not in result.output and "5/5 hits" in result.output
@@ -1,5 +1,5 @@
-import importlib
-import os
+import dataclasses
+import json
 import sys
 from pathlib import Path
 
@@ -19,8 +19,7 @@ def mock_env(monkeypatch):
 
 
 def test_config_initialization(mock_env):
-    importlib.reload(config)
-    cfg = config.Config()
+    cfg = config.Config.load()
     assert cfg.gemini_api_key == "fake_gemini"
     assert cfg.openai_api_key == "fake_openai"
     assert cfg.elevenlabs_api_key == "fake_eleven"
@@ -42,13 +41,66 @@ def test_config_validation_missing_keys(monkeypatch):
 
 
 def test_ensure_dirs(tmp_path):
-    cfg = config.Config()
-    cfg.data_dir = tmp_path / "data"
-    cfg.audio_dir = tmp_path / "audio"
-    cfg.video_dir = tmp_path / "video"
+    cfg = dataclasses.replace(
+        config.Config(),
+        data_dir=tmp_path / "data",
+        audio_dir=tmp_path / "audio",
+        video_dir=tmp_path / "video",
+    )
 
     cfg.ensure_dirs()
 
     assert (cfg.data_dir / "processed").exists()
     assert cfg.audio_dir.exists()
     assert cfg.video_dir.exists()
+
+
+def _campaign(root: Path, settings: dict, env: str = "") -> Path:
+    (root / "docs").mkdir(parents=True)
+    (root / "campaign.json").write_text(json.dumps(settings), encoding="utf-8")
+    (root / ".env").write_text(env, encoding="utf-8")
+    return root
+
+
+def test_load_layers_campaign_file_env_file_and_environment(tmp_path):
+    alpha = _campaign(
+        tmp_path / "alpha",
+        {"name": "alpha", "paradigm_doc": "docs/alpha.md", "gemini_model": "model-from-json", "target_video_minutes": 8},
+        env="GEMINI_MODEL=model-from-dotenv\nGEMINI_API_KEY=alpha-key\n",
+    )
+    beta = _campaign(tmp_path / "beta", {"name": "beta"}, env="GEMINI_API_KEY=beta-key\n")
+
+    a = config.Config.load(alpha, environ={"SORA_CONCURRENCY": "7"})
+    b = config.Config.load(beta, environ={})
+
+    assert (a.gemini_model, a.gemini_api_key, a.sora_concurrency) == ("model-from-dotenv", "alpha-key", 7)
+    assert a.target_video_minutes == 8
+    assert a.paradigm_doc == alpha.resolve() / "docs" / "alpha.md"
+    assert a.clip_store_dir == tmp_path.resolve() / ".clip-store"
+    assert (b.gemini_api_key, b.gemini_model) == ("beta-key", "gemini-2.0-flash")
+    assert b.prompt_outline == config.TEMPLATE_ROOT / "prompts" / "01-threat-to-outline.md"
+    assert config.Config.load(alpha, environ={"GEMINI_MODEL": "model-from-env"}).gemini_model == "model-from-env"
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        a.gemini_model = "other"
+    with config.use_config(b):
+        assert config.get_config() is b
+
+
+def test_fingerprint_tracks_generation_settings_and_inputs(tmp_path):
+    root = _campaign(tmp_path / "alpha", {"name": "alpha", "paradigm_doc": "docs/alpha.md"})
+    (root / "docs" / "alpha.md").write_text("Wave 1", encoding="utf-8")
+    base = config.Config.load(root, environ={"GEMINI_API_KEY": "one"})
+
+    assert config.Config.load(root, environ={"GEMINI_API_KEY": "two"}).fingerprint == base.fingerprint
+    assert dataclasses.replace(base, gemini_temperature=0.2).fingerprint != base.fingerprint
+
+    # A config kept across edits (watch mode) sees the new contents
+    before = base.fingerprint
+    (root / "docs" / "alpha.md").write_text("Wave 2", encoding="utf-8")
+    assert base.fingerprint != before
+    assert config.Config.load(root, environ={}).fingerprint == base.fingerprint
+
+    with pytest.raises(ValueError, match="gemini_modle"):
+        (root / "campaign.json").write_text(json.dumps({"gemini_modle": "typo"}), encoding="utf-8")
+        config.Config.load(root, environ={})
@@ -0,0 +1,64 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from context_cache import ContextCache, PromptLayout, generate_with_context  # noqa: E402
+from simulation_adapters import FakeGeminiAdapter  # noqa: E402
+
+SCRIPT = "Narrator: the worm spreads through npm install hooks. " * 200
+
+
+def _layouts():
+    shorts = PromptLayout(context=[("FULL_SCRIPT_TEXT", SCRIPT)], task="Write 3 shorts.")
+    shotlist = PromptLayout(context=[("FULL_SCRIPT_TEXT", SCRIPT)], task="## TARGET_ASPECT_RATIO: 16:9")
+    return shorts, shotlist
+
+
+def test_later_step_reuses_cached_prefix(tmp_path):
+    gemini = FakeGeminiAdapter()
+    cache = ContextCache(tmp_path / "registry.json", min_tokens=100)
+    shorts, shotlist = _layouts()
+
+    assert shorts.prefix_key("gemini-test") == shotlist.prefix_key("gemini-test")
+
+    first = generate_with_context(gemini, "gemini-test", shorts, None, cache)
+    # A new process (fresh registry object) still finds the handle on disk
+    reloaded = ContextCache(tmp_path / "registry.json", min_tokens=100)
+    second = generate_with_context(gemini, "gemini-test", shotlist, None, reloaded)
+    uncached = generate_with_context(gemini, "gemini-test", shotlist, None, None)
+
+    assert cache.stats.misses == 1
+    assert reloaded.stats.hits == 1
+    assert len(json.loads((tmp_path / "registry.json").read_text())) == 1
+    assert first.usage_metadata.cached_content_token_count > 0
+    assert second.usage_metadata.cached_content_token_count == first.usage_metadata.cached_content_token_count
+    assert uncached.usage_metadata.cached_content_token_count == 0
+    assert second.latency_seconds < uncached.latency_seconds
+    assert second.text == uncached.text
+
+
+def test_small_prefix_sends_full_prompt(tmp_path):
+    cache = ContextCache(None, min_tokens=10_000)
+    shorts, _ = _layouts()
+
+    response = generate_with_context(FakeGeminiAdapter(), "gemini-test", shorts, None, cache)
+
+    assert (cache.stats.hits, cache.stats.misses) == (0, 0)
+    assert response.usage_metadata.cached_content_token_count == 0
+
+
+def test_stale_handle_falls_back_and_is_dropped(tmp_path):
+    registry = tmp_path / "registry.json"
+    cache = ContextCache(registry, min_tokens=100)
+    _, shotlist = _layouts()
+    key = shotlist.prefix_key("gemini-test")
+    cache.store(key, "cachedContents/deleted-on-server", "gemini-test", 1000)
+
+    response = generate_with_context(FakeGeminiAdapter(), "gemini-test", shotlist, None, cache)
+
+    assert "scene_001" in response.text
+    assert cache.stats.fallbacks == 1
+    assert cache.lookup(key) is None
+    assert json.loads(registry.read_text()) == {}
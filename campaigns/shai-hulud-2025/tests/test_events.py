@@ -0,0 +1,73 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+import click
+import pytest
+from click.testing import CliRunner
+from rich.console import Console
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from events import EventEmitter, configure_events, get_emitter, step_events  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_emitter():
+    yield
+    configure_events("none", None)
+
+
+def _events(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def test_disabled_emitter_writes_nothing():
+    emitter = EventEmitter()
+    emitter.emit("progress", done=1, total=2)
+    assert not emitter.enabled
+
+
+def test_api_call_reports_duration_and_errors():
+    stream = io.StringIO()
+    emitter = EventEmitter(stream, step="audio")
+
+    with emitter.api_call("elevenlabs", chunk=0):
+        pass
+    with pytest.raises(RuntimeError):
+        with emitter.api_call("elevenlabs", chunk=1):
+            raise RuntimeError("quota")
+
+    records = _events(stream.getvalue())
+    assert [r["event"] for r in records] == ["api_call_start", "api_call_end"] * 2
+    assert records[1]["ok"] is True and records[1]["duration_seconds"] >= 0
+    assert records[3]["ok"] is False and records[3]["error"] == "quota"
+    assert all(r["step"] == "audio" for r in records)
+
+
+def test_step_events_option_mutes_console(tmp_path):
+    console = Console()
+    artifact = tmp_path / "out.txt"
+
+    @click.command()
+    @step_events("demo", console)
+    @click.option("--fail", is_flag=True)
+    def main(fail: bool):
+        console.print("human output")
+        artifact.write_text("12345")
+        get_emitter().artifact(artifact)
+        if fail:
+            raise click.ClickException("boom")
+
+    result = CliRunner().invoke(main, ["--events", "jsonl"])
+    records = _events(result.output)
+    assert [r["event"] for r in records] == ["step_start", "artifact_written", "step_end"]
+    assert records[1]["bytes"] == 5
+    assert console.quiet
+
+    result = CliRunner().invoke(main, ["--events", "jsonl", "--fail"])
+    records = _events(result.output.split("Error:")[0])
+    assert records[-2]["event"] == "error"
+    assert records[-2]["error"] == "boom"
+    assert records[-1]["ok"] is False
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from intel_dedup import RedundancyFilter, SketchIndex, near_duplicates  # noqa: E402
+from intel_index import Passage  # noqa: E402
+
+SHARED = (
+    "Wave 2 moved execution to preinstall hooks that download the Bun runtime, register a "
+    "self-hosted GitHub runner called SHA1HULUD and publish stolen credentials to public repos "
+    "described as Sha1-Hulud: The Second Coming."
+)
+UNRELATED = "Rotate npm tokens, pin lockfiles, and disable lifecycle scripts in CI until every dependency has been audited."
+
+
+def _write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_near_duplicates_across_campaigns_and_incremental_refresh(tmp_path):
+    original = _write(tmp_path / "alpha" / "docs" / "paradigm.md", f"# Paradigm\n\n{SHARED}\n\n{UNRELATED}\n")
+    copy = _write(
+        tmp_path / "beta" / "docs" / "paradigm.md",
+        f"# TODO: Update paradigm for beta\n\n{SHARED.replace('public repos', 'public repositories')}\n",
+    )
+    index_path = tmp_path / ".intel-sketches.json"
+
+    index = SketchIndex(index_path).refresh([original, copy], base_dir=tmp_path)
+    index.save()
+    pairs = near_duplicates(index, threshold=0.7)
+
+    assert [(p.first, p.second) for p in pairs] == [("alpha/docs/paradigm.md", "beta/docs/paradigm.md")]
+    assert pairs[0].preview.startswith("Wave 2 moved")
+
+    _write(copy, f"# Beta\n\n{SHARED}\n\nA brand new paragraph about a different worm entirely and its loader.\n")
+    index = SketchIndex(index_path).refresh([original, copy], base_dir=tmp_path)
+    assert index.changed_files == ["beta/docs/paradigm.md"]
+    assert index.sketched == 1  # only the new paragraph; SHARED is cached by content
+
+    index = SketchIndex(index_path).refresh([original], base_dir=tmp_path)
+    assert near_duplicates(index) == []
+
+
+def test_redundancy_filter_drops_passages_already_in_prompt(tmp_path):
+    keep = RedundancyFilter(SketchIndex(None))
+    keep.seed(f"# Paradigm\n\n{SHARED}")
+
+    assert keep(Passage("beta/docs/paradigm.md", "Wave 2", SHARED)) is False
+    assert keep(Passage("alpha/data/raw/notes.md", "Defense", UNRELATED)) is True
+    assert keep(Passage("beta/data/raw/notes.md", "Defense", UNRELATED)) is False
+    assert keep(Passage("beta/docs/mixed.md", "Both", f"{SHARED}\n\nAn entirely fresh finding about registry tokens leaking.")) is True
+    assert keep.dropped == 2
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from intel_index import IntelIndex, format_passages, intel_sources, split_passages  # noqa: E402
+
+
+def _campaign(root: Path) -> Path:
+    campaign = root / "campaign-a"
+    (campaign / "docs").mkdir(parents=True)
+    (campaign / "data" / "raw").mkdir(parents=True)
+    (campaign / "docs" / "paradigm.md").write_text(
+        "# Paradigm\n\n## Wave 2\n\nPreinstall hooks launch a Bun runtime and register a self-hosted "
+        "runner named SHA1HULUD to exfiltrate secrets.\n\n## Wave 1\n\nPostinstall hooks ran Node scripts "
+        "that pushed stolen tokens to a single public exfil repo.\n",
+        encoding="utf-8",
+    )
+    (campaign / "data" / "raw" / "notes-snippets.md").write_text(
+        "### Emerging Information\n- Vendors count 25k exfil repos labeled Second Coming across GitHub.\n",
+        encoding="utf-8",
+    )
+    return campaign
+
+
+def test_split_passages_scopes_text_to_headings():
+    passages = split_passages("# Title\n\nIntro text.\n\n## Detection\n\nLook for runners.\n\nAnd repos.\n")
+
+    assert passages == [("Title", "Intro text."), ("Detection", "Look for runners.\n\nAnd repos.")]
+
+
+def test_search_ranks_relevant_passages_and_respects_exclude(tmp_path):
+    campaign = _campaign(tmp_path)
+    index = IntelIndex(None, base_dir=tmp_path).refresh(intel_sources(campaign))
+
+    top = index.search("bun runtime self-hosted runner", k=2)
+    assert top[0].heading == "Wave 2"
+    assert top[0].source == "campaign-a/docs/paradigm.md"
+
+    others = index.search("exfil repos", k=5, exclude=["campaign-a/docs/paradigm.md"])
+    assert [p.source for p in others] == ["campaign-a/data/raw/notes-snippets.md"]
+
+    text = format_passages(top, max_chars=10_000)
+    assert text.startswith("[campaign-a/docs/paradigm.md § Wave 2]\n")
+
+
+def test_refresh_only_reindexes_changed_files(tmp_path):
+    campaign = _campaign(tmp_path)
+    index_path = tmp_path / "index.json"
+
+    assert len(IntelIndex(index_path, tmp_path).refresh(intel_sources(campaign)).changed_files) == 2
+    assert IntelIndex(index_path, tmp_path).refresh(intel_sources(campaign)).changed_files == []
+
+    notes = campaign / "data" / "raw" / "notes-snippets.md"
+    notes.write_text("### Update\n- Lockfile pinning and token rotation stop the worm spreading further.\n")
+    index = IntelIndex(index_path, tmp_path).refresh(intel_sources(campaign))
+
+    assert index.changed_files == ["campaign-a/data/raw/notes-snippets.md"]
+    assert "coming" not in index.df
+    assert index.search("lockfile pinning", k=1)[0].heading == "Update"
+
+    notes.unlink()
+    index = IntelIndex(index_path, tmp_path).refresh(intel_sources(campaign))
+    assert index.changed_files == ["campaign-a/data/raw/notes-snippets.md"]
+    assert index.search("lockfile", k=1) == []
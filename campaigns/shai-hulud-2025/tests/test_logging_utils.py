@@ -0,0 +1,70 @@
+import json
+import logging
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+import logging_utils  # noqa: E402
+from logging_utils import JsonFormatter, TextFormatter, get_logger, run_log_file  # noqa: E402
+
+
+def _record(**extra) -> logging.LogRecord:
+    record = logging.LogRecord("pipeline", logging.INFO, __file__, 1, "Scene %s rendered", ("scene_001",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_formatters_keep_extra_fields():
+    record = _record(duration=8, cached=True)
+
+    text = TextFormatter().format(record)
+    assert text.endswith("| INFO | pipeline | Scene scene_001 rendered | duration=8 cached=True")
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Scene scene_001 rendered"
+    assert (entry["level"], entry["logger"], entry["duration"], entry["cached"]) == ("INFO", "pipeline", 8, True)
+
+
+def test_run_log_file_captures_records_from_worker_threads(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    log = get_logger("test_run_log")
+    log.setLevel(logging.INFO)
+    path = tmp_path / "logs" / "sora-run.jsonl"
+
+    with run_log_file(path):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda n: log.info("Chunk done", extra={"chunk": n}), range(20)))
+    log.info("After the run")
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert sorted(entry["chunk"] for entry in entries) == list(range(20))
+    assert all(entry["message"] == "Chunk done" for entry in entries)
+
+
+def test_concurrent_runs_write_separate_files_without_restarting_the_listener(tmp_path):
+    log = get_logger("test_run_log")
+    log.setLevel(logging.INFO)
+    writer = logging_utils._listener._thread
+    both_open = threading.Barrier(2)
+
+    def step(name: str) -> None:
+        with run_log_file(tmp_path / f"{name}.jsonl"):
+            both_open.wait()
+            for n in range(50):
+                log.info("Step progress", extra={"step": name, "n": n})
+            both_open.wait()
+
+    threads = [threading.Thread(target=step, args=(name,)) for name in ("script", "shorts")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name in ("script", "shorts"):
+        entries = [json.loads(line) for line in (tmp_path / f"{name}.jsonl").read_text().splitlines()]
+        assert [entry["n"] for entry in entries] == list(range(50))
+        assert {entry["step"] for entry in entries} == {name} and "run_id" not in entries[0]
+    assert logging_utils._listener._thread is writer
@@ -0,0 +1,82 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+import click
+import pytest
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+import manifest  # noqa: E402
+from events import get_emitter  # noqa: E402
+from manifest import load_manifest, manifest_step, record_step, summarize  # noqa: E402
+
+
+def test_record_step_tracks_artifacts_and_drops_deleted_ones(tmp_path):
+    outline = tmp_path / "data" / "processed" / "outline.json"
+    outline.parent.mkdir(parents=True)
+    outline.write_text('{"chapters": []}', encoding="utf-8")
+
+    record_step(tmp_path, "outline", True, time.time(), 1.25, [outline])
+    data = load_manifest(tmp_path)
+
+    assert data["steps"]["outline"]["status"] == "complete"
+    assert data["steps"]["outline"]["artifacts"] == 1
+    artifact = data["artifacts"]["data/processed/outline.json"]
+    assert artifact["bytes"] == len('{"chapters": []}')
+    assert len(artifact["sha256"]) == 64
+    assert summarize(data)["status"] == "Outlined"
+
+    outline.unlink()
+    record_step(tmp_path, "script", False, time.time(), 0.5, error="boom")
+    data = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+
+    assert data["artifacts"] == {}
+    assert (data["steps"]["script"]["status"], data["steps"]["script"]["error"]) == ("failed", "boom")
+    assert summarize(data)["steps"]["script"] == "failed"
+    assert summarize(data)["status"] == "Draft"
+
+
+def test_manifest_step_records_only_runs_that_write_or_fail(tmp_path, monkeypatch):
+    fake_config = type("Cfg", (), {
+        "campaign_root": tmp_path, "fingerprint": "f" * 64,
+        "pipeline_run_logs": True, "logs_dir": tmp_path / "logs",
+    })()
+    monkeypatch.setattr(manifest, "get_config", lambda: fake_config)
+    output = tmp_path / "video" / "scene_001.mp4"
+
+    @manifest_step("sora")
+    def dry_run():
+        return None
+
+    @manifest_step("sora")
+    def render():
+        output.parent.mkdir(exist_ok=True)
+        output.write_bytes(b"clip")
+        get_emitter().artifact(output)
+
+    @manifest_step("audio")
+    def broken():
+        raise click.ClickException("quota exceeded")
+
+    dry_run()
+    assert load_manifest(tmp_path) is None
+
+    render()
+    with pytest.raises(click.ClickException):
+        broken()
+
+    summary = summarize(load_manifest(tmp_path))
+    assert summary["status"] == "Media Generated"
+    assert summary["steps"] == {
+        "outline": "pending", "script": "pending", "shorts": "pending",
+        "shotlist": "pending", "audio": "failed", "sora": "complete",
+    }
+    assert load_manifest(tmp_path)["steps"]["audio"]["error"] == "quota exceeded"
+    assert load_manifest(tmp_path)["steps"]["sora"]["config"] == "f" * 64
+
+    run_log = load_manifest(tmp_path)["steps"]["audio"]["log"]
+    assert run_log.startswith("logs/audio-")
+    entry = json.loads((tmp_path / run_log).read_text().splitlines()[-1])
+    assert (entry["message"], entry["step"], entry["error"]) == ("Step failed", "audio", "quota exceeded")
@@ -0,0 +1,83 @@
+import struct
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from clip_store import ClipStore  # noqa: E402
+from generate_sora_clips import generate_sora_clip  # noqa: E402
+from mp4_check import check_mp4, verify_clips  # noqa: E402
+from simulation_adapters import FakeOpenAIClient, fake_mp4_bytes  # noqa: E402
+
+
+def _write(path: Path, data: bytes) -> Path:
+    path.write_bytes(data)
+    return path
+
+
+def _box(kind: bytes, payload: bytes = b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def _clip(*moov_children: bytes) -> bytes:
+    """ftyp, mdat, then a moov holding the given boxes, ending the file."""
+    return _box(b"ftyp", b"isom\0\0\0\0") + _box(b"mdat", b"\0" * 16) + _box(b"moov", b"".join(moov_children))
+
+
+def test_synthetic_clip_passes_with_its_declared_duration(tmp_path):
+    report = check_mp4(_write(tmp_path / "ok.mp4", fake_mp4_bytes(8.0)))
+    assert report.ok, report.problems
+    assert report.boxes == ["ftyp", "moov", "mdat"] and report.duration_seconds == 8.0
+
+
+def test_truncated_and_malformed_clips_are_flagged(tmp_path):
+    clip = fake_mp4_bytes()
+    truncated = check_mp4(_write(tmp_path / "cut.mp4", clip[:-10]))
+    assert not truncated.ok and "truncated download" in truncated.problems[0]
+    # Cut inside moov: the index is lost entirely
+    assert "no 'moov' box" in " ".join(check_mp4(_write(tmp_path / "moov.mp4", clip[:60])).problems)
+    assert not check_mp4(_write(tmp_path / "text.mp4", b"<html>Access denied</html>")).ok
+    assert not check_mp4(tmp_path / "missing.mp4").ok
+
+    # Sizes add up, but the chunk table points past the media data
+    stco_offset = clip.index(b"stco") + 12
+    bad_offset = clip[:stco_offset] + struct.pack(">I", len(clip) + 100) + clip[stco_offset + 4:]
+    report = check_mp4(_write(tmp_path / "offset.mp4", bad_offset))
+    assert report.problems == [f"1 sample chunk(s) outside the media data (first at byte {len(clip) + 100}, "
+                               f"file is {len(clip)} bytes)"]
+
+    checks = verify_clips([tmp_path / "ok.mp4", tmp_path / "cut.mp4"], workers=2)
+    assert list(checks) == [tmp_path / "ok.mp4", tmp_path / "cut.mp4"]
+
+
+def test_corrupt_stored_clip_is_evicted_and_rendered_again(tmp_path):
+    store = ClipStore(tmp_path / "store")
+    scene = {"id": "scene_001", "sora_prompt": "terminal window", "duration_seconds": 5}
+    key = store.key("terminal window", "sora-2", "1080p", 5)
+    _write(tmp_path / "broken.mp4", b"FAKE_VIDEO_DATA")
+    store.put(key, tmp_path / "broken.mp4")
+
+    clip = generate_sora_clip(FakeOpenAIClient(), scene, tmp_path, model="sora-2", simulate=True, store=store)
+    assert clip == tmp_path / "scene_001.mp4" and check_mp4(clip).ok
+    assert check_mp4(store.lookup(key)).ok
+
+
+def test_boxes_shorter_than_their_fields_are_reported_not_raised(tmp_path):
+    mvhd = _box(b"mvhd", struct.pack(">IIIII", 0, 0, 0, 1000, 5000))
+    table = _box(b"trak", _box(b"mdia", _box(b"minf", _box(b"stbl", _box(b"stco", b"\0\0\0\0")))))
+
+    # An 'stco' at the end of the file with no entry count
+    data = _clip(mvhd, table)
+    report = check_mp4(_write(tmp_path / "stco.mp4", data))
+    assert report.duration_seconds == 5.0
+    assert report.problems == [f"'stco' box at byte {len(data) - 12} is too short (4 byte payload)"]
+
+    # A header-only 'mvhd', and one cut inside its version 1 fields
+    data = _clip(_box(b"mvhd"))
+    report = check_mp4(_write(tmp_path / "mvhd.mp4", data))
+    assert report.problems[0] == f"'mvhd' box at byte {len(data) - 8} is too short (0 byte payload)"
+    report = check_mp4(_write(tmp_path / "mvhd64.mp4", _clip(_box(b"mvhd", b"\1\0\0\0" + b"\0" * 20))))
+    assert "too short (24 byte payload)" in report.problems[0]
+
+    checks = verify_clips([tmp_path / "stco.mp4", tmp_path / "mvhd.mp4"], workers=2)
+    assert not any(check.ok for check in checks.values())
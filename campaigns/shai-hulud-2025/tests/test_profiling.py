@@ -0,0 +1,33 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from profiling import run_profiled  # noqa: E402
+
+
+def _work(label: str) -> str:
+    worker = threading.Thread(target=time.sleep, args=(0.05,))
+    worker.start()
+    time.sleep(0.05)
+    worker.join()
+    return label
+
+
+def test_run_profiled_writes_artifacts_and_attributes_sleep(tmp_path):
+    result = run_profiled("demo", tmp_path, _work, "done")
+
+    assert result == "done"
+    prof = list(tmp_path.glob("demo-*.prof"))
+    summary = list(tmp_path.glob("demo-*.txt"))
+    assert len(prof) == 1 and len(summary) == 1
+
+    text = summary[0].read_text(encoding="utf-8")
+    sleep_line = next(line for line in text.splitlines() if line.startswith("Sleep/poll wait"))
+    # Main thread and worker thread both sleep 50ms
+    assert float(sleep_line.split(":")[1].split("s")[0]) >= 0.09
+    assert "Top cumulative wall-clock" in text
+    # Waits are summed across threads, so no wall-clock remainder is reported against them
+    assert "CPU (process):" in text and "Other wait" not in text
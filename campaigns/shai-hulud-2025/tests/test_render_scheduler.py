@@ -0,0 +1,90 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from render_scheduler import (  # noqa: E402
+    DEFAULT_BASE_SECONDS,
+    DEFAULT_SECONDS_PER_CLIP_SECOND,
+    RateLimiter,
+    RenderHistory,
+    projected_makespan,
+    schedule_scenes,
+)
+
+
+def test_longest_scene_submitted_first():
+    scenes = [
+        {"id": "a", "duration_seconds": 5},
+        {"id": "b", "duration_seconds": 8},
+        {"id": "c", "duration_seconds": 20},
+    ]
+
+    plan = schedule_scenes(scenes, RenderHistory())
+
+    assert [job.scene_id for job in plan] == ["c", "b", "a"]
+    assert plan[0].expected_seconds == DEFAULT_BASE_SECONDS + DEFAULT_SECONDS_PER_CLIP_SECOND * 20
+
+
+def test_priority_hint_beats_duration():
+    scenes = [
+        {"id": "long", "duration_seconds": 20},
+        {"id": "hook", "duration_seconds": 5, "priority": 1},
+    ]
+
+    plan = schedule_scenes(scenes, RenderHistory())
+
+    assert [job.scene_id for job in plan] == ["hook", "long"]
+
+
+def test_history_estimates_and_persists(tmp_path):
+    path = tmp_path / "history.json"
+    history = RenderHistory.load(path)
+    history.record(10, 100.0)
+    history.record(10, 140.0)
+    history.save()
+
+    reloaded = RenderHistory.load(path)
+    assert reloaded.estimate(10) == 120.0
+    # Unseen duration scales from the observed per-second rate
+    assert reloaded.estimate(5) == 60.0
+
+
+def test_concurrent_saves_keep_each_others_samples(tmp_path):
+    path = tmp_path / "history.json"
+    runs = [RenderHistory.load(path) for _ in range(2)]
+    runs[0].record(10, 100.0)
+    runs[1].record(10, 200.0)
+    runs[1].record(5, 50.0)
+    for run in runs:
+        run.save()
+
+    merged = RenderHistory.load(path)
+    assert merged.timings["10"] == {"count": 2, "mean_seconds": 150.0}
+    assert merged.timings["5"]["count"] == 1
+    # Saving again adds nothing twice
+    runs[1].save()
+    assert RenderHistory.load(path).timings["10"]["count"] == 2
+
+
+def test_rate_limiter_spaces_starts_across_threads():
+    pacer = RateLimiter(0.05)
+    starts = []
+    threads = [threading.Thread(target=lambda: (pacer.wait(), starts.append(time.monotonic()))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    starts.sort()
+    assert all(later - earlier >= 0.04 for earlier, later in zip(starts, starts[1:]))
+
+
+def test_lpt_order_shortens_makespan():
+    in_order = [10.0, 10.0, 10.0, 30.0]
+    lpt = sorted(in_order, reverse=True)
+
+    assert projected_makespan(in_order, 2) == 40.0
+    assert projected_makespan(lpt, 2) == 30.0
+    assert projected_makespan([], 4) == 0.0
@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from clip_previews import FFmpegTools, PreviewCache  # noqa: E402
+from rough_cut import CutSpec, assemble, choose_spec, plan_segments, scene_spans  # noqa: E402
+from simulation_adapters import FakeMediaTools  # noqa: E402
+
+
+def test_scene_spans_cover_the_narration_from_cue_to_cue():
+    scenes = [{"id": "b", "start_seconds": 6.0}, {"id": "a", "start_seconds": 2.5}, {"id": "untimed"}]
+    assert scene_spans(scenes, 10.0) == [("slate", 0.0, 2.5), ("a", 2.5, 6.0), ("b", 6.0, 10.0)]
+    # Without voiceover timing, scenes are laid end to end
+    assert scene_spans([{"id": "a", "duration_seconds": 4}, {"id": "b", "duration_seconds": 3}], 5.0) == [
+        ("a", 0.0, 4.0), ("b", 4.0, 7.0),
+    ]
+
+
+def test_choose_spec_picks_the_most_common_encodable_format():
+    hd = {"video_codec": "h264", "width": 1920, "height": 1080, "fps": 30.0, "pix_fmt": "yuv420p",
+          "time_base": "1/15360", "profile": "High"}
+    vertical = {**hd, "width": 1080, "height": 1920}
+    assert choose_spec([vertical, hd, hd]) == CutSpec()
+    assert choose_spec([{"video_codec": "vp9", "width": 640, "height": 360, "fps": 25.0}]) == CutSpec()
+    assert not CutSpec().matches(vertical)
+
+
+def test_clips_with_another_timescale_or_profile_are_encoded_to_match(tmp_path, monkeypatch):
+    hd = {"video_codec": "h264", "width": 1920, "height": 1080, "fps": 30.0, "pix_fmt": "yuv420p",
+          "time_base": "1/15360", "profile": "High"}
+    spec = choose_spec([hd, hd, {**hd, "time_base": "1/90000"}])
+    assert spec.matches(hd)
+    assert not spec.matches({**hd, "time_base": "1/90000"}) and not spec.matches({**hd, "profile": "Main"})
+
+    commands = []
+    monkeypatch.setattr(FFmpegTools, "_run", staticmethod(commands.append))
+    FFmpegTools().encode_segment(tmp_path / "scene_001.mp4", tmp_path / "segment.mp4", 3.0, spec)
+    command = commands[0]
+    assert command[command.index("-profile:v") + 1] == "high"
+    assert command[command.index("-video_track_timescale") + 1] == "15360"
+
+
+def test_changing_one_scene_only_recuts_its_segment(tmp_path):
+    video_dir, audio = tmp_path / "video", tmp_path / "voiceover.mp3"
+    video_dir.mkdir()
+    audio.write_bytes(b"FAKE_AUDIO_DATA")
+    for scene_id in ("scene_001", "scene_002"):
+        (video_dir / f"{scene_id}.mp4").write_bytes(scene_id.encode())
+    scenes = [{"id": "scene_001", "start_seconds": 1.0}, {"id": "scene_002", "start_seconds": 4.0}]
+    tools, cache, cut_dir = FakeMediaTools(), PreviewCache(tmp_path / "cache"), tmp_path / "rough-cut"
+
+    spec, segments = plan_segments(scenes, 12.0, video_dir, tools, cache, tmp_path / "previews")
+    # Fake clips are 5s long: the 3s span is copied, the 8s span re-encoded to hold the last frame
+    assert [(s.scene_id, s.mode, s.frames) for s in segments] == [
+        ("slate", "slate", 30), ("scene_001", "copy", 90), ("scene_002", "encode", 240),
+    ]
+    counts = assemble(spec, segments, audio, cut_dir, tools)
+    assert counts == {"slate": 1, "copy": 1, "encode": 1, "muxed": True}
+    assert (cut_dir / "rough-cut.mp4").read_bytes().count(b"file 'segments/") == 3
+
+    # Unchanged timeline: nothing is cut or muxed again
+    assert assemble(spec, segments, audio, cut_dir, tools) == {"reused": 3, "muxed": False}
+
+    (video_dir / "scene_002.mp4").write_bytes(b"re-rendered")
+    spec, segments = plan_segments(scenes, 12.0, video_dir, tools, cache, tmp_path / "previews")
+    assert assemble(spec, segments, audio, cut_dir, tools) == {"reused": 2, "encode": 1, "muxed": True}
+    assert len(list((cut_dir / "segments").glob("*.mp4"))) == 3
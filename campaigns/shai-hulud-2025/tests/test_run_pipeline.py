@@ -0,0 +1,72 @@
+import asyncio
+import dataclasses
+import json
+import shutil
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from config import TEMPLATE_ROOT, Config, use_config  # noqa: E402
+from generate_script import astream_script  # noqa: E402
+from manifest import load_manifest  # noqa: E402
+from run_pipeline import StreamingPipeline, chapter_scenes, main, scene_range  # noqa: E402
+
+
+def test_streamed_script_parts_concatenate_to_the_full_script():
+    outline = {"chapters": [{"title": "Intro"}]}
+
+    async def run():
+        return [part async for part in astream_script(
+            outline, "outline-to-script", "calm", 12, "", "gemini-test", 0.7, 0.9, simulate=True,
+        )]
+
+    parts = asyncio.run(run())
+    assert len(parts) >= 2
+    assert parts[1].startswith("[CHAPTER 1")
+    assert "FAKE SCRIPT" in "".join(parts)
+
+
+def test_chapter_scenes_get_unique_ids_and_a_share_of_the_scene_budget():
+    scenes = chapter_scenes("chapter_2", {"scenes": [{"id": "scene_001"}, {"id": "scene_002"}]})
+    assert [scene["id"] for scene in scenes] == ["chapter_2_scene_001", "chapter_2_scene_002"]
+    assert scene_range(1) == "9-11"
+    assert scene_range(5) == "1-3"
+
+
+def test_streaming_pipeline_writes_every_step_output(tmp_path):
+    root = tmp_path / "campaigns" / "demo"
+    (root / "docs").mkdir(parents=True)
+    (root / "docs" / "shai-hulud-paradigm.md").write_text("# Paradigm\n\nA worm in npm.\n", encoding="utf-8")
+    config = Config.load(root, environ={})
+
+    with use_config(config):
+        config.ensure_dirs()
+        timeline = asyncio.run(StreamingPipeline(config, True, 12, "16:9", 2).run())
+
+    assert set(timeline) == {"outline", "script", "shorts", "shotlist", "audio", "sora"}
+    # Narration and planning are handed chapters before the script stage finishes
+    assert timeline["audio"][0] < timeline["script"][1] and timeline["shotlist"][0] < timeline["script"][1]
+    shotlist = json.loads(config.shotlist_json.read_text(encoding="utf-8"))
+    assert shotlist["scenes"] and all(scene["id"].startswith("chapter_") for scene in shotlist["scenes"])
+    assert shotlist["formats"] == {"longform": "16:9", "shorts": config.shorts_aspect_ratio}
+    assert all((config.video_dir / f"{scene['id']}.mp4").exists() for scene in shotlist["scenes"])
+    assert config.voiceover_mp3.exists() and config.shorts_scripts.exists()
+    steps = load_manifest(root)["steps"]
+    assert all(steps[step]["status"] == "complete" for step in timeline)
+
+
+def test_pipeline_aspect_ratio_defaults_to_the_campaign_setting(tmp_path):
+    root = tmp_path / "campaigns" / "demo"
+    (root / "docs").mkdir(parents=True)
+    (root / "docs" / "shai-hulud-paradigm.md").write_text("# Paradigm\n", encoding="utf-8")
+    shutil.copytree(TEMPLATE_ROOT / "prompts", root / "prompts")
+    config = dataclasses.replace(Config.load(root, environ={}), video_aspect_ratio="4:5")
+
+    with use_config(config):
+        result = CliRunner().invoke(main, ["--dry-run"])
+        assert result.exit_code == 0, result.output
+
+    assert "12 minutes, 4:5" in result.output
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from config import Config  # noqa: E402
+from generate_shorts import parse_shorts  # noqa: E402
+from generate_shorts_media import ShortsProducer, clean_short_for_tts, lay_out_scenes  # noqa: E402
+
+SHORTS = """Here are your shorts.
+
+--- SHORT #1: What is a supply chain worm? ---
+[0:00–0:05] Hook: One install. Five hundred packages.
+[0:05–0:45] Explanation: The worm republishes itself.
+
+--- SHORT #2: Check your runners ---
+[0:00–0:05] Hook: Is SHA1HULUD in your runner list?
+"""
+
+
+def test_shorts_are_parsed_into_items_with_clean_narration():
+    shorts = parse_shorts(SHORTS)
+    assert [(s["id"], s["title"]) for s in shorts] == [
+        ("short_1", "What is a supply chain worm?"), ("short_2", "Check your runners"),
+    ]
+    assert clean_short_for_tts(shorts[0]["text"]) == "One install. Five hundred packages.\nThe worm republishes itself."
+    assert parse_shorts("# Short 1\n\nNarrator: simulated.")[0]["text"] == "Narrator: simulated."
+    assert lay_out_scenes(["a", "b", "c"], {"a": "a.mp4", "c": "c.mp4"}, 10.0) == [
+        {"id": "a", "clip": "a.mp4", "start_seconds": 0.0, "end_seconds": 5.0},
+        {"id": "c", "clip": "c.mp4", "start_seconds": 5.0, "end_seconds": 10.0},
+    ]
+
+
+def test_shorts_get_voiceovers_and_share_clip_renders(tmp_path):
+    root = tmp_path / "campaigns" / "demo"
+    root.mkdir(parents=True)
+    config = Config.load(root, environ={})
+    shotlist = {
+        "formats": {"longform": "16:9", "shorts": "9:16"},
+        "scenes": [
+            {"id": "scene_001", "sora_prompt": "Worm on conveyor belts, 16:9", "duration_seconds": 5,
+             "used_by": ["longform", "short_1", "short_2"]},
+            {"id": "scene_002", "sora_prompt": "Runner list turning red", "duration_seconds": 5, "used_by": ["short_2"]},
+        ],
+    }
+
+    producer = ShortsProducer(config, shotlist, simulate=True, concurrency=4)
+    summaries = asyncio.run(producer.run(parse_shorts(SHORTS)))
+
+    # scene_001 is used by both shorts but rendered once
+    assert producer.rendered == 2
+    assert [[scene["id"] for scene in s["scenes"]] for s in summaries] == [["scene_001"], ["scene_001", "scene_002"]]
+    assert summaries[1]["scenes"][0]["clip"] == "video/9x16/scene_001.mp4"
+    for summary in summaries:
+        short_dir = config.shorts_dir / summary["id"]
+        assert summary["duration_seconds"] > 0 and (short_dir / "voiceover.timing.json").exists()
+        assert json.loads((short_dir / "short.json").read_text(encoding="utf-8")) == summary
+
+    # A second run finds the clips in place and the narration in the chunk cache
+    again = ShortsProducer(config, shotlist, simulate=True, concurrency=4)
+    asyncio.run(again.run(parse_shorts(SHORTS)))
+    assert (again.rendered, again.reused) == (0, 2)
+    assert len(list((config.audio_chunks_dir / "simulated").glob("*.mp3"))) == 2
+
+    # An edited scene prompt is a new render, even though a 9:16 clip for the scene exists
+    shotlist["scenes"][1]["sora_prompt"] = "Runner list turning green"
+    edited = ShortsProducer(config, shotlist, simulate=True, concurrency=4)
+    asyncio.run(edited.run(parse_shorts(SHORTS)))
+    assert (edited.rendered, edited.reused) == (1, 1)
@@ -0,0 +1,112 @@
+import json
+import shutil
+import sys
+import tracemalloc
+from pathlib import Path
+
+from click.testing import CliRunner
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+import shotlist_stream  # noqa: E402
+from chapters import mark_stale  # noqa: E402
+from config import TEMPLATE_ROOT, Config, use_config  # noqa: E402
+from generate_outline import main as outline_step  # noqa: E402
+from generate_script import main as script_step  # noqa: E402
+from generate_shotlist import main as shotlist_step  # noqa: E402
+from generate_sora_clips import main as generate_clips  # noqa: E402
+from shotlist_stream import append_scenes, iter_scenes, load_shotlist, read_meta, shotlist_source, windows  # noqa: E402
+
+
+def scene(n: int, **extra) -> dict:
+    return {"id": f"scene_{n:04d}", "sora_prompt": f"Shot {n} " + "x" * 2000, "duration_seconds": 5 + n % 3, **extra}
+
+
+def test_json_and_jsonl_shotlists_stream_the_same_scenes(tmp_path, monkeypatch):
+    # Tiny reads put values across buffer edges
+    monkeypatch.setattr(shotlist_stream, "CHUNK_SIZE", 7)
+    scenes = [scene(n, priority=1.5) for n in range(1, 6)]
+    document = tmp_path / "shotlist.json"
+    document.write_text(json.dumps({"formats": {"longform": "16:9"}, "scenes": scenes, "total": 12}, indent=2))
+    assert list(iter_scenes(document)) == scenes
+    assert read_meta(document) == {"formats": {"longform": "16:9"}, "total": 12}
+
+    # An appended scene replaces the earlier line with its id, in its original position
+    lines = tmp_path / "shotlist.jsonl"
+    append_scenes(lines, scenes[:3], meta={"formats": {"longform": "16:9"}})
+    append_scenes(lines, [dict(scenes[1], duration_seconds=9), *scenes[3:]])
+    streamed = list(iter_scenes(lines))
+    assert [s["id"] for s in streamed] == [s["id"] for s in scenes]
+    assert streamed[1]["duration_seconds"] == 9
+    assert read_meta(lines) == {"formats": {"longform": "16:9"}}
+
+    # Filters apply before the resume offset
+    wanted = {"scene_0002", "scene_0004", "scene_0005"}
+    assert [s["id"] for s in iter_scenes(lines, wanted, offset=1)] == ["scene_0004", "scene_0005"]
+    assert [len(w) for w in windows(iter_scenes(document), 2)] == [2, 2, 1]
+
+
+def test_reading_a_large_shotlist_holds_about_one_scene(tmp_path):
+    path = tmp_path / "shotlist.json"
+    path.write_text(json.dumps({"scenes": [scene(n) for n in range(2000)]}))
+    assert path.stat().st_size > 4_000_000
+
+    tracemalloc.start()
+    count = sum(1 for _ in iter_scenes(path))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert count == 2000 and peak < 1_000_000
+
+
+def test_clips_render_from_a_jsonl_shotlist_resuming_at_an_offset(tmp_path):
+    root = tmp_path / "campaigns" / "demo"
+    root.mkdir(parents=True)
+    config = Config.load(root, environ={})
+    config.ensure_dirs()
+    shotlist = config.shotlist_json.with_suffix(".jsonl")
+    append_scenes(shotlist, [scene(n) for n in range(1, 6)])
+
+    with use_config(config):
+        result = CliRunner().invoke(
+            generate_clips,
+            ["--simulate", "--no-coalesce", "--shotlist", str(shotlist), "--offset", "2", "--window", "2"],
+        )
+        assert result.exit_code == 0, result.output
+    assert "Scenes to generate: 3 (3 render jobs)" in result.output and "Generated 3 clips" in result.output
+    assert sorted(p.name for p in config.video_dir.glob("*.mp4")) == [f"scene_000{n}.mp4" for n in range(3, 6)]
+
+
+def test_shotlist_step_writes_jsonl_and_appends_only_redone_scenes(tmp_path):
+    root = tmp_path / "campaigns" / "demo"
+    (root / "docs").mkdir(parents=True)
+    (root / "docs" / "shai-hulud-paradigm.md").write_text("# Paradigm\n\nA worm in npm.\n", encoding="utf-8")
+    shutil.copytree(TEMPLATE_ROOT / "prompts", root / "prompts")
+    config = Config.load(root, environ={})
+    config.ensure_dirs()
+    jsonl = config.shotlist_json.with_suffix(".jsonl")
+
+    with use_config(config):
+        for step, args in ((outline_step, []), (script_step, []), (shotlist_step, ["--jsonl"])):
+            result = CliRunner().invoke(step, ["--simulate", *args])
+            assert result.exit_code == 0, result.output
+        assert shotlist_source(config.shotlist_json) == jsonl and not config.shotlist_json.exists()
+        written = load_shotlist(jsonl)
+        assert written["scenes"] and written["formats"]["longform"] == config.video_aspect_ratio
+        assert len(jsonl.read_text(encoding="utf-8").splitlines()) == len(written["scenes"]) + 1
+
+        # A redone scene is appended and replaces the earlier line in place, with or without --jsonl
+        scene = written["scenes"][0]
+        for args in (["--jsonl"], []):
+            append_scenes(jsonl, [{**scene, "sora_prompt": "An outdated prompt"}])
+            before = len(jsonl.read_text(encoding="utf-8").splitlines())
+            mark_stale(config.stale_json, scenes=[scene["id"]])
+            result = CliRunner().invoke(shotlist_step, ["--simulate", "--stale-only", *args])
+            assert result.exit_code == 0, result.output
+            appended = [json.loads(line) for line in jsonl.read_text(encoding="utf-8").splitlines()[before:]]
+            assert appended == [scene]
+            assert list(iter_scenes(jsonl)) == written["scenes"] and not config.shotlist_json.exists()
+
+        # Consumers follow the campaign to the JSONL shotlist
+        result = CliRunner().invoke(generate_clips, ["--simulate", "--dry-run"])
+        assert result.exit_code == 0, result.output
+    assert "shotlist.jsonl" in result.output
@@ -0,0 +1,96 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from generate_audio import clean_script_for_tts, synthesize_chunk  # noqa: E402
+from simulation_adapters import FakeElevenLabsClient  # noqa: E402
+from timing_index import (  # noqa: E402
+    apply_timing_to_shotlist,
+    build_timing_index,
+    estimate_word_timings,
+    find_broll_cues,
+    timing_index_path,
+    words_from_alignment,
+)
+
+SCRIPT = (
+    "[INTRO – 0:00–0:45]\n"
+    "Welcome to the worm.\n\n"
+    "[B-ROLL: Conveyor belt of npm boxes]\n\n"
+    "One package turns red and spreads quickly.\n\n"
+    "[B-ROLL: Glowing repo cubes multiplying]\n\n"
+    "Rotate your tokens today."
+)
+
+
+def test_words_from_alignment_groups_characters():
+    chars = list("hi there")
+    starts = [i * 0.1 for i in range(len(chars))]
+    ends = [(i + 1) * 0.1 for i in range(len(chars))]
+
+    words = words_from_alignment(chars, starts, ends, offset=10.0)
+
+    assert len(words) == 2
+    assert words[0][0] == 10.0
+    assert round(words[1][0], 3) == 10.3
+    assert round(words[1][1], 3) == 10.8
+
+
+def test_estimate_word_timings_is_monotonic():
+    words, duration = estimate_word_timings("one two three four five", offset=2.0)
+
+    assert len(words) == 5
+    assert duration == 2.0  # 5 words at 150 wpm
+    assert words[0][0] == 2.0
+    assert all(a[1] <= b[0] + 1e-9 for a, b in zip(words, words[1:]))
+
+
+def test_find_broll_cues_counts_spoken_words():
+    cues = find_broll_cues(SCRIPT, clean_script_for_tts)
+
+    assert [c["label"] for c in cues] == ["Conveyor belt of npm boxes", "Glowing repo cubes multiplying"]
+    assert cues[0]["word_index"] == 4
+    assert cues[1]["word_index"] == 11
+
+
+def test_synthetic_timestamps_drive_shotlist_timing():
+    client = FakeElevenLabsClient(api_key="fake")
+    text = clean_script_for_tts(SCRIPT)
+    audio, words, duration, source = synthesize_chunk(client, text, "voice", "model")
+
+    assert audio.startswith(b"FAKE_AUDIO_DATA")
+    assert source == "elevenlabs"
+    assert len(words) == len(text.split())
+
+    index = build_timing_index(words, duration, find_broll_cues(SCRIPT, clean_script_for_tts), source)
+    shotlist = {"scenes": [{"id": "belt", "sora_prompt": "npm conveyor belt"}, {"id": "cubes"}]}
+
+    assert apply_timing_to_shotlist(shotlist, index) == 2
+    first, second = shotlist["scenes"]
+    assert first["start_seconds"] == index["cues"][0]["start_seconds"]
+    assert first["end_seconds"] == second["start_seconds"]
+    assert second["end_seconds"] == index["duration_seconds"]
+    assert first["duration_seconds"] >= 1
+    assert first["time_range"].startswith("0:0")
+
+
+def test_fewer_scenes_than_cues_match_by_prompt():
+    index = {
+        "duration_seconds": 30.0,
+        "cues": [
+            {"label": "Terminal window scrolling", "start_seconds": 1.0},
+            {"label": "Glowing repo cubes", "start_seconds": 10.0},
+            {"label": "Red maintainer avatar", "start_seconds": 20.0},
+        ],
+    }
+    shotlist = {"scenes": [{"id": "cubes", "sora_prompt": "glowing cubes of repo data"}]}
+
+    apply_timing_to_shotlist(shotlist, index)
+
+    assert shotlist["scenes"][0]["time_range"] == "0:10-0:30"
+    assert shotlist["scenes"][0]["duration_seconds"] == 20
+
+
+def test_timing_index_path():
+    assert timing_index_path(Path("audio/voiceover.mp3")) == Path("audio/voiceover.timing.json")
@@ -0,0 +1,80 @@
+import json
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from clip_store import ClipStore  # noqa: E402
+from config import Config, use_config  # noqa: E402
+from generate_sora_clips import main as generate_clips  # noqa: E402
+from timing_index import apply_timing_to_shotlist  # noqa: E402
+from video_formats import format_dir, render_size, render_variants, retarget_prompt, shorts_scenes  # noqa: E402
+
+SCENES = [
+    {"id": "scene_001", "sora_prompt": "Glowing repo cubes, 16:9", "duration_seconds": 5,
+     "used_by": ["longform", "short_1", "short_2"],
+     "variants": {"9:16": {"sora_prompt": "Stacked repo cubes in a vertical frame, 9:16"}}},
+    {"id": "scene_002", "sora_prompt": "Conveyor belt of packages", "duration_seconds": 5},
+    {"id": "scene_003", "sora_prompt": "Red maintainer badge, 16:9", "duration_seconds": 5, "used_by": ["short_2"]},
+]
+
+
+def test_shared_scenes_render_once_per_format_not_per_short():
+    jobs = render_variants(SCENES, "16:9", "9:16")
+    assert [(job["id"], job["aspect_ratio"]) for job in jobs] == [
+        ("scene_001", "16:9"), ("scene_001", "9:16"), ("scene_002", "16:9"), ("scene_003", "9:16"),
+    ]
+    assert jobs[1]["sora_prompt"] == "Stacked repo cubes in a vertical frame, 9:16" and "variants" not in jobs[1]
+    # No planned variant: the long-form prompt is retargeted
+    assert jobs[3]["sora_prompt"] == "Red maintainer badge, 9:16"
+    assert shorts_scenes(SCENES) == {"short_1": ["scene_001"], "short_2": ["scene_001", "scene_003"]}
+    # One shared format collapses to one job per scene
+    assert len(render_variants(SCENES, "16:9", "16:9")) == 3
+
+
+def test_retargeting_swaps_aspect_ratios_but_not_times():
+    assert retarget_prompt("Clock reads 3:14 AM over a dark office, 16:9", "9:16") == (
+        "Clock reads 3:14 AM over a dark office, 9:16"
+    )
+    assert retarget_prompt("Pager goes off at 4:30, wide shot", "9:16") == "Pager goes off at 4:30, wide shot, 9:16."
+    assert retarget_prompt("Alarm at 9:16 PM", "4:5") == "Alarm at 9:16 PM, 4:5."
+    assert retarget_prompt("Terminal in 2:1 aspect ratio", "9:16") == "Terminal in 9:16 aspect ratio"
+
+
+def test_formats_map_to_sizes_store_keys_and_directories(tmp_path):
+    assert render_size("1080p", "16:9") == "1080p"
+    assert render_size("1080p", "9:16") == "1080x1920" and render_size("720p", "4:5") == "720x900"
+    assert format_dir(tmp_path, "9:16", "16:9") == tmp_path / "9x16" and format_dir(tmp_path, "16:9", "16:9") == tmp_path
+    # Existing 16:9 keys are unchanged; other formats get their own
+    key = ClipStore.key("cubes", "sora-2", "1080p", 5)
+    assert ClipStore.key("cubes", "sora-2", "1080p", 5, "16:9") == key
+    assert ClipStore.key("cubes", "sora-2", "1080p", 5, "9:16") != key
+
+    # Shorts-only scenes take no voiceover cue
+    shotlist = {"scenes": [dict(scene) for scene in SCENES]}
+    cues = [{"label": "cubes", "start_seconds": 1.0}, {"label": "belt", "start_seconds": 4.0}]
+    assert apply_timing_to_shotlist(shotlist, {"cues": cues, "duration_seconds": 9.0}) == 2
+    assert "start_seconds" not in shotlist["scenes"][2]
+
+
+def test_all_formats_share_one_render_run(tmp_path):
+    root = tmp_path / "campaigns" / "demo"
+    root.mkdir(parents=True)
+    config = Config.load(root, environ={})
+    config.ensure_dirs()
+    config.shotlist_json.write_text(
+        json.dumps({"scenes": SCENES, "formats": {"longform": "16:9", "shorts": "9:16"}}), encoding="utf-8",
+    )
+
+    with use_config(config):
+        result = CliRunner().invoke(generate_clips, ["--simulate", "--concurrency", "4"])
+        assert result.exit_code == 0, result.output
+        assert "4 render jobs" in result.output and "Generated 4 clips" in result.output
+        assert sorted(p.relative_to(config.video_dir).as_posix() for p in config.video_dir.rglob("*.mp4")) == [
+            "9x16/scene_001.mp4", "9x16/scene_003.mp4", "scene_001.mp4", "scene_002.mp4",
+        ]
+
+        result = CliRunner().invoke(generate_clips, ["--simulate", "--format", "9:16", "--dry-run"])
+        assert "2 render jobs" in result.output
@@ -0,0 +1,114 @@
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+from click.testing import CliRunner
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from clients import gemini_client, openai_client, warm_clients  # noqa: E402
+from config import TEMPLATE_ROOT, Config, use_config  # noqa: E402
+from generate_outline import main as outline_step  # noqa: E402
+from generate_script import main as script_step  # noqa: E402
+from generate_shorts import main as shorts_step  # noqa: E402
+from generate_shotlist import main as shotlist_step  # noqa: E402
+from manifest import load_manifest  # noqa: E402
+from watch import STAGES, affected_stages, watch  # noqa: E402
+
+
+def test_only_stages_downstream_of_a_change_are_affected():
+    def names(*fields):
+        return [stage.name for stage in affected_stages(set(fields))]
+
+    assert names("prompt_shorts") == ["shorts", "shotlist", "sora"]
+    assert names("prompt_voice_style") == ["script", "shorts", "shotlist", "audio", "sora"]
+    assert names("paradigm_doc") == ["outline", "script", "shorts", "shotlist", "audio", "sora"]
+    content = tuple(stage for stage in STAGES if not stage.media)
+    assert [stage.name for stage in affected_stages({"outline_json"}, content)] == ["script", "shorts", "shotlist"]
+    assert names("voiceover_mp3") == []
+
+
+def test_warm_registry_reuses_clients_until_it_closes(tmp_path):
+    with use_config(Config.load(tmp_path, environ={})):
+        assert openai_client("key", simulate=True) is not openai_client("key", simulate=True)
+        with warm_clients():
+            assert openai_client("key", simulate=True) is openai_client("key", simulate=True)
+            assert gemini_client("key", simulate=True) is gemini_client("key", simulate=True)
+            assert openai_client("key", simulate=True) is not openai_client("other", simulate=True)
+        assert openai_client("key", simulate=True) is not openai_client("key", simulate=True)
+
+
+def _built_campaign(tmp_path) -> Config:
+    """A campaign with every content stage already run."""
+    root = tmp_path / "campaigns" / "demo"
+    (root / "docs").mkdir(parents=True)
+    (root / "docs" / "shai-hulud-paradigm.md").write_text("# Paradigm\n\nA worm in npm.\n", encoding="utf-8")
+    shutil.copytree(TEMPLATE_ROOT / "prompts", root / "prompts")
+    config = Config.load(root, environ={})
+    config.ensure_dirs()
+    with use_config(config):
+        for step in (outline_step, script_step, shorts_step, shotlist_step):
+            result = CliRunner().invoke(step, ["--simulate"])
+            assert result.exit_code == 0, result.output
+    return config
+
+
+def _watch_one_rebuild(config: Config, edit) -> list[int]:
+    """Run the watcher until one rebuild, calling ``edit(n)`` for a burst of edits."""
+    stop = threading.Event()
+    content = tuple(stage for stage in STAGES if not stage.media)
+    runs = []
+    watcher = threading.Thread(
+        target=lambda: runs.append(watch(config, content, True, poll=0.05, debounce=0.2, max_runs=1, stop=stop)),
+    )
+    watcher.start()
+    try:
+        time.sleep(0.3)
+        for n in range(3):
+            edit(n)
+            time.sleep(0.05)
+        watcher.join(timeout=60)
+    finally:
+        stop.set()
+        watcher.join()
+    return runs
+
+
+def test_editing_a_prompt_reruns_only_its_stages(tmp_path):
+    config = _built_campaign(tmp_path)
+    before = {path: path.stat().st_mtime_ns for path in (
+        config.outline_json, config.script_longform, config.shorts_scripts, config.shotlist_json,
+    )}
+
+    # A burst of edits settles into one rebuild
+    runs = _watch_one_rebuild(
+        config, lambda n: config.prompt_shorts.write_text(f"Write punchier shorts, take {n}.\n", encoding="utf-8"),
+    )
+
+    assert runs == [1]
+    after = {path: path.stat().st_mtime_ns for path in before}
+    assert after[config.outline_json] == before[config.outline_json]
+    assert after[config.script_longform] == before[config.script_longform]
+    assert after[config.shorts_scripts] != before[config.shorts_scripts]
+    assert after[config.shotlist_json] != before[config.shotlist_json]
+
+
+def test_editing_the_script_prompt_regenerates_the_script(tmp_path):
+    config = _built_campaign(tmp_path)
+    script_before = config.script_longform.stat().st_mtime_ns
+    outline_before = config.outline_json.stat().st_mtime_ns
+    recorded_before = load_manifest(config.campaign_root)["steps"]["script"]["config"]
+
+    runs = _watch_one_rebuild(
+        config, lambda n: config.prompt_script.write_text(f"Write a tighter script, take {n}.\n", encoding="utf-8"),
+    )
+
+    # The script step sees the new prompt instead of reporting "up to date"
+    assert runs == [1]
+    assert config.script_longform.stat().st_mtime_ns != script_before
+    assert config.outline_json.stat().st_mtime_ns == outline_before
+    # The watcher's long-lived config records the fingerprint of the edited prompt
+    recorded = load_manifest(config.campaign_root)["steps"]["script"]["config"]
+    assert recorded != recorded_before and recorded == config.fingerprint
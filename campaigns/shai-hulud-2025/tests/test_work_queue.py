@@ -0,0 +1,111 @@
+import dataclasses
+import json
+import shutil
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+
+from config import TEMPLATE_ROOT, Config, use_config  # noqa: E402
+from mp4_check import check_mp4  # noqa: E402
+from queue_coordinator import llm_jobs  # noqa: E402
+from queue_coordinator import main as coordinate  # noqa: E402
+from work_queue import SQLiteBroker, job_id, open_broker, register_broker  # noqa: E402
+
+
+def test_jobs_are_idempotent_and_dead_workers_lose_their_lease(tmp_path):
+    broker = open_broker(tmp_path / "queue.sqlite", lease_seconds=0.2, max_attempts=2)
+    job = broker.enqueue("sora", {"scene": "scene_001"})
+    assert broker.enqueue("sora", {"scene": "scene_001"}) == job
+    assert broker.counts() == {"queued": 1, "running": 0, "done": 0, "failed": 0}
+
+    # A claimed job is leased to one worker only
+    assert broker.claim("a").id == job and broker.claim("b") is None
+    time.sleep(0.3)
+    assert broker.requeue_expired() == [job]
+    assert broker.claim("b").attempts == 2
+    assert not broker.heartbeat(job, "a")
+    # Out of attempts: failed, until it is enqueued again
+    assert broker.fail(job, "b", "boom") == "failed"
+    broker.enqueue("sora", {"scene": "scene_001"})
+    assert broker.claim("c").attempts == 1 and broker.complete(job, "c", {"path": "video/scene_001.mp4"})
+
+    # Done jobs stay done unless their output went missing
+    broker.enqueue("sora", {"scene": "scene_001"})
+    assert broker.get(job).state == "done" and broker.get(job).result == {"path": "video/scene_001.mp4"}
+    broker.enqueue("sora", {"scene": "scene_001"}, rerun=True)
+    assert broker.get(job).state == "queued"
+
+    with pytest.raises(ValueError, match="redis"):
+        open_broker("redis://queue:6379/0")
+    register_broker("memory", lambda rest, **options: SQLiteBroker(tmp_path / f"{rest}.sqlite", **options))
+    assert open_broker("memory://shared").path == tmp_path / "shared.sqlite"
+
+
+def test_local_workers_render_and_narrate_into_campaign_paths(tmp_path):
+    root = tmp_path / "campaigns" / "demo"
+    root.mkdir(parents=True)
+    config = Config.load(root, environ={})
+    config.ensure_dirs()
+    config.script_longform.write_text(
+        "# Intro\n\nA worm spreads through npm.\n\n## Chapter 1\n\nIt steals tokens. [B-ROLL: token vault]\n",
+        encoding="utf-8",
+    )
+    config.shotlist_json.write_text(json.dumps({"scenes": [
+        {"id": f"scene_00{n}", "sora_prompt": f"Shot {n} of the worm", "duration_seconds": 5} for n in range(1, 4)
+    ]}), encoding="utf-8")
+
+    with use_config(config):
+        result = CliRunner().invoke(coordinate, ["--simulate", "--workers", "3", "--no-clip-store", "--timeout", "60"])
+        assert result.exit_code == 0, result.output
+
+    assert "4 done, 0 failed" in result.output and config.voiceover_mp3.exists()
+    for n in range(1, 4):
+        assert check_mp4(config.video_dir / f"scene_00{n}.mp4").ok
+    shotlist = json.loads(config.shotlist_json.read_text(encoding="utf-8"))
+    assert "start_seconds" in shotlist["scenes"][0]
+
+    broker = open_broker(config.work_queue_db)
+    assert {job.worker for job in broker.jobs("done")} <= {"local-1", "local-2", "local-3"}
+    assert broker.live_workers() == []
+
+
+def test_queue_file_uses_a_rollback_journal(tmp_path):
+    broker = SQLiteBroker(tmp_path / "queue.sqlite")
+    broker.enqueue("llm", {"step": "outline"})
+    with sqlite3.connect(broker.path) as db:
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert not (tmp_path / "queue.sqlite-wal").exists()
+
+
+def test_llm_jobs_change_with_their_prompts_and_settings(tmp_path):
+    root = tmp_path / "campaigns" / "demo"
+    shutil.copytree(TEMPLATE_ROOT / "prompts", root / "prompts")
+    config = Config.load(root, environ={})
+    steps = ("outline", "script", "shorts", "shotlist")
+
+    def ids(config: Config) -> dict:
+        return {payload["step"]: job_id(kind, payload) for kind, payload, _ in llm_jobs(config, steps, True)}
+
+    before = ids(config)
+    config.prompt_shorts.write_text("Write punchier shorts.\n", encoding="utf-8")
+    edited = ids(config)
+    assert [step for step in steps if edited[step] != before[step]] == ["shorts"]
+    hotter = ids(dataclasses.replace(config, gemini_temperature=config.gemini_temperature + 0.3))
+    assert all(hotter[step] != edited[step] for step in steps)
+
+
+def test_shotlist_runs_in_a_wave_after_shorts(tmp_path):
+    config = Config.load(tmp_path / "campaigns" / "demo", environ={})
+
+    with use_config(config):
+        result = CliRunner().invoke(
+            coordinate, ["--dry-run", "--llm", "shotlist", "--llm", "shorts", "--no-tts", "--no-sora"])
+        assert result.exit_code == 0, result.output
+
+    assert "llm: shorts\n  llm: shotlist" in result.output
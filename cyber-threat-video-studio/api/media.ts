@@ -22,6 +22,9 @@ const seedMedia: MediaAsset[] = [
 
 let hydrated = false;
 
+const formatDuration = (seconds: number) =>
+  `${Math.floor(seconds / 60)}:${String(Math.round(seconds % 60)).padStart(2, '0')}`;
+
 export const mediaApi = {
   list: async (): Promise<MediaAsset[]> => {
     const apiBase = import.meta.env.VITE_API_BASE;
@@ -42,17 +45,23 @@ export const mediaApi = {
           duration: 'n/a',
           thumbnailUrl: 'https://picsum.photos/seed/audio/400/225',
         })),
-        ...(data.video || []).map((title: string, idx: number) => ({
-          id: `video-${idx}`,
-          campaignId: 'shai-hulud-2025',
-          title,
-          description: 'Video asset',
-          type: 'Video',
-          size: 'n/a',
-          generatedAt: 'just now',
-          duration: 'n/a',
-          thumbnailUrl: 'https://picsum.photos/seed/video/400/225',
-        })),
+        ...(data.video || []).map((title: string, idx: number): MediaAsset => {
+          // Metadata and contact sheet from generate_previews.py, when it has run
+          const preview = data.previews?.[title];
+          const previewUrl = (file: string) => `${apiBase}/campaigns/shai-hulud-2025/media/previews/${file}`;
+          return {
+            id: `video-${idx}`,
+            campaignId: 'shai-hulud-2025',
+            title,
+            description: preview ? `${preview.width}x${preview.height} ${preview.video_codec}` : 'Video asset',
+            type: 'Video',
+            size: preview ? `${(preview.bytes / (1024 * 1024)).toFixed(1)} MB` : 'n/a',
+            generatedAt: 'just now',
+            duration: preview ? formatDuration(preview.duration_seconds) : 'n/a',
+            thumbnailUrl: preview ? previewUrl(preview.sheet) : 'https://picsum.photos/seed/video/400/225',
+            proxyUrl: preview ? previewUrl(preview.proxy) : undefined,
+          };
+        }),
       ];
       useMediaStore.getState().setMedia(assets);
       return assets;
@@ -75,7 +75,7 @@ const MediaLibrary: React.FC = () => {
                     <div className="relative aspect-video bg-black group-hover:opacity-90 transition-opacity">
                         <img src={asset.thumbnailUrl} alt={asset.title} className="w-full h-full object-cover opacity-80" loading="lazy" />
                         <div className="absolute inset-0 flex items-center justify-center opacity-0 group-hover:opacity-100 transition-opacity bg-black/40 backdrop-blur-[2px]">
-                            <button className="w-12 h-12 bg-primary/90 rounded-full flex items-center justify-center text-black transform scale-90 group-hover:scale-100 transition-transform">
+                            <button onClick={() => asset.proxyUrl && window.open(asset.proxyUrl, '_blank')} className="w-12 h-12 bg-primary/90 rounded-full flex items-center justify-center text-black transform scale-90 group-hover:scale-100 transition-transform">
                                 <Play size={24} fill="currentColor" className="ml-1" />
                             </button>
                         </div>
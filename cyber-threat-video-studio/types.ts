@@ -20,6 +20,7 @@ export interface MediaAsset {
   generatedAt: string;
   duration?: string;
   thumbnailUrl: string;
+  proxyUrl?: string; // low-res preview of a video clip
 }
 
 export interface SecretConfig {
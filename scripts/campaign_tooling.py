@@ -3,21 +3,108 @@
 Campaign management tooling.
 
 Usage:
-    python scripts/campaign_tooling.py new <campaign_name>
+    python scripts/campaign_tooling.py new <campaign_name> [--copy]
+    python scripts/campaign_tooling.py customize <campaign_name> <path>
     python scripts/campaign_tooling.py list
+    python scripts/campaign_tooling.py status [<campaign_name>]
+    python scripts/campaign_tooling.py dedup [--threshold 0.8]
 """
 
+import json
+import os
 import shutil
+import sys
+from collections import Counter
 from pathlib import Path
 
 import click
 from rich.console import Console
+from rich.table import Table
 
 console = Console()
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 CAMPAIGNS_DIR = REPO_ROOT / "campaigns"
 TEMPLATE_CAMPAIGN = CAMPAIGNS_DIR / "shai-hulud-2025"
+SKETCH_INDEX = CAMPAIGNS_DIR / ".intel-sketches.json"
+
+# Shared with the template: code and build files, never edited per campaign
+SHARED_FROM_TEMPLATE = ("scripts", "Makefile", "requirements.txt", ".env.example")
+# Materialized: per-campaign intel and docs (prompts are resolved from the template until customized)
+MATERIALIZED_FROM_TEMPLATE = ("data/raw/intel-links.md", "data/raw/notes-snippets.md")
+SCAFFOLD_IGNORE = shutil.ignore_patterns(
+    "__pycache__", ".pytest_cache", "*.pyc", ".env", "manifest.json", "index", "cassettes", "profiles"
+)
+
+
+def _share(source: Path, destination: Path) -> None:
+    """Link a template file/dir into a campaign: symlink, else hardlinks, else a copy."""
+    try:
+        destination.symlink_to(os.path.relpath(source, destination.parent), target_is_directory=source.is_dir())
+        return
+    except OSError:
+        pass
+    if source.is_dir():
+        try:
+            shutil.copytree(source, destination, ignore=SCAFFOLD_IGNORE, copy_function=os.link)
+        except (OSError, shutil.Error):
+            shutil.rmtree(destination, ignore_errors=True)
+            shutil.copytree(source, destination, ignore=SCAFFOLD_IGNORE)
+    else:
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copy2(source, destination)
+
+
+def _materialize(campaign_dir: Path, relative: Path) -> Path:
+    """Turn a shared path into a real, campaign-owned file.
+
+    Linked directories along the way are expanded into real directories of
+    per-entry links, so only the requested file stops being shared.
+    """
+    current = campaign_dir
+    template = TEMPLATE_CAMPAIGN
+    for part in relative.parts[:-1]:
+        current, template = current / part, template / part
+        if current.is_symlink():
+            current.unlink()
+            current.mkdir()
+            for entry in template.iterdir():
+                if entry.name != "__pycache__":
+                    _share(entry, current / entry.name)
+        current.mkdir(exist_ok=True)
+
+    destination, source = current / relative.name, template / relative.name
+    if destination.is_symlink() or not destination.exists():
+        destination.unlink(missing_ok=True)
+        shutil.copy2(source, destination)
+    elif destination.samefile(source):  # hardlink: break it
+        destination.unlink()
+        shutil.copy2(source, destination)
+    return destination
+
+
+def _empty_dir(path: Path) -> None:
+    if path.exists():
+        for item in path.iterdir():
+            if item.name == ".gitkeep":
+                continue
+            if item.is_dir():
+                shutil.rmtree(item)
+            else:
+                item.unlink()
+
+
+def _use_pipeline_scripts() -> None:
+    """Make the template campaign's pipeline modules importable."""
+    scripts_dir = str(TEMPLATE_CAMPAIGN / "scripts")
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+
+
+def _campaign_dirs():
+    return [item for item in sorted(CAMPAIGNS_DIR.iterdir()) if item.is_dir() and not item.name.startswith(".")]
 
 
 @click.group()
@@ -27,8 +114,15 @@ def cli():
 
 @cli.command()
 @click.argument("name")
-def new(name: str):
-    """Create a new campaign from the shai-hulud-2025 template."""
+@click.option("--copy", "standalone", is_flag=True, help="Copy everything instead of sharing the template's code")
+def new(name: str, standalone: bool):
+    """Create a new campaign from the shai-hulud-2025 template.
+
+    Pipeline code and the Makefile are shared with the template (symlinks,
+    falling back to hardlinks, then copies) and prompts resolve to the
+    template's unless customized, so fixes reach every campaign. Only the
+    paradigm doc, intel notes, a README stub and campaign.json are written.
+    """
 
     target_dir = CAMPAIGNS_DIR / name
 
@@ -43,45 +137,45 @@ def new(name: str):
     console.print(f"[bold blue]Creating new campaign: {name}[/bold blue]")
 
     try:
-        shutil.copytree(
-            TEMPLATE_CAMPAIGN,
-            target_dir,
-            ignore=shutil.ignore_patterns("__pycache__", ".pytest_cache", "*.pyc", ".env"),
-        )
-    except Exception as exc:  # noqa: BLE001
-        console.print(f"[red]Error copying template: {exc}[/red]")
+        if standalone:
+            shutil.copytree(TEMPLATE_CAMPAIGN, target_dir, ignore=SCAFFOLD_IGNORE)
+            for path in [target_dir / "data" / "processed", target_dir / "audio", target_dir / "video"]:
+                _empty_dir(path)
+            (target_dir / "docs" / "shai-hulud-paradigm.md").unlink(missing_ok=True)
+        else:
+            target_dir.mkdir(parents=True)
+            for relative in SHARED_FROM_TEMPLATE:
+                if (TEMPLATE_CAMPAIGN / relative).exists():
+                    _share(TEMPLATE_CAMPAIGN / relative, target_dir / relative)
+            for relative in MATERIALIZED_FROM_TEMPLATE:
+                source = TEMPLATE_CAMPAIGN / relative
+                if source.exists():
+                    (target_dir / relative).parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(source, target_dir / relative)
+            for relative in ("data/processed", "audio", "video", "docs"):
+                (target_dir / relative).mkdir(parents=True, exist_ok=True)
+                (target_dir / relative / ".gitkeep").touch()
+    except OSError as exc:
+        console.print(f"[red]Error scaffolding from template: {exc}[/red]")
+        shutil.rmtree(target_dir, ignore_errors=True)
         raise click.Abort() from exc
 
-    for path in [target_dir / "data" / "processed", target_dir / "audio", target_dir / "video"]:
-        if path.exists():
-            for item in path.iterdir():
-                if item.name == ".gitkeep":
-                    continue
-                if item.is_dir():
-                    shutil.rmtree(item)
-                else:
-                    item.unlink()
-
-    paradigm_src = target_dir / "docs" / "shai-hulud-paradigm.md"
+    paradigm_src = TEMPLATE_CAMPAIGN / "docs" / "shai-hulud-paradigm.md"
     paradigm_dest = target_dir / "docs" / f"{name}-paradigm.md"
-
     if paradigm_src.exists():
         content = paradigm_src.read_text(encoding="utf-8")
         paradigm_dest.write_text(f"# TODO: Update paradigm for {name}\n\n{content}", encoding="utf-8")
-        paradigm_src.unlink()
 
-    config_path = target_dir / "scripts" / "config.py"
-    if config_path.exists():
-        config_content = config_path.read_text(encoding="utf-8")
-        config_content = config_content.replace("shai-hulud-paradigm.md", f"{name}-paradigm.md")
-        config_path.write_text(config_content, encoding="utf-8")
+    if not standalone:
+        readme = (
+            f"# {name}\n\nTODO: Describe the threat this campaign covers.\n\n"
+            f"Pipeline code, Makefile and prompts are shared with `{TEMPLATE_CAMPAIGN.name}`; "
+            f"see its README for the workflow.\n"
+        )
+        (target_dir / "README.md").write_text(readme, encoding="utf-8")
 
-    prompts_dir = target_dir / "prompts"
-    if prompts_dir.exists():
-        for prompt_file in prompts_dir.glob("*.md"):
-            content = prompt_file.read_text(encoding="utf-8")
-            if "TODO" not in content:
-                prompt_file.write_text(f"<!-- TODO: Customize prompt for {name} -->\n\n{content}", encoding="utf-8")
+    settings = {"name": name, "template": TEMPLATE_CAMPAIGN.name, "paradigm_doc": f"docs/{name}-paradigm.md"}
+    (target_dir / "campaign.json").write_text(json.dumps(settings, indent=2) + "\n", encoding="utf-8")
 
     console.print(f"[green]\u2713 Campaign created at: {target_dir}[/green]")
     console.print("[yellow]Next steps:[/yellow]")
@@ -89,6 +183,28 @@ def new(name: str):
     console.print("  2. make setup-env")
     console.print("  3. Edit .env")
     console.print(f"  4. Edit docs/{name}-paradigm.md")
+    if not standalone:
+        console.print(f"  5. To change a prompt: campaign_tooling.py customize {name} prompts/<file>.md")
+
+
+@cli.command()
+@click.argument("name")
+@click.argument("relative_path")
+def customize(name: str, relative_path: str):
+    """Give a campaign its own editable copy of a shared template file."""
+
+    target_dir = CAMPAIGNS_DIR / name
+    if not (target_dir / "campaign.json").exists():
+        console.print(f"[red]Error: '{name}' is not a scaffolded campaign (no campaign.json)[/red]")
+        raise click.Abort()
+
+    source = TEMPLATE_CAMPAIGN / relative_path
+    if not source.is_file():
+        console.print(f"[red]Error: template has no file {relative_path}[/red]")
+        raise click.Abort()
+
+    destination = _materialize(target_dir, Path(relative_path))
+    console.print(f"[green]\u2713 {destination.relative_to(CAMPAIGNS_DIR)} is now a campaign-local copy[/green]")
 
 
 @cli.command()
@@ -101,5 +217,94 @@ def list():
             console.print(f"  - {item.name}")
 
 
+@cli.command()
+@click.argument("name", required=False)
+def status(name: str | None):
+    """Show pipeline status from each campaign's manifest.json."""
+
+    _use_pipeline_scripts()
+    from manifest import PIPELINE_STEPS, load_manifest, summarize
+
+    if name:
+        campaign = CAMPAIGNS_DIR / name
+        if not campaign.is_dir():
+            console.print(f"[red]Error: Campaign '{name}' not found at {campaign}[/red]")
+            raise click.Abort()
+        manifest = load_manifest(campaign)
+        if manifest is None:
+            console.print(f"[yellow]{name}: no manifest.json yet (run a pipeline step)[/yellow]")
+            return
+        summary = summarize(manifest)
+        console.print(f"[bold]{name}[/bold]: {summary['status']} ({summary['progress']}%), updated {summary['last_updated']}")
+        table = Table("Step", "Status", "Finished", "Duration", "Artifacts")
+        for step in PIPELINE_STEPS:
+            record = manifest["steps"].get(step, {})
+            table.add_row(
+                step,
+                record.get("status", "pending") + (f": {record['error']}" if record.get("error") else ""),
+                record.get("finished_at", ""),
+                f"{record['duration_seconds']:.1f}s" if "duration_seconds" in record else "",
+                str(record.get("artifacts", "")),
+            )
+        console.print(table)
+        for path, artifact in sorted(manifest["artifacts"].items()):
+            console.print(f"  {path}  {artifact['bytes']:,} bytes  {artifact['sha256'][:12]}")
+        return
+
+    table = Table("Campaign", "Status", "Progress", *PIPELINE_STEPS, "Updated")
+    marks = {"complete": "[green]\u2713[/green]", "failed": "[red]\u2717[/red]", "pending": "\u00b7"}
+    for campaign in _campaign_dirs():
+        manifest = load_manifest(campaign)
+        if manifest is None:
+            table.add_row(campaign.name, "[dim]no manifest[/dim]", "", *[""] * len(PIPELINE_STEPS), "")
+            continue
+        summary = summarize(manifest)
+        table.add_row(
+            campaign.name,
+            summary["status"],
+            f"{summary['progress']}%",
+            *[marks.get(summary["steps"][step], "?") for step in PIPELINE_STEPS],
+            summary["last_updated"],
+        )
+    console.print(table)
+
+
+@cli.command()
+@click.option("--threshold", default=0.8, show_default=True, help="Minimum estimated Jaccard similarity")
+@click.option("--limit", default=20, show_default=True, help="Max pairs to show (0 = all)")
+def dedup(threshold: float, limit: int):
+    """Report near-duplicate intel paragraphs across all campaigns."""
+
+    # Sketching lives with the pipeline scripts so prompt building can share it
+    _use_pipeline_scripts()
+    from intel_dedup import SketchIndex, near_duplicates
+    from intel_index import intel_sources
+
+    campaigns = _campaign_dirs()
+    files = [path for campaign in campaigns for path in intel_sources(campaign)]
+
+    index = SketchIndex(SKETCH_INDEX).refresh(files, base_dir=CAMPAIGNS_DIR)
+    index.save()
+    pairs = near_duplicates(index, threshold)
+
+    console.print(
+        f"[bold]Sketched {len(files)} files from {len(campaigns)} campaigns[/bold] "
+        f"({len(index.changed_files)} changed, {index.sketched} paragraphs re-sketched)"
+    )
+    if not pairs:
+        console.print(f"[green]\u2713 No near-duplicate paragraphs at similarity >= {threshold}[/green]")
+        return
+
+    by_file_pair = Counter((pair.first, pair.second) for pair in pairs)
+    console.print(f"[yellow]{len(pairs)} near-duplicate paragraph pairs:[/yellow]")
+    for (first, second), count in by_file_pair.most_common():
+        console.print(f"  {count:>4}  {first}  \u2194  {second}")
+
+    console.print("\n[bold]Closest pairs:[/bold]")
+    for pair in pairs[:limit or None]:
+        preview = " ".join(pair.preview.split())[:80]
+        console.print(f"  {pair.similarity:.2f}  {pair.first}  \u2194  {pair.second}\n        {preview}")
+
+
 if __name__ == "__main__":
     cli()
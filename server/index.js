@@ -21,11 +21,54 @@ const stepToScript = {
   audio: 'generate_audio.py',
   sora: 'generate_sora_clips.py',
   media: 'generate_sora_clips.py',
+  'shorts-media': 'generate_shorts_media.py',
+  previews: 'generate_previews.py',
+  assemble: 'generate_rough_cut.py',
 };
 
 // Pipeline steps for progress calculation
 const pipelineSteps = ['outline', 'script', 'shorts', 'shotlist', 'audio', 'sora'];
 
+/**
+ * Read status from the campaign's manifest.json, written atomically by every pipeline step.
+ * Returns null when there is no manifest yet, so callers fall back to scanning files.
+ */
+const readManifestStatus = (campaignPath) => {
+  let manifest;
+  try {
+    manifest = JSON.parse(readFileSync(path.join(campaignPath, 'manifest.json'), 'utf-8'));
+  } catch (err) {
+    return null;
+  }
+  if (!manifest || manifest.version !== 1) {
+    return null;
+  }
+
+  const steps = manifest.steps || {};
+  const completedSteps = {};
+  for (const step of pipelineSteps) {
+    const record = steps[step];
+    completedSteps[step] = Boolean(record && record.status === 'complete' && record.artifacts > 0);
+  }
+  const completedCount = Object.values(completedSteps).filter(Boolean).length;
+  const progress = Math.round((completedCount / pipelineSteps.length) * 100);
+
+  let status = 'Draft';
+  if (completedSteps.audio || completedSteps.sora) {
+    status = 'Media Generated';
+  } else if (completedSteps.script || completedSteps.shorts || completedSteps.shotlist) {
+    status = 'Scripted';
+  } else if (completedSteps.outline) {
+    status = 'Outlined';
+  }
+
+  const processedFiles = Object.keys(manifest.artifacts || {})
+    .filter((p) => p.startsWith('data/processed/'))
+    .map((p) => p.slice('data/processed/'.length));
+
+  return { status, progress, completedSteps, lastUpdated: manifest.updated_at || '', processedFiles };
+};
+
 /**
  * Infer campaign status and progress from files in data/processed/, audio/, and video/
  */
@@ -64,9 +107,9 @@ const inferCampaignStatus = (campaignPath) => {
         f.match(/^shorts.*\.(json|md)$/)
       );
       
-      // Shotlist: shotlist.json or shotlist*.json
+      // Shotlist: shotlist.json, shotlist.jsonl or shotlist*.json
       completedSteps.shotlist = processedFiles.some(f =>
-        f.match(/^shotlist.*\.json$/)
+        f.match(/^shotlist.*\.jsonl?$/)
       );
     } catch (err) {
       // Ignore errors reading processed directory
@@ -221,16 +264,17 @@ app.get('/health', (req, res) => {
 });
 
 app.get('/campaigns', (req, res) => {
-  const entries = readdirSync(campaignsDir).filter((name) => {
-    const full = path.join(campaignsDir, name);
-    return statSync(full).isDirectory();
-  });
+  // Dirent types avoid a stat per entry; dot-dirs hold shared caches (.clip-store), not campaigns
+  const entries = readdirSync(campaignsDir, { withFileTypes: true })
+    .filter((entry) => entry.isDirectory() && !entry.name.startsWith('.'))
+    .map((entry) => entry.name);
   
   const campaigns = entries.map((id) => {
     const campaignPath = path.join(campaignsDir, id);
-    const { status, progress } = inferCampaignStatus(campaignPath);
+    const fromManifest = readManifestStatus(campaignPath);
+    const { status, progress } = fromManifest || inferCampaignStatus(campaignPath);
     const description = parseReadmeDescription(campaignPath);
-    const lastUpdated = getLastUpdated(campaignPath);
+    const lastUpdated = fromManifest ? fromManifest.lastUpdated : getLastUpdated(campaignPath);
     
     return {
       id,
@@ -255,14 +299,15 @@ app.get('/campaigns/:id', (req, res) => {
     return res.status(404).json({ error: 'Campaign not found' });
   }
   
-  const { status, progress, completedSteps } = inferCampaignStatus(campaignPath);
+  const fromManifest = readManifestStatus(campaignPath);
+  const { status, progress, completedSteps } = fromManifest || inferCampaignStatus(campaignPath);
   const description = parseReadmeDescription(campaignPath);
-  const lastUpdated = getLastUpdated(campaignPath);
+  const lastUpdated = fromManifest ? fromManifest.lastUpdated : getLastUpdated(campaignPath);
   
   // List files in data/processed
   const processedDir = path.join(campaignPath, 'data', 'processed');
-  let processedFiles = [];
-  if (existsSync(processedDir)) {
+  let processedFiles = fromManifest ? fromManifest.processedFiles : [];
+  if (!fromManifest && existsSync(processedDir)) {
     try {
       processedFiles = readdirSync(processedDir).filter(f => f !== '.gitkeep');
     } catch (err) {
@@ -363,12 +408,31 @@ app.get('/campaigns/:id/media', (req, res) => {
   const audioDir = path.join(base, 'audio');
   const videoDir = path.join(base, 'video');
   const listFiles = (dir) => (existsSync(dir) ? readdirSync(dir).filter((f) => statSync(path.join(dir, f)).isFile()) : []);
+  // Clip metadata, proxies and contact sheets from generate_previews.py, keyed by clip filename
+  let previews = {};
+  try {
+    previews = JSON.parse(readFileSync(path.join(videoDir, 'previews', 'index.json'), 'utf-8')).clips || {};
+  } catch (err) {
+    // No previews built yet
+  }
   res.json({
     audio: listFiles(audioDir),
     video: listFiles(videoDir),
+    previews,
   });
 });
 
+// Serve a low-res proxy or contact sheet instead of the full-resolution clip
+app.get('/campaigns/:id/media/previews/:file', (req, res) => {
+  const id = req.params.id || defaultCampaign;
+  const file = path.basename(req.params.file);
+  const previewPath = path.join(campaignsDir, path.basename(id), 'video', 'previews', file);
+  if (!/\.(proxy\.mp4|sheet\.jpg)$/.test(file) || !existsSync(previewPath)) {
+    return res.status(404).json({ error: 'preview not found' });
+  }
+  res.sendFile(previewPath);
+});
+
 app.post('/run/:step', async (req, res) => {
   const step = req.params.step;
   const campaignId = req.body?.campaignId || defaultCampaign;
@@ -418,7 +482,8 @@ app.get('/run/:step/stream', (req, res) => {
   res.setHeader('Access-Control-Allow-Origin', '*');
   
   const { step } = req.params;
-  const { campaignId = defaultCampaign, simulate } = req.query;
+  const { campaignId = defaultCampaign, simulate, events } = req.query;
+  const jsonEvents = events === 'jsonl';
   
   // Validate step
   const scriptName = stepToScript[step];
@@ -446,6 +511,10 @@ app.get('/run/:step/stream', (req, res) => {
   if (shouldSimulate) {
     args.push('--simulate');
   }
+  if (jsonEvents) {
+    // Structured progress on stdout instead of rich console output
+    args.push('--events', 'jsonl');
+  }
   
   // Send initial connection event
   res.write(`data: ${JSON.stringify({ type: 'connected', step, campaignId, simulate: shouldSimulate })}\n\n`);
@@ -456,12 +525,23 @@ app.get('/run/:step/stream', (req, res) => {
     env: process.env
   });
   
-  // Stream stdout
+  // Stream stdout (buffer partial lines so JSON events are never split)
+  let stdoutBuffer = '';
   proc.stdout.on('data', (data) => {
-    const text = data.toString();
+    stdoutBuffer += data.toString();
+    const parts = stdoutBuffer.split('\n');
+    stdoutBuffer = parts.pop();
     // Split by newlines to send individual log lines
-    const lines = text.split('\n').filter(line => line.trim());
+    const lines = parts.filter(line => line.trim());
     for (const line of lines) {
+      if (jsonEvents) {
+        try {
+          res.write(`data: ${JSON.stringify({ type: 'event', event: JSON.parse(line) })}\n\n`);
+          continue;
+        } catch (err) {
+          // Not an event line; relay as plain stdout
+        }
+      }
       res.write(`data: ${JSON.stringify({ type: 'stdout', text: line })}\n\n`);
     }
   });
@@ -477,6 +557,9 @@ app.get('/run/:step/stream', (req, res) => {
   
   // Handle completion
   proc.on('close', (code) => {
+    if (stdoutBuffer.trim()) {
+      res.write(`data: ${JSON.stringify({ type: 'stdout', text: stdoutBuffer })}\n\n`);
+    }
     res.write(`data: ${JSON.stringify({ type: 'complete', exitCode: code, success: code === 0 })}\n\n`);
     res.end();
   });